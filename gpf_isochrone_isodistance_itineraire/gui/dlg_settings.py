@@ -14,8 +14,9 @@ from urllib.parse import quote
 from qgis.core import Qgis, QgsApplication
 from qgis.gui import QgsOptionsPageWidget, QgsOptionsWidgetFactory
 from qgis.PyQt import uic
-from qgis.PyQt.QtCore import QUrl
+from qgis.PyQt.QtCore import Qt, QUrl
 from qgis.PyQt.QtGui import QDesktopServices, QIcon
+from qgis.PyQt.QtWidgets import QTableWidgetItem
 
 # project
 from gpf_isochrone_isodistance_itineraire.__about__ import (
@@ -25,11 +26,18 @@ from gpf_isochrone_isodistance_itineraire.__about__ import (
     __uri_tracker__,
     __version__,
 )
+from gpf_isochrone_isodistance_itineraire.processing.get_capabities_parser import (
+    clear_capabilities_memory_cache,
+)
 from gpf_isochrone_isodistance_itineraire.toolbelt import PlgLogger, PlgOptionsManager
 from gpf_isochrone_isodistance_itineraire.toolbelt.cache_manager import CacheManager
+from gpf_isochrone_isodistance_itineraire.toolbelt.file_stats import convert_octets
 from gpf_isochrone_isodistance_itineraire.toolbelt.preferences import (
     PlgSettingsStructure,
 )
+from gpf_isochrone_isodistance_itineraire.toolbelt.service_statistics import (
+    ServiceStatisticsStore,
+)
 
 # ############################################################################
 # ########## Globals ###############
@@ -53,6 +61,7 @@ class ConfigOptionsPage(FORM_CLASS, QgsOptionsPageWidget):
         self.log = PlgLogger().log
         self.plg_settings = PlgOptionsManager()
         self.cache_manager = CacheManager()
+        self.service_statistics = ServiceStatisticsStore()
 
         # load UI and set objectName
         self.setupUi(self)
@@ -95,12 +104,19 @@ class ConfigOptionsPage(FORM_CLASS, QgsOptionsPageWidget):
             QIcon(":images/themes/default/console/iconClearConsole.svg")
         )
         self.btn_clear_cache.pressed.connect(partial(self.cache_manager.clear_cache))
+        self.btn_clear_cache.pressed.connect(clear_capabilities_memory_cache)
 
         self.btn_reset.setIcon(QIcon(QgsApplication.iconPath("mActionUndo.svg")))
         self.btn_reset.pressed.connect(self.reset_settings)
 
+        self.btn_clear_service_statistics.setIcon(
+            QIcon(":images/themes/default/console/iconClearConsole.svg")
+        )
+        self.btn_clear_service_statistics.pressed.connect(self.clear_service_statistics)
+
         # load previously saved settings
         self.load_settings()
+        self.load_service_statistics()
 
     def apply(self):
         """Called to permanently apply the settings shown in the options page (e.g. \
@@ -112,6 +128,32 @@ class ConfigOptionsPage(FORM_CLASS, QgsOptionsPageWidget):
         settings.debug_mode = self.opt_debug.isChecked()
         settings.version = __version__
 
+        # logs
+        settings.log_to_file = self.opt_log_to_file.isChecked()
+
+        # profiling
+        settings.profiling_enabled = self.opt_profiling_enabled.isChecked()
+        settings.profiling_memory = self.opt_profiling_memory.isChecked()
+
+        # concurrent requests
+        settings.max_buffered_memory_mb = self.sbx_max_buffered_memory.value()
+        settings.concurrency_auto_tuning = self.chb_concurrency_auto_tuning.isChecked()
+        settings.min_concurrency = self.sbx_min_concurrency.value()
+        settings.max_retries = self.sbx_max_retries.value()
+
+        # request scheduler
+        settings.max_connections = self.sbx_max_connections.value()
+        settings.rate_limit = self.dsb_rate_limit.value()
+        settings.response_cache_mb = self.sbx_response_cache.value()
+        settings.circuit_breaker_threshold = self.sbx_circuit_breaker_threshold.value()
+        settings.circuit_breaker_probe_interval = (
+            self.sbx_circuit_breaker_probe_interval.value()
+        )
+        settings.circuit_breaker_fail_fast = (
+            self.chb_circuit_breaker_fail_fast.isChecked()
+        )
+        settings.max_host_connections = self.sbx_max_host_connections.value()
+
         # service
         settings.url_service = self.lne_url_service.text()
 
@@ -132,9 +174,81 @@ class ConfigOptionsPage(FORM_CLASS, QgsOptionsPageWidget):
         self.opt_debug.setChecked(settings.debug_mode)
         self.lbl_version_saved_value.setText(settings.version)
 
+        # logs
+        self.opt_log_to_file.setChecked(settings.log_to_file)
+
+        # profiling
+        self.opt_profiling_enabled.setChecked(settings.profiling_enabled)
+        self.opt_profiling_memory.setChecked(settings.profiling_memory)
+
+        # concurrent requests
+        self.sbx_max_buffered_memory.setValue(settings.max_buffered_memory_mb)
+        self.chb_concurrency_auto_tuning.setChecked(settings.concurrency_auto_tuning)
+        self.sbx_min_concurrency.setValue(settings.min_concurrency)
+        self.sbx_max_retries.setValue(settings.max_retries)
+
+        # request scheduler
+        self.sbx_max_connections.setValue(settings.max_connections)
+        self.dsb_rate_limit.setValue(settings.rate_limit)
+        self.sbx_response_cache.setValue(settings.response_cache_mb)
+        self.sbx_circuit_breaker_threshold.setValue(settings.circuit_breaker_threshold)
+        self.sbx_circuit_breaker_probe_interval.setValue(
+            settings.circuit_breaker_probe_interval
+        )
+        self.chb_circuit_breaker_fail_fast.setChecked(
+            settings.circuit_breaker_fail_fast
+        )
+        self.sbx_max_host_connections.setValue(settings.max_host_connections)
+
         # service
         self.lne_url_service.setText(settings.url_service)
 
+    def load_service_statistics(self) -> None:
+        """Load request statistics of previous runs into table."""
+        headers = [
+            self.tr("Service"),
+            self.tr("Resource"),
+            self.tr("Profile"),
+            self.tr("Operation"),
+            self.tr("Requests"),
+            self.tr("Error rate"),
+            self.tr("Mean latency (ms)"),
+            self.tr("Recent latency (ms)"),
+            self.tr("Mean response size"),
+            self.tr("Last update"),
+        ]
+        all_statistics = self.service_statistics.get_all()
+
+        self.tbl_service_statistics.setSortingEnabled(False)
+        self.tbl_service_statistics.clear()
+        self.tbl_service_statistics.setColumnCount(len(headers))
+        self.tbl_service_statistics.setHorizontalHeaderLabels(headers)
+        self.tbl_service_statistics.setRowCount(len(all_statistics))
+        for row, statistics in enumerate(all_statistics):
+            values = [
+                statistics.url_service,
+                statistics.id_resource,
+                statistics.profile,
+                statistics.operation,
+                statistics.request_count,
+                f"{statistics.error_rate:.1%}",
+                round(statistics.mean_latency * 1000.0),
+                round(statistics.recent_latency * 1000.0),
+                convert_octets(round(statistics.mean_bytes)),
+                statistics.last_update,
+            ]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem()
+                item.setData(Qt.ItemDataRole.DisplayRole, value)
+                self.tbl_service_statistics.setItem(row, column, item)
+        self.tbl_service_statistics.setSortingEnabled(True)
+        self.tbl_service_statistics.resizeColumnsToContents()
+
+    def clear_service_statistics(self) -> None:
+        """Remove request statistics of previous runs."""
+        self.service_statistics.clear()
+        self.load_service_statistics()
+
     def reset_settings(self):
         """Reset settings to default values (set in preferences.py module)."""
         default_settings = PlgSettingsStructure()
@@ -7,6 +7,7 @@ from typing import Any, Dict, Optional
 # PyQGIS
 from qgis.core import (
     QgsApplication,
+    QgsExpression,
     QgsFeature,
     QgsFields,
     QgsGeometry,
@@ -31,6 +32,7 @@ from gpf_isochrone_isodistance_itineraire.processing.get_capabities_parser impor
 from gpf_isochrone_isodistance_itineraire.processing.gpf_iso_service import (
     GpfIsoServiceProcessing,
 )
+from gpf_isochrone_isodistance_itineraire.toolbelt.preferences import PlgOptionsManager
 
 
 class IsoServiceWidget(QWidget):
@@ -112,11 +114,16 @@ class IsoServiceWidget(QWidget):
         # Define parameters
         params = {
             "INPUT": self.memory_layer,
+            # Url service parameter is an expression: url as string literal
+            GpfIsoServiceProcessing.URL_SERVICE: QgsExpression.quotedString(
+                PlgOptionsManager().get_plg_settings().url_service
+            ),
             GpfIsoServiceProcessing.ID_RESOURCE: self.cbx_resource.currentText(),
             GpfIsoServiceProcessing.PROFILE: self.cbx_profil.currentText(),
             GpfIsoServiceProcessing.DIRECTION: self.cbx_direction.currentText(),
             GpfIsoServiceProcessing.MAX_COST: self.spb_max_cost.value(),
             GpfIsoServiceProcessing.ADDITIONAL_URL_PARAM: self.txt_additionnal_request.toPlainText(),
+            GpfIsoServiceProcessing.INTERACTIVE: True,
             "OUTPUT": "TEMPORARY_OUTPUT",
         }
 
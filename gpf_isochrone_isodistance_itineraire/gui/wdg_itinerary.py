@@ -81,6 +81,7 @@ class ItineraryWidget(QWidget):
             ItineraryProcessing.PROFILE: self.cbx_profil.currentText(),
             ItineraryProcessing.OPTIMIZATION: self.cbx_optimization.currentText(),
             ItineraryProcessing.ADDITIONAL_URL_PARAM: self.txt_additionnal_request.toPlainText(),
+            ItineraryProcessing.INTERACTIVE: True,
             "OUTPUT": "TEMPORARY_OUTPUT",
         }
 
@@ -37,6 +37,9 @@ from gpf_isochrone_isodistance_itineraire.processing.utils import (
     create_processing_action,
 )
 from gpf_isochrone_isodistance_itineraire.toolbelt import PlgLogger
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_scheduler import (
+    RequestScheduler,
+)
 
 # ############################################################################
 # ########## Classes ###############
@@ -362,6 +365,9 @@ class GpfIsochroneIsodistanceItinerairePlugin:
         # -- Clean up preferences panel in QGIS settings
         self.iface.unregisterOptionsWidgetFactory(self.options_factory)
 
+        # -- Stop request scheduler threads
+        RequestScheduler.shutdown_instance()
+
         # remove from QGIS help/extensions menu
         if self.action_help_plugin_menu_documentation:
             self.iface.pluginHelpMenu().removeAction(
@@ -375,6 +381,9 @@ class GpfIsochroneIsodistanceItinerairePlugin:
         if self.provider:
             QgsApplication.processingRegistry().removeProvider(self.provider)
 
+        # write pending log messages and stop log background thread
+        PlgLogger.log_buffer.stop()
+
     def run(self):
         """Main process.
 
@@ -0,0 +1,252 @@
+# standard
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+# PyQGIS
+from qgis.core import (
+    QgsProcessingFeedback,
+    QgsProcessingOutputNumber,
+    QgsProcessingParameterBoolean,
+    QgsProcessingParameterDefinition,
+)
+from qgis.PyQt.QtCore import QCoreApplication
+
+# project
+from gpf_isochrone_isodistance_itineraire.processing.previous_output import (
+    PreviousOutput,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    canonical_request_url,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_scheduler import (
+    ResponseCache,
+    get_request_scheduler,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.run_history import RunHistory
+
+# Report requests that would be sent, without calling the service
+DRY_RUN = "DRY_RUN"
+
+# Dry run results
+UNIQUE_REQUEST_COUNT = "UNIQUE_REQUEST_COUNT"
+DUPLICATE_REQUEST_COUNT = "DUPLICATE_REQUEST_COUNT"
+CACHED_REQUEST_COUNT = "CACHED_REQUEST_COUNT"
+ESTIMATED_DURATION = "ESTIMATED_DURATION"
+
+
+@dataclass
+class DryRunReport:
+    """Requests that would be sent by a run"""
+
+    # Number of input features
+    input_count: int = 0
+    # Number of input features without request (invalid input)
+    invalid_count: int = 0
+    # Number of requests available in previous output
+    reused_count: int = 0
+    # Number of requests available in response cache of the request scheduler
+    cached_count: int = 0
+    # Number of requests already defined for another input feature
+    duplicate_count: int = 0
+    # Number of requests to send without latency statistics
+    unknown_latency_count: int = 0
+    # Default latency of a request (seconds), None if no statistics available
+    latency: Optional[float] = None
+    # Number of requests sent at the same time
+    concurrency: int = 1
+    # Response cache of the request scheduler, None if not used
+    cache: Optional[ResponseCache] = None
+    _urls: Set[str] = field(default_factory=set)
+    _duration: float = 0.0
+
+    @property
+    def unique_count(self) -> int:
+        """Number of distinct requests that would be sent
+
+        :return: number of distinct requests
+        :rtype: int
+        """
+        return len(self._urls)
+
+    @property
+    def estimated_duration(self) -> float:
+        """Estimated duration of requests with latency statistics (seconds).
+        Duplicated requests are sent too, cached requests are not.
+
+        :return: estimated duration (seconds)
+        :rtype: float
+        """
+        return self._duration / max(self.concurrency, 1)
+
+    def add(
+        self,
+        url: Optional[str],
+        previous_output: PreviousOutput,
+        latency: Optional[float] = None,
+    ) -> None:
+        """Add request of an input feature
+
+        :param url: request url, None if input feature is invalid
+        :type url: Optional[str]
+        :param previous_output: previous output
+        :type previous_output: PreviousOutput
+        :param latency: expected latency of request (seconds), defaults to None to use
+            default latency of report
+        :type latency: Optional[float], optional
+        """
+        self.input_count += 1
+        if url is None:
+            self.invalid_count += 1
+            return
+        canonical_url = canonical_request_url(url)
+        if canonical_url in previous_output:
+            self.reused_count += 1
+            return
+        if self.cache is not None and canonical_url in self.cache:
+            self.cached_count += 1
+            return
+        if canonical_url in self._urls:
+            self.duplicate_count += 1
+        else:
+            self._urls.add(canonical_url)
+
+        if latency is None:
+            latency = self.latency
+        if latency is None:
+            self.unknown_latency_count += 1
+        else:
+            self._duration += latency
+
+    def push(self, feedback: QgsProcessingFeedback) -> None:
+        """Push report in feedback
+
+        :param feedback: processing feedback
+        :type feedback: QgsProcessingFeedback
+        """
+        feedback.pushInfo(
+            QCoreApplication.translate(
+                "DryRunReport",
+                "Simulation : {} entités, {} requêtes à envoyer, {} doublons, "
+                "{} reprises de la sortie précédente, {} lues depuis le cache des "
+                "réponses, {} entités invalides.",
+            ).format(
+                self.input_count,
+                self.unique_count,
+                self.duplicate_count,
+                self.reused_count,
+                self.cached_count,
+                self.invalid_count,
+            )
+        )
+        request_count = self.unique_count + self.duplicate_count
+        if request_count and self.unknown_latency_count == request_count:
+            feedback.pushWarning(
+                QCoreApplication.translate(
+                    "DryRunReport",
+                    "Aucune statistique de latence disponible pour estimer la durée : "
+                    "lancer un premier calcul.",
+                )
+            )
+            return
+        if self.unknown_latency_count:
+            feedback.pushWarning(
+                QCoreApplication.translate(
+                    "DryRunReport",
+                    "{} requêtes sans statistique de latence ne sont pas comptées dans "
+                    "la durée estimée.",
+                ).format(self.unknown_latency_count)
+            )
+        feedback.pushInfo(
+            QCoreApplication.translate(
+                "DryRunReport", "Durée estimée : {} ({} requêtes simultanées)."
+            ).format(
+                time.strftime("%H:%M:%S", time.gmtime(round(self.estimated_duration))),
+                self.concurrency,
+            )
+        )
+
+    def results(self) -> Dict[str, Any]:
+        """Return algorithm results for dry run
+
+        :return: requests count and estimated duration
+        :rtype: Dict[str, Any]
+        """
+        return {
+            UNIQUE_REQUEST_COUNT: self.unique_count,
+            DUPLICATE_REQUEST_COUNT: self.duplicate_count,
+            CACHED_REQUEST_COUNT: self.cached_count,
+            ESTIMATED_DURATION: self.estimated_duration,
+        }
+
+    @staticmethod
+    def from_history(
+        algorithm: str, url_service: Optional[str], concurrency: int = 1
+    ) -> "DryRunReport":
+        """Create an empty report, with default latency estimated from previous runs
+        of the algorithm. Requests available in the response cache of the request
+        scheduler of the process are counted as cached.
+
+        :param algorithm: algorithm name
+        :type algorithm: str
+        :param url_service: service url, None if requests are sent to several
+            services: no default latency
+        :type url_service: Optional[str]
+        :param concurrency: number of requests sent at the same time, defaults to 1
+        :type concurrency: int, optional
+        :return: empty dry run report
+        :rtype: DryRunReport
+        """
+        return DryRunReport(
+            latency=(
+                RunHistory().estimate_latency(algorithm, url_service)
+                if url_service
+                else None
+            ),
+            concurrency=concurrency,
+            cache=get_request_scheduler().cache,
+        )
+
+
+def create_dry_run_parameter() -> QgsProcessingParameterBoolean:
+    """Create advanced DRY_RUN parameter
+
+    :return: dry run parameter
+    :rtype: QgsProcessingParameterBoolean
+    """
+    param = QgsProcessingParameterBoolean(
+        name=DRY_RUN,
+        description=QCoreApplication.translate(
+            "ProcessingUtils", "Simulation, sans requête au service"
+        ),
+        defaultValue=False,
+        optional=True,
+    )
+    param.setFlags(param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+    return param
+
+
+def create_dry_run_outputs() -> List[QgsProcessingOutputNumber]:
+    """Create dry run outputs
+
+    :return: dry run outputs
+    :rtype: List[QgsProcessingOutputNumber]
+    """
+    descriptions = {
+        UNIQUE_REQUEST_COUNT: QCoreApplication.translate(
+            "ProcessingUtils", "Nombre de requêtes distinctes à envoyer"
+        ),
+        DUPLICATE_REQUEST_COUNT: QCoreApplication.translate(
+            "ProcessingUtils", "Nombre de requêtes en double"
+        ),
+        CACHED_REQUEST_COUNT: QCoreApplication.translate(
+            "ProcessingUtils", "Nombre de requêtes lues depuis le cache des réponses"
+        ),
+        ESTIMATED_DURATION: QCoreApplication.translate(
+            "ProcessingUtils", "Durée estimée des requêtes (s)"
+        ),
+    }
+    return [
+        QgsProcessingOutputNumber(name=name, description=description)
+        for name, description in descriptions.items()
+    ]
@@ -0,0 +1,195 @@
+# standard
+from typing import Any, Dict, Optional
+
+# PyQGIS
+from qgis.core import (
+    QgsFeature,
+    QgsFeatureSink,
+    QgsFeatureSource,
+    QgsField,
+    QgsFields,
+    QgsProcessingAlgorithm,
+    QgsProcessingContext,
+    QgsProcessingException,
+    QgsProcessingOutputNumber,
+    QgsProcessingParameterFeatureSink,
+)
+from qgis.PyQt.QtCore import QCoreApplication, QMetaType
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    RequestResult,
+)
+
+# Optional sink for input features that could not be processed
+FAILED_OUTPUT = "FAILED_OUTPUT"
+# Number of failed input features, in algorithm results
+FAILED_COUNT = "FAILED_COUNT"
+
+# Fields added to failed input features
+ERROR_CATEGORY_FIELD = "error_category"
+ERROR_MESSAGE_FIELD = "error_message"
+
+# Error categories
+ERROR_CATEGORY_INVALID_INPUT = "invalid_input"
+ERROR_CATEGORY_SERVICE_ERROR = "service_error"
+ERROR_CATEGORY_EMPTY_RESPONSE = "empty_response"
+
+
+class FailedFeatureSink:
+    """Write input features that could not be processed in an optional sink, with
+    an error category and message. The output layer can be used as input of a new run
+    to only process failed features.
+    """
+
+    def __init__(
+        self,
+        sink: Optional[QgsFeatureSink] = None,
+        fields: Optional[QgsFields] = None,
+        write_error: str = "",
+        dest_id: str = "",
+    ) -> None:
+        """Sink for failed input features
+
+        :param sink: output sink, None if failed features are not written
+        :type sink: Optional[QgsFeatureSink], optional
+        :param fields: output fields, from create_failed_output_fields
+        :type fields: Optional[QgsFields], optional
+        :param write_error: exception message if a feature can't be written
+        :type write_error: str, optional
+        :param dest_id: sink destination id
+        :type dest_id: str, optional
+        """
+        self._sink = sink
+        self._fields = fields or QgsFields()
+        self._write_error = write_error
+        self.dest_id = dest_id
+        self.count = 0
+
+    def add(self, feature: QgsFeature, category: str, message: str) -> None:
+        """Add a failed input feature
+
+        :param feature: input feature
+        :type feature: QgsFeature
+        :param category: error category
+        :type category: str
+        :param message: error message
+        :type message: str
+        :raises QgsProcessingException: feature can't be written in sink
+        """
+        self.count += 1
+        if self._sink is None:
+            return
+
+        failed_feature = QgsFeature(self._fields)
+        failed_feature.setGeometry(feature.geometry())
+        failed_feature.setAttributes(feature.attributes() + [category, message])
+        if not self._sink.addFeature(failed_feature, QgsFeatureSink.Flag.FastInsert):
+            raise QgsProcessingException(self._write_error)
+
+    @staticmethod
+    def from_parameters(
+        algorithm: QgsProcessingAlgorithm,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        source: QgsFeatureSource,
+    ) -> "FailedFeatureSink":
+        """Create failed features sink from FAILED_OUTPUT parameter
+
+        :param algorithm: algorithm with FAILED_OUTPUT parameter
+        :type algorithm: QgsProcessingAlgorithm
+        :param parameters: input parameter
+        :type parameters: Dict[str, Any]
+        :param context: processing context
+        :type context: QgsProcessingContext
+        :param source: input source
+        :type source: QgsFeatureSource
+        :return: failed features sink, without sink if FAILED_OUTPUT is not defined
+        :rtype: FailedFeatureSink
+        """
+        fields = create_failed_output_fields(source.fields())
+        sink, dest_id = algorithm.parameterAsSink(
+            parameters,
+            FAILED_OUTPUT,
+            context,
+            fields,
+            source.wkbType(),
+            source.sourceCrs(),
+        )
+        return FailedFeatureSink(
+            sink=sink,
+            fields=fields,
+            write_error=(
+                algorithm.writeFeatureError(sink, parameters, FAILED_OUTPUT)
+                if sink is not None
+                else ""
+            ),
+            dest_id=dest_id,
+        )
+
+    def results(self) -> Dict[str, Any]:
+        """Return algorithm results for failed features
+
+        :return: failed features sink destination id (if created) and count
+        :rtype: Dict[str, Any]
+        """
+        results: Dict[str, Any] = {FAILED_COUNT: self.count}
+        if self._sink is not None:
+            results[FAILED_OUTPUT] = self.dest_id
+        return results
+
+
+def create_failed_output_parameter() -> QgsProcessingParameterFeatureSink:
+    """Create optional FAILED_OUTPUT sink parameter, not created by default
+
+    :return: failed features sink parameter
+    :rtype: QgsProcessingParameterFeatureSink
+    """
+    return QgsProcessingParameterFeatureSink(
+        name=FAILED_OUTPUT,
+        description=QCoreApplication.translate("ProcessingUtils", "Entités en échec"),
+        optional=True,
+        createByDefault=False,
+    )
+
+
+def create_failed_count_output() -> QgsProcessingOutputNumber:
+    """Create FAILED_COUNT output
+
+    :return: failed features count output
+    :rtype: QgsProcessingOutputNumber
+    """
+    return QgsProcessingOutputNumber(
+        name=FAILED_COUNT,
+        description=QCoreApplication.translate(
+            "ProcessingUtils", "Nombre d'entités en échec"
+        ),
+    )
+
+
+def create_failed_output_fields(input_fields: QgsFields) -> QgsFields:
+    """Define fields of failed features: input fields, error category and message
+
+    :param input_fields: input fields
+    :type input_fields: QgsFields
+    :return: failed features fields
+    :rtype: QgsFields
+    """
+    fields = QgsFields(input_fields)
+    fields.append(QgsField(ERROR_CATEGORY_FIELD, type=QMetaType.Type.QString))
+    fields.append(QgsField(ERROR_MESSAGE_FIELD, type=QMetaType.Type.QString))
+    return fields
+
+
+def get_result_error_category(result: RequestResult) -> str:
+    """Define error category of a request result not usable
+
+    :param result: request result
+    :type result: RequestResult
+    :return: ERROR_CATEGORY_SERVICE_ERROR for request errors,
+        ERROR_CATEGORY_EMPTY_RESPONSE otherwise
+    :rtype: str
+    """
+    if result.is_error:
+        return ERROR_CATEGORY_SERVICE_ERROR
+    return ERROR_CATEGORY_EMPTY_RESPONSE
@@ -1,6 +1,8 @@
 # standard
 import json
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 # PyQGIS
 from qgis.core import Qgis, QgsBlockingNetworkRequest, QgsRectangle
@@ -12,6 +14,10 @@ from gpf_isochrone_isodistance_itineraire.constants import (
     ROUTE_OPERATION,
 )
 from gpf_isochrone_isodistance_itineraire.toolbelt.cache_manager import CacheManager
+from gpf_isochrone_isodistance_itineraire.toolbelt.endpoints import (
+    primary_endpoint,
+    split_endpoints,
+)
 from gpf_isochrone_isodistance_itineraire.toolbelt.file_stats import is_file_older_than
 from gpf_isochrone_isodistance_itineraire.toolbelt.log_handler import PlgLogger
 from gpf_isochrone_isodistance_itineraire.toolbelt.preferences import PlgOptionsManager
@@ -20,11 +26,91 @@ from gpf_isochrone_isodistance_itineraire.toolbelt.preferences import PlgOptions
 # ########## GLOBALS #############
 # ################################
 
+# Duration of getcapabilities content in memory cache, before a new read of disk cache
+CAPABILITIES_MEMORY_CACHE_DURATION_S = 300.0
+
+# getcapabilities content by url service, with load time
+_capabilities_memory_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_capabilities_memory_cache_lock = threading.Lock()
+
+# Index of last getcapabilities contents used, by content id
+_capabilities_indexes: Dict[int, "_CapabilitiesIndex"] = {}
+_CAPABILITIES_INDEXES_MAX_SIZE = 16
+
+# ############################################################################
+# ########## CLASSES #############
+# ################################
+
+
+class _CapabilitiesIndex:
+    """Lookup tables for a getcapabilities content.
+
+    Keep a reference to indexed content, so index is used only if content is the
+    same object.
+    """
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        """Build index for getcapabilities content
+
+        :param data: getcapabilities content
+        :type data: Dict[str, Any]
+        """
+        self.data = data
+        self.operations: List[str] = [
+            op["id"] for op in data.get("operations", []) if "id" in op
+        ]
+        self.resources: List[Dict[str, Any]] = [
+            res for res in data.get("resources", []) if "id" in res
+        ]
+        self.resources_by_operation: Dict[str, List[Dict[str, Any]]] = {}
+        self.parameters: Dict[Tuple[str, str], List[Any]] = {}
+
+        for res in self.resources:
+            for op in res.get("availableOperations", []):
+                if "id" not in op:
+                    continue
+                resources = self.resources_by_operation.setdefault(op["id"], [])
+                if not resources or resources[-1] is not res:
+                    resources.append(res)
+                if "availableParameters" in op:
+                    self.parameters.setdefault(
+                        (res["id"], op["id"]), op["availableParameters"]
+                    )
+
+
 # ############################################################################
 # ########## FUNCTIONS ###########
 # ################################
 
 
+def clear_capabilities_memory_cache() -> None:
+    """Clear getcapabilities memory cache and indexes. Next calls read disk cache."""
+    with _capabilities_memory_cache_lock:
+        _capabilities_memory_cache.clear()
+        _capabilities_indexes.clear()
+
+
+def _get_capabilities_index(data: Dict[str, Any]) -> _CapabilitiesIndex:
+    """Get index for a getcapabilities content, created if not available
+
+    :param data: getcapabilities content
+    :type data: Dict[str, Any]
+    :return: index for content
+    :rtype: _CapabilitiesIndex
+    """
+    with _capabilities_memory_cache_lock:
+        index = _capabilities_indexes.get(id(data))
+        if index is not None and index.data is data:
+            return index
+
+    index = _CapabilitiesIndex(data)
+    with _capabilities_memory_cache_lock:
+        if len(_capabilities_indexes) >= _CAPABILITIES_INDEXES_MAX_SIZE:
+            _capabilities_indexes.clear()
+        _capabilities_indexes[id(data)] = index
+    return index
+
+
 def isochrone_available_for_service(url_service: Optional[str] = None) -> bool:
     """Check if isochrone is available for service
 
@@ -57,10 +143,29 @@ def get_available_operation(url_service: Optional[str] = None) -> List[str]:
     """
     data = getcapabilities_json(url_service)
     if data and "operations" in data:
-        return [op["id"] for op in data["operations"]]
+        return list(_get_capabilities_index(data).operations)
     return []
 
 
+def get_post_operation_paths(url_service: Optional[str] = None) -> List[str]:
+    """Get url paths of operations accepting POST requests for a service
+
+    :param url_service: url for service, defaults to None (plugin settings param is used)
+    :type url_service: Optional[str], optional
+    :return: url paths of operations, relative to service url (for example
+        "/itineraire")
+    :rtype: List[str]
+    """
+    data = getcapabilities_json(url_service)
+    if not data:
+        return []
+    return [
+        op["url"].split("?")[0]
+        for op in data.get("operations", [])
+        if op.get("url") and "POST" in op.get("methods", [])
+    ]
+
+
 def isochrone_available_for_resource(
     id_resource: str, url_service: Optional[str] = None
 ) -> bool:
@@ -109,18 +214,13 @@ def get_available_resources(
     """
     data = getcapabilities_json(url_service)
     if data and "resources" in data:
+        index = _get_capabilities_index(data)
         # If no operation filter return all resources
         if operation is None:
-            return [res["id"] for res in data["resources"]]
-
-        # Parse resources to get available operation and check filter
-        result = []
-        for res in data["resources"]:
-            available_operation = [op["id"] for op in res["availableOperations"]]
-            if operation in available_operation:
-                result.append(res["id"])
+            return [res["id"] for res in index.resources]
 
-        return result
+        # Use resources indexed by available operation
+        return [res["id"] for res in index.resources_by_operation.get(operation, [])]
     return []
 
 
@@ -140,18 +240,13 @@ def get_available_resources_dict(
     """
     data = getcapabilities_json(url_service)
     if data and "resources" in data:
+        index = _get_capabilities_index(data)
         # If no operation filter return all resources
         if operation is None:
-            return [res["id"] for res in data["resources"]]
+            return [res["id"] for res in index.resources]
 
-        # Parse resources to get available operation and check filter
-        result = []
-        for res in data["resources"]:
-            available_operation = [op["id"] for op in res["availableOperations"]]
-            if operation in available_operation:
-                result.append(res)
-
-        return result
+        # Use resources indexed by available operation
+        return list(index.resources_by_operation.get(operation, []))
     return []
 
 
@@ -172,20 +267,8 @@ def get_resource_operation_parameters(
     data = getcapabilities_json(url_service)
 
     if data and "resources" in data:
-        # Parse resources to get available operation and check filter
-        for res in data["resources"]:
-            if (
-                "id" in res
-                and "availableOperations" in res
-                and res["id"] == id_resource
-            ):
-                for op in res["availableOperations"]:
-                    if (
-                        "id" in op
-                        and "availableParameters" in op
-                        and op["id"] == operation
-                    ):
-                        return op["availableParameters"]
+        index = _get_capabilities_index(data)
+        return index.parameters.get((id_resource, operation))
 
     return None
 
@@ -425,8 +508,13 @@ def get_resource_optimization(
 def getcapabilities_json(url_service: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """Returns getcapabilities json for an url.
 
-    First check if data is available in cache an not older than 24h
-    Otherwise a request is made to get value and save it in cache
+    First check if data is available in memory cache, then in disk cache if not older
+    than 24h. Otherwise a request is made to get value and save it in cache.
+
+    If url service contains several endpoints, content is cached for the first
+    endpoint and downloaded from the first available endpoint.
+
+    Returned content is shared between calls and must not be modified.
 
     :param url_service: url for service, defaults to None (plugin settings param is used)
     :type url_service: Optional[str], optional
@@ -436,6 +524,14 @@ def getcapabilities_json(url_service: Optional[str] = None) -> Optional[Dict[str
     if not url_service:
         plg_settings = PlgOptionsManager().get_plg_settings()
         url_service = plg_settings.url_service
+    endpoints = split_endpoints(url_service)
+    url_service = primary_endpoint(url_service)
+
+    # Check if memory cache available
+    with _capabilities_memory_cache_lock:
+        cached = _capabilities_memory_cache.get(url_service)
+    if cached and time.monotonic() - cached[0] < CAPABILITIES_MEMORY_CACHE_DURATION_S:
+        return cached[1]
 
     # Check if cache available
     cache_manager = CacheManager()
@@ -446,7 +542,11 @@ def getcapabilities_json(url_service: Optional[str] = None) -> Optional[Dict[str
         local_file_path=getcap_cache_file,
         expiration_rotating_hours=24,
     ):
-        result = download_getcapabilities(url_service=url_service, forceRefresh=True)
+        result = None
+        for endpoint in endpoints or [url_service]:
+            result = download_getcapabilities(url_service=endpoint, forceRefresh=True)
+            if result:
+                break
         if result:
             json_str = json.dumps(result)
             cache_manager.save_cache_file_content(
@@ -457,6 +557,10 @@ def getcapabilities_json(url_service: Optional[str] = None) -> Optional[Dict[str
         with open(getcap_cache_file, "r", encoding="utf-8") as f:
             result = json.load(f)
 
+    if result:
+        with _capabilities_memory_cache_lock:
+            _capabilities_memory_cache[url_service] = (time.monotonic(), result)
+
     return result
 
 
@@ -474,7 +578,7 @@ def download_getcapabilities(
         plg_settings = PlgOptionsManager().get_plg_settings()
         url_service = plg_settings.url_service
 
-    url = f"{url_service}/getcapabilities"
+    url = f"{primary_endpoint(url_service)}/getcapabilities"
 
     blocking_req = QgsBlockingNetworkRequest()
     qreq = QNetworkRequest(QUrl(url))
@@ -490,3 +594,62 @@ def download_getcapabilities(
 
     data = json.loads(str(blocking_req.reply().content(), "UTF8"))
     return data
+
+
+def capabilities_signature(data: Dict[str, Any]) -> Dict[Tuple[str, str], List[Any]]:
+    """Return resources, operations and parameter values of a getcapabilities
+    content, used to compare services
+
+    :param data: getcapabilities content
+    :type data: Dict[str, Any]
+    :return: parameter ids and values by resource and operation
+    :rtype: Dict[Tuple[str, str], List[Any]]
+    """
+    index = _get_capabilities_index(data)
+    signature: Dict[Tuple[str, str], List[Any]] = {}
+    for res in index.resources:
+        for op in res.get("availableOperations", []):
+            if "id" not in op:
+                continue
+            signature[(res["id"], op["id"])] = sorted(
+                (param.get("id", ""), json.dumps(param.get("values"), sort_keys=True))
+                for param in op.get("availableParameters", [])
+            )
+    return signature
+
+
+def get_compatible_endpoints(
+    url_service: Optional[str] = None,
+) -> Tuple[List[str], List[str]]:
+    """Compare getcapabilities content of each endpoint of url service with content
+    used by algorithms (first available endpoint). Endpoints with different
+    resources, operations or parameter values, or without getcapabilities, are
+    incompatible.
+
+    :param url_service: url for service, endpoints separated by ";". Defaults to None
+        (plugin settings param is used)
+    :type url_service: Optional[str], optional
+    :return: compatible endpoints and incompatible endpoints
+    :rtype: Tuple[List[str], List[str]]
+    """
+    if not url_service:
+        plg_settings = PlgOptionsManager().get_plg_settings()
+        url_service = plg_settings.url_service
+    endpoints = split_endpoints(url_service)
+    if len(endpoints) < 2:
+        return endpoints, []
+
+    reference = getcapabilities_json(url_service)
+    if not reference:
+        return [], endpoints
+    reference_signature = capabilities_signature(reference)
+
+    compatible = []
+    incompatible = []
+    for endpoint in endpoints:
+        data = getcapabilities_json(endpoint)
+        if data and capabilities_signature(data) == reference_signature:
+            compatible.append(endpoint)
+        else:
+            incompatible.append(endpoint)
+    return compatible, incompatible
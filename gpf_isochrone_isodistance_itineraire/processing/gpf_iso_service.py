@@ -1,17 +1,19 @@
 # standard
 import json
 from abc import abstractmethod
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 # PyQGIS
 from qgis.core import (
     Qgis,
-    QgsBlockingNetworkRequest,
     QgsCoordinateReferenceSystem,
     QgsCoordinateTransform,
     QgsExpression,
     QgsExpressionContext,
     QgsFeature,
+    QgsFeatureSink,
+    QgsFeatureSource,
     QgsField,
     QgsFields,
     QgsGeometry,
@@ -22,13 +24,25 @@ from qgis.core import (
     QgsProcessingFeedback,
     QgsProcessingParameterDefinition,
     QgsProcessingParameterExpression,
-    QgsProcessingParameterString,
 )
-from qgis.PyQt.QtCore import QCoreApplication, QMetaType, QUrl, QVariant
-from qgis.PyQt.QtNetwork import QNetworkRequest
+from qgis.PyQt.QtCore import QCoreApplication, QMetaType, QVariant
 
 # project
 from gpf_isochrone_isodistance_itineraire.constants import ISOCHRONE_OPERATION
+from gpf_isochrone_isodistance_itineraire.processing.dry_run import (
+    DRY_RUN,
+    DryRunReport,
+    create_dry_run_outputs,
+    create_dry_run_parameter,
+)
+from gpf_isochrone_isodistance_itineraire.processing.failed_features import (
+    ERROR_CATEGORY_EMPTY_RESPONSE,
+    ERROR_CATEGORY_INVALID_INPUT,
+    ERROR_CATEGORY_SERVICE_ERROR,
+    FailedFeatureSink,
+    create_failed_count_output,
+    create_failed_output_parameter,
+)
 from gpf_isochrone_isodistance_itineraire.processing.get_capabities_parser import (
     get_available_resources,
     get_resource_cost_type,
@@ -40,7 +54,78 @@ from gpf_isochrone_isodistance_itineraire.processing.get_capabities_parser impor
     isochrone_available_for_resource,
     isochrone_available_for_service,
 )
+from gpf_isochrone_isodistance_itineraire.processing.preflight import (
+    PREFLIGHT,
+    PREFLIGHT_NONE,
+    PREFLIGHT_ONLY,
+    PreflightReport,
+    create_preflight_parameter,
+)
+from gpf_isochrone_isodistance_itineraire.processing.previous_output import (
+    PreviousOutput,
+    create_previous_output_parameter,
+    create_reused_count_output,
+)
+from gpf_isochrone_isodistance_itineraire.processing.utils import (
+    CONCURRENCY,
+    INTERACTIVE,
+    OUTPUT_ORDER,
+    OUTPUT_ORDER_INPUT,
+    create_concurrency_controller,
+    create_concurrency_parameters,
+    create_interactive_parameter,
+    create_request_statistics_outputs,
+    create_retry_policy,
+    register_url_service,
+    scheduled_algorithm,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.instrumentation import (
+    StageInstrumentation,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    RequestResult,
+    RetryPolicy,
+    send_request_with_retry,
+)
 from gpf_isochrone_isodistance_itineraire.toolbelt.preferences import PlgOptionsManager
+from gpf_isochrone_isodistance_itineraire.toolbelt.profiling import profiled_algorithm
+from gpf_isochrone_isodistance_itineraire.toolbelt.reorder_buffer import ReorderBuffer
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_engine import (
+    ConcurrentRequestEngine,
+    RequestJob,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_scheduler import (
+    SchedulerJob,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_statistics import (
+    RequestStatistics,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.run_history import RunHistory
+from gpf_isochrone_isodistance_itineraire.toolbelt.service_request import (
+    ServiceRequest,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.service_statistics import (
+    ServiceStatisticsStore,
+)
+
+
+@dataclass
+class IsoServiceRequest:
+    """Request defined for an input feature"""
+
+    # Request url
+    url: str
+    # Point in request CRS
+    point: QgsPointXY
+    id_resource: str
+    profile: str
+    direction: str
+    max_cost: Any
+    additional_url_param: Any
+    # Service url used to build request: first endpoint
+    url_service: str
+    # Transform from input CRS to request CRS, None if not needed
+    transform: Optional[QgsCoordinateTransform] = None
 
 
 class GpfIsoServiceProcessing(QgsProcessingFeatureBasedAlgorithm):
@@ -50,19 +135,39 @@ class GpfIsoServiceProcessing(QgsProcessingFeatureBasedAlgorithm):
     DIRECTION = "DIRECTION"
     MAX_COST = "MAX_COST"
     ADDITIONAL_URL_PARAM = "ADDITIONAL_URL_PARAM"
+    CONCURRENCY = CONCURRENCY
+    OUTPUT_ORDER = OUTPUT_ORDER
+    PREFLIGHT = PREFLIGHT
+    DRY_RUN = DRY_RUN
+    INTERACTIVE = INTERACTIVE
 
     DIRECTION_ENUM = ["departure", "arrival"]
 
     def __init__(self) -> None:
         """Processing for isochrone and isodistance generation"""
         super().__init__()
+        # Service url: first endpoint if fixed, expression otherwise
         self._url_service = ""
+        self._url_service_expression = ""
+        self._url_service_fixed = True
+        # Service url by evaluated url service expression, None if unavailable
+        self._url_services: Dict[str, Optional[str]] = {}
         self._id_resource = ""
         self._profile = ""
         self._direction = ""
         self._max_cost = ""
         self._additional_url_param = ""
         self._input_crs = QgsCoordinateReferenceSystem()
+        self._statistics = RequestStatistics()
+        self._instrumentation = StageInstrumentation(enabled=False)
+        self._failed_features = FailedFeatureSink()
+        self._previous_output = PreviousOutput()
+        self._service_statistics = ServiceStatisticsStore()
+        self._retry_policy = RetryPolicy()
+        # Job of current run in request scheduler
+        self.scheduler_job: Optional[SchedulerJob] = None
+        # Last error reported while preparing a request
+        self._last_error = ""
 
     def tr(self, message: str) -> str:
         """Get the translation for a string using Qt translation API.
@@ -143,10 +248,11 @@ class GpfIsoServiceProcessing(QgsProcessingFeatureBasedAlgorithm):
         plg_settings = PlgOptionsManager().get_plg_settings()
 
         self.addParameter(
-            QgsProcessingParameterString(
+            QgsProcessingParameterExpression(
                 name=self.URL_SERVICE,
                 description=self.tr("Url service"),
-                defaultValue=plg_settings.url_service,
+                parentLayerParameterName=self.inputParameterName(),
+                defaultValue=QgsExpression.quotedString(plg_settings.url_service),
             )
         )
         self.addParameter(
@@ -194,6 +300,22 @@ class GpfIsoServiceProcessing(QgsProcessingFeatureBasedAlgorithm):
         )
         self.addParameter(param)
 
+        for param in create_concurrency_parameters():
+            self.addParameter(param)
+
+        self.addParameter(create_preflight_parameter())
+        self.addParameter(create_dry_run_parameter())
+        self.addParameter(create_failed_output_parameter())
+        self.addParameter(create_previous_output_parameter())
+        self.addParameter(create_interactive_parameter())
+
+        for output in create_request_statistics_outputs():
+            self.addOutput(output)
+        self.addOutput(create_failed_count_output())
+        self.addOutput(create_reused_count_output())
+        for output in create_dry_run_outputs():
+            self.addOutput(output)
+
     def prepareAlgorithm(
         self,
         parameters: Dict[str, Any],
@@ -211,9 +333,12 @@ class GpfIsoServiceProcessing(QgsProcessingFeatureBasedAlgorithm):
         :return: True if the parameter are valid, False otherwise
         :rtype: bool
         """
-        self._url_service = self.parameterAsString(
+        self._url_service_expression = self.parameterAsExpression(
             parameters, self.URL_SERVICE, context
         )
+        self._url_service = self._url_service_expression
+        self._url_service_fixed = not self._uses_feature(self._url_service_expression)
+        self._url_services = {}
         self._id_resource = self.parameterAsExpression(
             parameters, self.ID_RESOURCE, context
         )
@@ -226,26 +351,418 @@ class GpfIsoServiceProcessing(QgsProcessingFeatureBasedAlgorithm):
         self._additional_url_param = self.parameterAsString(
             parameters, self.ADDITIONAL_URL_PARAM, context
         )
+        self._statistics = RequestStatistics()
+        self._service_statistics = ServiceStatisticsStore()
+        self._retry_policy = create_retry_policy()
+        self._instrumentation = StageInstrumentation(
+            enabled=PlgOptionsManager().get_plg_settings().debug_mode,
+            name=self.name(),
+        )
 
-        # Check service for isochrone
-        if not isochrone_available_for_service(self._url_service):
-            if feedback:
+        # If url service is fixed (not refering to the feature), check service for
+        # isochrone
+        if self._url_service_fixed:
+            url_service = self._evaluateExpression(
+                context.expressionContext(), self._url_service_expression
+            )
+            self._url_service = self._register_url_service(str(url_service), feedback)
+            if self._url_service is None:
+                return False
+
+            # If id resource is fixed, check that isochrone is available
+            if '"' not in self._id_resource and not self._check_resource(
+                self._id_resource, self._url_service, feedback
+            ):
+                return False
+
+        return True
+
+    @staticmethod
+    def _uses_feature(expression_str: str) -> bool:
+        """Check if an expression depends on the evaluated feature: fields, geometry
+        or feature variables. A value which is not a valid expression, like an url
+        not quoted, is used as is and does not depend on the feature.
+
+        :param expression_str: expression string
+        :type expression_str: str
+        :return: True if expression must be evaluated for each feature
+        :rtype: bool
+        """
+        expression = QgsExpression(expression_str)
+        if expression.hasParserError():
+            return False
+        return bool(
+            expression.referencedColumns()
+            or expression.needsGeometry()
+            or expression.referencedVariables() & {"feature", "id", "geometry"}
+        )
+
+    def _register_url_service(
+        self, url_service: str, feedback: Optional[QgsProcessingFeedback]
+    ) -> Optional[str]:
+        """Register endpoints of an url service value in request scheduler and check
+        isochrone is available, once by value
+
+        :param url_service: url service value
+        :type url_service: str
+        :param feedback: processing feedback
+        :type feedback: Optional[QgsProcessingFeedback]
+        :return: first endpoint, used to build requests. None if isochrone is not
+            available
+        :rtype: Optional[str]
+        """
+        error = self.tr(
+            "Service isochrone/isodistance indisponible pour l'url : {}"
+        ).format(url_service)
+        if url_service in self._url_services:
+            if self._url_services[url_service] is None:
+                # Error already reported
+                self._last_error = error
+            return self._url_services[url_service]
+
+        primary = register_url_service(url_service, feedback)
+        if not isochrone_available_for_service(primary):
+            self._report_error(error, feedback)
+            primary = None
+        self._url_services[url_service] = primary
+        return primary
+
+    def _evaluate_url_service(
+        self,
+        expression_ctx: QgsExpressionContext,
+        feedback: Optional[QgsProcessingFeedback],
+    ) -> Optional[str]:
+        """Evaluate url service for a feature
+
+        :param expression_ctx: expression context, with feature
+        :type expression_ctx: QgsExpressionContext
+        :param feedback: processing feedback
+        :type feedback: Optional[QgsProcessingFeedback]
+        :return: first endpoint of url service, None if isochrone is not available
+        :rtype: Optional[str]
+        """
+        if self._url_service_fixed:
+            return self._url_service
+        url_service = self._evaluateExpression(
+            expression_ctx, self._url_service_expression
+        )
+        return self._register_url_service(str(url_service), feedback)
+
+    @profiled_algorithm
+    @scheduled_algorithm
+    def processAlgorithm(
+        self,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: Optional[QgsProcessingFeedback],
+    ) -> Dict[str, Any]:
+        """Runs the algorithm using the specified parameters.
+
+        Same feature loop as QgsProcessingFeatureBasedAlgorithm, with sink write
+        instrumentation. Request statistics are added to results.
+
+        :param parameters: input parameter
+        :type parameters: Dict[str, Any]
+        :param context: processing context
+        :type context: QgsProcessingContext
+        :param feedback: processing feedback
+        :type feedback: Optional[QgsProcessingFeedback]
+        :return: algorithm results
+        :rtype: Dict[str, Any]
+        """
+        source = self.parameterAsSource(parameters, self.inputParameterName(), context)
+        if source is None:
+            raise QgsProcessingException(
+                self.invalidSourceError(parameters, self.inputParameterName())
+            )
+
+        sink, dest_id = self.parameterAsSink(
+            parameters,
+            "OUTPUT",
+            context,
+            self.outputFields(source.fields()),
+            self.outputWkbType(source.wkbType()),
+            self.outputCrs(source.sourceCrs()),
+            self.sinkFlags(),
+        )
+        if sink is None:
+            raise QgsProcessingException(self.invalidSinkError(parameters, "OUTPUT"))
+
+        self._failed_features = FailedFeatureSink.from_parameters(
+            self, parameters, context, source
+        )
+        self._previous_output = PreviousOutput.from_parameters(
+            self, parameters, context, self.outputCrs(source.sourceCrs())
+        )
+        if len(self._previous_output):
+            feedback.pushInfo(
+                self.tr("{} requêtes disponibles dans la sortie précédente.").format(
+                    len(self._previous_output)
+                )
+            )
+
+        preflight = self.parameterAsEnum(parameters, self.PREFLIGHT, context)
+        if preflight != PREFLIGHT_NONE:
+            report = self.preflight(source, context, feedback)
+            report.push(feedback)
+            if not report.is_valid:
                 feedback.reportError(
-                    self.tr(
-                        "Service isochrone/isodistance indisponible pour l'url : {}".format(
-                            self._url_service
+                    self.tr("Pré-vérification en échec : aucune requête envoyée.")
+                )
+                return self._create_results(dest_id, feedback)
+            if preflight == PREFLIGHT_ONLY:
+                feedback.pushInfo(self.tr("Pré-vérification réussie."))
+                return self._create_results(dest_id, feedback)
+            feedback.pushInfo(
+                self.tr("Pré-vérification réussie : lancement des calculs.")
+            )
+
+        count = source.featureCount()
+        features = source.getFeatures(self.request(), self.sourceFlags())
+
+        concurrency = self.parameterAsInt(parameters, self.CONCURRENCY, context)
+        if self.parameterAsBoolean(parameters, self.DRY_RUN, context):
+            report = self.dry_run(features, concurrency, context, feedback)
+            results = self._create_results(dest_id, feedback)
+            results.update(report.results())
+            return results
+
+        if concurrency > 1:
+            max_bytes = (
+                PlgOptionsManager().get_plg_settings().max_buffered_memory_mb
+                * 1024
+                * 1024
+            )
+            buffer = ReorderBuffer(
+                sink,
+                ordered=self.parameterAsEnum(parameters, self.OUTPUT_ORDER, context)
+                == OUTPUT_ORDER_INPUT,
+                max_bytes=max_bytes,
+            )
+            engine = ConcurrentRequestEngine(
+                concurrency=concurrency,
+                buffer=buffer,
+                statistics=self._statistics,
+                feedback=feedback,
+                instrumentation=self._instrumentation,
+                max_bytes=max_bytes,
+                controller=create_concurrency_controller(concurrency),
+                retry_policy=self._retry_policy,
+                scheduler_job=self.scheduler_job,
+            )
+            if not engine.run(
+                self._create_jobs(features, context, feedback),
+                lambda job, result: self.create_output_features(
+                    job.data[0], job.data[1], result, feedback
+                ),
+                total=count,
+            ):
+                raise QgsProcessingException(
+                    self.writeFeatureError(sink, parameters, "OUTPUT")
+                )
+        else:
+            self._process_features(features, count, sink, parameters, context, feedback)
+
+        return self._create_results(dest_id, feedback)
+
+    def _create_results(
+        self, dest_id: str, feedback: Optional[QgsProcessingFeedback]
+    ) -> Dict[str, Any]:
+        """Report statistics and create algorithm results
+
+        :param dest_id: output destination id
+        :type dest_id: str
+        :param feedback: processing feedback
+        :type feedback: Optional[QgsProcessingFeedback]
+        :return: algorithm results
+        :rtype: Dict[str, Any]
+        """
+        self._statistics.report(feedback, force=True)
+        self._instrumentation.log_report()
+
+        statistics = self._statistics.as_dict()
+        # Run statistics are only recorded if a single service was used: statistics
+        # of several services are kept by service in service statistics
+        url_services = {primary for primary in self._url_services.values() if primary}
+        if len(url_services) == 1:
+            RunHistory().add_run(self.name(), url_services.pop(), statistics)
+        self._service_statistics.save()
+
+        results = {"OUTPUT": dest_id}
+        results.update(statistics)
+        results.update(self._failed_features.results())
+        results.update(self._previous_output.results())
+        return results
+
+    def dry_run(
+        self,
+        features: Iterable[QgsFeature],
+        concurrency: int,
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> DryRunReport:
+        """Define requests for input features without sending them, and report number
+        of requests and estimated duration from latency of previous runs.
+
+        Latency of a request is estimated from statistics of its service, resource and
+        profile, otherwise from previous runs on its service.
+
+        :param features: input features
+        :type features: Iterable[QgsFeature]
+        :param concurrency: number of requests sent at the same time
+        :type concurrency: int
+        :param context: processing context
+        :type context: QgsProcessingContext
+        :param feedback: processing feedback
+        :type feedback: QgsProcessingFeedback
+        :return: dry run report
+        :rtype: DryRunReport
+        """
+        # Default latency from previous runs only for a fixed url service
+        fixed_url_service = self._url_service if self._url_service_fixed else None
+        report = DryRunReport.from_history(self.name(), fixed_url_service, concurrency)
+        run_history = RunHistory()
+        history_latencies: Dict[str, Optional[float]] = {}
+        for feature in features:
+            if feedback.isCanceled():
+                break
+            iso_request = self.prepare_request(feature, context, feedback)
+            if iso_request is None:
+                self._failed_features.add(
+                    feature, ERROR_CATEGORY_INVALID_INPUT, self._last_error
+                )
+                report.add(None, self._previous_output)
+                continue
+            statistics = self._service_statistics.get(
+                iso_request.url_service,
+                str(iso_request.id_resource),
+                str(iso_request.profile),
+                ISOCHRONE_OPERATION,
+            )
+            latency = statistics.expected_latency if statistics else None
+            if latency is None and fixed_url_service is None:
+                if iso_request.url_service not in history_latencies:
+                    history_latencies[iso_request.url_service] = (
+                        run_history.estimate_latency(
+                            self.name(), iso_request.url_service
                         )
                     )
+                latency = history_latencies[iso_request.url_service]
+            report.add(iso_request.url, self._previous_output, latency)
+        report.push(feedback)
+        return report
+
+    def preflight(
+        self,
+        source: QgsFeatureSource,
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> PreflightReport:
+        """Check all input features before any request.
+
+        Each feature is checked with prepare_request, as before sending its request:
+        expressions are evaluated for the feature, service, resource, profile,
+        direction and cost type are checked against capabilities (memory cache and
+        index) and the point against the bbox of its resource. Invalid features are
+        added to failed features.
+
+        :param source: input source
+        :type source: QgsFeatureSource
+        :param context: processing context
+        :type context: QgsProcessingContext
+        :param feedback: processing feedback
+        :type feedback: QgsProcessingFeedback
+        :return: pre-flight report
+        :rtype: PreflightReport
+        """
+        report = PreflightReport()
+        combinations = set()
+        expression_ctx = context.expressionContext()
+        for feature in source.getFeatures(self.request(), self.sourceFlags()):
+            if feedback.isCanceled():
+                break
+            report.checked_count += 1
+
+            if not self._url_service_fixed:
+                # Service of feature registered once, with ignored endpoints reported
+                expression_ctx.setFeature(feature)
+                self._evaluate_url_service(expression_ctx, feedback)
+
+            iso_request = self.prepare_request(feature, context, None)
+            if iso_request is None:
+                report.add_invalid(feature.id(), self._last_error)
+                self._failed_features.add(
+                    feature, ERROR_CATEGORY_INVALID_INPUT, self._last_error
                 )
-            return False
+                continue
+            combinations.add(
+                (
+                    iso_request.url_service,
+                    str(iso_request.id_resource),
+                    str(iso_request.profile),
+                    str(iso_request.direction),
+                )
+            )
 
-        # If id resource is fixed (not refering to a field), check that isochrone is available
-        if '"' not in self._id_resource and not self._check_resource(
-            self._id_resource, self._url_service, feedback
-        ):
-            return False
+        report.combination_count = len(combinations)
+        return report
 
-        return True
+    def _process_features(
+        self,
+        features: Iterable[QgsFeature],
+        count: int,
+        sink: QgsFeatureSink,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> None:
+        """Process input features one by one, as QgsProcessingFeatureBasedAlgorithm
+
+        :param features: input features
+        :type features: Iterable[QgsFeature]
+        :param count: number of input features
+        :type count: int
+        :param sink: output sink
+        :type sink: QgsFeatureSink
+        :param parameters: input parameter
+        :type parameters: Dict[str, Any]
+        :param context: processing context
+        :type context: QgsProcessingContext
+        :param feedback: processing feedback
+        :type feedback: QgsProcessingFeedback
+        """
+        step = 100.0 / count if count > 0 else 1
+        for current, feature in enumerate(features):
+            if feedback.isCanceled():
+                break
+
+            context.expressionContext().setFeature(feature)
+            output_features = self.processFeature(feature, context, feedback)
+            with self._instrumentation.stage(StageInstrumentation.SINK):
+                for output_feature in output_features:
+                    if not sink.addFeature(
+                        output_feature, QgsFeatureSink.Flag.FastInsert
+                    ):
+                        raise QgsProcessingException(
+                            self.writeFeatureError(sink, parameters, "OUTPUT")
+                        )
+
+            feedback.setProgress(current * step)
+
+    def _report_error(
+        self, message: str, feedback: Optional[QgsProcessingFeedback]
+    ) -> None:
+        """Report an error in feedback and keep it as last error, used for failed
+        features
+
+        :param message: error message
+        :type message: str
+        :param feedback: processing feedback
+        :type feedback: Optional[QgsProcessingFeedback]
+        """
+        self._last_error = message
+        if feedback:
+            feedback.reportError(message)
 
     def _check_resource(
         self,
@@ -265,25 +782,23 @@ class GpfIsoServiceProcessing(QgsProcessingFeatureBasedAlgorithm):
         :rtype: bool
         """
         if id_resource not in get_available_resources(url_service):
-            if feedback:
-                feedback.reportError(
-                    self.tr(
-                        "Le service ne contient pas la resource : {}".format(
-                            id_resource
-                        )
-                    )
-                )
+            self._report_error(
+                self.tr(
+                    "Le service ne contient pas la resource : {}".format(id_resource)
+                ),
+                feedback,
+            )
             return False
 
         if not isochrone_available_for_resource(id_resource, url_service):
-            if feedback:
-                feedback.reportError(
-                    self.tr(
-                        "Service isochrone/isodistance indisponible pour la resource : {}".format(
-                            id_resource
-                        )
+            self._report_error(
+                self.tr(
+                    "Service isochrone/isodistance indisponible pour la resource : {}".format(
+                        id_resource
                     )
-                )
+                ),
+                feedback,
+            )
             return False
 
         return True
@@ -313,14 +828,14 @@ class GpfIsoServiceProcessing(QgsProcessingFeatureBasedAlgorithm):
             operation=ISOCHRONE_OPERATION,
             url_service=url_service,
         ):
-            if feedback:
-                feedback.reportError(
-                    self.tr(
-                        "La resource {} ne contient pas le profil : {}".format(
-                            id_resource, profile
-                        )
+            self._report_error(
+                self.tr(
+                    "La resource {} ne contient pas le profil : {}".format(
+                        id_resource, profile
                     )
-                )
+                ),
+                feedback,
+            )
             return False
         return True
 
@@ -348,14 +863,14 @@ class GpfIsoServiceProcessing(QgsProcessingFeatureBasedAlgorithm):
             id_resource=id_resource,
             url_service=url_service,
         ):
-            if feedback:
-                feedback.reportError(
-                    self.tr(
-                        "La resource {} ne contient pas la direction : {}".format(
-                            id_resource, direction
-                        )
+            self._report_error(
+                self.tr(
+                    "La resource {} ne contient pas la direction : {}".format(
+                        id_resource, direction
                     )
-                )
+                ),
+                feedback,
+            )
             return False
         return True
 
@@ -383,14 +898,14 @@ class GpfIsoServiceProcessing(QgsProcessingFeatureBasedAlgorithm):
             id_resource=id_resource,
             url_service=url_service,
         ):
-            if feedback:
-                feedback.reportError(
-                    self.tr(
-                        "La resource {} ne contient pas le type de cout : {}".format(
-                            id_resource, cost_type
-                        )
+            self._report_error(
+                self.tr(
+                    "La resource {} ne contient pas le type de cout : {}".format(
+                        id_resource, cost_type
                     )
-                )
+                ),
+                feedback,
+            )
             return False
         return True
 
@@ -446,14 +961,14 @@ class GpfIsoServiceProcessing(QgsProcessingFeatureBasedAlgorithm):
             bbox = transform.transformBoundingBox(bbox)
 
             if not bbox.contains(geom):
-                if feedback:
-                    feedback.reportError(
-                        self.tr(
-                            "Point {} non contenu dans la bounding box de la ressource {} : {}".format(
-                                geom.asWkt(), id_resource, bbox
-                            )
+                self._report_error(
+                    self.tr(
+                        "Point {} non contenu dans la bounding box de la ressource {} : {}".format(
+                            geom.asWkt(), id_resource, bbox
                         )
-                    )
+                    ),
+                    feedback,
+                )
                 return False
         return True
 
@@ -509,12 +1024,10 @@ class GpfIsoServiceProcessing(QgsProcessingFeatureBasedAlgorithm):
             url_service=url_service,
         )
         if len(supported_crs) == 0:
-            if feedback:
-                feedback.reportError(
-                    self.tr(
-                        "La resource ne supporte aucun CRS : {}".format(id_resource)
-                    )
-                )
+            self._report_error(
+                self.tr("La resource ne supporte aucun CRS : {}".format(id_resource)),
+                feedback,
+            )
             return None
 
         request_crs = input_crs
@@ -539,13 +1052,14 @@ class GpfIsoServiceProcessing(QgsProcessingFeatureBasedAlgorithm):
                 )
         return request_crs
 
-    def processFeature(
+    def prepare_request(
         self,
         feature: QgsFeature,
         context: QgsProcessingContext,
         feedback: Optional[QgsProcessingFeedback],
-    ) -> List[QgsFeature]:
-        """Processes an individual input feature from the source
+    ) -> Optional[IsoServiceRequest]:
+        """Evaluate expressions and check values for an input feature, and define
+        request to send.
 
         :param feature: feature to process
         :type feature: QgsFeature
@@ -553,39 +1067,48 @@ class GpfIsoServiceProcessing(QgsProcessingFeatureBasedAlgorithm):
         :type context: QgsProcessingContext
         :param feedback: processing feedback
         :type feedback: Optional[QgsProcessingFeedback]
-        :return: list of created QgsFeature
-        :rtype: List[QgsFeature]
+        :return: request for feature, None if no request can be sent
+        :rtype: Optional[IsoServiceRequest]
         """
+        stopwatch = self._instrumentation.stopwatch()
+        self._last_error = ""
 
         geometry = feature.geometry()
 
         if geometry.isNull():
-            feedback.pushWarning(
-                self.tr(
-                    "La géométrie n'est pas définie pour la feature {}. Le calcul n'est pas effectué".format(
-                        feature.id(),
-                    )
+            self._last_error = self.tr(
+                "La géométrie n'est pas définie pour la feature {}. Le calcul n'est pas effectué".format(
+                    feature.id(),
                 )
             )
-            return []
+            if feedback:
+                feedback.pushWarning(self._last_error)
+            return None
 
         expression_ctx = context.expressionContext()
         expression_ctx.setFeature(feature)
 
+        # Check service
+        url_service = self._evaluate_url_service(expression_ctx, feedback)
+        if url_service is None:
+            return None
+
         # Check resource
         id_resource = self._evaluateExpression(expression_ctx, self._id_resource)
-        if not self._check_resource(id_resource, self._url_service, feedback):
-            return []
+        stopwatch.lap(StageInstrumentation.EXPRESSION)
+        if not self._check_resource(id_resource, url_service, feedback):
+            return None
 
         # Define request crs
         request_crs = self._define_request_crs(
             input_crs=self._input_crs,
             id_resource=id_resource,
-            url_service=self._url_service,
+            url_service=url_service,
             feedback=feedback,
         )
         if request_crs is None:
-            return []
+            return None
+        stopwatch.lap(StageInstrumentation.VALIDATION)
 
         # Check if geometry must be converted
         transform = None
@@ -596,122 +1119,249 @@ class GpfIsoServiceProcessing(QgsProcessingFeatureBasedAlgorithm):
                 context.transformContext(),
             )
             geometry.transform(transform)
+        stopwatch.lap(StageInstrumentation.TRANSFORM)
 
         # Create request
         geom: QgsPointXY = geometry.asPoint()
-        request = f"{self._url_service}/isochrone?point={geom.x()},{geom.y()}"
+        request = ServiceRequest(url_service, ISOCHRONE_OPERATION)
+        request.add_param("point", f"{geom.x()},{geom.y()}")
 
         # Add resource
-        request += f"&resource={id_resource}"
+        request.add_param("resource", id_resource)
 
         # Check point geom
         if not self._check_point(
-            geom, request_crs, id_resource, self._url_service, context, feedback
+            geom, request_crs, id_resource, url_service, context, feedback
         ):
-            return []
+            return None
+
+        stopwatch.lap(StageInstrumentation.VALIDATION)
 
         # Check profile
         profile = self._evaluateExpression(expression_ctx, self._profile)
-        if not self._check_profile(profile, id_resource, self._url_service, feedback):
-            return []
-        request += f"&profile={profile}"
+        stopwatch.lap(StageInstrumentation.EXPRESSION)
+        if not self._check_profile(profile, id_resource, url_service, feedback):
+            return None
+        request.add_param("profile", profile)
+        stopwatch.lap(StageInstrumentation.VALIDATION)
 
         # Check direction
         direction = self._evaluateExpression(expression_ctx, self._direction)
-        if not self._check_direction(
-            direction, id_resource, self._url_service, feedback
-        ):
-            return []
-        request += f"&direction={direction}"
+        stopwatch.lap(StageInstrumentation.EXPRESSION)
+        if not self._check_direction(direction, id_resource, url_service, feedback):
+            return None
+        request.add_param("direction", direction)
 
         # Check cost type
         cost_type = self.get_cost_type()
-        if not self._check_cost_type(
-            cost_type, id_resource, self._url_service, feedback
-        ):
-            return []
-        request += f"&costType={cost_type}"
+        if not self._check_cost_type(cost_type, id_resource, url_service, feedback):
+            return None
+        request.add_param("costType", cost_type)
 
-        request += self.get_cost_unit_request_str()
+        request.add_params_string(self.get_cost_unit_request_str())
+        stopwatch.lap(StageInstrumentation.VALIDATION)
 
         # TODO check url getCapabilities to check values
         max_cost = self._evaluateExpression(expression_ctx, self._max_cost)
-        request += f"&costValue={max_cost}"
+        request.add_param("costValue", max_cost)
 
-        request += "&geometryFormat=wkt"
+        request.add_param("geometryFormat", "wkt")
 
-        request += f"&crs={request_crs.authid()}"
+        request.add_param("crs", request_crs.authid())
 
         # Check if additional param are available
         additional_url_param = self._evaluateExpression(
             expression_ctx, self._additional_url_param
         )
         if not QVariant(additional_url_param).isNull():
-            request += additional_url_param
+            request.add_params_string(str(additional_url_param))
+        stopwatch.lap(StageInstrumentation.EXPRESSION)
 
-        if feedback:
-            feedback.pushCommandInfo(f"request : {request}")
+        return IsoServiceRequest(
+            url=request.url,
+            point=geom,
+            id_resource=id_resource,
+            profile=profile,
+            direction=direction,
+            max_cost=max_cost,
+            additional_url_param=additional_url_param,
+            url_service=url_service,
+            transform=transform,
+        )
 
-        blocking_req = QgsBlockingNetworkRequest()
-        qreq = QNetworkRequest(QUrl(request))
-        error_code = blocking_req.get(qreq, forceRefresh=True, feedback=feedback)
+    def create_output_features(
+        self,
+        feature: QgsFeature,
+        iso_request: IsoServiceRequest,
+        result: RequestResult,
+        feedback: Optional[QgsProcessingFeedback],
+    ) -> List[QgsFeature]:
+        """Create output features from request result
+
+        :param feature: input feature
+        :type feature: QgsFeature
+        :param iso_request: request sent for input feature
+        :type iso_request: IsoServiceRequest
+        :param result: request result
+        :type result: RequestResult
+        :param feedback: processing feedback
+        :type feedback: Optional[QgsProcessingFeedback]
+        :return: list of created QgsFeature, empty in case of error
+        :rtype: List[QgsFeature]
+        """
+        stopwatch = self._instrumentation.stopwatch()
+        self._service_statistics.add_result(
+            iso_request.url_service,
+            str(iso_request.id_resource),
+            str(iso_request.profile),
+            ISOCHRONE_OPERATION,
+            result,
+        )
 
         # Add feedback in case of error
-        if error_code != QgsBlockingNetworkRequest.ErrorCode.NoError:
-            if feedback:
-                err_msg = f"{blocking_req.errorMessage()}."
-                # get the API response error to log it
-                req_reply = blocking_req.reply()
-                if req_reply and b"application/json" in req_reply.rawHeader(
-                    b"Content-Type"
-                ):
-                    api_response_error = json.loads(str(req_reply.content(), "UTF8"))
-                    if (
-                        "error" in api_response_error
-                        and "message" in api_response_error["error"]
-                    ):
-                        err_msg += f"API error message: {api_response_error['error']['message']}"
-                feedback.reportError(
-                    self.tr(
-                        "Erreur lors de la requête pour calcul d'isochrone : {}".format(
-                            err_msg
-                        )
+        if result.is_error:
+            self._report_error(
+                self.tr(
+                    "Erreur lors de la requête pour calcul d'isochrone : {}".format(
+                        result.full_error_message()
                     )
-                )
+                ),
+                feedback,
+            )
+            self._failed_features.add(
+                feature, ERROR_CATEGORY_SERVICE_ERROR, self._last_error
+            )
             return []
-        res_str = str(blocking_req.reply().content(), "UTF8")
+        res_str = str(result.content, "UTF8")
         if res_str:
             data = json.loads(res_str)
+            stopwatch.lap(StageInstrumentation.DECODE)
 
             output_geom = QgsGeometry.fromWkt(data["geometry"])
             # Apply inverse transformation if input data was converted
-            if transform:
+            if iso_request.transform:
                 output_geom.transform(
-                    transform, direction=Qgis.TransformDirection.Reverse
+                    iso_request.transform, direction=Qgis.TransformDirection.Reverse
                 )
 
+            geom = iso_request.point
             f = QgsFeature()
             f.setGeometry(output_geom)
             f.setFields(self.outputFields(feature.fields()))
-            f.setAttribute("request", request)
+            f.setAttribute("request", iso_request.url)
             f.setAttribute("x", geom.x())
             f.setAttribute("y", geom.y())
-            f.setAttribute("id_resource", id_resource)
-            f.setAttribute("profile", profile)
-            f.setAttribute("direction", direction)
-            f.setAttribute(self.get_max_cost_attribute_string(), max_cost)
-            f.setAttribute("additional_url_param", additional_url_param)
+            f.setAttribute("id_resource", iso_request.id_resource)
+            f.setAttribute("profile", iso_request.profile)
+            f.setAttribute("direction", iso_request.direction)
+            f.setAttribute(self.get_max_cost_attribute_string(), iso_request.max_cost)
+            f.setAttribute("additional_url_param", iso_request.additional_url_param)
 
             for field in feature.fields():
                 if field.name() == "fid":
                     f["fid_input"] = feature[field.name()]
                 else:
                     f[field.name()] = feature[field.name()]
+            stopwatch.lap(StageInstrumentation.GEOMETRY)
 
             return [f]
         else:
-            raise QgsProcessingException(
-                self.tr("Réponse vide pour la requête de calcul d'isoservice.")
+            self._report_error(
+                self.tr("Réponse vide pour la requête de calcul d'isoservice."),
+                feedback,
+            )
+            self._failed_features.add(
+                feature, ERROR_CATEGORY_EMPTY_RESPONSE, self._last_error
+            )
+            return []
+
+    def processFeature(
+        self,
+        feature: QgsFeature,
+        context: QgsProcessingContext,
+        feedback: Optional[QgsProcessingFeedback],
+    ) -> List[QgsFeature]:
+        """Processes an individual input feature from the source
+
+        :param feature: feature to process
+        :type feature: QgsFeature
+        :param context: processing context
+        :type context: QgsProcessingContext
+        :param feedback: processing feedback
+        :type feedback: Optional[QgsProcessingFeedback]
+        :return: list of created QgsFeature
+        :rtype: List[QgsFeature]
+        """
+        iso_request = self.prepare_request(feature, context, feedback)
+        if iso_request is None:
+            self._failed_features.add(
+                feature, ERROR_CATEGORY_INVALID_INPUT, self._last_error
+            )
+            return []
+
+        previous_features = self._previous_output.get_features(
+            iso_request.url, feature, self.outputFields(feature.fields())
+        )
+        if previous_features is not None:
+            return previous_features
+
+        if feedback:
+            feedback.pushCommandInfo(f"request : {iso_request.url}")
+
+        stopwatch = self._instrumentation.stopwatch()
+        result = send_request_with_retry(
+            iso_request.url,
+            feedback,
+            self._retry_policy,
+            on_retry=self._statistics.add_retried_result,
+            sender=self.scheduler_job.send,
+        )
+        if feedback and feedback.isCanceled():
+            # Request aborted by cancellation: not an error
+            return []
+        self._statistics.add_request_result(result)
+        self._statistics.report(feedback)
+        stopwatch.lap(StageInstrumentation.REQUEST)
+
+        return self.create_output_features(feature, iso_request, result, feedback)
+
+    def _create_jobs(
+        self,
+        features: Iterable[QgsFeature],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> Iterator[RequestJob]:
+        """Create request jobs for input features
+
+        :param features: input features
+        :type features: Iterable[QgsFeature]
+        :param context: processing context
+        :type context: QgsProcessingContext
+        :param feedback: processing feedback
+        :type feedback: QgsProcessingFeedback
+        :yield: request job for each input feature
+        :rtype: Iterator[RequestJob]
+        """
+        for index, feature in enumerate(features):
+            context.expressionContext().setFeature(feature)
+            iso_request = self.prepare_request(feature, context, feedback)
+            if iso_request is None:
+                self._failed_features.add(
+                    feature, ERROR_CATEGORY_INVALID_INPUT, self._last_error
+                )
+                yield RequestJob(index=index)
+                continue
+
+            previous_features = self._previous_output.get_features(
+                iso_request.url, feature, self.outputFields(feature.fields())
+            )
+            if previous_features is not None:
+                yield RequestJob(index=index, features=previous_features)
+                continue
+
+            feedback.pushCommandInfo(f"request : {iso_request.url}")
+            yield RequestJob(
+                index=index, url=iso_request.url, data=(feature, iso_request)
             )
 
     def outputWkbType(self, _: Qgis.WkbType) -> Qgis.WkbType:
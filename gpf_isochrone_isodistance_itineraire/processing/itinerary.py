@@ -1,32 +1,42 @@
 import json
-from typing import Optional
+from dataclasses import dataclass, replace
+from typing import List, Optional
 
 from qgis.core import (
     Qgis,
-    QgsBlockingNetworkRequest,
     QgsCoordinateReferenceSystem,
     QgsCoordinateTransform,
     QgsFeature,
     QgsFeatureSink,
+    QgsFeatureStore,
     QgsField,
     QgsFields,
     QgsGeometry,
+    QgsLineString,
+    QgsPoint,
     QgsPointXY,
     QgsProcessing,
     QgsProcessingAlgorithm,
     QgsProcessingContext,
     QgsProcessingException,
     QgsProcessingFeedback,
+    QgsProcessingParameterBoolean,
     QgsProcessingParameterDefinition,
     QgsProcessingParameterFeatureSink,
     QgsProcessingParameterPoint,
     QgsProcessingParameterString,
     QgsProcessingParameterVectorLayer,
+    QgsVectorLayer,
 )
-from qgis.PyQt.QtCore import QCoreApplication, QMetaType, QUrl
-from qgis.PyQt.QtNetwork import QNetworkRequest
+from qgis.PyQt.QtCore import QCoreApplication, QMetaType
 
 from gpf_isochrone_isodistance_itineraire.constants import ROUTE_OPERATION
+from gpf_isochrone_isodistance_itineraire.processing.dry_run import (
+    DRY_RUN,
+    DryRunReport,
+    create_dry_run_outputs,
+    create_dry_run_parameter,
+)
 from gpf_isochrone_isodistance_itineraire.processing.get_capabities_parser import (
     get_available_resources,
     get_resource_crs,
@@ -37,11 +47,66 @@ from gpf_isochrone_isodistance_itineraire.processing.get_capabities_parser impor
     route_available_for_resource,
     route_available_for_service,
 )
+from gpf_isochrone_isodistance_itineraire.processing.previous_output import (
+    PreviousOutput,
+)
 from gpf_isochrone_isodistance_itineraire.processing.utils import (
+    INTERACTIVE,
+    MAX_CONCURRENCY,
+    create_interactive_parameter,
+    create_request_statistics_outputs,
+    create_retry_policy,
     get_short_string,
     get_user_manual_url,
+    register_url_service,
+    scheduled_algorithm,
 )
 from gpf_isochrone_isodistance_itineraire.toolbelt import PlgOptionsManager
+from gpf_isochrone_isodistance_itineraire.toolbelt.instrumentation import (
+    StageInstrumentation,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    RequestResult,
+    send_request_with_retry,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.profiling import profiled_algorithm
+from gpf_isochrone_isodistance_itineraire.toolbelt.reorder_buffer import ReorderBuffer
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_engine import (
+    ConcurrentRequestEngine,
+    RequestJob,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_scheduler import (
+    get_request_scheduler,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_statistics import (
+    RequestStatistics,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.run_history import RunHistory
+from gpf_isochrone_isodistance_itineraire.toolbelt.service_request import (
+    ServiceRequest,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.service_statistics import (
+    ServiceStatisticsStore,
+)
+
+
+@dataclass
+class ItineraryRequest:
+    """Request defined for an itinerary"""
+
+    # Request url
+    url: str
+    # Start and end points in request CRS
+    start: QgsPointXY
+    end: QgsPointXY
+    # Intermediates points used in request
+    intermediates: str
+    id_resource: str
+    profile: str
+    optimization: str
+    additional_url_param: str
+    # Transform from input CRS to request CRS, None if not needed
+    transform: Optional[QgsCoordinateTransform] = None
 
 
 class ItineraryProcessing(QgsProcessingAlgorithm):
@@ -53,6 +118,9 @@ class ItineraryProcessing(QgsProcessingAlgorithm):
     PROFILE = "PROFILE"
     OPTIMIZATION = "OPTIMIZATION"
     ADDITIONAL_URL_PARAM = "ADDITIONAL_URL_PARAM"
+    LEG_MODE = "LEG_MODE"
+    DRY_RUN = DRY_RUN
+    INTERACTIVE = INTERACTIVE
 
     OUTPUT = "OUTPUT"
 
@@ -161,6 +229,17 @@ class ItineraryProcessing(QgsProcessingAlgorithm):
         )
         self.addParameter(param)
 
+        param = QgsProcessingParameterBoolean(
+            name=self.LEG_MODE,
+            description=self.tr("Calcul par tronçon entre les étapes"),
+            defaultValue=False,
+            optional=True,
+        )
+        param.setFlags(
+            param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced
+        )
+        self.addParameter(param)
+
         self.addParameter(
             QgsProcessingParameterFeatureSink(
                 name=self.OUTPUT,
@@ -169,6 +248,14 @@ class ItineraryProcessing(QgsProcessingAlgorithm):
             )
         )
 
+        self.addParameter(create_dry_run_parameter())
+        self.addParameter(create_interactive_parameter())
+
+        for output in create_request_statistics_outputs():
+            self.addOutput(output)
+        for output in create_dry_run_outputs():
+            self.addOutput(output)
+
     def _check_resource(
         self,
         id_resource: str,
@@ -434,42 +521,56 @@ class ItineraryProcessing(QgsProcessingAlgorithm):
         output_fields.append(QgsField(name="duration", type=QMetaType.Type.Double))
         return output_fields
 
-    def processAlgorithm(self, parameters, context, feedback):
-        url_service = self.parameterAsString(parameters, self.URL_SERVICE, context)
-        id_resource = self.parameterAsString(parameters, self.ID_RESOURCE, context)
-        profile = self.parameterAsString(parameters, self.PROFILE, context)
-        optimization = self.parameterAsString(parameters, self.OPTIMIZATION, context)
-        start = self.parameterAsPoint(parameters, self.START, context)
-        end = self.parameterAsPoint(parameters, self.END, context)
-        input_crs = self.parameterAsPointCrs(parameters, self.START, context)
-
-        intermediates_layer = self.parameterAsVectorLayer(
-            parameters, self.INTERMEDIATES, context
-        )
-
-        additional_url_param = self.parameterAsString(
-            parameters, self.ADDITIONAL_URL_PARAM, context
-        )
+    def prepare_request(
+        self,
+        url_service: str,
+        id_resource: str,
+        start: QgsPointXY,
+        end: QgsPointXY,
+        input_crs: QgsCoordinateReferenceSystem,
+        intermediates: List[QgsPointXY],
+        intermediates_crs: Optional[QgsCoordinateReferenceSystem],
+        profile: str,
+        optimization: str,
+        additional_url_param: str,
+        context: QgsProcessingContext,
+        feedback: Optional[QgsProcessingFeedback],
+        instrumentation: Optional[StageInstrumentation] = None,
+    ) -> ItineraryRequest:
+        """Check values for an itinerary and define request to send.
 
-        # Check service for isochrone
-        if not route_available_for_service(url_service):
-            raise QgsProcessingException(
-                self.tr(
-                    "Service itineraire indisponible pour l'url : {}".format(
-                        url_service
-                    )
-                )
-            )
-        output_fields = ItineraryProcessing.get_output_fields()
-        # Get sink for output feature
-        (sink_itinerary, sink_itinerary_id) = self.parameterAsSink(
-            parameters,
-            self.OUTPUT,
-            context,
-            output_fields,
-            Qgis.WkbType.LineStringZ,
-            input_crs,
-        )
+        :param url_service: url service
+        :type url_service: str
+        :param id_resource: id resource
+        :type id_resource: str
+        :param start: start point
+        :type start: QgsPointXY
+        :param end: end point
+        :type end: QgsPointXY
+        :param input_crs: start and end points CRS
+        :type input_crs: QgsCoordinateReferenceSystem
+        :param intermediates: intermediates points, empty if no intermediates
+        :type intermediates: List[QgsPointXY]
+        :param intermediates_crs: intermediates points CRS, None if no intermediates
+        :type intermediates_crs: Optional[QgsCoordinateReferenceSystem]
+        :param profile: profile
+        :type profile: str
+        :param optimization: optimization
+        :type optimization: str
+        :param additional_url_param: additional url parameters
+        :type additional_url_param: str
+        :param context: processing context
+        :type context: QgsProcessingContext
+        :param feedback: processing feedback
+        :type feedback: Optional[QgsProcessingFeedback]
+        :param instrumentation: stage instrumentation, defaults to None
+        :type instrumentation: Optional[StageInstrumentation], optional
+        :raises QgsProcessingException: invalid values for itinerary
+        :return: request for itinerary
+        :rtype: ItineraryRequest
+        """
+        instrumentation = instrumentation or StageInstrumentation(enabled=False)
+        stopwatch = instrumentation.stopwatch()
 
         # Check resource
         if not self._check_resource(id_resource, url_service, feedback):
@@ -494,6 +595,7 @@ class ItineraryProcessing(QgsProcessingAlgorithm):
                     "Impossible de définir le système de coordonnées pour la requête"
                 )
             )
+        stopwatch.lap(StageInstrumentation.VALIDATION)
 
         # Check if geometry must be converted
         transform = None
@@ -507,24 +609,15 @@ class ItineraryProcessing(QgsProcessingAlgorithm):
             end = transform.transform(end)
 
         # Create request
-        request = f"{url_service}/itineraire?start={start.x()},{start.y()}&end={end.x()},{end.y()}"
+        request = ServiceRequest(url_service, "itineraire")
+        request.add_param("start", f"{start.x()},{start.y()}")
+        request.add_param("end", f"{end.x()},{end.y()}")
 
         # Add intermediates
         intermediates_str = ""
-        if intermediates_layer is not None:
-            intermediates_crs = intermediates_layer.crs()
-
+        if intermediates_crs is not None:
             intermediates_str_list = []
-            for feature in intermediates_layer.getFeatures():
-                if feature.geometry().isNull():
-                    feedback.pushWarning(
-                        self.tr(
-                            "Point intermédiaire avec géométrie nulle. Le point n'est pas utilisé."
-                        )
-                    )
-                    continue
-
-                step = feature.geometry().asPoint()
+            for step in intermediates:
                 if intermediates_crs != request_crs:
                     intermediate_transform = QgsCoordinateTransform(
                         intermediates_crs,
@@ -544,10 +637,11 @@ class ItineraryProcessing(QgsProcessingAlgorithm):
                     intermediates_str_list.append(f"{step.x()},{step.y()}")
 
             intermediates_str = "|".join(intermediates_str_list)
-            request += f"&intermediates={intermediates_str}"
+            request.add_param("intermediates", intermediates_str)
+        stopwatch.lap(StageInstrumentation.TRANSFORM)
 
         # Add resource
-        request += f"&resource={id_resource}"
+        request.add_param("resource", id_resource)
 
         # Check point geom
         if not self._check_point(
@@ -577,7 +671,7 @@ class ItineraryProcessing(QgsProcessingAlgorithm):
                     )
                 )
             )
-        request += f"&profile={profile}"
+        request.add_param("profile", profile)
 
         # Check optimization
         if not self._check_optimization(
@@ -590,82 +684,433 @@ class ItineraryProcessing(QgsProcessingAlgorithm):
                     )
                 )
             )
-        request += f"&optimization={optimization}"
+        request.add_param("optimization", optimization)
 
-        request += "&geometryFormat=wkt"
+        request.add_param("geometryFormat", "wkt")
 
-        request += f"&crs={request_crs.authid()}"
+        request.add_param("crs", request_crs.authid())
 
         # Check if additional param are available
         if additional_url_param:
-            request += additional_url_param
+            request.add_params_string(additional_url_param)
+        stopwatch.lap(StageInstrumentation.VALIDATION)
+
+        return ItineraryRequest(
+            url=request.url,
+            start=start,
+            end=end,
+            intermediates=intermediates_str,
+            id_resource=id_resource,
+            profile=profile,
+            optimization=optimization,
+            additional_url_param=additional_url_param,
+            transform=transform,
+        )
 
-        if feedback:
-            feedback.pushCommandInfo(f"request : {request}")
+    def create_output_feature(
+        self,
+        itinerary_request: ItineraryRequest,
+        result: RequestResult,
+        instrumentation: Optional[StageInstrumentation] = None,
+    ) -> QgsFeature:
+        """Create itinerary feature from request result
+
+        :param itinerary_request: request sent
+        :type itinerary_request: ItineraryRequest
+        :param result: request result
+        :type result: RequestResult
+        :param instrumentation: stage instrumentation, defaults to None
+        :type instrumentation: Optional[StageInstrumentation], optional
+        :raises QgsProcessingException: request error or empty response
+        :return: itinerary feature, with fields from get_output_fields
+        :rtype: QgsFeature
+        """
+        instrumentation = instrumentation or StageInstrumentation(enabled=False)
+        stopwatch = instrumentation.stopwatch()
 
-        blocking_req = QgsBlockingNetworkRequest()
-        qreq = QNetworkRequest(QUrl(request))
-        error_code = blocking_req.get(qreq, forceRefresh=True, feedback=feedback)
+        # Raise exception in case of error
+        if result.is_error:
+            raise QgsProcessingException(
+                self.tr(
+                    "Erreur lors de la requête pour calcul d'itinéraire : {}".format(
+                        result.full_error_message()
+                    )
+                )
+            )
 
-        # Add feedback in case of error
-        if error_code != QgsBlockingNetworkRequest.ErrorCode.NoError:
-            if feedback:
-                err_msg = f"{blocking_req.errorMessage()}."
-                # get the API response error to log it
-                req_reply = blocking_req.reply()
-                if req_reply and b"application/json" in req_reply.rawHeader(
-                    b"Content-Type"
-                ):
-                    api_response_error = json.loads(str(req_reply.content(), "UTF8"))
-                    if (
-                        "error" in api_response_error
-                        and "message" in api_response_error["error"]
-                    ):
-                        err_msg += f"API error message: {api_response_error['error']['message']}"
-
-                raise QgsProcessingException(
+        res_str = str(result.content, "UTF8")
+        if not res_str:
+            raise QgsProcessingException(
+                self.tr("Réponse vide pour la requête de calcul d'itinéraire.")
+            )
+
+        data = json.loads(res_str)
+        stopwatch.lap(StageInstrumentation.DECODE)
+
+        output_geom = QgsGeometry.fromWkt(data["geometry"])
+        # Apply inverse transformation if input data was converted
+        if itinerary_request.transform:
+            output_geom.transform(
+                itinerary_request.transform, direction=Qgis.TransformDirection.Reverse
+            )
+
+        f = self._create_feature(
+            itinerary_request, output_geom, data["distance"], data["duration"]
+        )
+        stopwatch.lap(StageInstrumentation.GEOMETRY)
+        return f
+
+    def prepare_leg_requests(
+        self, itinerary_request: ItineraryRequest
+    ) -> List[ItineraryRequest]:
+        """Define requests of itinerary legs: one request without intermediates for
+        each pair of consecutive points, with the other parameters of the itinerary.
+
+        :param itinerary_request: itinerary request
+        :type itinerary_request: ItineraryRequest
+        :return: leg requests, in itinerary order
+        :rtype: List[ItineraryRequest]
+        """
+        request = ServiceRequest.from_url(itinerary_request.url)
+        points = [request.get_param("start")]
+        if itinerary_request.intermediates:
+            points.extend(itinerary_request.intermediates.split("|"))
+        points.append(request.get_param("end"))
+        request.remove_param("intermediates")
+
+        leg_requests = []
+        for leg_start, leg_end in zip(points, points[1:]):
+            request.add_param("start", leg_start)
+            request.add_param("end", leg_end)
+            leg_requests.append(
+                replace(itinerary_request, url=request.url, intermediates="")
+            )
+        return leg_requests
+
+    def create_legs_output_feature(
+        self, itinerary_request: ItineraryRequest, leg_features: List[QgsFeature]
+    ) -> QgsFeature:
+        """Create itinerary feature from features of its legs: leg geometries are
+        joined, distances and durations are summed.
+
+        :param itinerary_request: itinerary request
+        :type itinerary_request: ItineraryRequest
+        :param leg_features: leg features, in itinerary order, created by
+            create_output_feature
+        :type leg_features: List[QgsFeature]
+        :return: itinerary feature, with fields from get_output_fields
+        :rtype: QgsFeature
+        """
+        points: List[QgsPoint] = []
+        for leg_feature in leg_features:
+            vertices = list(leg_feature.geometry().vertices())
+            # Leg start is the end of previous leg
+            if points and vertices and vertices[0] == points[-1]:
+                vertices = vertices[1:]
+            points.extend(vertices)
+
+        return self._create_feature(
+            itinerary_request,
+            QgsGeometry(QgsLineString(points)),
+            sum(leg_feature["distance"] for leg_feature in leg_features),
+            sum(leg_feature["duration"] for leg_feature in leg_features),
+        )
+
+    def _create_feature(
+        self,
+        itinerary_request: ItineraryRequest,
+        geometry: QgsGeometry,
+        distance: float,
+        duration: float,
+    ) -> QgsFeature:
+        """Create itinerary feature with request attributes
+
+        :param itinerary_request: request sent
+        :type itinerary_request: ItineraryRequest
+        :param geometry: itinerary geometry, in input CRS
+        :type geometry: QgsGeometry
+        :param distance: itinerary distance
+        :type distance: float
+        :param duration: itinerary duration
+        :type duration: float
+        :return: itinerary feature, with fields from get_output_fields
+        :rtype: QgsFeature
+        """
+        start = itinerary_request.start
+        end = itinerary_request.end
+
+        f = QgsFeature()
+        f.setGeometry(geometry)
+        f.setFields(ItineraryProcessing.get_output_fields())
+
+        f.setAttribute("start_x", start.x())
+        f.setAttribute("start_y", start.y())
+        f.setAttribute("end_x", end.x())
+        f.setAttribute("end_y", end.y())
+        f.setAttribute("intermediates", itinerary_request.intermediates)
+        f.setAttribute("request", itinerary_request.url)
+        f.setAttribute("id_resource", itinerary_request.id_resource)
+        f.setAttribute("profile", itinerary_request.profile)
+        f.setAttribute("optimization", itinerary_request.optimization)
+        f.setAttribute("distance", distance)
+        f.setAttribute("duration", duration)
+        f.setAttribute("additional_url_param", itinerary_request.additional_url_param)
+        return f
+
+    def _get_intermediates_points(
+        self,
+        intermediates_layer: QgsVectorLayer,
+        feedback: Optional[QgsProcessingFeedback],
+    ) -> List[QgsPointXY]:
+        """Get intermediates points from layer, null geometries are ignored
+
+        :param intermediates_layer: intermediates layer
+        :type intermediates_layer: QgsVectorLayer
+        :param feedback: processing feedback
+        :type feedback: Optional[QgsProcessingFeedback]
+        :return: intermediates points, in layer CRS
+        :rtype: List[QgsPointXY]
+        """
+        intermediates = []
+        for feature in intermediates_layer.getFeatures():
+            if feature.geometry().isNull():
+                feedback.pushWarning(
                     self.tr(
-                        "Erreur lors de la requête pour calcul d'itinéraire : {}".format(
-                            err_msg
-                        )
+                        "Point intermédiaire avec géométrie nulle. Le point n'est pas utilisé."
                     )
                 )
+                continue
+            intermediates.append(feature.geometry().asPoint())
+        return intermediates
 
-        res_str = str(blocking_req.reply().content(), "UTF8")
-        if res_str:
-            data = json.loads(res_str)
+    def _send_leg_requests(
+        self,
+        url_service: str,
+        leg_requests: List[ItineraryRequest],
+        statistics: RequestStatistics,
+        service_statistics: ServiceStatisticsStore,
+        feedback: QgsProcessingFeedback,
+        instrumentation: StageInstrumentation,
+    ) -> List[QgsFeature]:
+        """Send leg requests at the same time and create their features.
+
+        Leg responses are kept in the response cache of the request scheduler, if
+        enabled in plugin settings: legs not modified since a previous run are not
+        requested again.
 
-            output_geom = QgsGeometry.fromWkt(data["geometry"])
-            # Apply inverse transformation if input data was converted
-            if transform:
-                output_geom.transform(
-                    transform, direction=Qgis.TransformDirection.Reverse
+        :param url_service: url service
+        :type url_service: str
+        :param leg_requests: leg requests, in itinerary order
+        :type leg_requests: List[ItineraryRequest]
+        :param statistics: request statistics
+        :type statistics: RequestStatistics
+        :param service_statistics: service statistics
+        :type service_statistics: ServiceStatisticsStore
+        :param feedback: processing feedback
+        :type feedback: QgsProcessingFeedback
+        :param instrumentation: stage instrumentation
+        :type instrumentation: StageInstrumentation
+        :raises QgsProcessingException: leg request error or run canceled
+        :return: leg features, in itinerary order
+        :rtype: List[QgsFeature]
+        """
+        if not get_request_scheduler().cache.max_bytes:
+            feedback.pushInfo(
+                self.tr(
+                    "Cache des réponses désactivé : tous les tronçons sont demandés au "
+                    "service. Activer le cache dans les paramètres du plugin pour ne "
+                    "recalculer que les tronçons modifiés."
                 )
+            )
 
-            duration = data["duration"]
-            distance = data["distance"]
-
-            f = QgsFeature()
-            f.setGeometry(output_geom)
-            f.setFields(output_fields)
-
-            f.setAttribute("start_x", start.x())
-            f.setAttribute("start_y", start.y())
-            f.setAttribute("end_x", end.x())
-            f.setAttribute("end_y", end.y())
-            f.setAttribute("intermediates", intermediates_str)
-            f.setAttribute("request", request)
-            f.setAttribute("id_resource", id_resource)
-            f.setAttribute("profile", profile)
-            f.setAttribute("optimization", optimization)
-            f.setAttribute("distance", distance)
-            f.setAttribute("duration", duration)
-            f.setAttribute("additional_url_param", additional_url_param)
-
-            sink_itinerary.addFeature(feature=f, flags=QgsFeatureSink.Flag.FastInsert)
-        else:
+        cached_legs = []
+
+        def handle_result(job: RequestJob, result: RequestResult) -> List[QgsFeature]:
+            if result.from_cache:
+                cached_legs.append(job.index)
+            service_statistics.add_result(
+                url_service,
+                job.data.id_resource,
+                job.data.profile,
+                ROUTE_OPERATION,
+                result,
+            )
+            return [self.create_output_feature(job.data, result, instrumentation)]
+
+        jobs = []
+        for index, leg_request in enumerate(leg_requests):
+            feedback.pushCommandInfo(f"request : {leg_request.url}")
+            jobs.append(RequestJob(index=index, url=leg_request.url, data=leg_request))
+
+        store = QgsFeatureStore()
+        engine = ConcurrentRequestEngine(
+            concurrency=min(len(leg_requests), MAX_CONCURRENCY),
+            buffer=ReorderBuffer(store),
+            statistics=statistics,
+            feedback=feedback,
+            instrumentation=instrumentation,
+            retry_policy=create_retry_policy(),
+            scheduler_job=self.scheduler_job,
+        )
+        engine.run(jobs, handle_result, total=len(jobs))
+
+        leg_features = store.features()
+        if feedback.isCanceled() or len(leg_features) != len(leg_requests):
             raise QgsProcessingException(
-                self.tr("Réponse vide pour la requête de calcul d'itinéraire.")
+                self.tr("Calcul interrompu : {} tronçons calculés sur {}.").format(
+                    len(leg_features), len(leg_requests)
+                )
             )
+        feedback.pushInfo(
+            self.tr("{} tronçons calculés, dont {} lus depuis le cache.").format(
+                len(leg_requests), len(cached_legs)
+            )
+        )
+        return leg_features
+
+    @profiled_algorithm
+    @scheduled_algorithm
+    def processAlgorithm(self, parameters, context, feedback):
+        statistics = RequestStatistics()
+        instrumentation = StageInstrumentation(
+            enabled=PlgOptionsManager().get_plg_settings().debug_mode,
+            name=self.name(),
+        )
+        stopwatch = instrumentation.stopwatch()
+
+        url_service = register_url_service(
+            self.parameterAsString(parameters, self.URL_SERVICE, context), feedback
+        )
+        id_resource = self.parameterAsString(parameters, self.ID_RESOURCE, context)
+        profile = self.parameterAsString(parameters, self.PROFILE, context)
+        optimization = self.parameterAsString(parameters, self.OPTIMIZATION, context)
+        start = self.parameterAsPoint(parameters, self.START, context)
+        end = self.parameterAsPoint(parameters, self.END, context)
+        input_crs = self.parameterAsPointCrs(parameters, self.START, context)
+
+        intermediates_layer = self.parameterAsVectorLayer(
+            parameters, self.INTERMEDIATES, context
+        )
+
+        additional_url_param = self.parameterAsString(
+            parameters, self.ADDITIONAL_URL_PARAM, context
+        )
+        stopwatch.lap(StageInstrumentation.EXPRESSION)
+
+        # Check service for isochrone
+        if not route_available_for_service(url_service):
+            raise QgsProcessingException(
+                self.tr(
+                    "Service itineraire indisponible pour l'url : {}".format(
+                        url_service
+                    )
+                )
+            )
+        stopwatch.lap(StageInstrumentation.VALIDATION)
+        output_fields = ItineraryProcessing.get_output_fields()
+        # Get sink for output feature
+        (sink_itinerary, sink_itinerary_id) = self.parameterAsSink(
+            parameters,
+            self.OUTPUT,
+            context,
+            output_fields,
+            Qgis.WkbType.LineStringZ,
+            input_crs,
+        )
+        stopwatch.lap(StageInstrumentation.SINK)
+
+        intermediates = []
+        intermediates_crs = None
+        if intermediates_layer is not None:
+            intermediates = self._get_intermediates_points(
+                intermediates_layer, feedback
+            )
+            intermediates_crs = intermediates_layer.crs()
+
+        itinerary_request = self.prepare_request(
+            url_service=url_service,
+            id_resource=id_resource,
+            start=start,
+            end=end,
+            input_crs=input_crs,
+            intermediates=intermediates,
+            intermediates_crs=intermediates_crs,
+            profile=profile,
+            optimization=optimization,
+            additional_url_param=additional_url_param,
+            context=context,
+            feedback=feedback,
+            instrumentation=instrumentation,
+        )
+        stopwatch = instrumentation.stopwatch()
+
+        # Legs are only requested separately for itineraries with intermediates
+        leg_requests = []
+        if (
+            self.parameterAsBoolean(parameters, self.LEG_MODE, context)
+            and itinerary_request.intermediates
+        ):
+            leg_requests = self.prepare_leg_requests(itinerary_request)
+
+        service_statistics = ServiceStatisticsStore()
+        if self.parameterAsBoolean(parameters, self.DRY_RUN, context):
+            report = DryRunReport.from_history(self.name(), url_service)
+            request_statistics = service_statistics.get(
+                url_service, id_resource, profile, ROUTE_OPERATION
+            )
+            for request in leg_requests or [itinerary_request]:
+                report.add(
+                    request.url,
+                    PreviousOutput(),
+                    request_statistics.expected_latency if request_statistics else None,
+                )
+            report.push(feedback)
+            results = {self.OUTPUT: sink_itinerary_id}
+            results.update(statistics.as_dict())
+            results.update(report.results())
+            return results
+
+        if leg_requests:
+            leg_features = self._send_leg_requests(
+                url_service,
+                leg_requests,
+                statistics,
+                service_statistics,
+                feedback,
+                instrumentation,
+            )
+            service_statistics.save()
+            stopwatch = instrumentation.stopwatch()
+            f = self.create_legs_output_feature(itinerary_request, leg_features)
+            stopwatch.lap(StageInstrumentation.GEOMETRY)
+        else:
+            if feedback:
+                feedback.pushCommandInfo(f"request : {itinerary_request.url}")
+
+            result = send_request_with_retry(
+                itinerary_request.url,
+                feedback,
+                create_retry_policy(),
+                on_retry=statistics.add_retried_result,
+                sender=self.scheduler_job.send,
+            )
+            statistics.add_request_result(result)
+            service_statistics.add_result(
+                url_service, id_resource, profile, ROUTE_OPERATION, result
+            )
+            service_statistics.save()
+            stopwatch.lap(StageInstrumentation.REQUEST)
+
+            f = self.create_output_feature(itinerary_request, result, instrumentation)
+        stopwatch = instrumentation.stopwatch()
+        sink_itinerary.addFeature(feature=f, flags=QgsFeatureSink.Flag.FastInsert)
+        stopwatch.lap(StageInstrumentation.SINK)
+
+        instrumentation.log_report()
+
+        statistics_results = statistics.as_dict()
+        RunHistory().add_run(self.name(), url_service, statistics_results)
 
-        return {self.OUTPUT: sink_itinerary_id}
+        results = {self.OUTPUT: sink_itinerary_id}
+        results.update(statistics_results)
+        return results
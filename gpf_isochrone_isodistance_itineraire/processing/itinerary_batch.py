@@ -1,37 +1,106 @@
 # standard
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 # PyQGIS
 from qgis.core import (
     Qgis,
-    QgsApplication,
     QgsCoordinateReferenceSystem,
     QgsCoordinateTransform,
     QgsFeature,
+    QgsFeatureSource,
     QgsField,
     QgsFields,
+    QgsPointXY,
     QgsProcessing,
     QgsProcessingContext,
+    QgsProcessingException,
     QgsProcessingFeatureBasedAlgorithm,
     QgsProcessingFeedback,
     QgsProcessingParameterCrs,
     QgsProcessingParameterField,
     QgsProcessingParameterString,
     QgsProcessingParameterVectorLayer,
+    QgsRectangle,
     QgsVectorLayer,
 )
-from qgis.PyQt.QtCore import QCoreApplication
-
+from qgis.PyQt.QtCore import QCoreApplication, QVariant
+
+from gpf_isochrone_isodistance_itineraire.constants import ROUTE_OPERATION
+from gpf_isochrone_isodistance_itineraire.processing.dry_run import (
+    DRY_RUN,
+    DryRunReport,
+    create_dry_run_outputs,
+    create_dry_run_parameter,
+)
+from gpf_isochrone_isodistance_itineraire.processing.failed_features import (
+    ERROR_CATEGORY_INVALID_INPUT,
+    FailedFeatureSink,
+    create_failed_count_output,
+    create_failed_output_parameter,
+    get_result_error_category,
+)
+from gpf_isochrone_isodistance_itineraire.processing.get_capabities_parser import (
+    get_resource_param_bbox,
+    route_available_for_service,
+)
 from gpf_isochrone_isodistance_itineraire.processing.itinerary import (
     ItineraryProcessing,
+    ItineraryRequest,
+)
+from gpf_isochrone_isodistance_itineraire.processing.preflight import (
+    PREFLIGHT,
+    PREFLIGHT_NONE,
+    PREFLIGHT_ONLY,
+    PreflightReport,
+    create_preflight_parameter,
 )
 
 # plugin
+from gpf_isochrone_isodistance_itineraire.processing.previous_output import (
+    PreviousOutput,
+    create_previous_output_parameter,
+    create_reused_count_output,
+)
 from gpf_isochrone_isodistance_itineraire.processing.utils import (
+    CONCURRENCY,
+    INTERACTIVE,
+    OUTPUT_ORDER,
+    OUTPUT_ORDER_INPUT,
+    create_concurrency_controller,
+    create_concurrency_parameters,
+    create_interactive_parameter,
+    create_request_statistics_outputs,
+    create_retry_policy,
     get_short_string,
     get_user_manual_url,
+    register_url_service,
+    scheduled_algorithm,
 )
 from gpf_isochrone_isodistance_itineraire.toolbelt import PlgOptionsManager
+from gpf_isochrone_isodistance_itineraire.toolbelt.instrumentation import (
+    StageInstrumentation,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    RequestResult,
+    RetryPolicy,
+    send_request_with_retry,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.profiling import profiled_algorithm
+from gpf_isochrone_isodistance_itineraire.toolbelt.reorder_buffer import ReorderBuffer
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_engine import (
+    ConcurrentRequestEngine,
+    RequestJob,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_scheduler import (
+    SchedulerJob,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_statistics import (
+    RequestStatistics,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.run_history import RunHistory
+from gpf_isochrone_isodistance_itineraire.toolbelt.service_statistics import (
+    ServiceStatisticsStore,
+)
 
 
 class BatchItineraryAlgorithm(QgsProcessingFeatureBasedAlgorithm):
@@ -56,6 +125,12 @@ class BatchItineraryAlgorithm(QgsProcessingFeatureBasedAlgorithm):
 
     CRS = "CRS"
 
+    CONCURRENCY = CONCURRENCY
+    OUTPUT_ORDER = OUTPUT_ORDER
+    PREFLIGHT = PREFLIGHT
+    DRY_RUN = DRY_RUN
+    INTERACTIVE = INTERACTIVE
+
     def __init__(self) -> None:
         """Processing for batch itinerary compute"""
         super().__init__()
@@ -82,7 +157,15 @@ class BatchItineraryAlgorithm(QgsProcessingFeatureBasedAlgorithm):
         self.start_transform = None
         self.end_transform = None
         self.result_transform = None
-        self.alg = None
+        self.itinerary = None
+        self.statistics = RequestStatistics()
+        self.instrumentation = StageInstrumentation(enabled=False)
+        self.failed_features = FailedFeatureSink()
+        self.previous_output = PreviousOutput()
+        self.service_statistics = ServiceStatisticsStore()
+        self.retry_policy = RetryPolicy()
+        # Job of current run in request scheduler
+        self.scheduler_job: Optional[SchedulerJob] = None
 
     def tr(self, message: str) -> str:
         """Get the translation for a string using Qt translation API.
@@ -252,6 +335,22 @@ class BatchItineraryAlgorithm(QgsProcessingFeatureBasedAlgorithm):
             )
         )
 
+        for param in create_concurrency_parameters():
+            self.addParameter(param)
+
+        self.addParameter(create_preflight_parameter())
+        self.addParameter(create_dry_run_parameter())
+        self.addParameter(create_failed_output_parameter())
+        self.addParameter(create_previous_output_parameter())
+        self.addParameter(create_interactive_parameter())
+
+        for output in create_request_statistics_outputs():
+            self.addOutput(output)
+        self.addOutput(create_failed_count_output())
+        self.addOutput(create_reused_count_output())
+        for output in create_dry_run_outputs():
+            self.addOutput(output)
+
     def prepareAlgorithm(
         self,
         parameters: Dict[str, Any],
@@ -269,7 +368,20 @@ class BatchItineraryAlgorithm(QgsProcessingFeatureBasedAlgorithm):
         :return: True if the parameter are valid, False otherwise
         :rtype: bool
         """
-        self.url_service = self.parameterAsString(parameters, self.URL_SERVICE, context)
+        self.url_service = register_url_service(
+            self.parameterAsString(parameters, self.URL_SERVICE, context), feedback
+        )
+
+        # Check service for itinerary
+        if not route_available_for_service(self.url_service):
+            feedback.reportError(
+                self.tr(
+                    "Service itineraire indisponible pour l'url : {}".format(
+                        self.url_service
+                    )
+                )
+            )
+            return False
 
         self.param_id_start_field = self.parameterAsString(
             parameters, self.ID_START_FIELD, context
@@ -347,13 +459,405 @@ class BatchItineraryAlgorithm(QgsProcessingFeatureBasedAlgorithm):
             context.transformContext(),
         )
 
-        algo_str = (
-            f"gpf_isochrone_isodistance_itineraire:{ItineraryProcessing().name()}"
+        self.itinerary = ItineraryProcessing()
+        self.statistics = RequestStatistics()
+        self.service_statistics = ServiceStatisticsStore()
+        self.retry_policy = create_retry_policy()
+        self.instrumentation = StageInstrumentation(
+            enabled=PlgOptionsManager().get_plg_settings().debug_mode,
+            name=self.name(),
         )
-        self.alg = QgsApplication.processingRegistry().algorithmById(algo_str)
 
         return True
 
+    @profiled_algorithm
+    @scheduled_algorithm
+    def processAlgorithm(
+        self,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: Optional[QgsProcessingFeedback],
+    ) -> Dict[str, Any]:
+        """Runs the algorithm using the specified parameters.
+        Features are processed one by one, or with concurrent requests if
+        CONCURRENCY parameter is greater than 1.
+        Request statistics are added to results.
+
+        :param parameters: input parameter
+        :type parameters: Dict[str, Any]
+        :param context: processing context
+        :type context: QgsProcessingContext
+        :param feedback: processing feedback
+        :type feedback: Optional[QgsProcessingFeedback]
+        :return: algorithm results
+        :rtype: Dict[str, Any]
+        """
+        source = self.parameterAsSource(parameters, self.inputParameterName(), context)
+        if source is None:
+            raise QgsProcessingException(
+                self.invalidSourceError(parameters, self.inputParameterName())
+            )
+        self.failed_features = FailedFeatureSink.from_parameters(
+            self, parameters, context, source
+        )
+        self.previous_output = PreviousOutput.from_parameters(
+            self, parameters, context, self.output_crs
+        )
+        if len(self.previous_output):
+            feedback.pushInfo(
+                self.tr("{} requêtes disponibles dans la sortie précédente.").format(
+                    len(self.previous_output)
+                )
+            )
+
+        preflight = self.parameterAsEnum(parameters, self.PREFLIGHT, context)
+        run = True
+        if preflight != PREFLIGHT_NONE:
+            report = self.preflight(source, context, feedback)
+            report.push(feedback)
+            if not report.is_valid:
+                feedback.reportError(
+                    self.tr("Pré-vérification en échec : aucune requête envoyée.")
+                )
+                run = False
+            elif preflight == PREFLIGHT_ONLY:
+                feedback.pushInfo(self.tr("Pré-vérification réussie."))
+                run = False
+            else:
+                feedback.pushInfo(
+                    self.tr("Pré-vérification réussie : lancement des calculs.")
+                )
+
+        concurrency = self.parameterAsInt(parameters, self.CONCURRENCY, context)
+        dry_run_report = None
+        if run and self.parameterAsBoolean(parameters, self.DRY_RUN, context):
+            dry_run_report = self.dry_run(source, concurrency, context, feedback)
+            run = False
+
+        if not run:
+            # Create empty output
+            _, dest_id = self.parameterAsSink(
+                parameters,
+                "OUTPUT",
+                context,
+                self.outputFields(source.fields()),
+                self.outputWkbType(source.wkbType()),
+                self.outputCrs(source.sourceCrs()),
+                self.sinkFlags(),
+            )
+            results = {"OUTPUT": dest_id}
+        elif concurrency > 1:
+            results = self._process_concurrently(
+                concurrency, parameters, context, feedback
+            )
+        else:
+            results = super().processAlgorithm(parameters, context, feedback)
+        self.statistics.report(feedback, force=True)
+        self.instrumentation.log_report()
+        statistics = self.statistics.as_dict()
+        RunHistory().add_run(self.name(), self.url_service, statistics)
+        self.service_statistics.save()
+        results.update(statistics)
+        results.update(self.failed_features.results())
+        results.update(self.previous_output.results())
+        if dry_run_report is not None:
+            results.update(dry_run_report.results())
+        return results
+
+    def dry_run(
+        self,
+        source: QgsFeatureSource,
+        concurrency: int,
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> DryRunReport:
+        """Define requests for input features without sending them, and report number
+        of requests and estimated duration from latency of previous runs.
+
+        :param source: input source
+        :type source: QgsFeatureSource
+        :param concurrency: number of requests sent at the same time
+        :type concurrency: int
+        :param context: processing context
+        :type context: QgsProcessingContext
+        :param feedback: processing feedback
+        :type feedback: QgsProcessingFeedback
+        :return: dry run report
+        :rtype: DryRunReport
+        """
+        report = DryRunReport.from_history(self.name(), self.url_service, concurrency)
+        for feat in source.getFeatures(self.request(), self.sourceFlags()):
+            if feedback.isCanceled():
+                break
+            itinerary_request = self._prepare_request(feat, context, feedback)
+            if itinerary_request is None:
+                report.add(None, self.previous_output)
+                continue
+            statistics = self.service_statistics.get(
+                self.url_service,
+                itinerary_request.id_resource,
+                itinerary_request.profile,
+                ROUTE_OPERATION,
+            )
+            report.add(
+                itinerary_request.url,
+                self.previous_output,
+                statistics.expected_latency if statistics else None,
+            )
+        report.push(feedback)
+        return report
+
+    def preflight(
+        self,
+        source: QgsFeatureSource,
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> PreflightReport:
+        """Check all input features before any request.
+
+        Starts and ends layers are read once, each distinct combination of resource,
+        profile and optimization is checked once against capabilities and points are
+        checked against the bbox of their resource. Invalid features are added to
+        failed features.
+
+        :param source: input source
+        :type source: QgsFeatureSource
+        :param context: processing context
+        :type context: QgsProcessingContext
+        :param feedback: processing feedback
+        :type feedback: QgsProcessingFeedback
+        :return: pre-flight report
+        :rtype: PreflightReport
+        """
+        report = PreflightReport()
+        starts = self._index_points(self.starts_layer, self.id_start_field, context)
+        ends = self._index_points(self.ends_layer, self.id_end_field, context)
+
+        combination_errors: Dict[Tuple[str, str, str], str] = {}
+        bboxes: Dict[str, Optional[QgsRectangle]] = {}
+
+        for feat in source.getFeatures(self.request(), self.sourceFlags()):
+            if feedback.isCanceled():
+                break
+            report.checked_count += 1
+
+            id_start = str(feat[self.param_id_start_field])
+            id_end = str(feat[self.param_id_end_field])
+            combination = (
+                str(feat[self.param_ressource_field]),
+                str(feat[self.param_profil_field]),
+                str(feat[self.param_optimization_field]),
+            )
+            id_resource = combination[0]
+
+            message = ""
+            if id_start not in starts:
+                message = self.tr(
+                    "Identifiant {} non trouvé dans la couche de départs"
+                ).format(id_start)
+            elif id_end not in ends:
+                message = self.tr(
+                    "Identifiant {} non trouvé dans la couche d'arrivées"
+                ).format(id_end)
+            else:
+                if combination not in combination_errors:
+                    combination_errors[combination] = self._check_combination(
+                        *combination
+                    )
+                message = combination_errors[combination]
+
+            if not message:
+                if id_resource not in bboxes:
+                    bboxes[id_resource] = get_resource_param_bbox(
+                        parameter="start",
+                        id_resource=id_resource,
+                        operation=ROUTE_OPERATION,
+                        url_service=self.url_service,
+                    )
+                bbox = bboxes[id_resource]
+                if bbox and not bbox.contains(starts[id_start]):
+                    message = self.tr(
+                        "Point de départ non inclus dans la bounding box de la ressource."
+                    )
+                elif bbox and not bbox.contains(ends[id_end]):
+                    message = self.tr(
+                        "Point d'arrivée non inclus dans la bounding box de la ressource."
+                    )
+
+            if message:
+                report.add_invalid(feat.id(), message)
+                self.failed_features.add(feat, ERROR_CATEGORY_INVALID_INPUT, message)
+
+        report.combination_count = len(combination_errors)
+        return report
+
+    @staticmethod
+    def _index_points(
+        layer: QgsVectorLayer, id_field: str, context: QgsProcessingContext
+    ) -> Dict[str, QgsPointXY]:
+        """Read points of a layer once, in EPSG:4326, indexed by identifier.
+        First feature with a geometry is used for an identifier.
+
+        :param layer: points layer
+        :type layer: QgsVectorLayer
+        :param id_field: identifier field
+        :type id_field: str
+        :param context: processing context
+        :type context: QgsProcessingContext
+        :return: points indexed by identifier as string
+        :rtype: Dict[str, QgsPointXY]
+        """
+        transform = QgsCoordinateTransform(
+            layer.crs(),
+            QgsCoordinateReferenceSystem("EPSG:4326"),
+            context.transformContext(),
+        )
+        points = {}
+        for f in layer.getFeatures():
+            id_ = str(f[id_field])
+            if id_ in points or f.geometry().isNull():
+                continue
+            points[id_] = transform.transform(f.geometry().asPoint())
+        return points
+
+    def _check_combination(
+        self, id_resource: str, profile: str, optimization: str
+    ) -> str:
+        """Check resource, profile and optimization against capabilities
+
+        :param id_resource: id resource
+        :type id_resource: str
+        :param profile: profile
+        :type profile: str
+        :param optimization: optimization
+        :type optimization: str
+        :return: error message, empty string if combination is valid
+        :rtype: str
+        """
+        if not self.itinerary._check_resource(id_resource, self.url_service, None):
+            return self.tr(
+                "Service itineraire indisponible pour l'url : {} et la ressource {}"
+            ).format(self.url_service, id_resource)
+        if not self.itinerary._check_profile(
+            profile, id_resource, self.url_service, None
+        ):
+            return self.tr("Profil {} non compatible avec la ressource {}").format(
+                profile, id_resource
+            )
+        if not self.itinerary._check_optimization(
+            optimization, id_resource, self.url_service, None
+        ):
+            return self.tr(
+                "Optimisation {} non compatible avec la ressource {}"
+            ).format(optimization, id_resource)
+        return ""
+
+    def _process_concurrently(
+        self,
+        concurrency: int,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> Dict[str, Any]:
+        """Process input features with concurrent requests
+
+        :param concurrency: maximum number of requests sent at the same time
+        :type concurrency: int
+        :param parameters: input parameter
+        :type parameters: Dict[str, Any]
+        :param context: processing context
+        :type context: QgsProcessingContext
+        :param feedback: processing feedback
+        :type feedback: QgsProcessingFeedback
+        :return: algorithm results
+        :rtype: Dict[str, Any]
+        """
+        source = self.parameterAsSource(parameters, self.inputParameterName(), context)
+        if source is None:
+            raise QgsProcessingException(
+                self.invalidSourceError(parameters, self.inputParameterName())
+            )
+
+        sink, dest_id = self.parameterAsSink(
+            parameters,
+            "OUTPUT",
+            context,
+            self.outputFields(source.fields()),
+            self.outputWkbType(source.wkbType()),
+            self.outputCrs(source.sourceCrs()),
+            self.sinkFlags(),
+        )
+        if sink is None:
+            raise QgsProcessingException(self.invalidSinkError(parameters, "OUTPUT"))
+
+        max_bytes = (
+            PlgOptionsManager().get_plg_settings().max_buffered_memory_mb * 1024 * 1024
+        )
+        buffer = ReorderBuffer(
+            sink,
+            ordered=self.parameterAsEnum(parameters, self.OUTPUT_ORDER, context)
+            == OUTPUT_ORDER_INPUT,
+            max_bytes=max_bytes,
+        )
+        engine = ConcurrentRequestEngine(
+            concurrency=concurrency,
+            buffer=buffer,
+            statistics=self.statistics,
+            feedback=feedback,
+            instrumentation=self.instrumentation,
+            max_bytes=max_bytes,
+            controller=create_concurrency_controller(concurrency),
+            retry_policy=self.retry_policy,
+            scheduler_job=self.scheduler_job,
+        )
+        features = source.getFeatures(self.request(), self.sourceFlags())
+        if not engine.run(
+            self._create_jobs(features, context, feedback),
+            lambda job, result: self._create_output_features(
+                job.data[0], job.data[1], result, feedback
+            ),
+            total=source.featureCount(),
+        ):
+            raise QgsProcessingException(
+                self.writeFeatureError(sink, parameters, "OUTPUT")
+            )
+        return {"OUTPUT": dest_id}
+
+    def _create_jobs(
+        self,
+        features: Iterable[QgsFeature],
+        context: QgsProcessingContext,
+        feedback: QgsProcessingFeedback,
+    ) -> Iterator[RequestJob]:
+        """Create request jobs for input features
+
+        :param features: input features
+        :type features: Iterable[QgsFeature]
+        :param context: processing context
+        :type context: QgsProcessingContext
+        :param feedback: processing feedback
+        :type feedback: QgsProcessingFeedback
+        :yield: request job for each input feature
+        :rtype: Iterator[RequestJob]
+        """
+        for index, feat in enumerate(features):
+            itinerary_request = self._prepare_request(feat, context, feedback)
+            if itinerary_request is None:
+                yield RequestJob(index=index)
+                continue
+
+            previous_features = self.previous_output.get_features(
+                itinerary_request.url, feat, self.outputFields(feat.fields())
+            )
+            if previous_features is not None:
+                yield RequestJob(index=index, features=previous_features)
+                continue
+
+            feedback.pushCommandInfo(f"request : {itinerary_request.url}")
+            yield RequestJob(
+                index=index, url=itinerary_request.url, data=(feat, itinerary_request)
+            )
+
     def _define_id_intermediates(self, id_intermediates: Any) -> List[Any]:
         """Define id_intermediates list from feature field
 
@@ -377,28 +881,23 @@ class BatchItineraryAlgorithm(QgsProcessingFeatureBasedAlgorithm):
 
         return result
 
-    def _create_intermediates_layer(
+    def _get_intermediates_points(
         self, id_intermediates: List[Any], feedback: QgsProcessingFeedback
-    ) -> QgsVectorLayer:
-        """Create intermediates layer from a list of id
+    ) -> List[QgsPointXY]:
+        """Get intermediates points from a list of id
 
         :param id_intermediates: list of id
         :type id_intermediates: List[Any]
         :param feedback: processing feedback
         :type feedback: QgsProcessingFeedback
-        :return: layer with point from steps layer
-        :rtype: QgsVectorLayer
+        :return: points from steps layer, in steps layer CRS
+        :rtype: List[QgsPointXY]
         """
-
-        intermediates_layer = QgsVectorLayer(
-            f"Point?crs={self.intermediates_layer.crs()}", "intermediates", "memory"
-        )
-        intermediates_layer.startEditing()
-
         feedback.pushDebugInfo(
             self.tr("Liste des identifiants d'étapes {}").format(id_intermediates)
         )
 
+        intermediates = []
         for id_ in id_intermediates:
             request_filter = f"{self.id_intermediate_field} = {id_}"
 
@@ -412,29 +911,33 @@ class BatchItineraryAlgorithm(QgsProcessingFeatureBasedAlgorithm):
                     ).format(id_)
                 )
             for f in intermediate_features:
-                point = QgsFeature()
-                point.setGeometry(f.geometry())
-                intermediates_layer.addFeature(point)
-        intermediates_layer.commitChanges()
+                if f.geometry().isNull():
+                    feedback.pushWarning(
+                        self.tr(
+                            "Point intermédiaire avec géométrie nulle. Le point n'est pas utilisé."
+                        )
+                    )
+                    continue
+                intermediates.append(f.geometry().asPoint())
 
-        return intermediates_layer
+        return intermediates
 
-    def processFeature(
+    def _prepare_request(
         self,
         feat: QgsFeature,
         context: QgsProcessingContext,
-        feedback: Optional[QgsProcessingFeedback],
-    ) -> List[QgsFeature]:
-        """Processes an individual input feature from the source
+        feedback: QgsProcessingFeedback,
+    ) -> Optional[ItineraryRequest]:
+        """Define itinerary request for an input feature
 
-        :param feature: feature to process
-        :type feature: QgsFeature
+        :param feat: input feature
+        :type feat: QgsFeature
         :param context: processing context
         :type context: QgsProcessingContext
         :param feedback: processing feedback
-        :type feedback: Optional[QgsProcessingFeedback]
-        :return: list of created QgsFeature
-        :rtype: List[QgsFeature]
+        :type feedback: QgsProcessingFeedback
+        :return: itinerary request, None if no request can be sent
+        :rtype: Optional[ItineraryRequest]
         """
         id_start = feat[self.param_id_start_field]
         id_end = feat[self.param_id_end_field]
@@ -456,12 +959,12 @@ class BatchItineraryAlgorithm(QgsProcessingFeatureBasedAlgorithm):
             start = start_feature[0].geometry().asPoint()
             start = self.start_transform.transform(start)
         else:
-            feedback.pushWarning(
-                self.tr("Identifiant {} non trouvé dans la couche de départs").format(
-                    id_start
-                )
-            )
-            return []
+            message = self.tr(
+                "Identifiant {} non trouvé dans la couche de départs"
+            ).format(id_start)
+            feedback.pushWarning(message)
+            self.failed_features.add(feat, ERROR_CATEGORY_INVALID_INPUT, message)
+            return None
 
         end_feature = [
             f for f in self.ends_layer.getFeatures(f"{self.id_end_field}={id_end}")
@@ -470,27 +973,21 @@ class BatchItineraryAlgorithm(QgsProcessingFeatureBasedAlgorithm):
             end = end_feature[0].geometry().asPoint()
             end = self.end_transform.transform(end)
         else:
-            feedback.pushWarning(
-                self.tr("Identifiant {} non trouvé dans la couche d'arrivées").format(
-                    id_start
-                )
-            )
-            return []
-
-        params = {
-            ItineraryProcessing.URL_SERVICE: self.url_service,
-            ItineraryProcessing.ID_RESOURCE: id_resource,
-            ItineraryProcessing.START: start,
-            ItineraryProcessing.END: end,
-            ItineraryProcessing.PROFILE: profile,
-            ItineraryProcessing.OPTIMIZATION: optimization,
-            ItineraryProcessing.OUTPUT: "TEMPORARY_OUTPUT",
-        }
-
+            message = self.tr(
+                "Identifiant {} non trouvé dans la couche d'arrivées"
+            ).format(id_end)
+            feedback.pushWarning(message)
+            self.failed_features.add(feat, ERROR_CATEGORY_INVALID_INPUT, message)
+            return None
+
+        additional_url_param = ""
         if self.param_additionnal_url_param_field in feat.attributeMap():
-            additional_url_param = feat[self.param_additionnal_url_param_field]
-            params[ItineraryProcessing.ADDITIONAL_URL_PARAM] = additional_url_param
+            value = feat[self.param_additionnal_url_param_field]
+            if not QVariant(value).isNull():
+                additional_url_param = str(value)
 
+        intermediates = []
+        intermediates_crs = None
         if (
             self.intermediates_layer is not None
             and self.param_id_intermediates_field in feat.attributeMap()
@@ -498,36 +995,128 @@ class BatchItineraryAlgorithm(QgsProcessingFeatureBasedAlgorithm):
             id_intermediates = self._define_id_intermediates(
                 feat[self.param_id_intermediates_field]
             )
-            params[ItineraryProcessing.INTERMEDIATES] = (
-                self._create_intermediates_layer(id_intermediates, feedback)
-            )
-
-        results, successful = self.alg.run(params, context, feedback)
-        if successful:
-            res = results[ItineraryProcessing.OUTPUT]
-            res_layer = context.getMapLayer(res)
-
-            output_features = []
-            for f in res_layer.getFeatures():
-                new_feature = QgsFeature()
-                new_feature.setFields(self.outputFields(feat.fields()))
-                geom = f.geometry()
-                geom.transform(self.result_transform)
-                new_feature.setGeometry(geom)
-
-                for field in res_layer.fields():
-                    new_feature[field.name()] = f[field.name()]
-
-                for field in feat.fields():
-                    feat_field_name = field.name()
-                    if feat_field_name == "fid":
-                        feat_field_name = "fid_input"
-                    new_feature[feat_field_name] = feat[field.name()]
-                output_features.append(new_feature)
-            return output_features
-        else:
+            intermediates = self._get_intermediates_points(id_intermediates, feedback)
+            intermediates_crs = self.intermediates_layer.crs()
+
+        try:
+            return self.itinerary.prepare_request(
+                url_service=self.url_service,
+                id_resource=str(id_resource),
+                start=start,
+                end=end,
+                input_crs=context.project().crs(),
+                intermediates=intermediates,
+                intermediates_crs=intermediates_crs,
+                profile=str(profile),
+                optimization=str(optimization),
+                additional_url_param=additional_url_param,
+                context=context,
+                feedback=feedback,
+                instrumentation=self.instrumentation,
+            )
+        except QgsProcessingException as exc:
+            feedback.reportError(str(exc))
+            self.failed_features.add(feat, ERROR_CATEGORY_INVALID_INPUT, str(exc))
+            return None
+
+    def _create_output_features(
+        self,
+        feat: QgsFeature,
+        itinerary_request: ItineraryRequest,
+        result: RequestResult,
+        feedback: QgsProcessingFeedback,
+    ) -> List[QgsFeature]:
+        """Create output features from request result
+
+        :param feat: input feature
+        :type feat: QgsFeature
+        :param itinerary_request: request sent for input feature
+        :type itinerary_request: ItineraryRequest
+        :param result: request result
+        :type result: RequestResult
+        :param feedback: processing feedback
+        :type feedback: QgsProcessingFeedback
+        :return: list of created QgsFeature, empty in case of error
+        :rtype: List[QgsFeature]
+        """
+        self.service_statistics.add_result(
+            self.url_service,
+            itinerary_request.id_resource,
+            itinerary_request.profile,
+            ROUTE_OPERATION,
+            result,
+        )
+        try:
+            itinerary_feature = self.itinerary.create_output_feature(
+                itinerary_request, result, self.instrumentation
+            )
+        except QgsProcessingException as exc:
+            feedback.reportError(str(exc))
+            self.failed_features.add(feat, get_result_error_category(result), str(exc))
             return []
 
+        new_feature = QgsFeature()
+        new_feature.setFields(self.outputFields(feat.fields()))
+        geom = itinerary_feature.geometry()
+        geom.transform(self.result_transform)
+        new_feature.setGeometry(geom)
+
+        for field in itinerary_feature.fields():
+            new_feature[field.name()] = itinerary_feature[field.name()]
+
+        for field in feat.fields():
+            feat_field_name = field.name()
+            if feat_field_name == "fid":
+                feat_field_name = "fid_input"
+            new_feature[feat_field_name] = feat[field.name()]
+        return [new_feature]
+
+    def processFeature(
+        self,
+        feat: QgsFeature,
+        context: QgsProcessingContext,
+        feedback: Optional[QgsProcessingFeedback],
+    ) -> List[QgsFeature]:
+        """Processes an individual input feature from the source
+
+        :param feature: feature to process
+        :type feature: QgsFeature
+        :param context: processing context
+        :type context: QgsProcessingContext
+        :param feedback: processing feedback
+        :type feedback: Optional[QgsProcessingFeedback]
+        :return: list of created QgsFeature
+        :rtype: List[QgsFeature]
+        """
+        itinerary_request = self._prepare_request(feat, context, feedback)
+        if itinerary_request is None:
+            return []
+
+        previous_features = self.previous_output.get_features(
+            itinerary_request.url, feat, self.outputFields(feat.fields())
+        )
+        if previous_features is not None:
+            return previous_features
+
+        feedback.pushCommandInfo(f"request : {itinerary_request.url}")
+
+        stopwatch = self.instrumentation.stopwatch()
+        result = send_request_with_retry(
+            itinerary_request.url,
+            feedback,
+            self.retry_policy,
+            on_retry=self.statistics.add_retried_result,
+            sender=self.scheduler_job.send,
+        )
+        if feedback and feedback.isCanceled():
+            # Request aborted by cancellation: not an error
+            return []
+        self.statistics.add_request_result(result)
+        self.statistics.report(feedback)
+        stopwatch.lap(StageInstrumentation.REQUEST)
+
+        return self._create_output_features(feat, itinerary_request, result, feedback)
+
     def outputWkbType(self, _: Qgis.WkbType) -> Qgis.WkbType:
         """Maps the input WKB geometry type (inputWkbType) to the corresponding output WKB type generated by the algorithm.
 
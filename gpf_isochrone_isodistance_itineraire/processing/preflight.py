@@ -0,0 +1,111 @@
+# standard
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+# PyQGIS
+from qgis.core import (
+    QgsProcessingFeedback,
+    QgsProcessingParameterDefinition,
+    QgsProcessingParameterEnum,
+)
+from qgis.PyQt.QtCore import QCoreApplication
+
+# Pre-flight validation of all input features before any request
+PREFLIGHT = "PREFLIGHT"
+
+# Values for PREFLIGHT parameter
+PREFLIGHT_NONE = 0
+PREFLIGHT_STOP_ON_ERROR = 1
+PREFLIGHT_ONLY = 2
+
+# Maximum number of invalid features detailed in log
+MAX_REPORTED_ROWS = 100
+
+
+@dataclass
+class PreflightReport:
+    """Result of pre-flight validation of input features"""
+
+    # Number of checked input features
+    checked_count: int = 0
+    # Number of invalid input features
+    invalid_count: int = 0
+    # Number of distinct parameters combination checked against capabilities
+    combination_count: int = 0
+    # First invalid features : (feature id, error message)
+    invalid_rows: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        """True if all checked input features are valid
+
+        :return: True if all checked input features are valid
+        :rtype: bool
+        """
+        return self.invalid_count == 0
+
+    def add_invalid(self, feature_id: int, message: str) -> None:
+        """Add an invalid input feature
+
+        :param feature_id: input feature id
+        :type feature_id: int
+        :param message: error message
+        :type message: str
+        """
+        self.invalid_count += 1
+        if len(self.invalid_rows) < MAX_REPORTED_ROWS:
+            self.invalid_rows.append((feature_id, message))
+
+    def push(self, feedback: QgsProcessingFeedback) -> None:
+        """Push report of invalid input features and summary in feedback
+
+        :param feedback: processing feedback
+        :type feedback: QgsProcessingFeedback
+        """
+        for feature_id, message in self.invalid_rows:
+            feedback.reportError(
+                QCoreApplication.translate("PreflightReport", "Entité {} : {}").format(
+                    feature_id, message
+                )
+            )
+        if self.invalid_count > len(self.invalid_rows):
+            feedback.reportError(
+                QCoreApplication.translate(
+                    "PreflightReport", "... et {} autres entités invalides."
+                ).format(self.invalid_count - len(self.invalid_rows))
+            )
+        feedback.pushInfo(
+            QCoreApplication.translate(
+                "PreflightReport",
+                "Pré-vérification : {} entités vérifiées, {} invalides, "
+                "{} combinaisons de paramètres vérifiées.",
+            ).format(self.checked_count, self.invalid_count, self.combination_count)
+        )
+
+
+def create_preflight_parameter() -> QgsProcessingParameterEnum:
+    """Create advanced PREFLIGHT parameter
+
+    :return: pre-flight validation parameter
+    :rtype: QgsProcessingParameterEnum
+    """
+    param = QgsProcessingParameterEnum(
+        name=PREFLIGHT,
+        description=QCoreApplication.translate(
+            "ProcessingUtils", "Pré-vérification des entités"
+        ),
+        options=[
+            QCoreApplication.translate("ProcessingUtils", "Aucune"),
+            QCoreApplication.translate(
+                "ProcessingUtils",
+                "Arrêt avant les requêtes si des entités sont invalides",
+            ),
+            QCoreApplication.translate(
+                "ProcessingUtils", "Vérification seule, sans requête"
+            ),
+        ],
+        defaultValue=PREFLIGHT_NONE,
+        optional=True,
+    )
+    param.setFlags(param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+    return param
@@ -0,0 +1,221 @@
+# standard
+from typing import Any, Dict, List, Optional
+
+# PyQGIS
+from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransform,
+    QgsCoordinateTransformContext,
+    QgsFeature,
+    QgsFeatureRequest,
+    QgsFeatureSource,
+    QgsFields,
+    QgsProcessing,
+    QgsProcessingAlgorithm,
+    QgsProcessingContext,
+    QgsProcessingException,
+    QgsProcessingOutputNumber,
+    QgsProcessingParameterFeatureSource,
+)
+from qgis.PyQt.QtCore import QCoreApplication
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    canonical_request_url,
+)
+
+# Optional output layer of a previous run, used to avoid requests already done
+PREVIOUS_OUTPUT = "PREVIOUS_OUTPUT"
+# Number of output features copied from previous output, in algorithm results
+REUSED_COUNT = "REUSED_COUNT"
+
+# Field of output features containing request url
+REQUEST_FIELD = "request"
+
+
+class PreviousOutput:
+    """Output features of a previous run, indexed by canonical request url.
+
+    Output features of an input feature whose request was already done in the
+    previous run are copied: geometry and computed attributes come from the previous
+    output, attributes of the input feature come from the current input.
+    """
+
+    def __init__(
+        self,
+        source: Optional[QgsFeatureSource] = None,
+        output_crs: Optional[QgsCoordinateReferenceSystem] = None,
+        context: Optional[QgsProcessingContext] = None,
+    ) -> None:
+        """Index previous output features by canonical request url
+
+        :param source: previous output, None if not defined
+        :type source: Optional[QgsFeatureSource], optional
+        :param output_crs: CRS of current output, defaults to None
+        :type output_crs: Optional[QgsCoordinateReferenceSystem], optional
+        :param context: processing context, used for CRS transform, defaults to None
+        :type context: Optional[QgsProcessingContext], optional
+        :raises QgsProcessingException: previous output has no request field
+        """
+        self._source = source
+        self._feature_ids: Dict[str, int] = {}
+        self._transform: Optional[QgsCoordinateTransform] = None
+        self.reused_count = 0
+
+        if source is None:
+            return
+
+        fields = source.fields()
+        if fields.lookupField(REQUEST_FIELD) == -1:
+            raise QgsProcessingException(
+                QCoreApplication.translate(
+                    "ProcessingUtils",
+                    "La couche de sortie précédente ne contient pas de champ {}",
+                ).format(REQUEST_FIELD)
+            )
+
+        request = QgsFeatureRequest()
+        request.setFlags(QgsFeatureRequest.Flag.NoGeometry)
+        request.setSubsetOfAttributes([REQUEST_FIELD], fields)
+        for feature in source.getFeatures(request):
+            url = feature[REQUEST_FIELD]
+            if isinstance(url, str) and url:
+                self._feature_ids[canonical_request_url(url)] = feature.id()
+
+        if output_crs and output_crs.isValid() and source.sourceCrs() != output_crs:
+            self._transform = QgsCoordinateTransform(
+                source.sourceCrs(),
+                output_crs,
+                (
+                    context.transformContext()
+                    if context
+                    else QgsCoordinateTransformContext()
+                ),
+            )
+
+    def __len__(self) -> int:
+        """Number of indexed requests
+
+        :return: number of indexed requests
+        :rtype: int
+        """
+        return len(self._feature_ids)
+
+    def __contains__(self, request_url: str) -> bool:
+        """Check if a request is available in previous output
+
+        :param request_url: request url
+        :type request_url: str
+        :return: True if request is available in previous output
+        :rtype: bool
+        """
+        return canonical_request_url(request_url) in self._feature_ids
+
+    @staticmethod
+    def from_parameters(
+        algorithm: QgsProcessingAlgorithm,
+        parameters: Dict[str, Any],
+        context: QgsProcessingContext,
+        output_crs: QgsCoordinateReferenceSystem,
+    ) -> "PreviousOutput":
+        """Create previous output index from PREVIOUS_OUTPUT parameter
+
+        :param algorithm: algorithm with PREVIOUS_OUTPUT parameter
+        :type algorithm: QgsProcessingAlgorithm
+        :param parameters: input parameter
+        :type parameters: Dict[str, Any]
+        :param context: processing context
+        :type context: QgsProcessingContext
+        :param output_crs: CRS of current output
+        :type output_crs: QgsCoordinateReferenceSystem
+        :return: previous output index, empty if PREVIOUS_OUTPUT is not defined
+        :rtype: PreviousOutput
+        """
+        source = algorithm.parameterAsSource(parameters, PREVIOUS_OUTPUT, context)
+        return PreviousOutput(source, output_crs, context)
+
+    def get_features(
+        self,
+        request_url: str,
+        input_feature: QgsFeature,
+        output_fields: QgsFields,
+    ) -> Optional[List[QgsFeature]]:
+        """Return output features copied from previous output for a request
+
+        :param request_url: request url of input feature
+        :type request_url: str
+        :param input_feature: input feature
+        :type input_feature: QgsFeature
+        :param output_fields: fields of current output
+        :type output_fields: QgsFields
+        :return: copied features, None if request is not in previous output
+        :rtype: Optional[List[QgsFeature]]
+        """
+        if not self._feature_ids:
+            return None
+        feature_id = self._feature_ids.get(canonical_request_url(request_url))
+        if feature_id is None:
+            return None
+        previous = QgsFeature()
+        if not self._source.getFeatures(QgsFeatureRequest(feature_id)).nextFeature(
+            previous
+        ):
+            return None
+
+        geometry = previous.geometry()
+        if self._transform and not geometry.isNull():
+            geometry.transform(self._transform)
+
+        input_fields = input_feature.fields()
+        previous_fields = previous.fields()
+        feature = QgsFeature(output_fields)
+        feature.setGeometry(geometry)
+        for field in output_fields:
+            name = field.name()
+            if name == "fid_input" and input_fields.lookupField("fid") != -1:
+                feature[name] = input_feature["fid"]
+            elif input_fields.lookupField(name) != -1:
+                feature[name] = input_feature[name]
+            elif previous_fields.lookupField(name) != -1:
+                feature[name] = previous[name]
+
+        self.reused_count += 1
+        return [feature]
+
+    def results(self) -> Dict[str, Any]:
+        """Return algorithm results for previous output
+
+        :return: number of output features copied from previous output
+        :rtype: Dict[str, Any]
+        """
+        return {REUSED_COUNT: self.reused_count}
+
+
+def create_previous_output_parameter() -> QgsProcessingParameterFeatureSource:
+    """Create optional PREVIOUS_OUTPUT parameter
+
+    :return: previous output parameter
+    :rtype: QgsProcessingParameterFeatureSource
+    """
+    return QgsProcessingParameterFeatureSource(
+        name=PREVIOUS_OUTPUT,
+        description=QCoreApplication.translate(
+            "ProcessingUtils", "Sortie d'un calcul précédent"
+        ),
+        types=[QgsProcessing.SourceType.TypeVectorAnyGeometry],
+        optional=True,
+    )
+
+
+def create_reused_count_output() -> QgsProcessingOutputNumber:
+    """Create REUSED_COUNT output
+
+    :return: reused features count output
+    :rtype: QgsProcessingOutputNumber
+    """
+    return QgsProcessingOutputNumber(
+        name=REUSED_COUNT,
+        description=QCoreApplication.translate(
+            "ProcessingUtils", "Nombre d'entités reprises de la sortie précédente"
+        ),
+    )
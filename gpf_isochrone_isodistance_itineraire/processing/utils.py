@@ -1,16 +1,58 @@
 # standard
+from functools import wraps
 from pathlib import Path
-from typing import Optional
+from typing import Callable, List, Optional
 
 # PyQgis
 from qgis import processing
-from qgis.core import Qgis, QgsApplication
-from qgis.PyQt.QtCore import QObject
+from qgis.core import (
+    Qgis,
+    QgsApplication,
+    QgsProcessingFeedback,
+    QgsProcessingOutputNumber,
+    QgsProcessingParameterBoolean,
+    QgsProcessingParameterDefinition,
+    QgsProcessingParameterEnum,
+    QgsProcessingParameterNumber,
+)
+from qgis.PyQt.QtCore import QCoreApplication, QObject
 from qgis.PyQt.QtWidgets import QAction
 
 # project
 from gpf_isochrone_isodistance_itineraire.__about__ import __uri_homepage__
+from gpf_isochrone_isodistance_itineraire.processing.get_capabities_parser import (
+    get_compatible_endpoints,
+    get_post_operation_paths,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.concurrency_controller import (
+    AimdConcurrencyController,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.endpoints import primary_endpoint
 from gpf_isochrone_isodistance_itineraire.toolbelt.log_handler import PlgLogger
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import RetryPolicy
+from gpf_isochrone_isodistance_itineraire.toolbelt.preferences import PlgOptionsManager
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_scheduler import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    get_request_scheduler,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_statistics import (
+    RequestStatistics,
+)
+
+# Parameters for concurrent requests
+CONCURRENCY = "CONCURRENCY"
+OUTPUT_ORDER = "OUTPUT_ORDER"
+
+# Maximum number of requests sent at the same time by an algorithm
+MAX_CONCURRENCY = 32
+
+# Hidden parameter for algorithms run from dock widgets: requests sent first
+INTERACTIVE = "INTERACTIVE"
+
+# Values for OUTPUT_ORDER parameter
+OUTPUT_ORDER_INPUT = 0
+OUTPUT_ORDER_UNORDERED = 1
 
 
 def get_locale_prefix() -> str:
@@ -90,3 +132,207 @@ def create_processing_action(algorithm_id: str, parent: QObject) -> Optional[QAc
     action.triggered.connect(lambda: processing.execAlgorithmDialog(algorithm_id))
 
     return action
+
+
+def create_request_statistics_outputs() -> List[QgsProcessingOutputNumber]:
+    """Create processing outputs for request statistics returned by algorithms
+
+    :return: list of outputs for request statistics
+    :rtype: List[QgsProcessingOutputNumber]
+    """
+    descriptions = {
+        RequestStatistics.REQUEST_COUNT: QCoreApplication.translate(
+            "RequestStatistics", "Nombre de requêtes"
+        ),
+        RequestStatistics.ERROR_COUNT: QCoreApplication.translate(
+            "RequestStatistics", "Nombre de requêtes en erreur"
+        ),
+        RequestStatistics.RETRY_COUNT: QCoreApplication.translate(
+            "RequestStatistics", "Nombre de relances"
+        ),
+        RequestStatistics.REQUESTS_PER_SECOND: QCoreApplication.translate(
+            "RequestStatistics", "Requêtes par seconde"
+        ),
+        RequestStatistics.CACHE_HIT_RATIO: QCoreApplication.translate(
+            "RequestStatistics", "Taux de réponses lues depuis le cache"
+        ),
+        RequestStatistics.LATENCY_P50: QCoreApplication.translate(
+            "RequestStatistics", "Latence médiane (ms)"
+        ),
+        RequestStatistics.LATENCY_P95: QCoreApplication.translate(
+            "RequestStatistics", "Latence 95e centile (ms)"
+        ),
+        RequestStatistics.BYTES_RECEIVED: QCoreApplication.translate(
+            "RequestStatistics", "Octets reçus"
+        ),
+    }
+    return [
+        QgsProcessingOutputNumber(name=name, description=description)
+        for name, description in descriptions.items()
+    ]
+
+
+def create_concurrency_parameters() -> List[QgsProcessingParameterDefinition]:
+    """Create advanced processing parameters for concurrent requests:
+
+    - CONCURRENCY: number of requests sent at the same time, 1 for sequential run
+    - OUTPUT_ORDER: features written in input order or as soon as available
+
+    :return: list of parameters for concurrent requests
+    :rtype: List[QgsProcessingParameterDefinition]
+    """
+    concurrency = QgsProcessingParameterNumber(
+        name=CONCURRENCY,
+        description=QCoreApplication.translate(
+            "ProcessingUtils", "Nombre de requêtes simultanées"
+        ),
+        type=QgsProcessingParameterNumber.Type.Integer,
+        defaultValue=1,
+        minValue=1,
+        maxValue=MAX_CONCURRENCY,
+        optional=True,
+    )
+    output_order = QgsProcessingParameterEnum(
+        name=OUTPUT_ORDER,
+        description=QCoreApplication.translate(
+            "ProcessingUtils", "Ordre des entités en sortie"
+        ),
+        options=[
+            QCoreApplication.translate("ProcessingUtils", "Ordre des entrées"),
+            QCoreApplication.translate("ProcessingUtils", "Non ordonné (plus rapide)"),
+        ],
+        defaultValue=OUTPUT_ORDER_INPUT,
+        optional=True,
+    )
+    parameters = [concurrency, output_order]
+    for param in parameters:
+        param.setFlags(
+            param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced
+        )
+    return parameters
+
+
+def create_concurrency_controller(
+    concurrency: int,
+) -> Optional[AimdConcurrencyController]:
+    """Create controller adjusting number of requests in flight up to concurrency,
+    if automatic tuning is enabled in plugin settings
+
+    :param concurrency: maximum number of requests sent at the same time
+    :type concurrency: int
+    :return: concurrency controller, None if automatic tuning is disabled
+    :rtype: Optional[AimdConcurrencyController]
+    """
+    settings = PlgOptionsManager().get_plg_settings()
+    if not settings.concurrency_auto_tuning:
+        return None
+    return AimdConcurrencyController(
+        max_concurrency=concurrency, min_concurrency=settings.min_concurrency
+    )
+
+
+def create_retry_policy() -> RetryPolicy:
+    """Create retry policy of requests failed with a transient error, from plugin
+    settings
+
+    :return: retry policy
+    :rtype: RetryPolicy
+    """
+    return RetryPolicy(max_retries=PlgOptionsManager().get_plg_settings().max_retries)
+
+
+def create_interactive_parameter() -> QgsProcessingParameterBoolean:
+    """Create hidden INTERACTIVE parameter, defined by dock widgets so that their
+    requests are sent before requests of other algorithms
+
+    :return: interactive parameter
+    :rtype: QgsProcessingParameterBoolean
+    """
+    param = QgsProcessingParameterBoolean(
+        name=INTERACTIVE,
+        description=QCoreApplication.translate(
+            "ProcessingUtils", "Calcul interactif prioritaire"
+        ),
+        defaultValue=False,
+        optional=True,
+    )
+    param.setFlags(param.flags() | QgsProcessingParameterDefinition.Flag.FlagHidden)
+    return param
+
+
+def scheduled_algorithm(process_algorithm: Callable) -> Callable:
+    """Decorator for QgsProcessingAlgorithm.processAlgorithm registering a job in the
+    request scheduler of the process during run.
+
+    The job is available in `scheduler_job` attribute of algorithm. It has interactive
+    priority if INTERACTIVE parameter is true and reports service state changes in
+    feedback.
+
+    :param process_algorithm: processAlgorithm method
+    :type process_algorithm: Callable
+    :return: decorated method
+    :rtype: Callable
+    """
+
+    @wraps(process_algorithm)
+    def wrapper(self, parameters, context, feedback):
+        scheduler = get_request_scheduler()
+        self.scheduler_job = scheduler.register_job(
+            self.name(),
+            (
+                PRIORITY_INTERACTIVE
+                if self.parameterAsBoolean(parameters, INTERACTIVE, context)
+                else PRIORITY_BATCH
+            ),
+            feedback,
+        )
+        try:
+            return process_algorithm(self, parameters, context, feedback)
+        finally:
+            scheduler.unregister_job(self.scheduler_job)
+
+    return wrapper
+
+
+def register_url_service(
+    url_service: str, feedback: Optional[QgsProcessingFeedback] = None
+) -> str:
+    """Register endpoints of url service in request scheduler of the process.
+
+    Url service can contain several equivalent endpoints separated by ";": requests
+    are built with the first endpoint and sent to the available endpoint with the
+    lowest latency. Endpoints with a getcapabilities different from the service
+    used by algorithms are not used.
+
+    Operations accepting POST in getcapabilities are registered, so that requests
+    too long for an url are sent with POST.
+
+    :param url_service: url service parameter
+    :type url_service: str
+    :param feedback: feedback for ignored endpoints, defaults to None
+    :type feedback: Optional[QgsProcessingFeedback], optional
+    :return: first endpoint, used to build requests
+    :rtype: str
+    """
+    compatible, incompatible = get_compatible_endpoints(url_service)
+    if feedback:
+        for endpoint in incompatible:
+            feedback.pushWarning(
+                QCoreApplication.translate(
+                    "ProcessingUtils",
+                    "Url {} non utilisée : getcapabilities indisponible ou différent "
+                    "du service.",
+                ).format(endpoint)
+            )
+    primary = primary_endpoint(url_service)
+    scheduler = get_request_scheduler()
+    scheduler.register_endpoints(primary, compatible)
+    paths = get_post_operation_paths(primary)
+    scheduler.register_post_operations(
+        [
+            f"{endpoint.rstrip('/')}/{path.lstrip('/')}"
+            for endpoint in compatible or [primary]
+            for path in paths
+        ]
+    )
+    return primary
@@ -0,0 +1,169 @@
+#! python3  # noqa: E265
+
+"""Circuit breaker stopping requests to an unavailable service."""
+
+# ############################################################################
+# ########## IMPORTS #############
+# ################################
+
+# standard library
+import time
+from typing import Optional
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.endpoints import endpoint_key
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    RequestResult,
+)
+
+# ############################################################################
+# ########## Globals #############
+# ################################
+
+# Circuit breaker states
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half-open"
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class CircuitBreaker:
+    """Circuit breaker of a service url.
+
+    - closed: requests are sent. After failure_threshold consecutive failures
+      (service unavailable, timeout or connection error), the circuit opens.
+    - open: requests are not sent. After probe_interval_s, a single probe request
+      is allowed and the circuit is half-open.
+    - half-open: the probe request is sent. The circuit closes if it succeeds and
+      opens again if it fails.
+
+    Server errors returned for a computation that can't be done (500, 4xx) are
+    answers of an available service: they reset the failure count.
+
+    Not thread safe: calls must be synchronized by caller.
+    """
+
+    def __init__(
+        self,
+        service_url: str,
+        failure_threshold: int = 5,
+        probe_interval_s: float = 10.0,
+    ) -> None:
+        """Circuit breaker
+
+        :param service_url: service url, see service_url()
+        :type service_url: str
+        :param failure_threshold: number of consecutive failures opening the circuit,
+            0 to disable circuit breaker. Defaults to 5
+        :type failure_threshold: int, optional
+        :param probe_interval_s: delay between probe requests while the circuit is
+            open (seconds), defaults to 10.0
+        :type probe_interval_s: float, optional
+        """
+        self.service_url = service_url
+        self.failure_threshold = max(failure_threshold, 0)
+        self.probe_interval_s = max(probe_interval_s, 0.0)
+
+        self.state = STATE_CLOSED
+        self.failure_count = 0
+        self.open_count = 0
+        self.next_probe_time = 0.0
+
+    @staticmethod
+    def is_failure_result(result: RequestResult) -> bool:
+        """Check if a result shows the service is unavailable: throttled or rejected
+        by an unavailable service (429, 502, 503, 504), timeout or no response
+
+        :param result: request result
+        :type result: RequestResult
+        :return: True for a failure
+        :rtype: bool
+        """
+        return result.is_transient_error or (
+            result.is_error and result.status_code == 0
+        )
+
+    def allow_request(self, now: Optional[float] = None) -> bool:
+        """Check if a request can be sent. When the probe delay of an open circuit is
+        over, the circuit becomes half-open and the request is the probe request.
+
+        :param now: current monotonic time, defaults to None for time.monotonic()
+        :type now: Optional[float], optional
+        :return: True if request can be sent
+        :rtype: bool
+        """
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_OPEN:
+            now = time.monotonic() if now is None else now
+            if now >= self.next_probe_time:
+                self.state = STATE_HALF_OPEN
+                return True
+        return False
+
+    def probe_delay(self, now: Optional[float] = None) -> Optional[float]:
+        """Return delay before next probe request of an open circuit
+
+        :param now: current monotonic time, defaults to None for time.monotonic()
+        :type now: Optional[float], optional
+        :return: delay (seconds), None if circuit is not open
+        :rtype: Optional[float]
+        """
+        if self.state != STATE_OPEN:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(self.next_probe_time - now, 0.0)
+
+    def reset(self) -> None:
+        """Close the circuit and reset failure count"""
+        self.state = STATE_CLOSED
+        self.failure_count = 0
+
+    def add_result(self, result: RequestResult, now: Optional[float] = None) -> bool:
+        """Add result of a request sent to the service and update state
+
+        :param result: request result
+        :type result: RequestResult
+        :param now: current monotonic time, defaults to None for time.monotonic()
+        :type now: Optional[float], optional
+        :return: True if state changed
+        :rtype: bool
+        """
+        previous = self.state
+        if not self.is_failure_result(result):
+            self.failure_count = 0
+            self.state = STATE_CLOSED
+            return self.state != previous
+
+        self.failure_count += 1
+        if self.state == STATE_HALF_OPEN or (
+            self.state == STATE_CLOSED
+            and self.failure_threshold
+            and self.failure_count >= self.failure_threshold
+        ):
+            now = time.monotonic() if now is None else now
+            self.state = STATE_OPEN
+            self.next_probe_time = now + self.probe_interval_s
+            if previous == STATE_CLOSED:
+                self.open_count += 1
+        return self.state != previous
+
+
+# ############################################################################
+# ########## Functions ###########
+# ################################
+
+
+def service_url(url: str) -> str:
+    """Return url of the service of a request: request url without query and last
+    path part (operation)
+
+    :param url: request url
+    :type url: str
+    :return: service url
+    :rtype: str
+    """
+    return endpoint_key(url, operation=True)
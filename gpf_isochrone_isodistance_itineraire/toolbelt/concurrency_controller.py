@@ -0,0 +1,147 @@
+#! python3  # noqa: E265
+
+"""Automatic tuning of the number of requests sent at the same time."""
+
+# ############################################################################
+# ########## IMPORTS #############
+# ################################
+
+# standard library
+import time
+from typing import Optional
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    RequestResult,
+)
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class AimdConcurrencyController:
+    """Adjust the number of requests in flight with additive increase and
+    multiplicative decrease (AIMD), from request results.
+
+    Results are counted by window of `concurrency` results:
+
+    - congestion: a throttled (429), server error (5xx) or timed out request, or a
+      smoothed latency inflated above LATENCY_INFLATION times the baseline latency
+      (lowest smoothed latency observed). Responses read from cache are ignored.
+      The level is multiplied by DECREASE_FACTOR, at most once by window so that
+      results of requests sent before the decrease are not counted twice.
+    - a window without congestion increases the level: doubled until a first
+      congestion (slow start), then increased by 1.
+
+    As throughput is concurrency divided by latency, latency inflation means that more
+    requests in flight no longer increase throughput.
+    """
+
+    DECREASE_FACTOR = 0.5
+    LATENCY_INFLATION = 3.0
+    # Weight of last result in smoothed latency
+    LATENCY_WEIGHT = 0.2
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+        initial_concurrency: Optional[int] = None,
+    ) -> None:
+        """AIMD controller
+
+        :param max_concurrency: maximum number of requests in flight
+        :type max_concurrency: int
+        :param min_concurrency: minimum number of requests in flight, defaults to 1
+        :type min_concurrency: int, optional
+        :param initial_concurrency: initial number of requests in flight, defaults to
+            None for min_concurrency
+        :type initial_concurrency: Optional[int], optional
+        """
+        self.max_concurrency = max(max_concurrency, 1)
+        self.min_concurrency = min(max(min_concurrency, 1), self.max_concurrency)
+        self.concurrency = min(
+            max(initial_concurrency or self.min_concurrency, self.min_concurrency),
+            self.max_concurrency,
+        )
+        self.peak_concurrency = self.concurrency
+        self.decrease_count = 0
+
+        self.baseline_latency: Optional[float] = None
+        self.smoothed_latency: Optional[float] = None
+        self.throughput = 0.0
+
+        self._slow_start = True
+        self._window_count = 0
+        self._window_congested = False
+        self._window_start = time.monotonic()
+
+    @staticmethod
+    def is_congestion_result(result: RequestResult) -> bool:
+        """Check if a result is a congestion signal: throttling, server error or
+        timeout
+
+        :param result: request result
+        :type result: RequestResult
+        :return: True for a congestion signal
+        :rtype: bool
+        """
+        return (
+            result.status_code == 429 or result.status_code >= 500 or result.is_timeout
+        )
+
+    def add_result(self, result: RequestResult) -> bool:
+        """Add a request result and adjust level
+
+        :param result: request result
+        :type result: RequestResult
+        :return: True if level changed
+        :rtype: bool
+        """
+        congestion = self.is_congestion_result(result)
+        if not congestion and not result.is_error and not result.from_cache:
+            if self.smoothed_latency is None:
+                self.smoothed_latency = result.latency
+            else:
+                self.smoothed_latency += self.LATENCY_WEIGHT * (
+                    result.latency - self.smoothed_latency
+                )
+            if (
+                self.baseline_latency is None
+                or self.smoothed_latency < self.baseline_latency
+            ):
+                self.baseline_latency = self.smoothed_latency
+            congestion = self.smoothed_latency > self.LATENCY_INFLATION * max(
+                self.baseline_latency, 0.001
+            )
+
+        previous = self.concurrency
+        if congestion and not self._window_congested:
+            # Decrease once by window
+            self._window_congested = True
+            self._slow_start = False
+            self.concurrency = max(
+                int(self.concurrency * self.DECREASE_FACTOR), self.min_concurrency
+            )
+            if self.concurrency < previous:
+                self.decrease_count += 1
+            # Inflated latency is measured again from the new level
+            self.smoothed_latency = None
+
+        self._window_count += 1
+        if self._window_count >= previous:
+            now = time.monotonic()
+            elapsed = now - self._window_start
+            self.throughput = self._window_count / elapsed if elapsed > 0 else 0.0
+            if not self._window_congested:
+                if self._slow_start:
+                    self.concurrency = min(self.concurrency * 2, self.max_concurrency)
+                else:
+                    self.concurrency = min(self.concurrency + 1, self.max_concurrency)
+            self._window_count = 0
+            self._window_congested = False
+            self._window_start = now
+
+        self.peak_concurrency = max(self.peak_concurrency, self.concurrency)
+        return self.concurrency != previous
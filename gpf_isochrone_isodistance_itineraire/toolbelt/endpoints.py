@@ -0,0 +1,193 @@
+#! python3  # noqa: E265
+
+"""Equivalent endpoints of a navigation service."""
+
+# ############################################################################
+# ########## IMPORTS #############
+# ################################
+
+# standard library
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+# ############################################################################
+# ########## Globals #############
+# ################################
+
+# Separator of endpoints in url service setting and parameter
+ENDPOINT_SEPARATOR = ";"
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class EndpointPool:
+    """Equivalent endpoints of a service: requests built with the url of the first
+    endpoint (primary) are sent to the endpoint with the lowest expected latency,
+    from the smoothed latency of its requests and its number of requests in flight.
+
+    Health of endpoints is checked by caller, with circuit breakers.
+
+    Not thread safe: calls must be synchronized by caller.
+    """
+
+    # Weight of last request in smoothed latency
+    LATENCY_WEIGHT = 0.2
+
+    def __init__(self, primary: str, endpoints: List[str]) -> None:
+        """Endpoint pool
+
+        :param primary: url of the endpoint used to build requests
+        :type primary: str
+        :param endpoints: urls of the endpoints requests can be sent to, in
+            preference order
+        :type endpoints: List[str]
+        """
+        self.primary = endpoint_key(primary)
+        self.endpoints: List[str] = []
+        for endpoint in endpoints:
+            key = endpoint_key(endpoint)
+            if key and key not in self.endpoints:
+                self.endpoints.append(key)
+
+        self.latency: Dict[str, float] = {}
+        self.in_flight: Dict[str, int] = {}
+
+    def relative_url(self, url: str) -> Optional[str]:
+        """Return part of a request url after primary endpoint url
+
+        :param url: request url
+        :type url: str
+        :return: path from primary endpoint url with query, None if request is not
+            sent to primary endpoint
+        :rtype: Optional[str]
+        """
+        parts = urlsplit(url.strip())
+        primary = urlsplit(self.primary)
+        if (parts.scheme.lower(), parts.netloc.lower()) != (
+            primary.scheme,
+            primary.netloc,
+        ):
+            return None
+        path = re.sub("/+", "/", parts.path)
+        if not path.startswith(primary.path + "/"):
+            return None
+        relative = path[len(primary.path) :]
+        return f"{relative}?{parts.query}" if parts.query else relative
+
+    def endpoint_urls(self, url: str) -> List[str]:
+        """Return urls of a request for each endpoint
+
+        :param url: request url, built with primary endpoint url
+        :type url: str
+        :return: request urls, in endpoint preference order
+        :rtype: List[str]
+        """
+        relative = self.relative_url(url)
+        if relative is None:
+            return []
+        return [endpoint + relative for endpoint in self.endpoints]
+
+    def expected_latency(self, url: str) -> float:
+        """Return expected latency of a request sent to an endpoint: smoothed latency
+        multiplied by number of requests in flight. Endpoints without latency are
+        tried first.
+
+        :param url: request url for endpoint
+        :type url: str
+        :return: expected latency (seconds)
+        :rtype: float
+        """
+        key = endpoint_key(url, operation=True)
+        return self.latency.get(key, 0.0) * (self.in_flight.get(key, 0) + 1)
+
+    def add_in_flight(self, url: str, count: int) -> None:
+        """Update number of requests in flight of an endpoint
+
+        :param url: request url for endpoint
+        :type url: str
+        :param count: number of requests added, negative for requests done
+        :type count: int
+        """
+        key = endpoint_key(url, operation=True)
+        self.in_flight[key] = max(self.in_flight.get(key, 0) + count, 0)
+
+    def add_latency(self, url: str, latency: float) -> None:
+        """Add latency of a successful request sent to an endpoint
+
+        :param url: request url for endpoint
+        :type url: str
+        :param latency: request latency (seconds)
+        :type latency: float
+        """
+        key = endpoint_key(url, operation=True)
+        previous = self.latency.get(key)
+        if previous is None:
+            self.latency[key] = latency
+        else:
+            self.latency[key] = previous + self.LATENCY_WEIGHT * (latency - previous)
+
+
+# ############################################################################
+# ########## Functions ###########
+# ################################
+
+
+def split_endpoints(url_service: str) -> List[str]:
+    """Split url service setting or parameter into endpoint urls
+
+    :param url_service: endpoint urls separated by ENDPOINT_SEPARATOR
+    :type url_service: str
+    :return: endpoint urls, empty values removed
+    :rtype: List[str]
+    """
+    return [
+        endpoint.strip()
+        for endpoint in url_service.split(ENDPOINT_SEPARATOR)
+        if endpoint.strip()
+    ]
+
+
+def primary_endpoint(url_service: str) -> str:
+    """Return first endpoint of url service setting or parameter, used to build
+    requests
+
+    :param url_service: endpoint urls separated by ENDPOINT_SEPARATOR
+    :type url_service: str
+    :return: first endpoint url, url service if no endpoint defined
+    :rtype: str
+    """
+    endpoints = split_endpoints(url_service)
+    return endpoints[0] if endpoints else url_service
+
+
+def endpoint_key(url: str, operation: bool = False) -> str:
+    """Return a canonical form of an endpoint url: lower case scheme and host, no
+    duplicated nor trailing slash, no query
+
+    :param url: endpoint url, or request url if operation is True
+    :type url: str
+    :param operation: url is a request url, last path part (operation) is removed.
+        Defaults to False
+    :type operation: bool, optional
+    :return: endpoint url
+    :rtype: str
+    """
+    parts = urlsplit(url.strip())
+    path = re.sub("/+", "/", parts.path).rstrip("/")
+    if operation:
+        path = path.rsplit("/", 1)[0]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, "", ""))
+
+
+def host_key(url: str) -> str:
+    """Return host of an url, with port if defined, in lower case
+
+    :param url: url
+    :type url: str
+    :return: host
+    :rtype: str
+    """
+    return urlsplit(url.strip()).netloc.lower()
@@ -0,0 +1,232 @@
+#! python3  # noqa: E265
+
+"""Timing instrumentation for processing algorithms stages."""
+
+# ############################################################################
+# ########## IMPORTS #############
+# ################################
+
+# standard library
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+# PyQGIS
+from qgis.core import Qgis
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.log_handler import PlgLogger
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class StageHistogram:
+    """Duration histogram for a stage, with power of 2 millisecond buckets.
+
+    Bucket 0 contains durations below 1 ms, bucket i durations between 2^(i-1) ms
+    and 2^i ms. Last bucket contains all durations above.
+    """
+
+    BUCKET_COUNT = 18
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets: List[int] = [0] * self.BUCKET_COUNT
+
+    def add(self, duration: float) -> None:
+        """Add a duration to histogram
+
+        :param duration: duration (seconds)
+        :type duration: float
+        """
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        duration_ms = duration * 1000.0
+        index = 0 if duration_ms < 1.0 else int(math.log2(duration_ms)) + 1
+        self.buckets[min(index, self.BUCKET_COUNT - 1)] += 1
+
+    def percentile(self, percent: float) -> float:
+        """Return approximate percentile as upper limit of bucket (milliseconds)
+
+        :param percent: percentile (0-100)
+        :type percent: float
+        :return: percentile upper limit in milliseconds, 0.0 if histogram is empty
+        :rtype: float
+        """
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(percent / 100.0 * self.count), 1)
+        cumulated = 0
+        for index, bucket_count in enumerate(self.buckets):
+            cumulated += bucket_count
+            if cumulated >= rank:
+                return min(float(2**index), self.max * 1000.0)
+        return self.max * 1000.0
+
+
+class _Stopwatch:
+    """Record successive stages durations in instrumentation"""
+
+    def __init__(self, instrumentation: "StageInstrumentation") -> None:
+        self._instrumentation = instrumentation
+        self._last_time = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        """Record time elapsed since last lap for a stage
+
+        :param stage: stage name
+        :type stage: str
+        """
+        now = time.perf_counter()
+        self._instrumentation.record(stage, now - self._last_time)
+        self._last_time = now
+
+
+class _NullStopwatch:
+    """Stopwatch used when instrumentation is disabled"""
+
+    def lap(self, stage: str) -> None:
+        """Do nothing
+
+        :param stage: stage name
+        :type stage: str
+        """
+
+
+_NULL_STOPWATCH = _NullStopwatch()
+
+
+class StageInstrumentation:
+    """Aggregate durations of processing stages in histograms.
+
+    When disabled, stopwatch and stage context have almost no cost.
+
+    Example:
+
+    .. code-block:: python
+
+        instrumentation = StageInstrumentation(enabled=True)
+        stopwatch = instrumentation.stopwatch()
+        value = expression.evaluate(expression_ctx)
+        stopwatch.lap(StageInstrumentation.EXPRESSION)
+        with instrumentation.stage(StageInstrumentation.SINK):
+            sink.addFeature(feature)
+        instrumentation.log_report()
+    """
+
+    EXPRESSION = "expression"
+    VALIDATION = "validation"
+    TRANSFORM = "transform"
+    REQUEST = "request"
+    DECODE = "decode"
+    GEOMETRY = "geometry"
+    SINK = "sink"
+
+    STAGES = [EXPRESSION, VALIDATION, TRANSFORM, REQUEST, DECODE, GEOMETRY, SINK]
+
+    def __init__(self, enabled: bool, name: str = "") -> None:
+        """Instrumentation for processing stages
+
+        :param enabled: True if durations must be recorded
+        :type enabled: bool
+        :param name: name used in report, defaults to ""
+        :type name: str, optional
+        """
+        self.enabled = enabled
+        self.name = name
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, StageHistogram] = {}
+
+    def stopwatch(self):
+        """Create a stopwatch to record successive stages
+
+        :return: stopwatch with a lap(stage) method
+        :rtype: _Stopwatch
+        """
+        if not self.enabled:
+            return _NULL_STOPWATCH
+        return _Stopwatch(self)
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """Context manager to record duration of a stage
+
+        :param stage: stage name
+        :type stage: str
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage: str, duration: float) -> None:
+        """Record a stage duration
+
+        :param stage: stage name
+        :type stage: str
+        :param duration: duration (seconds)
+        :type duration: float
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = StageHistogram()
+            histogram.add(duration)
+
+    def histograms(self) -> Dict[str, StageHistogram]:
+        """Return recorded histograms by stage
+
+        :return: histograms by stage
+        :rtype: Dict[str, StageHistogram]
+        """
+        with self._lock:
+            return dict(self._histograms)
+
+    def report(self) -> str:
+        """Return a report of recorded stages
+
+        :return: report, empty string if nothing was recorded
+        :rtype: str
+        """
+        histograms = self.histograms()
+        if not histograms:
+            return ""
+
+        total = sum(histogram.total for histogram in histograms.values())
+        lines = [f"Stage timings {self.name} (total {total * 1000.0:.1f} ms):"]
+        stages = self.STAGES + sorted(set(histograms) - set(self.STAGES))
+        for stage in stages:
+            histogram = histograms.get(stage)
+            if histogram is None:
+                continue
+            share = histogram.total / total if total > 0 else 0.0
+            lines.append(
+                f"  {stage:<10} count={histogram.count} "
+                f"total={histogram.total * 1000.0:.1f} ms ({share:.0%}) "
+                f"mean={histogram.total * 1000.0 / histogram.count:.2f} ms "
+                f"p50<={histogram.percentile(50):.0f} ms "
+                f"p95<={histogram.percentile(95):.0f} ms "
+                f"max={histogram.max * 1000.0:.1f} ms"
+            )
+        return "\n".join(lines)
+
+    def log_report(self) -> None:
+        """Log report of recorded stages in plugin logs"""
+        if not self.enabled:
+            return
+        report = self.report()
+        if report:
+            PlgLogger.log(report, log_level=Qgis.MessageLevel.Info, push=False)
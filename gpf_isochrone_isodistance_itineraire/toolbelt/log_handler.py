@@ -2,27 +2,305 @@
 
 # standard library
 import logging
+import queue
+import threading
 from functools import partial
-from typing import Callable, Literal, Optional, Union
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Callable, List, Literal, Optional, Tuple, Union
 
 # PyQGIS
 from qgis.core import Qgis, QgsMessageLog, QgsMessageOutput
 from qgis.gui import QgsMessageBar
+from qgis.PyQt.QtCore import QCoreApplication, QObject, QThread, pyqtSignal, pyqtSlot
 from qgis.PyQt.QtWidgets import QPushButton, QWidget
 from qgis.utils import iface
 
 # project package
 import gpf_isochrone_isodistance_itineraire.toolbelt.preferences as plg_prefs_hdlr
-from gpf_isochrone_isodistance_itineraire.__about__ import __title__
+from gpf_isochrone_isodistance_itineraire.__about__ import __title__, __title_clean__
+from gpf_isochrone_isodistance_itineraire.toolbelt.application_folder import get_app_dir
 
 # ############################################################################
 # ########## Classes ###############
 # ##################################
 
 
+class _MainThreadDispatcher(QObject):
+    """Run callables in the thread of the QGIS application (main thread).
+
+    Emitting the signal from another thread queues the call in the main thread event
+    loop, emitting it from the main thread calls it directly.
+    """
+
+    call_requested = pyqtSignal(object)
+
+    def __init__(self):
+        super().__init__()
+        app = QCoreApplication.instance()
+        if app is not None:
+            self.moveToThread(app.thread())
+        self.call_requested.connect(self._call)
+
+    @pyqtSlot(object)
+    def _call(self, func: Callable) -> None:
+        """Call a callable in the dispatcher thread.
+
+        :param func: callable without argument
+        :type func: Callable
+        """
+        func()
+
+
+class PlgLogBuffer:
+    """Buffered output for plugin log messages.
+
+    Messages are queued by any thread without formatting nor settings lookup. A \
+    background thread writes them by batches to the QGIS messages panel and, if \
+    enabled in settings, to a rotating log file in the application folder.
+    """
+
+    MAX_BATCH_SIZE: int = 1000
+    LOG_FILE_MAX_BYTES: int = 2 * 1024 * 1024
+    LOG_FILE_BACKUP_COUNT: int = 3
+
+    # QGIS message level to python logging level for log file
+    LOGGING_LEVELS = {
+        Qgis.MessageLevel.Info: logging.INFO,
+        Qgis.MessageLevel.Warning: logging.WARNING,
+        Qgis.MessageLevel.Critical: logging.ERROR,
+        Qgis.MessageLevel.Success: logging.INFO,
+        Qgis.MessageLevel.NoLevel: logging.DEBUG,
+    }
+
+    def __init__(self, log_file: Optional[Path] = None):
+        """Buffered output for plugin log messages.
+
+        :param log_file: path of the rotating log file, defaults to None \
+        (<application folder>/logs/<plugin title>.log)
+        :type log_file: Optional[Path], optional
+        """
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        self._log_file = log_file
+        self._file_handler: Optional[RotatingFileHandler] = None
+
+    @property
+    def log_file(self) -> Path:
+        """Return rotating log file path
+
+        :return: log file path
+        :rtype: Path
+        """
+        if self._log_file is None:
+            self._log_file = get_app_dir(dir_name="logs") / f"{__title_clean__}.log"
+        return self._log_file
+
+    def put(
+        self,
+        message: Any,
+        application: str,
+        log_level: Qgis.MessageLevel,
+        notify_user: bool = False,
+    ) -> None:
+        """Queue a message. The message is written later by the background thread.
+
+        :param message: message to write, converted to string when written
+        :type message: Any
+        :param application: name of the application sending the message
+        :type application: str
+        :param log_level: message level
+        :type log_level: Qgis.MessageLevel
+        :param notify_user: message is always written and QGIS notifies the user, \
+        defaults to False
+        :type notify_user: bool, optional
+        """
+        self._queue.put((message, application, log_level, notify_user))
+        if self._thread is None or not self._thread.is_alive():
+            self._start()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until all messages queued before this call are written.
+
+        :param timeout: maximum wait in seconds, defaults to 5.0
+        :type timeout: float, optional
+        :return: True if messages were written before timeout, False otherwise
+        :rtype: bool
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._write(self._drain())
+            return True
+
+        written = threading.Event()
+        self._queue.put(written)
+        return written.wait(timeout)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write pending messages, stop background thread and close log file.
+
+        :param timeout: maximum wait in seconds, defaults to 5.0
+        :type timeout: float, optional
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                self._queue.put(None)
+                self._thread.join(timeout)
+            self._thread = None
+
+        # messages queued during thread shutdown
+        self._write(self._drain())
+
+        if self._file_handler:
+            self._file_handler.close()
+            self._file_handler = None
+
+    def _start(self) -> None:
+        """Start background thread if not running"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=f"{__title_clean__}-log", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Background thread loop: wait for messages and write them by batches"""
+        while True:
+            item = self._queue.get()
+            batch, flush_events, stop = [], [], False
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    flush_events.append(item)
+                else:
+                    batch.append(item)
+
+                if stop or len(batch) >= self.MAX_BATCH_SIZE:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            try:
+                self._write(batch)
+            except Exception as err:
+                logging.error(f"Error while writing plugin log messages: {err}")
+
+            for event in flush_events:
+                event.set()
+
+            if stop:
+                return
+
+    def _drain(self) -> List[Tuple[Any, str, Qgis.MessageLevel, bool]]:
+        """Get all queued messages without waiting
+
+        :return: queued messages
+        :rtype: List[Tuple[Any, str, Qgis.MessageLevel, bool]]
+        """
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return batch
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is not None:
+                batch.append(item)
+
+    def _write(self, batch: List[Tuple[Any, str, Qgis.MessageLevel, bool]]) -> None:
+        """Write a batch of messages to QGIS messages panel and optional log file.
+        If debug mode is disabled, only warnings (1), errors (2) and messages \
+        notified to the user are written.
+
+        :param batch: messages to write
+        :type batch: List[Tuple[Any, str, Qgis.MessageLevel, bool]]
+        """
+        if not batch:
+            return
+
+        # settings are read once for the whole batch
+        plg_settings = plg_prefs_hdlr.PlgOptionsManager.get_plg_settings()
+        file_handler = self._get_file_handler(plg_settings.log_to_file)
+
+        for message, application, log_level, notify_user in batch:
+            # if not debug mode and not notified, let's ignore INFO, SUCCESS and TEST
+            if (
+                not plg_settings.debug_mode
+                and not notify_user
+                and (log_level < 1 or log_level > 2)
+            ):
+                continue
+
+            message = PlgLogger.message_as_str(message)
+
+            # send it to QGIS messages panel
+            QgsMessageLog.logMessage(
+                message=message,
+                tag=application,
+                notifyUser=notify_user,
+                level=log_level,
+            )
+
+            if file_handler:
+                python_level = self.LOGGING_LEVELS.get(log_level, logging.INFO)
+                file_handler.handle(
+                    logging.makeLogRecord(
+                        {
+                            "name": application,
+                            "levelno": python_level,
+                            "levelname": logging.getLevelName(python_level),
+                            "msg": message,
+                        }
+                    )
+                )
+
+    def _get_file_handler(self, enabled: bool) -> Optional[RotatingFileHandler]:
+        """Get rotating file handler, opened or closed depending on settings
+
+        :param enabled: True if log file is enabled in settings
+        :type enabled: bool
+        :return: file handler, None if log file is disabled or can't be opened
+        :rtype: Optional[RotatingFileHandler]
+        """
+        if not enabled:
+            if self._file_handler:
+                self._file_handler.close()
+                self._file_handler = None
+            return None
+
+        if self._file_handler is None:
+            try:
+                self.log_file.parent.mkdir(parents=True, exist_ok=True)
+                self._file_handler = RotatingFileHandler(
+                    filename=self.log_file,
+                    maxBytes=self.LOG_FILE_MAX_BYTES,
+                    backupCount=self.LOG_FILE_BACKUP_COUNT,
+                    encoding="UTF-8",
+                )
+                self._file_handler.setFormatter(
+                    logging.Formatter(
+                        "%(asctime)s || %(levelname)s || %(name)s || %(message)s"
+                    )
+                )
+            except OSError as err:
+                logging.error(f"Can't open plugin log file {self.log_file}: {err}")
+                return None
+        return self._file_handler
+
+
 class PlgLogger(logging.Handler):
     """Python logging handler supercharged with QGIS useful methods."""
 
+    # shared by all loggers, messages are written by a background thread
+    log_buffer = PlgLogBuffer()
+    _dispatcher: Optional[_MainThreadDispatcher] = None
+
     @staticmethod
     def log(
         message: str,
@@ -44,6 +322,10 @@ class PlgLogger(logging.Handler):
         Plugin name is used as title. If debug mode is disabled, only warnings (1) and \
         errors (2) or with push are sent.
 
+        Messages are queued and written by batches by a background thread, so logging \
+        from processing threads doesn't slow them down. Message bar display is always \
+        done in the main thread.
+
         :param message: message to display
         :type message: str
         :param application: name of the application sending the message. \
@@ -120,74 +402,127 @@ class PlgLogger(logging.Handler):
             )
             log(message="Plugin loaded - TEST", log_level=4, push=0)
         """
-        # if not debug mode and not push, let's ignore INFO, SUCCESS and TEST
-        debug_mode = plg_prefs_hdlr.PlgOptionsManager.get_plg_settings().debug_mode
-        if not debug_mode and not push and (log_level < 1 or log_level > 2):
-            return
-
         # if log_level is an int, convert it to Qgis.MessageLevel
         if isinstance(log_level, int):
             log_level = Qgis.MessageLevel(log_level)
 
-        # ensure message is a string
-        if not isinstance(message, str):
-            try:
-                message = str(message)
-            except Exception as err:
-                err_msg = "Log message must be a string, not: {}. Trace: {}".format(
-                    type(message), err
-                )
-                logging.error(err_msg)
-                message = err_msg
-
-        # send it to QGIS messages panel
-        QgsMessageLog.logMessage(
-            message=message, tag=application, notifyUser=push, level=log_level
+        # formatting, filtering and write are done by the buffer background thread
+        PlgLogger.log_buffer.put(
+            message=message,
+            application=application,
+            log_level=log_level,
+            notify_user=push,
         )
 
         # optionally, display message on QGIS Message bar (above the map canvas)
         if push and iface is not None:
-            msg_bar = None
+            push_message = partial(
+                PlgLogger._push_message_bar,
+                message=PlgLogger.message_as_str(message),
+                application=application,
+                log_level=log_level,
+                duration=duration,
+                button=button,
+                button_text=button_text,
+                button_more_text=button_more_text,
+                button_connect=button_connect,
+                parent_location=parent_location,
+            )
 
-            # QGIS or custom dialog
-            if parent_location and isinstance(parent_location, QWidget):
-                msg_bar = parent_location.findChild(QgsMessageBar)
+            # message bar widgets can only be used in main thread
+            app = QCoreApplication.instance()
+            if app is None or QThread.currentThread() == app.thread():
+                push_message()
+            else:
+                if PlgLogger._dispatcher is None:
+                    PlgLogger._dispatcher = _MainThreadDispatcher()
+                PlgLogger._dispatcher.call_requested.emit(push_message)
 
-            if not msg_bar:
-                msg_bar = iface.messageBar()
+    @staticmethod
+    def flush(timeout: float = 5.0) -> bool:
+        """Wait until queued messages are written.
 
-            # calc duration
-            if duration is None:
-                duration = (log_level + 1) * 3
+        :param timeout: maximum wait in seconds, defaults to 5.0
+        :type timeout: float, optional
+        :return: True if messages were written before timeout, False otherwise
+        :rtype: bool
+        """
+        return PlgLogger.log_buffer.flush(timeout)
 
-            # create message with/out a widget
-            if button:
-                # create output message
-                notification = iface.messageBar().createMessage(
-                    title=application, text=message
-                )
-                widget_button = QPushButton(button_text or "More...")
-                if button_connect:
-                    widget_button.clicked.connect(button_connect)
-                else:
-                    mini_dlg: QgsMessageOutput = QgsMessageOutput.createMessageOutput()
-                    mini_dlg.setTitle(application)
-                    mini_dlg.setMessage(
-                        f"{message}\n{button_more_text}",
-                        QgsMessageOutput.MessageType.MessageText,
-                    )
-                    widget_button.clicked.connect(partial(mini_dlg.showMessage, False))
+    @staticmethod
+    def message_as_str(message: Any) -> str:
+        """Ensure message is a string.
 
-                notification.layout().addWidget(widget_button)
-                msg_bar.pushWidget(
-                    widget=notification, level=log_level, duration=duration
-                )
+        :param message: message to convert
+        :type message: Any
+        :return: message as string, or conversion error message
+        :rtype: str
+        """
+        if isinstance(message, str):
+            return message
+        try:
+            return str(message)
+        except Exception as err:
+            err_msg = "Log message must be a string, not: {}. Trace: {}".format(
+                type(message), err
+            )
+            logging.error(err_msg)
+            return err_msg
+
+    @staticmethod
+    def _push_message_bar(
+        message: str,
+        application: str,
+        log_level: Qgis.MessageLevel,
+        duration: Optional[int],
+        button: bool,
+        button_text: Optional[str],
+        button_more_text: Optional[str],
+        button_connect: Optional[Callable],
+        parent_location: Optional[QWidget],
+    ) -> None:
+        """Display message on QGIS Message bar. Must be called in main thread.
+        See `log` for parameters description.
+        """
+        msg_bar = None
+
+        # QGIS or custom dialog
+        if parent_location and isinstance(parent_location, QWidget):
+            msg_bar = parent_location.findChild(QgsMessageBar)
 
+        if not msg_bar:
+            msg_bar = iface.messageBar()
+
+        # calc duration
+        if duration is None:
+            duration = (log_level + 1) * 3
+
+        # create message with/out a widget
+        if button:
+            # create output message
+            notification = iface.messageBar().createMessage(
+                title=application, text=message
+            )
+            widget_button = QPushButton(button_text or "More...")
+            if button_connect:
+                widget_button.clicked.connect(button_connect)
             else:
-                # send simple message
-                msg_bar.pushMessage(
-                    title=application,
-                    text=message,
-                    level=log_level,
-                    duration=duration,
+                mini_dlg: QgsMessageOutput = QgsMessageOutput.createMessageOutput()
+                mini_dlg.setTitle(application)
+                mini_dlg.setMessage(
+                    f"{message}\n{button_more_text}",
+                    QgsMessageOutput.MessageType.MessageText,
                 )
+                widget_button.clicked.connect(partial(mini_dlg.showMessage, False))
+
+            notification.layout().addWidget(widget_button)
+            msg_bar.pushWidget(widget=notification, level=log_level, duration=duration)
+
+        else:
+            # send simple message
+            msg_bar.pushMessage(
+                title=application,
+                text=message,
+                level=log_level,
+                duration=duration,
+            )
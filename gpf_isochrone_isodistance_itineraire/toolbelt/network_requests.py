@@ -0,0 +1,316 @@
+#! python3  # noqa: E265
+
+"""Requests to navigation service, usable from any thread."""
+
+# ############################################################################
+# ########## IMPORTS #############
+# ################################
+
+# standard library
+import json
+import random
+import re
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# PyQGIS
+from qgis.core import QgsBlockingNetworkRequest, QgsFeedback
+from qgis.PyQt.QtCore import QUrl
+from qgis.PyQt.QtNetwork import QNetworkRequest
+
+# ############################################################################
+# ########## Globals #############
+# ################################
+
+# HTTP status of errors that may not occur again
+TRANSIENT_STATUS_CODES = (429, 502, 503, 504)
+
+# Maximum time waiting before a retry before checking cancellation
+RETRY_POLL_INTERVAL_S = 0.1
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+@dataclass
+class RequestResult:
+    """Result of a request, independent of the QgsBlockingNetworkRequest used"""
+
+    # Requested url
+    url: str
+    # Request error code
+    error_code: QgsBlockingNetworkRequest.ErrorCode
+    # Request error message, empty if no error
+    error_message: str
+    # Response content
+    content: bytes
+    # Response Content-Type header
+    content_type: bytes
+    # Request latency (seconds)
+    latency: float
+    # True if response was read from cache
+    from_cache: bool = False
+    # HTTP status code, 0 if no response received
+    status_code: int = 0
+    # Delay requested by Retry-After response header (seconds), 0 if not defined
+    retry_after: float = 0.0
+
+    @property
+    def is_error(self) -> bool:
+        """True if request failed
+
+        :return: True if request failed
+        :rtype: bool
+        """
+        return self.error_code != QgsBlockingNetworkRequest.ErrorCode.NoError
+
+    @property
+    def is_timeout(self) -> bool:
+        """True if request failed because of a timeout
+
+        :return: True if request timed out
+        :rtype: bool
+        """
+        return self.error_code == QgsBlockingNetworkRequest.ErrorCode.TimeoutError
+
+    @property
+    def is_transient_error(self) -> bool:
+        """True if request failed with an error that may not occur again: throttled
+        (429), service unavailable (502, 503, 504) or timeout.
+
+        Other server errors (500) are returned by the service for computations that
+        can't be done: sending the request again would give the same error.
+
+        :return: True if request may succeed if sent again
+        :rtype: bool
+        """
+        return self.status_code in TRANSIENT_STATUS_CODES or self.is_timeout
+
+    def api_error_message(self) -> Optional[str]:
+        """Return error message from API JSON error response
+
+        :return: API error message, None if not available
+        :rtype: Optional[str]
+        """
+        if b"application/json" not in self.content_type:
+            return None
+        try:
+            api_response_error = json.loads(str(self.content, "UTF8"))
+        except ValueError:
+            return None
+        if (
+            isinstance(api_response_error, dict)
+            and "error" in api_response_error
+            and "message" in api_response_error["error"]
+        ):
+            return api_response_error["error"]["message"]
+        return None
+
+    def full_error_message(self) -> str:
+        """Return request error message, with API error message if available
+
+        :return: error message
+        :rtype: str
+        """
+        err_msg = f"{self.error_message}."
+        api_error_message = self.api_error_message()
+        if api_error_message:
+            err_msg += f"API error message: {api_error_message}"
+        return err_msg
+
+
+@dataclass
+class RetryPolicy:
+    """Retry of requests failed with a transient error.
+
+    Delay before a retry is the Retry-After delay of the response if defined,
+    otherwise an exponential backoff with random jitter, so that concurrent requests
+    are not sent again at the same time.
+    """
+
+    # Maximum number of retries of a request, 0 to disable retries
+    max_retries: int = 3
+    # Delay before first retry without Retry-After header (seconds), doubled for
+    # each retry
+    backoff_s: float = 1.0
+    # Maximum delay before a retry (seconds)
+    max_delay_s: float = 30.0
+
+    def should_retry(self, result: RequestResult, attempt: int) -> bool:
+        """Check if a request must be sent again
+
+        :param result: request result
+        :type result: RequestResult
+        :param attempt: number of retries already done for request
+        :type attempt: int
+        :return: True if request must be sent again
+        :rtype: bool
+        """
+        return attempt < self.max_retries and result.is_transient_error
+
+    def delay(self, result: RequestResult, attempt: int) -> float:
+        """Return delay before a retry
+
+        :param result: request result
+        :type result: RequestResult
+        :param attempt: number of retries already done for request
+        :type attempt: int
+        :return: delay (seconds)
+        :rtype: float
+        """
+        if result.retry_after > 0:
+            return min(result.retry_after, self.max_delay_s)
+        backoff = min(self.backoff_s * 2**attempt, self.max_delay_s)
+        return random.uniform(backoff / 2, backoff)
+
+
+# ############################################################################
+# ########## Functions ###########
+# ################################
+
+
+def parse_retry_after(value: str) -> float:
+    """Parse a Retry-After header value: a number of seconds or an HTTP date
+
+    :param value: header value
+    :type value: str
+    :return: delay (seconds), 0 if value is empty or invalid
+    :rtype: float
+    """
+    value = value.strip()
+    if not value:
+        return 0.0
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return max(date.timestamp() - time.time(), 0.0)
+
+
+def canonical_request_url(url: str) -> str:
+    """Return a canonical form of a request url, used to compare requests:
+    lower case scheme and host, no duplicated slashes in path and sorted query
+    parameters.
+
+    :param url: request url
+    :type url: str
+    :return: canonical request url
+    :rtype: str
+    """
+    parts = urlsplit(url.strip())
+    query = sorted(parse_qsl(parts.query, keep_blank_values=True))
+    return urlunsplit(
+        (
+            parts.scheme.lower(),
+            parts.netloc.lower(),
+            re.sub("/+", "/", parts.path),
+            urlencode(query),
+            "",
+        )
+    )
+
+
+def send_request(
+    url: str, feedback: Optional[QgsFeedback] = None, body: Optional[bytes] = None
+) -> RequestResult:
+    """Send a GET request, or a POST request with a JSON body, with a new
+    QgsBlockingNetworkRequest.
+
+    Can be called from a worker thread: feedback must then be dedicated to the request.
+
+    :param url: request url
+    :type url: str
+    :param feedback: feedback used to cancel request, defaults to None
+    :type feedback: Optional[QgsFeedback], optional
+    :param body: JSON body of a POST request, defaults to None for a GET request
+    :type body: Optional[bytes], optional
+    :return: request result
+    :rtype: RequestResult
+    """
+    blocking_req = QgsBlockingNetworkRequest()
+    qreq = QNetworkRequest(QUrl(url))
+    start_time = time.perf_counter()
+    if body is None:
+        error_code = blocking_req.get(qreq, forceRefresh=True, feedback=feedback)
+    else:
+        qreq.setHeader(
+            QNetworkRequest.KnownHeaders.ContentTypeHeader, "application/json"
+        )
+        error_code = blocking_req.post(qreq, body, forceRefresh=True, feedback=feedback)
+    latency = time.perf_counter() - start_time
+
+    reply = blocking_req.reply()
+    status_code = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+    return RequestResult(
+        url=url,
+        error_code=error_code,
+        error_message=(
+            blocking_req.errorMessage()
+            if error_code != QgsBlockingNetworkRequest.ErrorCode.NoError
+            else ""
+        ),
+        content=bytes(reply.content()),
+        content_type=bytes(reply.rawHeader(b"Content-Type")),
+        latency=latency,
+        from_cache=bool(
+            reply.attribute(QNetworkRequest.Attribute.SourceIsFromCacheAttribute)
+        ),
+        status_code=int(status_code) if status_code else 0,
+        retry_after=parse_retry_after(
+            str(bytes(reply.rawHeader(b"Retry-After")), "latin-1")
+        ),
+    )
+
+
+def send_request_with_retry(
+    url: str,
+    feedback: Optional[QgsFeedback] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    on_retry: Optional[Callable[[RequestResult], None]] = None,
+    sender: Callable[[str, Optional[QgsFeedback]], RequestResult] = send_request,
+) -> RequestResult:
+    """Send a GET request, sent again after a delay while it fails with a transient
+    error.
+
+    Waiting before a retry is stopped when feedback is canceled.
+
+    :param url: request url
+    :type url: str
+    :param feedback: feedback used to cancel request, defaults to None
+    :type feedback: Optional[QgsFeedback], optional
+    :param retry_policy: retry policy, defaults to None for no retry
+    :type retry_policy: Optional[RetryPolicy], optional
+    :param on_retry: function called with result of each request sent again,
+        defaults to None
+    :type on_retry: Optional[Callable[[RequestResult], None]], optional
+    :param sender: function sending a request, defaults to send_request
+    :type sender: Callable[[str, Optional[QgsFeedback]], RequestResult], optional
+    :return: result of last request
+    :rtype: RequestResult
+    """
+    attempt = 0
+    while True:
+        result = sender(url, feedback)
+        if (
+            retry_policy is None
+            or (feedback and feedback.isCanceled())
+            or not retry_policy.should_retry(result, attempt)
+        ):
+            return result
+        if on_retry:
+            on_retry(result)
+
+        end = time.monotonic() + retry_policy.delay(result, attempt)
+        while time.monotonic() < end:
+            if feedback and feedback.isCanceled():
+                return result
+            time.sleep(min(RETRY_POLL_INTERVAL_S, max(end - time.monotonic(), 0)))
+        attempt += 1
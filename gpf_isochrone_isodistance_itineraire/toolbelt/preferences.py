@@ -51,6 +51,28 @@ class PlgSettingsStructure:
     debug_mode: bool = False
     version: str = __version__
 
+    # logs
+    log_to_file: bool = False
+
+    # profiling
+    profiling_enabled: bool = False
+    profiling_memory: bool = False
+
+    # concurrent requests
+    max_buffered_memory_mb: int = 256
+    concurrency_auto_tuning: bool = True
+    min_concurrency: int = 1
+    max_retries: int = 3
+
+    # request scheduler, shared by all algorithms
+    max_connections: int = 16
+    rate_limit: float = 0.0
+    response_cache_mb: int = 0
+    circuit_breaker_threshold: int = 5
+    circuit_breaker_probe_interval: int = 10
+    circuit_breaker_fail_fast: bool = False
+    max_host_connections: int = 0
+
     # url service
     url_service: str = "https://data.geopf.fr/navigation/"
 
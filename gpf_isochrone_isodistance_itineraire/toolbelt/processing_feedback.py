@@ -1,23 +1,45 @@
 import sys
-from typing import Optional
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple
 
 from qgis.core import QgsProcessingFeedback
-from qgis.PyQt.QtCore import pyqtSignal, pyqtSlot
-from qgis.PyQt.QtGui import QColor
+from qgis.PyQt.QtCore import QCoreApplication, QTimer
+from qgis.PyQt.QtGui import QColor, QTextCharFormat, QTextCursor
 from qgis.PyQt.QtWidgets import QTextEdit
 
 
 class QTextEditProcessingFeedBack(QgsProcessingFeedback):
-    insert_text_color = pyqtSignal(str, QColor)
-
-    def __init__(self, text_edit: QTextEdit):
+    # Interval for text edit update
+    FLUSH_INTERVAL_MS = 250
+    # Maximum number of lines kept and displayed
+    MAX_LINES = 2000
+    # Minimum interval between two command summary lines
+    SUMMARY_INTERVAL_S = 2.0
+
+    INFO_COLOR = "black"
+    WARNING_COLOR = "orange"
+    ERROR_COLOR = "red"
+
+    def __init__(self, text_edit: QTextEdit, errors_only: bool = False):
         """QgsProcessingFeedback to display feedback in a QTextEdit
 
+        Messages can be pushed from any thread, they are displayed by batches in the
+        text edit by a timer. Only the last MAX_LINES lines are kept.
+        Commands are not displayed: a summary line with the number of commands and
+        the throughput is displayed instead.
+
+        Must be created in main thread.
+
         :param text_edit: text edit to display feedback
         :type text_edit: QTextEdit
+        :param errors_only: display only errors, defaults to False
+        :type errors_only: bool, optional
         """
         super().__init__()
         self._text_edit = text_edit
+        self._errors_only = errors_only
 
         # Define font depending on platform
         if sys.platform.startswith("win"):
@@ -27,8 +49,36 @@ class QTextEditProcessingFeedBack(QgsProcessingFeedback):
 
         self._text_edit.setReadOnly(True)
         self._text_edit.setUndoRedoEnabled(False)
+        self._text_edit.document().setMaximumBlockCount(self.MAX_LINES)
+
+        # Lines received from algorithm thread, waiting for display
+        self._pending_lock = threading.Lock()
+        self._pending_lines: List[Tuple[str, str]] = []
+
+        # Ring buffer of displayed lines, used to apply display filter
+        self._lines: Deque[Tuple[str, str]] = deque(maxlen=self.MAX_LINES)
+
+        # Command summary
+        self._command_count = 0
+        self._first_command_time: Optional[float] = None
+        self._last_summary_count = 0
+        self._last_summary_time = 0.0
 
-        self.insert_text_color.connect(self._change_color_and_insert_text)
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start()
+
+    def tr(self, message: str) -> str:
+        """Get the translation for a string using Qt translation API.
+
+        :param message: string to be translated.
+        :type message: str
+
+        :returns: Translated version of message.
+        :rtype: str
+        """
+        return QCoreApplication.translate(self.__class__.__name__, message)
 
     def setProgressText(self, text: Optional[str]):
         """Sets a progress report text string. This can be used in conjunction with setProgress() to provide detailed progress reports, such as “Transformed 4 of 5 layers”.
@@ -46,7 +96,7 @@ class QTextEditProcessingFeedBack(QgsProcessingFeedback):
         :type warning: Optional[str]
         """
         super().pushWarning(warning)
-        self.insert_text_color.emit(warning, QColor("orange"))
+        self._add_line(warning, self.WARNING_COLOR)
 
     def pushInfo(self, info: Optional[str]):
         """Pushes a general informational message from the algorithm. This can be used to report feedback which is neither a status report or an error, such as “Found 47 matching features”.
@@ -55,16 +105,21 @@ class QTextEditProcessingFeedBack(QgsProcessingFeedback):
         :type info: Optional[str]
         """
         super().pushInfo(info)
-        self.insert_text_color.emit(info, QColor("black"))
+        self._add_line(info, self.INFO_COLOR)
 
     def pushCommandInfo(self, info: str):
         """Pushes an informational message containing a command from the algorithm. This is usually used to report commands which are executed in an external application or as subprocesses.
 
+        Commands are not displayed, they are counted for the summary line.
+
         :param info: info text
         :type info: Optional[str]
         """
         super().pushCommandInfo(info)
-        self.pushInfo(info)
+        with self._pending_lock:
+            if self._first_command_time is None:
+                self._first_command_time = time.monotonic()
+            self._command_count += 1
 
     def pushDebugInfo(self, info: Optional[str]):
         """Pushes an informational message containing debugging helpers from the algorithm.
@@ -95,19 +150,102 @@ class QTextEditProcessingFeedBack(QgsProcessingFeedback):
         :type fatalError: bool, optional
         """
         super().reportError(error, fatalError)
-        self.insert_text_color.emit(error, QColor("red"))
+        self._add_line(error, self.ERROR_COLOR)
+
+    def set_errors_only(self, errors_only: bool) -> None:
+        """Define display filter and refresh text edit with kept lines
+
+        :param errors_only: display only errors
+        :type errors_only: bool
+        """
+        self._errors_only = errors_only
+        self._text_edit.clear()
+        self._insert_lines(self._lines)
+
+    def flush(self) -> None:
+        """Display pending lines in text edit. Must be called in main thread."""
+        self._flush(force_summary=False)
 
-    @pyqtSlot(str, QColor)
-    def _change_color_and_insert_text(self, text: Optional[str], color: QColor):
-        """Change current text edit color and insert text
+    def finish(self) -> None:
+        """Display pending lines and final command summary, then stop display timer.
+        Must be called in main thread."""
+        self._flush_timer.stop()
+        self._flush(force_summary=True)
 
-        :param text: text to insert
+    def _add_line(self, text: Optional[str], color: str) -> None:
+        """Add a line to pending lines
+
+        :param text: text to add
         :type text: Optional[str]
-        :param color: color
-        :type color: QColor
+        :param color: text color
+        :type color: str
         """
         if text:
-            self._text_edit.setTextColor(color)
-            self._text_edit.append(text)
-            sb = self._text_edit.verticalScrollBar()
-            sb.setValue(sb.maximum())
+            with self._pending_lock:
+                self._pending_lines.append((text, color))
+
+    def _flush(self, force_summary: bool) -> None:
+        """Display pending lines and command summary if needed
+
+        :param force_summary: add summary even if summary interval is not reached
+        :type force_summary: bool
+        """
+        with self._pending_lock:
+            lines = self._pending_lines[-self.MAX_LINES :]
+            self._pending_lines = []
+            command_count = self._command_count
+            first_command_time = self._first_command_time
+
+        now = time.monotonic()
+        if (
+            command_count != self._last_summary_count
+            and first_command_time is not None
+            and (
+                force_summary
+                or now - self._last_summary_time >= self.SUMMARY_INTERVAL_S
+            )
+        ):
+            elapsed = now - first_command_time
+            rate = command_count / elapsed if elapsed > 0 else 0.0
+            lines.append(
+                (
+                    self.tr("Requêtes : {} ({:.1f} requêtes/s)").format(
+                        command_count, rate
+                    ),
+                    self.INFO_COLOR,
+                )
+            )
+            self._last_summary_count = command_count
+            self._last_summary_time = now
+
+        if lines:
+            self._lines.extend(lines)
+            self._insert_lines(lines)
+
+    def _insert_lines(self, lines: List[Tuple[str, str]]) -> None:
+        """Insert lines in text edit in a single edit block, depending on display filter
+
+        :param lines: lines to insert with color
+        :type lines: List[Tuple[str, str]]
+        """
+        if self._errors_only:
+            lines = [line for line in lines if line[1] == self.ERROR_COLOR]
+        if not lines:
+            return
+
+        document = self._text_edit.document()
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        new_block = not document.isEmpty()
+        for text, color in lines:
+            if new_block:
+                cursor.insertBlock()
+            text_format = QTextCharFormat()
+            text_format.setForeground(QColor(color))
+            cursor.insertText(text, text_format)
+            new_block = True
+        cursor.endEditBlock()
+
+        sb = self._text_edit.verticalScrollBar()
+        sb.setValue(sb.maximum())
@@ -0,0 +1,134 @@
+#! python3  # noqa: E265
+
+"""Opt-in profiling of processing algorithms runs."""
+
+# ############################################################################
+# ########## IMPORTS #############
+# ################################
+
+# standard library
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+# PyQGIS
+from qgis.core import Qgis
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.application_folder import (
+    get_app_dir,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.log_handler import PlgLogger
+from gpf_isochrone_isodistance_itineraire.toolbelt.preferences import (
+    PlgOptionsManager,
+)
+
+# ############################################################################
+# ########## Globals #############
+# ################################
+
+# Only one cProfile profiler can be active at a time: nested runs (for example an
+# algorithm run from another algorithm) are not profiled separately.
+_profiling_lock = threading.Lock()
+
+# ############################################################################
+# ########## Functions ###########
+# ################################
+
+
+def get_profiling_dir() -> Path:
+    """Get folder where profiles and memory snapshots are written
+
+    :return: profiling folder
+    :rtype: Path
+    """
+    return get_app_dir(dir_name="profiling")
+
+
+@contextmanager
+def profile_run(
+    name: str, memory: bool = False, output_dir: Optional[Path] = None
+) -> Iterator[None]:
+    """Profile code with cProfile and optionally tracemalloc.
+
+    Profile is written in <output_dir>/<name>_<timestamp>.prof and can be read with
+    pstats or snakeviz. Memory snapshot is written in
+    <output_dir>/<name>_<timestamp>.tracemalloc and can be read with
+    tracemalloc.Snapshot.load.
+
+    If another run is already profiled, code is run without profiling.
+
+    :param name: name used for output files
+    :type name: str
+    :param memory: take a tracemalloc snapshot at the end of the run, defaults to False
+    :type memory: bool, optional
+    :param output_dir: output folder, defaults to None (application profiling folder)
+    :type output_dir: Optional[Path], optional
+    """
+    if not _profiling_lock.acquire(blocking=False):
+        yield
+        return
+
+    try:
+        output_dir = output_dir or get_profiling_dir()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        output_path = output_dir / f"{name}_{timestamp}"
+
+        start_tracemalloc = memory and not tracemalloc.is_tracing()
+        if start_tracemalloc:
+            tracemalloc.start()
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profile_path = output_path.with_suffix(".prof")
+            profiler.dump_stats(str(profile_path))
+            PlgLogger.log(
+                f"Profile written in {profile_path}",
+                log_level=Qgis.MessageLevel.Info,
+                push=False,
+            )
+
+            if memory:
+                snapshot_path = output_path.with_suffix(".tracemalloc")
+                tracemalloc.take_snapshot().dump(str(snapshot_path))
+                PlgLogger.log(
+                    f"Memory snapshot written in {snapshot_path}",
+                    log_level=Qgis.MessageLevel.Info,
+                    push=False,
+                )
+            if start_tracemalloc:
+                tracemalloc.stop()
+    finally:
+        _profiling_lock.release()
+
+
+def profiled_algorithm(process_algorithm: Callable) -> Callable:
+    """Decorator for QgsProcessingAlgorithm.processAlgorithm to profile algorithm runs
+    if profiling is enabled in plugin settings.
+
+    :param process_algorithm: processAlgorithm method
+    :type process_algorithm: Callable
+    :return: decorated method
+    :rtype: Callable
+    """
+
+    @wraps(process_algorithm)
+    def wrapper(self, parameters, context, feedback):
+        plg_settings = PlgOptionsManager.get_plg_settings()
+        if not plg_settings.profiling_enabled:
+            return process_algorithm(self, parameters, context, feedback)
+
+        with profile_run(name=self.name(), memory=plg_settings.profiling_memory):
+            return process_algorithm(self, parameters, context, feedback)
+
+    return wrapper
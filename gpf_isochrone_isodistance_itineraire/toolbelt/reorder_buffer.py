@@ -0,0 +1,156 @@
+#! python3  # noqa: E265
+
+"""Bounded buffer writing features in a sink in input order."""
+
+# ############################################################################
+# ########## IMPORTS #############
+# ################################
+
+# standard library
+from typing import Dict, List, Tuple
+
+# PyQGIS
+from qgis.core import QgsFeature, QgsFeatureSink
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class ReorderBuffer:
+    """Write features computed out of order in a sink, as soon as possible.
+
+    Each input index must be pushed once, with the features created for it (possibly
+    none). In ordered mode, features of an index are written once all previous indexes
+    are pushed: features received in advance are kept in the buffer. In unordered
+    mode, features are written in completion order.
+
+    Features are written with batched addFeatures calls using FastInsert.
+
+    The buffer does not refuse features: callers must stop dispatching new work when
+    is_full() is True, until missing indexes are pushed.
+    """
+
+    DEFAULT_MAX_FEATURES = 1000
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+    DEFAULT_BATCH_SIZE = 200
+
+    def __init__(
+        self,
+        sink: QgsFeatureSink,
+        ordered: bool = True,
+        max_features: int = DEFAULT_MAX_FEATURES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        """Reorder buffer for a sink
+
+        :param sink: output sink
+        :type sink: QgsFeatureSink
+        :param ordered: True if features must be written in input order, defaults to True
+        :type ordered: bool, optional
+        :param max_features: maximum number of features kept for out of order indexes,
+            defaults to DEFAULT_MAX_FEATURES
+        :type max_features: int, optional
+        :param max_bytes: maximum size of features kept for out of order indexes,
+            defaults to DEFAULT_MAX_BYTES
+        :type max_bytes: int, optional
+        :param batch_size: number of features written by addFeatures call,
+            defaults to DEFAULT_BATCH_SIZE
+        :type batch_size: int, optional
+        """
+        self._sink = sink
+        self.ordered = ordered
+        self.max_features = max_features
+        self.max_bytes = max_bytes
+        self.batch_size = max(batch_size, 1)
+
+        self._next_index = 0
+        self._pending: Dict[int, Tuple[List[QgsFeature], int]] = {}
+        self._batch: List[QgsFeature] = []
+
+        self.buffered_features = 0
+        self.buffered_bytes = 0
+        self.peak_buffered_features = 0
+        self.peak_buffered_bytes = 0
+        self.written_count = 0
+
+    def push(self, index: int, features: List[QgsFeature], size_bytes: int = 0) -> bool:
+        """Push features created for an input index
+
+        :param index: input index, starting at 0
+        :type index: int
+        :param features: features created for index
+        :type features: List[QgsFeature]
+        :param size_bytes: estimated size of features, defaults to 0
+        :type size_bytes: int, optional
+        :return: False if features could not be written in sink, True otherwise
+        :rtype: bool
+        """
+        if not self.ordered:
+            self._batch.extend(features)
+        elif index != self._next_index:
+            self._pending[index] = (features, size_bytes)
+            self.buffered_features += len(features)
+            self.buffered_bytes += size_bytes
+            self.peak_buffered_features = max(
+                self.peak_buffered_features, self.buffered_features
+            )
+            self.peak_buffered_bytes = max(
+                self.peak_buffered_bytes, self.buffered_bytes
+            )
+            return True
+        else:
+            self._batch.extend(features)
+            self._next_index += 1
+            while self._next_index in self._pending:
+                pending_features, pending_bytes = self._pending.pop(self._next_index)
+                self.buffered_features -= len(pending_features)
+                self.buffered_bytes -= pending_bytes
+                self._batch.extend(pending_features)
+                self._next_index += 1
+
+        if len(self._batch) >= self.batch_size:
+            return self._write_batch()
+        return True
+
+    def is_full(self) -> bool:
+        """Check if features kept for out of order indexes reached a limit
+
+        :return: True if buffer limit is reached
+        :rtype: bool
+        """
+        return (
+            self.buffered_features >= self.max_features
+            or self.buffered_bytes >= self.max_bytes
+        )
+
+    def flush(self, skip_missing: bool = False) -> bool:
+        """Write features available in input order.
+
+        :param skip_missing: write features kept after missing indexes, in input order,
+            for example to write partial results of a canceled run. Defaults to False
+        :type skip_missing: bool, optional
+        :return: False if features could not be written in sink, True otherwise
+        :rtype: bool
+        """
+        if skip_missing and self._pending:
+            for index in sorted(self._pending):
+                pending_features, _ = self._pending.pop(index)
+                self._batch.extend(pending_features)
+            self.buffered_features = 0
+            self.buffered_bytes = 0
+        return self._write_batch()
+
+    def _write_batch(self) -> bool:
+        """Write current batch in sink
+
+        :return: False if features could not be written in sink, True otherwise
+        :rtype: bool
+        """
+        if not self._batch:
+            return True
+        batch = self._batch
+        self._batch = []
+        self.written_count += len(batch)
+        return self._sink.addFeatures(batch, QgsFeatureSink.Flag.FastInsert)
@@ -0,0 +1,468 @@
+#! python3  # noqa: E265
+
+"""Concurrent requests engine for processing algorithms."""
+
+# ############################################################################
+# ########## IMPORTS #############
+# ################################
+
+# standard library
+import heapq
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# PyQGIS
+from qgis.core import QgsFeature, QgsFeedback, QgsProcessingFeedback
+from qgis.PyQt.QtCore import QCoreApplication
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.concurrency_controller import (
+    AimdConcurrencyController,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.instrumentation import (
+    StageInstrumentation,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    RequestResult,
+    RetryPolicy,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.reorder_buffer import ReorderBuffer
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_scheduler import (
+    SchedulerJob,
+    get_request_scheduler,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_statistics import (
+    RequestStatistics,
+)
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+@dataclass
+class RequestJob:
+    """Work for an input feature"""
+
+    # Input index, starting at 0
+    index: int
+    # Request url, None if no request must be sent
+    url: Optional[str] = None
+    # Data needed to create output features from request result
+    data: Any = None
+    # Output features if no request must be sent
+    features: List[QgsFeature] = field(default_factory=list)
+    # Number of retries of request
+    attempt: int = 0
+
+
+class ConcurrentRequestEngine:
+    """Send requests of jobs with the request scheduler of the process and write
+    created features in a reorder buffer.
+
+    Jobs are created and request results are handled in the calling thread: only
+    requests are sent from scheduler threads, each with its own
+    QgsBlockingNetworkRequest and QgsFeedback. Other algorithms running at the same
+    time share the scheduler connections.
+
+    Memory used by the run is bounded by max_bytes: the engine counts the bytes of
+    features decoded but not written yet (kept in the reorder buffer) and estimates
+    the bytes of pending replies from the mean size of received responses. Until a
+    first response is received, a single request is pending. Then no request is
+    dispatched while their sum would exceed max_bytes, except when no request is
+    pending, so that a single response larger than max_bytes can't block the run.
+
+    With a controller, the number of requests in flight is adjusted from request
+    results, up to concurrency. With a retry policy, requests failed with a transient
+    error are sent again after a delay, before new jobs, and their results are only
+    handled for the last attempt.
+
+    Example:
+
+    .. code-block:: python
+
+        engine = ConcurrentRequestEngine(
+            concurrency=4, buffer=ReorderBuffer(sink), statistics=statistics,
+            feedback=feedback,
+        )
+        if not engine.run(jobs, handle_result, total=source.featureCount()):
+            raise QgsProcessingException(self.writeFeatureError(sink, parameters, "OUTPUT"))
+    """
+
+    # Maximum time waiting for a request result before checking cancellation
+    POLL_INTERVAL_S = 0.2
+    # Maximum time waiting for aborted requests to end after cancellation
+    CANCEL_TIMEOUT_S = 0.5
+
+    def __init__(
+        self,
+        concurrency: int,
+        buffer: ReorderBuffer,
+        statistics: RequestStatistics,
+        feedback: QgsFeedback,
+        instrumentation: Optional[StageInstrumentation] = None,
+        max_bytes: int = 0,
+        controller: Optional[AimdConcurrencyController] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        scheduler_job: Optional[SchedulerJob] = None,
+    ) -> None:
+        """Concurrent requests engine
+
+        :param concurrency: maximum number of requests sent at the same time
+        :type concurrency: int
+        :param buffer: buffer used to write output features
+        :type buffer: ReorderBuffer
+        :param statistics: request statistics
+        :type statistics: RequestStatistics
+        :param feedback: processing feedback
+        :type feedback: QgsFeedback
+        :param instrumentation: stage instrumentation, defaults to None
+        :type instrumentation: Optional[StageInstrumentation], optional
+        :param max_bytes: maximum bytes of pending replies and unwritten features,
+            0 for no limit. Defaults to 0
+        :type max_bytes: int, optional
+        :param controller: controller adjusting number of requests in flight up to
+            concurrency, defaults to None for concurrency requests in flight
+        :type controller: Optional[AimdConcurrencyController], optional
+        :param retry_policy: retry policy, defaults to None for no retry
+        :type retry_policy: Optional[RetryPolicy], optional
+        :param scheduler_job: job registered in scheduler, defaults to None to register
+            a batch job in scheduler of the process during run
+        :type scheduler_job: Optional[SchedulerJob], optional
+        """
+        self.concurrency = max(concurrency, 1)
+        self.max_bytes = max(max_bytes, 0)
+        self._buffer = buffer
+        self._statistics = statistics
+        self._feedback = feedback
+        self._instrumentation = instrumentation or StageInstrumentation(enabled=False)
+        self._controller = controller
+        self._retry_policy = retry_policy
+        self._scheduler_job = scheduler_job
+        # Job sending requests of current run
+        self._run_job: Optional[SchedulerJob] = None
+
+        self._pending: Dict[Future, RequestJob] = {}
+        # Jobs waiting for a retry: (retry time, input index, job)
+        self._retries: List[Tuple[float, int, RequestJob]] = []
+        self._job_feedbacks: Dict[Future, QgsFeedback] = {}
+        self._handle_result: Callable[[RequestJob, RequestResult], List[QgsFeature]]
+        self._done_count = 0
+        self._progress_step = 1.0
+        self._write_error = False
+        self.canceled_count = 0
+
+        self._received_count = 0
+        self._received_bytes = 0
+        self.peak_bytes = 0
+
+    @property
+    def max_in_flight(self) -> int:
+        """Current maximum number of requests in flight
+
+        :return: maximum number of requests in flight
+        :rtype: int
+        """
+        if self._controller is None:
+            return self.concurrency
+        return min(self._controller.concurrency, self.concurrency)
+
+    @property
+    def response_bytes_estimate(self) -> float:
+        """Estimated size of a response, from the mean size of received responses
+
+        :return: estimated response size (bytes), 0 if no response received
+        :rtype: float
+        """
+        if not self._received_count:
+            return 0.0
+        return self._received_bytes / self._received_count
+
+    @property
+    def bytes_in_flight(self) -> float:
+        """Estimated bytes of pending replies
+
+        :return: estimated bytes of pending replies
+        :rtype: float
+        """
+        return len(self._pending) * self.response_bytes_estimate
+
+    @property
+    def used_bytes(self) -> float:
+        """Estimated bytes of pending replies and features not written yet
+
+        :return: estimated used bytes
+        :rtype: float
+        """
+        return self.bytes_in_flight + self._buffer.buffered_bytes
+
+    def is_memory_full(self) -> bool:
+        """Check if a new request would exceed max_bytes
+
+        :return: True if no request must be dispatched before pending ones are done
+        :rtype: bool
+        """
+        if not self.max_bytes:
+            return False
+        if not self._received_count:
+            # Response size unknown: wait for a first response
+            return bool(self._pending)
+        return self.used_bytes + self.response_bytes_estimate > self.max_bytes
+
+    def tr(self, message: str) -> str:
+        """Get the translation for a string using Qt translation API.
+
+        :param message: string to be translated.
+        :type message: str
+
+        :returns: Translated version of message.
+        :rtype: str
+        """
+        return QCoreApplication.translate(self.__class__.__name__, message)
+
+    def run(
+        self,
+        jobs: Iterable[RequestJob],
+        handle_result: Callable[[RequestJob, RequestResult], List[QgsFeature]],
+        total: int = 0,
+    ) -> bool:
+        """Run jobs until all are done or feedback is canceled.
+
+        When feedback is canceled, pending requests are aborted within
+        POLL_INTERVAL_S and features already created are written in sink, in input
+        order after missing ones.
+
+        :param jobs: jobs, in input order
+        :type jobs: Iterable[RequestJob]
+        :param handle_result: function creating output features from request result,
+            called in the calling thread
+        :type handle_result: Callable[[RequestJob, RequestResult], List[QgsFeature]]
+        :param total: number of jobs, used for progress, defaults to 0
+        :type total: int, optional
+        :return: False if features could not be written in sink, True otherwise
+        :rtype: bool
+        """
+        self._handle_result = handle_result
+        self._done_count = 0
+        self._progress_step = 100.0 / total if total > 0 else 1
+        self._write_error = False
+        self.canceled_count = 0
+        self._received_count = 0
+        self._received_bytes = 0
+        self.peak_bytes = 0
+
+        self._retries.clear()
+
+        scheduler_job = self._scheduler_job
+        if scheduler_job is None:
+            scheduler_job = get_request_scheduler().register_job(
+                self.__class__.__name__, feedback=self._feedback
+            )
+        self._run_job = scheduler_job
+        try:
+            jobs_iterator = iter(jobs)
+            while not self._is_stopped():
+                job = self._next_job(jobs_iterator)
+                if job is None:
+                    if not self._pending and not self._retries:
+                        break
+                    # Wait for pending requests or next retry
+                    self._collect(self._retry_wait())
+                    continue
+
+                if job.url is None:
+                    self._push(job, job.features, 0)
+                    continue
+
+                # Wait for a free slot and for memory if max bytes would be exceeded
+                while self._pending and (
+                    len(self._pending) >= self.max_in_flight or self.is_memory_full()
+                ):
+                    self._collect()
+                    if self._is_stopped():
+                        break
+                if self._is_stopped():
+                    break
+
+                job_feedback = QgsFeedback()
+                future = scheduler_job.submit(job.url, job_feedback)
+                self._pending[future] = job
+                self._job_feedbacks[future] = job_feedback
+                self.peak_bytes = max(self.peak_bytes, self.used_bytes)
+        finally:
+            # Abort requests still pending after cancel, write error or exception
+            self._cancel_pending()
+            if self._scheduler_job is None:
+                scheduler_job.scheduler.unregister_job(scheduler_job)
+            scheduler_job.report_messages()
+            self._run_job = None
+            if self._pending:
+                wait(list(self._pending), timeout=self.CANCEL_TIMEOUT_S)
+            self._pending.clear()
+            self._job_feedbacks.clear()
+            self._retries.clear()
+
+        if self._controller is not None and isinstance(
+            self._feedback, QgsProcessingFeedback
+        ):
+            self._feedback.pushInfo(
+                self.tr(
+                    "Requêtes simultanées : {} en fin de calcul, {} au maximum, "
+                    "{} réductions."
+                ).format(
+                    self._controller.concurrency,
+                    self._controller.peak_concurrency,
+                    self._controller.decrease_count,
+                )
+            )
+
+        if self._write_error:
+            return False
+        with self._instrumentation.stage(StageInstrumentation.SINK):
+            return self._buffer.flush(skip_missing=self._feedback.isCanceled())
+
+    def _is_stopped(self) -> bool:
+        """Check if run must be stopped: feedback canceled or write error
+
+        :return: True if run must be stopped
+        :rtype: bool
+        """
+        return self._feedback.isCanceled() or self._write_error
+
+    def _next_job(self, jobs: Iterator[RequestJob]) -> Optional[RequestJob]:
+        """Return next job to run: a job waiting for a retry if its delay is over,
+        otherwise next input job.
+
+        No input job is read while buffer is full or max bytes would be exceeded:
+        missing features are pending or waiting for a retry, run waits for them.
+
+        :param jobs: input jobs
+        :type jobs: Iterator[RequestJob]
+        :return: next job, None if no job is available now
+        :rtype: Optional[RequestJob]
+        """
+        if self._retries and self._retries[0][0] <= time.monotonic():
+            return heapq.heappop(self._retries)[2]
+        if (self._pending or self._retries) and (
+            self._buffer.is_full() or self.is_memory_full()
+        ):
+            return None
+        return next(jobs, None)
+
+    def _retry_wait(self) -> float:
+        """Return time waiting for request results before next retry
+
+        :return: waiting time (seconds)
+        :rtype: float
+        """
+        if not self._retries:
+            return self.POLL_INTERVAL_S
+        return min(
+            max(self._retries[0][0] - time.monotonic(), 0.0), self.POLL_INTERVAL_S
+        )
+
+    def _cancel_pending(self) -> None:
+        """Abort pending requests, their results are ignored. Jobs waiting for a retry
+        are canceled too."""
+        if not self._pending and not self._retries:
+            return
+        for future, job_feedback in self._job_feedbacks.items():
+            # Requests not sent yet are removed from scheduler queue
+            future.cancel()
+            job_feedback.cancel()
+        self.canceled_count = len(self._pending) + len(self._retries)
+        if isinstance(self._feedback, QgsProcessingFeedback):
+            self._feedback.pushInfo(
+                self.tr("{} requêtes en cours annulées.").format(self.canceled_count)
+            )
+
+    def _collect(self, timeout: Optional[float] = None) -> None:
+        """Wait for request results and handle them
+
+        :param timeout: maximum waiting time (seconds), defaults to None for
+            POLL_INTERVAL_S
+        :type timeout: Optional[float], optional
+        """
+        if timeout is None:
+            timeout = self.POLL_INTERVAL_S
+        if self._run_job is not None:
+            # Service state changes, requests may be paused by a circuit breaker
+            self._run_job.report_messages()
+        if not self._pending:
+            # Only jobs waiting for a retry
+            time.sleep(timeout)
+            return
+
+        done, _ = wait(
+            list(self._pending),
+            timeout=timeout,
+            return_when=FIRST_COMPLETED,
+        )
+        for future in done:
+            job = self._pending.pop(future)
+            self._job_feedbacks.pop(future, None)
+            result = future.result()
+            self._received_count += 1
+            self._received_bytes += len(result.content)
+
+            if self._controller is not None and self._controller.add_result(result):
+                self._report_concurrency()
+
+            retry = self._retry_policy is not None and self._retry_policy.should_retry(
+                result, job.attempt
+            )
+            if retry:
+                self._statistics.add_retried_result(result)
+            else:
+                self._statistics.add_request_result(result)
+            self._statistics.report(self._feedback)
+            self._instrumentation.record(StageInstrumentation.REQUEST, result.latency)
+
+            if retry:
+                heapq.heappush(
+                    self._retries,
+                    (
+                        time.monotonic()
+                        + self._retry_policy.delay(result, job.attempt),
+                        job.index,
+                        job,
+                    ),
+                )
+                job.attempt += 1
+                continue
+
+            features = self._handle_result(job, result)
+            self._push(job, features, len(result.content))
+            self.peak_bytes = max(self.peak_bytes, self.used_bytes)
+
+    def _report_concurrency(self) -> None:
+        """Report number of requests in flight chosen by controller"""
+        if not isinstance(self._feedback, QgsProcessingFeedback):
+            return
+        self._feedback.pushInfo(
+            self.tr(
+                "Requêtes simultanées : {} (débit {:.1f} requêtes/s, latence {:.0f} ms)."
+            ).format(
+                self.max_in_flight,
+                self._controller.throughput,
+                (self._controller.smoothed_latency or 0.0) * 1000.0,
+            )
+        )
+
+    def _push(self, job: RequestJob, features: List[QgsFeature], size: int) -> None:
+        """Push job features in buffer and update progress
+
+        :param job: job done
+        :type job: RequestJob
+        :param features: created features
+        :type features: List[QgsFeature]
+        :param size: estimated size of features
+        :type size: int
+        """
+        with self._instrumentation.stage(StageInstrumentation.SINK):
+            if not self._buffer.push(job.index, features, size):
+                self._write_error = True
+        self._done_count += 1
+        self._feedback.setProgress(self._done_count * self._progress_step)
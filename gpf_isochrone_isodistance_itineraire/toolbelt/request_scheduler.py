@@ -0,0 +1,1012 @@
+#! python3  # noqa: E265
+
+"""Process-wide scheduler of requests sent to navigation services."""
+
+# ############################################################################
+# ########## IMPORTS #############
+# ################################
+
+# standard library
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Set, Tuple
+
+# PyQGIS
+from qgis.core import (
+    Qgis,
+    QgsBlockingNetworkRequest,
+    QgsFeedback,
+    QgsProcessingFeedback,
+)
+from qgis.PyQt.QtCore import QCoreApplication, Qt
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    service_url,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.endpoints import (
+    EndpointPool,
+    endpoint_key,
+    host_key,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.log_handler import PlgLogger
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    RequestResult,
+    canonical_request_url,
+    send_request,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.preferences import PlgOptionsManager
+from gpf_isochrone_isodistance_itineraire.toolbelt.service_request import (
+    ServiceRequest,
+)
+
+# ############################################################################
+# ########## Globals #############
+# ################################
+
+# Job priorities: requests of jobs with higher priority are sent first
+PRIORITY_BATCH = 0
+PRIORITY_INTERACTIVE = 1
+
+# Maximum length of urls sent with GET: longer requests are sent with POST to
+# operations accepting it. Limit of usual proxies and servers.
+MAX_GET_URL_LENGTH = 2048
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class SchedulerJob:
+    """Job registered in scheduler: a run of an algorithm"""
+
+    def __init__(
+        self,
+        scheduler: "RequestScheduler",
+        name: str,
+        priority: int = PRIORITY_BATCH,
+        feedback: Optional[QgsFeedback] = None,
+    ) -> None:
+        """Scheduler job, created by RequestScheduler.register_job()
+
+        :param scheduler: scheduler sending requests of job
+        :type scheduler: RequestScheduler
+        :param name: job name, algorithm name for example
+        :type name: str
+        :param priority: job priority, defaults to PRIORITY_BATCH
+        :type priority: int, optional
+        :param feedback: feedback of the run, used to report service state changes.
+            Defaults to None
+        :type feedback: Optional[QgsFeedback], optional
+        """
+        self.scheduler = scheduler
+        self.name = name
+        self.priority = priority
+        self.feedback = feedback
+        # Number of requests of job currently sent, updated by scheduler
+        self.in_flight = 0
+        # Number of requests of job sent, updated by scheduler
+        self.sent_count = 0
+        # Messages not reported yet in feedback, added by scheduler
+        self.messages: List[Tuple[Qgis.MessageLevel, str]] = []
+
+    def report_messages(self) -> None:
+        """Push messages added by scheduler in job feedback. Must be called from the
+        thread of the run."""
+        with self.scheduler._condition:
+            messages = self.messages
+            self.messages = []
+        if not isinstance(self.feedback, QgsProcessingFeedback):
+            return
+        for level, message in messages:
+            if level == Qgis.MessageLevel.Warning:
+                self.feedback.pushWarning(message)
+            else:
+                self.feedback.pushInfo(message)
+
+    def submit(
+        self, url: str, feedback: Optional[QgsFeedback] = None
+    ) -> "Future[RequestResult]":
+        """Submit a request of job, see RequestScheduler.submit()
+
+        :param url: request url
+        :type url: str
+        :param feedback: feedback dedicated to the request, defaults to None
+        :type feedback: Optional[QgsFeedback], optional
+        :return: future request result
+        :rtype: Future[RequestResult]
+        """
+        self.report_messages()
+        return self.scheduler.submit(self, url, feedback)
+
+    def send(self, url: str, feedback: Optional[QgsFeedback] = None) -> RequestResult:
+        """Send a request of job and wait for its result, see RequestScheduler.send()
+
+        :param url: request url
+        :type url: str
+        :param feedback: feedback used to cancel request, defaults to None
+        :type feedback: Optional[QgsFeedback], optional
+        :return: request result
+        :rtype: RequestResult
+        """
+        return self.scheduler.send(self, url, feedback)
+
+
+@dataclass
+class _Task:
+    """Request waiting to be sent"""
+
+    job: SchedulerJob
+    url: str
+    feedback: Optional[QgsFeedback]
+    future: Future
+    # Submission order
+    sequence: int
+    # True if request must fail without being sent: circuit breaker open
+    rejected: bool = False
+    # True if request is the probe request of a half-open circuit breaker
+    probe: bool = False
+    # Url sent, for the endpoint chosen
+    send_url: str = ""
+    # Urls already sent, for failover to another endpoint
+    sent_urls: List[str] = field(default_factory=list)
+
+
+class ResponseCache:
+    """Successful responses by canonical request url, least recently used responses
+    are removed when max_bytes is exceeded. Thread safe."""
+
+    def __init__(self, max_bytes: int = 0) -> None:
+        """Response cache
+
+        :param max_bytes: maximum bytes of cached responses, 0 to disable cache.
+            Defaults to 0
+        :type max_bytes: int, optional
+        """
+        self.max_bytes = max(max_bytes, 0)
+        self.used_bytes = 0
+        self._results: "OrderedDict[str, RequestResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __contains__(self, url: str) -> bool:
+        """Check if result of a request is cached, without updating its use
+
+        :param url: request url
+        :type url: str
+        :return: True if result is cached
+        :rtype: bool
+        """
+        if not self.max_bytes:
+            return False
+        key = canonical_request_url(url)
+        with self._lock:
+            return key in self._results
+
+    def get(self, url: str) -> Optional[RequestResult]:
+        """Return cached result of a request
+
+        :param url: request url
+        :type url: str
+        :return: cached result, with url requested, None if not available
+        :rtype: Optional[RequestResult]
+        """
+        if not self.max_bytes:
+            return None
+        key = canonical_request_url(url)
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                return None
+            self._results.move_to_end(key)
+        return replace(result, url=url, latency=0.0, from_cache=True)
+
+    def put(self, result: RequestResult) -> None:
+        """Add result of a request if successful
+
+        :param result: request result
+        :type result: RequestResult
+        """
+        size = len(result.content)
+        if result.is_error or not self.max_bytes or size > self.max_bytes:
+            return
+        key = canonical_request_url(result.url)
+        with self._lock:
+            previous = self._results.pop(key, None)
+            if previous is not None:
+                self.used_bytes -= len(previous.content)
+            self._results[key] = result
+            self.used_bytes += size
+            self._evict()
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        """Define maximum bytes of cached responses
+
+        :param max_bytes: maximum bytes of cached responses, 0 to disable cache
+        :type max_bytes: int
+        """
+        with self._lock:
+            self.max_bytes = max(max_bytes, 0)
+            self._evict()
+
+    def clear(self) -> None:
+        """Remove all cached responses"""
+        with self._lock:
+            self._results.clear()
+            self.used_bytes = 0
+
+    def _evict(self) -> None:
+        """Remove least recently used responses until max bytes is respected. Must be
+        called with lock."""
+        while self._results and self.used_bytes > self.max_bytes:
+            _, result = self._results.popitem(last=False)
+            self.used_bytes -= len(result.content)
+
+
+class RequestScheduler:
+    """Send requests of all jobs of the process (algorithms run from dock widgets,
+    processing toolbox or batch) with a shared pool of max_connections threads, a
+    rate limit and a response cache.
+
+    When a connection is free, the next request is taken from the job with the
+    highest priority, then from the job with the fewest requests in flight (fair
+    share), then to the host with the fewest requests in flight, then in submission
+    order. Interactive requests of dock widgets are sent before requests of batches.
+
+    Rate limit and max_host_connections apply to each host, so that requests of a
+    run to several services are not limited by the slowest one.
+
+    Worker threads are kept between runs, so that connections of their network
+    access manager are reused.
+
+    Each service url has a circuit breaker: when the service is unavailable, its
+    waiting requests are paused until a probe request succeeds, or fail without
+    being sent if fail_fast is enabled. State changes are logged and reported to
+    the feedback of registered jobs.
+
+    Equivalent endpoints of a service can be registered with register_endpoints():
+    requests are sent to the available endpoint with the lowest expected latency and
+    sent again to another endpoint if it is unavailable.
+
+    Requests with an url longer than max_get_url_length are sent with POST and a
+    JSON body to operations registered with register_post_operations(). Results,
+    cache and circuit breakers still use the request url.
+
+    Example:
+
+    .. code-block:: python
+
+        scheduler = get_request_scheduler()
+        job = scheduler.register_job("isochrone", PRIORITY_INTERACTIVE)
+        try:
+            result = job.send(url, feedback)
+        finally:
+            scheduler.unregister_job(job)
+    """
+
+    # Maximum time waiting for a result before checking cancellation
+    POLL_INTERVAL_S = 0.1
+
+    _instance: Optional["RequestScheduler"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        max_connections: int = 16,
+        rate_limit: float = 0.0,
+        cache_bytes: int = 0,
+        failure_threshold: int = 5,
+        probe_interval_s: float = 10.0,
+        fail_fast: bool = False,
+        max_host_connections: int = 0,
+        max_get_url_length: int = MAX_GET_URL_LENGTH,
+    ) -> None:
+        """Request scheduler
+
+        :param max_connections: maximum number of requests sent at the same time,
+            defaults to 16
+        :type max_connections: int, optional
+        :param rate_limit: maximum number of requests sent by second to a host, 0 for
+            no limit. Defaults to 0.0
+        :type rate_limit: float, optional
+        :param cache_bytes: maximum bytes of cached responses, 0 to disable cache.
+            Defaults to 0
+        :type cache_bytes: int, optional
+        :param failure_threshold: number of consecutive failures opening the circuit
+            breaker of a service, 0 to disable circuit breakers. Defaults to 5
+        :type failure_threshold: int, optional
+        :param probe_interval_s: delay between probe requests to an unavailable
+            service (seconds), defaults to 10.0
+        :type probe_interval_s: float, optional
+        :param fail_fast: requests to an unavailable service fail without being sent
+            instead of waiting, defaults to False
+        :type fail_fast: bool, optional
+        :param max_host_connections: maximum number of requests sent at the same time
+            to a host, 0 for max_connections. Defaults to 0
+        :type max_host_connections: int, optional
+        :param max_get_url_length: maximum length of urls sent with GET to operations
+            accepting POST, defaults to MAX_GET_URL_LENGTH
+        :type max_get_url_length: int, optional
+        """
+        self.max_connections = max(max_connections, 1)
+        self.rate_limit = max(rate_limit, 0.0)
+        self.cache = ResponseCache(cache_bytes)
+        self.failure_threshold = max(failure_threshold, 0)
+        self.probe_interval_s = max(probe_interval_s, 0.0)
+        self.fail_fast = fail_fast
+        self.max_host_connections = max(max_host_connections, 0)
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._pools: List[EndpointPool] = []
+        self._host_in_flight: Dict[str, int] = {}
+        self._next_send_times: Dict[str, float] = {}
+        self.max_get_url_length = max_get_url_length
+        self._post_operations: Set[str] = set()
+
+        self._condition = threading.Condition()
+        self._queue: List[_Task] = []
+        self._jobs: List[SchedulerJob] = []
+        self._sequence = 0
+        self._worker_count = 0
+        self._stopped = False
+
+    @classmethod
+    def instance(cls) -> "RequestScheduler":
+        """Return scheduler of the process, created at first call
+
+        :return: process scheduler
+        :rtype: RequestScheduler
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @classmethod
+    def shutdown_instance(cls) -> None:
+        """Stop scheduler of the process, if created"""
+        with cls._instance_lock:
+            if cls._instance is not None:
+                cls._instance.shutdown()
+                cls._instance = None
+
+    @property
+    def jobs(self) -> List[SchedulerJob]:
+        """Registered jobs
+
+        :return: registered jobs
+        :rtype: List[SchedulerJob]
+        """
+        with self._condition:
+            return list(self._jobs)
+
+    def configure(
+        self,
+        max_connections: int,
+        rate_limit: float,
+        cache_bytes: int,
+        failure_threshold: int = 5,
+        probe_interval_s: float = 10.0,
+        fail_fast: bool = False,
+        max_host_connections: int = 0,
+    ) -> None:
+        """Change scheduler limits. Requests in flight are not aborted.
+
+        :param max_connections: maximum number of requests sent at the same time
+        :type max_connections: int
+        :param rate_limit: maximum number of requests sent by second to a host, 0 for
+            no limit
+        :type rate_limit: float
+        :param cache_bytes: maximum bytes of cached responses, 0 to disable cache
+        :type cache_bytes: int
+        :param failure_threshold: number of consecutive failures opening the circuit
+            breaker of a service, 0 to disable circuit breakers. Defaults to 5
+        :type failure_threshold: int, optional
+        :param probe_interval_s: delay between probe requests to an unavailable
+            service (seconds), defaults to 10.0
+        :type probe_interval_s: float, optional
+        :param fail_fast: requests to an unavailable service fail without being sent
+            instead of waiting, defaults to False
+        :type fail_fast: bool, optional
+        :param max_host_connections: maximum number of requests sent at the same time
+            to a host, 0 for max_connections. Defaults to 0
+        :type max_host_connections: int, optional
+        """
+        with self._condition:
+            self.max_connections = max(max_connections, 1)
+            self.rate_limit = max(rate_limit, 0.0)
+            self.failure_threshold = max(failure_threshold, 0)
+            self.probe_interval_s = max(probe_interval_s, 0.0)
+            self.fail_fast = fail_fast
+            self.max_host_connections = max(max_host_connections, 0)
+            for breaker in self._breakers.values():
+                breaker.failure_threshold = self.failure_threshold
+                breaker.probe_interval_s = self.probe_interval_s
+                if not self.failure_threshold:
+                    breaker.reset()
+            # Paused requests can be sent if circuit breakers or host limits changed
+            self._condition.notify_all()
+            self._start_workers()
+        self.cache.set_max_bytes(cache_bytes)
+
+    def register_job(
+        self,
+        name: str,
+        priority: int = PRIORITY_BATCH,
+        feedback: Optional[QgsFeedback] = None,
+    ) -> SchedulerJob:
+        """Register a job
+
+        :param name: job name
+        :type name: str
+        :param priority: job priority, defaults to PRIORITY_BATCH
+        :type priority: int, optional
+        :param feedback: feedback of the run, used to report service state changes.
+            Defaults to None
+        :type feedback: Optional[QgsFeedback], optional
+        :return: registered job
+        :rtype: SchedulerJob
+        """
+        job = SchedulerJob(self, name, priority, feedback)
+        with self._condition:
+            self._jobs.append(job)
+        return job
+
+    def register_endpoints(self, primary: str, endpoints: List[str]) -> None:
+        """Register equivalent endpoints of a service, replacing endpoints previously
+        registered for the same primary endpoint
+
+        :param primary: url of the endpoint used to build requests
+        :type primary: str
+        :param endpoints: urls of the endpoints requests can be sent to, in
+            preference order
+        :type endpoints: List[str]
+        """
+        pool = EndpointPool(primary, endpoints)
+        with self._condition:
+            self._pools = [p for p in self._pools if p.primary != pool.primary]
+            if pool.endpoints and pool.endpoints != [pool.primary]:
+                self._pools.append(pool)
+
+    def register_post_operations(self, operation_urls: List[str]) -> None:
+        """Register operations accepting POST requests with a JSON body
+
+        :param operation_urls: operation urls, without parameters
+        :type operation_urls: List[str]
+        """
+        with self._condition:
+            self._post_operations.update(endpoint_key(url) for url in operation_urls)
+
+    def _use_post(self, url: str) -> bool:
+        """Check if a request must be sent with POST: url too long for GET and
+        operation accepting POST. Must be called with lock.
+
+        :param url: request url
+        :type url: str
+        :return: True to send request with POST
+        :rtype: bool
+        """
+        return (
+            len(url) > self.max_get_url_length
+            and endpoint_key(url) in self._post_operations
+        )
+
+    def unregister_job(self, job: SchedulerJob) -> None:
+        """Unregister a job. Its requests not sent yet are canceled.
+
+        :param job: registered job
+        :type job: SchedulerJob
+        """
+        with self._condition:
+            if job in self._jobs:
+                self._jobs.remove(job)
+            canceled = [task for task in self._queue if task.job is job]
+            self._queue = [task for task in self._queue if task.job is not job]
+        for task in canceled:
+            task.future.cancel()
+
+    def submit(
+        self, job: SchedulerJob, url: str, feedback: Optional[QgsFeedback] = None
+    ) -> "Future[RequestResult]":
+        """Submit a request, sent when a connection is free unless available in cache.
+
+        Canceling the future before the request is sent removes it from the queue.
+        Canceling feedback aborts the request.
+
+        :param job: registered job
+        :type job: SchedulerJob
+        :param url: request url
+        :type url: str
+        :param feedback: feedback dedicated to the request, defaults to None
+        :type feedback: Optional[QgsFeedback], optional
+        :return: future request result
+        :rtype: Future[RequestResult]
+        """
+        future: "Future[RequestResult]" = Future()
+        cached = self.cache.get(url)
+        if cached is not None:
+            future.set_running_or_notify_cancel()
+            future.set_result(cached)
+            return future
+
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("Request scheduler is stopped")
+            self._sequence += 1
+            self._queue.append(_Task(job, url, feedback, future, self._sequence))
+            self._start_workers()
+            self._condition.notify()
+        return future
+
+    def send(
+        self, job: SchedulerJob, url: str, feedback: Optional[QgsFeedback] = None
+    ) -> RequestResult:
+        """Submit a request and wait for its result.
+
+        The request is sent by a worker thread with a feedback dedicated to the
+        request, canceled when feedback is canceled: feedback can be the processing
+        feedback of an algorithm. If feedback is canceled before the request is
+        sent, it is removed from the queue and a canceled result is returned.
+
+        :param job: registered job
+        :type job: SchedulerJob
+        :param url: request url
+        :type url: str
+        :param feedback: feedback used to cancel request, defaults to None
+        :type feedback: Optional[QgsFeedback], optional
+        :return: request result
+        :rtype: RequestResult
+        """
+        request_feedback = QgsFeedback()
+        if feedback:
+            # Direct connection: the calling thread is blocked until the result
+            feedback.canceled.connect(
+                request_feedback.cancel, Qt.ConnectionType.DirectConnection
+            )
+        try:
+            future = self.submit(job, url, request_feedback)
+            while True:
+                if feedback and feedback.isCanceled():
+                    request_feedback.cancel()
+                try:
+                    result = future.result(timeout=self.POLL_INTERVAL_S)
+                    job.report_messages()
+                    return result
+                except FutureTimeoutError:
+                    job.report_messages()
+                    if request_feedback.isCanceled() and future.cancel():
+                        return canceled_result(url)
+        finally:
+            if feedback:
+                feedback.canceled.disconnect(request_feedback.cancel)
+
+    def shutdown(self) -> None:
+        """Stop worker threads when their request is done, requests not sent yet are
+        canceled."""
+        with self._condition:
+            self._stopped = True
+            canceled = self._queue
+            self._queue = []
+            self._condition.notify_all()
+        for task in canceled:
+            task.future.cancel()
+
+    def _start_workers(self) -> None:
+        """Start worker threads up to max connections, when requests are waiting.
+        Must be called with lock."""
+        while self._queue and self._worker_count < self.max_connections:
+            self._worker_count += 1
+            threading.Thread(
+                target=self._work,
+                name=f"gpf_request_{self._worker_count}",
+                daemon=True,
+            ).start()
+
+    def circuit_breaker(self, url: str) -> CircuitBreaker:
+        """Return circuit breaker of the service of a request, created at first call
+
+        :param url: request url or service url
+        :type url: str
+        :return: circuit breaker
+        :rtype: CircuitBreaker
+        """
+        key = service_url(url)
+        with self._condition:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    key, self.failure_threshold, self.probe_interval_s
+                )
+                self._breakers[key] = breaker
+            return breaker
+
+    def _next_task(self) -> Optional[_Task]:
+        """Remove and return next request to send: highest priority, fewest requests
+        in flight for job and for host, then first submitted. Requests to hosts with
+        max_host_connections requests in flight are skipped. Requests to a service
+        with an open circuit breaker are skipped, or rejected if fail_fast is enabled.
+        Must be called with lock.
+
+        :return: next request, None if no request can be sent now
+        :rtype: Optional[_Task]
+        """
+        for task in sorted(
+            self._queue,
+            key=lambda t: (
+                -t.job.priority,
+                t.job.in_flight,
+                self._host_in_flight.get(host_key(t.url), 0),
+                t.sequence,
+            ),
+        ):
+            if not self._select_url(task):
+                # Rejected only if no endpoint is available, not if hosts are busy
+                if not self.fail_fast or any(
+                    self.circuit_breaker(url).state == STATE_CLOSED
+                    for url in self._task_urls(task)
+                ):
+                    continue
+                task.rejected = True
+            self._queue.remove(task)
+            return task
+        return None
+
+    def _host_available(self, url: str) -> bool:
+        """Check if a request can be sent to the host of an url without exceeding
+        max_host_connections. Must be called with lock.
+
+        :param url: request url
+        :type url: str
+        :return: True if request can be sent
+        :rtype: bool
+        """
+        return (
+            not self.max_host_connections
+            or self._host_in_flight.get(host_key(url), 0) < self.max_host_connections
+        )
+
+    def _add_host_in_flight(self, url: str, count: int) -> None:
+        """Update number of requests in flight of the host of an url. Must be called
+        with lock.
+
+        :param url: request url
+        :type url: str
+        :param count: number of requests added, negative for requests done
+        :type count: int
+        """
+        host = host_key(url)
+        in_flight = self._host_in_flight.get(host, 0) + count
+        if in_flight > 0:
+            self._host_in_flight[host] = in_flight
+        else:
+            self._host_in_flight.pop(host, None)
+
+    def _endpoint_pool(self, url: str) -> Optional[EndpointPool]:
+        """Return equivalent endpoints of a request. Must be called with lock.
+
+        :param url: request url
+        :type url: str
+        :return: endpoint pool, None if no endpoint registered for request
+        :rtype: Optional[EndpointPool]
+        """
+        for pool in self._pools:
+            if pool.relative_url(url) is not None:
+                return pool
+        return None
+
+    def _task_urls(self, task: _Task) -> List[str]:
+        """Return urls of a request for endpoints not tried yet. Must be called with
+        lock.
+
+        :param task: request
+        :type task: _Task
+        :return: request urls
+        :rtype: List[str]
+        """
+        pool = self._endpoint_pool(task.url)
+        urls = pool.endpoint_urls(task.url) if pool else [task.url]
+        return [url for url in urls if url not in task.sent_urls]
+
+    def _select_url(self, task: _Task) -> bool:
+        """Choose url sent for a request, among endpoints not tried yet: a probe
+        request to an unavailable endpoint if its probe delay is over, otherwise the
+        available endpoint with the lowest expected latency. Endpoints whose host has
+        max_host_connections requests in flight are not chosen. Must be called with
+        lock.
+
+        :param task: request
+        :type task: _Task
+        :return: True if task.send_url is defined, False if no endpoint is available
+        :rtype: bool
+        """
+        pool = self._endpoint_pool(task.url)
+        urls = [url for url in self._task_urls(task) if self._host_available(url)]
+
+        # Probe first, a failed probe request is sent again to another endpoint
+        now = time.monotonic()
+        for url in urls:
+            breaker = self.circuit_breaker(url)
+            if breaker.state == STATE_OPEN and breaker.allow_request(now):
+                task.send_url = url
+                task.probe = True
+                self._report_breaker(breaker)
+                return True
+
+        closed = [
+            url for url in urls if self.circuit_breaker(url).state == STATE_CLOSED
+        ]
+        if not closed:
+            return False
+        task.send_url = min(closed, key=pool.expected_latency) if pool else closed[0]
+        return True
+
+    def _wait_timeout(self) -> Optional[float]:
+        """Return time waiting for a request to send: until next probe request if
+        waiting requests are paused by a circuit breaker. Only circuit breakers of
+        waiting requests are used, at least POLL_INTERVAL_S is waited. Must be called
+        with lock.
+
+        :return: waiting time (seconds), None to wait for a new request or a request
+            done
+        :rtype: Optional[float]
+        """
+        delays = [
+            self.circuit_breaker(url).probe_delay()
+            for task in self._queue
+            for url in self._task_urls(task)
+        ]
+        delays = [delay for delay in delays if delay is not None]
+        if not delays:
+            # No waiting request or probe request in flight: woken up by a new
+            # request or a request done
+            return None
+        return max(min(delays), self.POLL_INTERVAL_S)
+
+    def _report_breaker(self, breaker: CircuitBreaker) -> None:
+        """Log circuit breaker state and add message to registered jobs. Must be
+        called with lock.
+
+        :param breaker: circuit breaker
+        :type breaker: CircuitBreaker
+        """
+        level = Qgis.MessageLevel.Info
+        if breaker.state == STATE_OPEN:
+            level = Qgis.MessageLevel.Warning
+            if self.fail_fast:
+                message = QCoreApplication.translate(
+                    "RequestScheduler",
+                    "Service {} indisponible ({} échecs consécutifs) : les requêtes "
+                    "échouent sans être envoyées. Nouvel essai dans {:.0f} s.",
+                )
+            else:
+                message = QCoreApplication.translate(
+                    "RequestScheduler",
+                    "Service {} indisponible ({} échecs consécutifs) : les requêtes "
+                    "sont suspendues. Nouvel essai dans {:.0f} s.",
+                )
+            message = message.format(
+                breaker.service_url, breaker.failure_count, breaker.probe_interval_s
+            )
+        elif breaker.state == STATE_HALF_OPEN:
+            message = QCoreApplication.translate(
+                "RequestScheduler", "Service {} : envoi d'une requête de test."
+            ).format(breaker.service_url)
+        else:
+            message = QCoreApplication.translate(
+                "RequestScheduler", "Service {} de nouveau disponible."
+            ).format(breaker.service_url)
+
+        PlgLogger.log(message, log_level=level, push=False)
+        for job in self._jobs:
+            job.messages.append((level, message))
+
+    def _wait_rate_limit(self, task: _Task) -> None:
+        """Wait until a request can be sent without exceeding rate limit of its host
+
+        :param task: request, waiting stops when its feedback is canceled
+        :type task: _Task
+        """
+        with self._condition:
+            if self.rate_limit <= 0:
+                return
+            host = host_key(task.send_url)
+            now = time.monotonic()
+            send_time = max(now, self._next_send_times.get(host, 0.0))
+            self._next_send_times[host] = send_time + 1.0 / self.rate_limit
+        while time.monotonic() < send_time:
+            if task.feedback and task.feedback.isCanceled():
+                return
+            time.sleep(min(self.POLL_INTERVAL_S, send_time - time.monotonic()))
+
+    def _work(self) -> None:
+        """Send requests of queue, until scheduler is stopped or max connections is
+        decreased"""
+        while True:
+            with self._condition:
+                task = None
+                while task is None:
+                    if self._stopped or self._worker_count > self.max_connections:
+                        self._worker_count -= 1
+                        return
+                    task = self._next_task()
+                    if task is None:
+                        self._condition.wait(self._wait_timeout())
+                if not task.future.set_running_or_notify_cancel():
+                    self._release_probe(task)
+                    continue
+                if task.rejected:
+                    task.future.set_result(circuit_open_result(task.url))
+                    continue
+                task.job.in_flight += 1
+                task.job.sent_count += 1
+                self._add_host_in_flight(task.send_url, 1)
+
+            try:
+                self._wait_rate_limit(task)
+                task.future.set_result(self._send(task))
+            except Exception as exc:
+                with self._condition:
+                    self._release_probe(task)
+                task.future.set_exception(exc)
+            finally:
+                with self._condition:
+                    task.job.in_flight -= 1
+                    self._add_host_in_flight(task.send_url, -1)
+                    # Requests skipped for a busy host can be sent
+                    self._condition.notify()
+
+    def _send(self, task: _Task) -> RequestResult:
+        """Send a request to the endpoint chosen, then to other available endpoints
+        while the endpoint is unavailable
+
+        :param task: request
+        :type task: _Task
+        :return: request result
+        :rtype: RequestResult
+        """
+        while True:
+            if task.feedback and task.feedback.isCanceled():
+                with self._condition:
+                    self._release_probe(task)
+                return canceled_result(task.url)
+
+            with self._condition:
+                pool = self._endpoint_pool(task.url)
+                if pool:
+                    pool.add_in_flight(task.send_url, 1)
+                post = self._use_post(task.send_url)
+            task.sent_urls.append(task.send_url)
+            if post:
+                request = ServiceRequest.from_url(task.send_url)
+                result = replace(
+                    send_request(
+                        request.operation_url, task.feedback, request.json_body()
+                    ),
+                    url=task.send_url,
+                )
+            else:
+                result = send_request(task.send_url, task.feedback)
+
+            with self._condition:
+                if pool:
+                    pool.add_in_flight(task.send_url, -1)
+                    if not result.is_error:
+                        pool.add_latency(task.send_url, result.latency)
+                if task.feedback and task.feedback.isCanceled():
+                    self._release_probe(task)
+                    return result
+                self._add_breaker_result(task, result)
+                previous_url = task.send_url
+                failover = (
+                    pool is not None
+                    and CircuitBreaker.is_failure_result(result)
+                    and self._select_url(task)
+                )
+                if failover:
+                    self._add_host_in_flight(previous_url, -1)
+                    self._add_host_in_flight(task.send_url, 1)
+            if not failover:
+                self.cache.put(replace(result, url=task.url))
+                return result
+
+    def _release_probe(self, task: _Task) -> None:
+        """Open again the circuit breaker of a probe request canceled, so that next
+        waiting request is the probe. Must be called with lock.
+
+        :param task: request not sent or canceled
+        :type task: _Task
+        """
+        if not task.probe:
+            return
+        task.probe = False
+        breaker = self.circuit_breaker(task.send_url)
+        if breaker.state == STATE_HALF_OPEN:
+            breaker.state = STATE_OPEN
+            self._condition.notify_all()
+
+    def _add_breaker_result(self, task: _Task, result: RequestResult) -> None:
+        """Update circuit breaker of the endpoint of a request sent. Must be called
+        with lock.
+
+        :param task: request sent
+        :type task: _Task
+        :param result: request result
+        :type result: RequestResult
+        """
+        task.probe = False
+        breaker = self.circuit_breaker(task.send_url)
+        if breaker.add_result(result):
+            self._report_breaker(breaker)
+            # Paused requests can be sent, or wait for next probe
+            self._condition.notify_all()
+
+
+# ############################################################################
+# ########## Functions ###########
+# ################################
+
+
+def canceled_result(url: str) -> RequestResult:
+    """Create result of a request canceled before being sent
+
+    :param url: request url
+    :type url: str
+    :return: canceled request result
+    :rtype: RequestResult
+    """
+    return RequestResult(
+        url=url,
+        error_code=QgsBlockingNetworkRequest.ErrorCode.NetworkError,
+        error_message="Request canceled",
+        content=b"",
+        content_type=b"",
+        latency=0.0,
+    )
+
+
+def circuit_open_result(url: str) -> RequestResult:
+    """Create result of a request rejected because the circuit breaker of its service
+    is open
+
+    :param url: request url
+    :type url: str
+    :return: rejected request result
+    :rtype: RequestResult
+    """
+    return RequestResult(
+        url=url,
+        error_code=QgsBlockingNetworkRequest.ErrorCode.NetworkError,
+        error_message="Service unavailable, request not sent (circuit breaker open)",
+        content=b"",
+        content_type=b"",
+        latency=0.0,
+    )
+
+
+def get_request_scheduler() -> RequestScheduler:
+    """Return scheduler of the process, configured from plugin settings
+
+    :return: process scheduler
+    :rtype: RequestScheduler
+    """
+    settings = PlgOptionsManager().get_plg_settings()
+    scheduler = RequestScheduler.instance()
+    scheduler.configure(
+        max_connections=settings.max_connections,
+        rate_limit=settings.rate_limit,
+        cache_bytes=settings.response_cache_mb * 1024 * 1024,
+        failure_threshold=settings.circuit_breaker_threshold,
+        probe_interval_s=settings.circuit_breaker_probe_interval,
+        fail_fast=settings.circuit_breaker_fail_fast,
+        max_host_connections=settings.max_host_connections,
+    )
+    return scheduler
@@ -0,0 +1,372 @@
+#! python3  # noqa: E265
+
+"""Statistics for requests sent by processing algorithms."""
+
+# ############################################################################
+# ########## IMPORTS #############
+# ################################
+
+# standard library
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+# PyQGIS
+from qgis.core import QgsBlockingNetworkRequest, QgsFeedback
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.PyQt.QtNetwork import QNetworkRequest
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.file_stats import convert_octets
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    RequestResult,
+)
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class LatencyHistogram:
+    """Histogram of request latencies with log-scaled buckets.
+
+    Memory does not depend on the number of requests: latencies are counted in at
+    most BUCKET_COUNT buckets, each BUCKET_RATIO times wider than the previous one,
+    so percentiles are estimated within 1% of the actual latency. Histograms of
+    several runs are merged by adding their bucket counts.
+
+    Not thread safe: used under the lock of RequestStatistics.
+    """
+
+    # Upper bound of first bucket (seconds)
+    MIN_LATENCY_S = 0.001
+    # Ratio between bounds of a bucket
+    BUCKET_RATIO = 1.02
+    # Number of buckets: last bucket starts at about 17 minutes
+    BUCKET_COUNT = 700
+
+    def __init__(self) -> None:
+        # Number of latencies by bucket index, only for non empty buckets
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+
+    def add(self, latency: float, count: int = 1) -> None:
+        """Add a latency
+
+        :param latency: request latency (seconds)
+        :type latency: float
+        :param count: number of requests with this latency, defaults to 1
+        :type count: int, optional
+        """
+        index = self._bucket_index(latency)
+        self._counts[index] = self._counts.get(index, 0) + count
+        self.count += count
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add latencies of another histogram
+
+        :param other: histogram to merge
+        :type other: LatencyHistogram
+        """
+        for index, count in other._counts.items():
+            self._counts[index] = self._counts.get(index, 0) + count
+        self.count += other.count
+
+    def percentile(self, percent: float) -> float:
+        """Return estimated percentile of latencies with nearest-rank method
+
+        :param percent: percentile (0-100)
+        :type percent: float
+        :return: percentile latency (seconds), 0.0 if no latency
+        :rtype: float
+        """
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(percent / 100.0 * self.count), 1)
+        cumulated = 0
+        for index in sorted(self._counts):
+            cumulated += self._counts[index]
+            if cumulated >= rank:
+                return self._bucket_value(index)
+        return self._bucket_value(max(self._counts))
+
+    def to_list(self) -> List[List[int]]:
+        """Return non empty buckets, used to merge histograms from algorithm results
+
+        :return: bucket index and count of non empty buckets
+        :rtype: List[List[int]]
+        """
+        return [[index, count] for index, count in sorted(self._counts.items())]
+
+    @classmethod
+    def from_list(cls, buckets: Sequence[Sequence[int]]) -> "LatencyHistogram":
+        """Create a histogram from non empty buckets returned by to_list()
+
+        :param buckets: bucket index and count of non empty buckets
+        :type buckets: Sequence[Sequence[int]]
+        :return: histogram
+        :rtype: LatencyHistogram
+        """
+        histogram = cls()
+        for index, count in buckets:
+            index = min(max(int(index), 0), cls.BUCKET_COUNT - 1)
+            histogram._counts[index] = histogram._counts.get(index, 0) + int(count)
+            histogram.count += int(count)
+        return histogram
+
+    def _bucket_index(self, latency: float) -> int:
+        """Return index of bucket containing a latency
+
+        :param latency: latency (seconds)
+        :type latency: float
+        :return: bucket index
+        :rtype: int
+        """
+        if latency <= self.MIN_LATENCY_S:
+            return 0
+        index = math.ceil(
+            math.log(latency / self.MIN_LATENCY_S) / math.log(self.BUCKET_RATIO)
+        )
+        return min(index, self.BUCKET_COUNT - 1)
+
+    def _bucket_value(self, index: int) -> float:
+        """Return latency used for a bucket: geometric middle of its bounds
+
+        :param index: bucket index
+        :type index: int
+        :return: latency (seconds)
+        :rtype: float
+        """
+        if index == 0:
+            return self.MIN_LATENCY_S / 2.0
+        return self.MIN_LATENCY_S * self.BUCKET_RATIO ** (index - 0.5)
+
+
+class RequestStatistics:
+    """Aggregate statistics for requests sent during a processing run.
+
+    Statistics can be updated from several threads. A summary is pushed to processing
+    feedback every REPORT_INTERVAL_S seconds and can be exported with as_dict() for
+    algorithm results.
+    """
+
+    # Interval between two statistics reports in processing feedback
+    REPORT_INTERVAL_S = 5.0
+
+    # Keys used in algorithm results
+    REQUEST_COUNT = "REQUEST_COUNT"
+    ERROR_COUNT = "ERROR_COUNT"
+    RETRY_COUNT = "RETRY_COUNT"
+    REQUESTS_PER_SECOND = "REQUESTS_PER_SECOND"
+    CACHE_HIT_RATIO = "CACHE_HIT_RATIO"
+    LATENCY_P50 = "LATENCY_P50"
+    LATENCY_P95 = "LATENCY_P95"
+    BYTES_RECEIVED = "BYTES_RECEIVED"
+    # Not declared as output: used to merge latencies of algorithm runs
+    LATENCY_HISTOGRAM = "LATENCY_HISTOGRAM"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._start_time = time.monotonic()
+        self._last_report_time = self._start_time
+        self._latencies = LatencyHistogram()
+        self._request_count = 0
+        self._error_count = 0
+        self._retry_count = 0
+        self._cache_hit_count = 0
+        self._bytes_received = 0
+
+    def tr(self, message: str) -> str:
+        """Get the translation for a string using Qt translation API.
+
+        :param message: string to be translated.
+        :type message: str
+
+        :returns: Translated version of message.
+        :rtype: str
+        """
+        return QCoreApplication.translate(self.__class__.__name__, message)
+
+    def add_request(
+        self,
+        latency: float,
+        bytes_received: int = 0,
+        cache_hit: bool = False,
+        error: bool = False,
+    ) -> None:
+        """Add a request to statistics
+
+        :param latency: request latency (seconds)
+        :type latency: float
+        :param bytes_received: number of bytes received, defaults to 0
+        :type bytes_received: int, optional
+        :param cache_hit: True if response was read from cache, defaults to False
+        :type cache_hit: bool, optional
+        :param error: True if request failed, defaults to False
+        :type error: bool, optional
+        """
+        with self._lock:
+            self._request_count += 1
+            self._latencies.add(latency)
+            self._bytes_received += bytes_received
+            if cache_hit:
+                self._cache_hit_count += 1
+            if error:
+                self._error_count += 1
+
+    def add_blocking_request(
+        self,
+        blocking_req: QgsBlockingNetworkRequest,
+        error_code: QgsBlockingNetworkRequest.ErrorCode,
+        latency: float,
+    ) -> None:
+        """Add a request sent with a QgsBlockingNetworkRequest to statistics
+
+        :param blocking_req: blocking request used
+        :type blocking_req: QgsBlockingNetworkRequest
+        :param error_code: request error code
+        :type error_code: QgsBlockingNetworkRequest.ErrorCode
+        :param latency: request latency (seconds)
+        :type latency: float
+        """
+        reply = blocking_req.reply()
+        cache_hit = bool(
+            reply.attribute(QNetworkRequest.Attribute.SourceIsFromCacheAttribute)
+        )
+        self.add_request(
+            latency=latency,
+            bytes_received=len(reply.content()),
+            cache_hit=cache_hit,
+            error=error_code != QgsBlockingNetworkRequest.ErrorCode.NoError,
+        )
+
+    def add_request_result(self, result: RequestResult) -> None:
+        """Add a request result to statistics
+
+        :param result: request result
+        :type result: RequestResult
+        """
+        self.add_request(
+            latency=result.latency,
+            bytes_received=len(result.content),
+            cache_hit=result.from_cache,
+            error=result.is_error,
+        )
+
+    def add_retry(self) -> None:
+        """Add a request retry to statistics"""
+        with self._lock:
+            self._retry_count += 1
+
+    def add_retried_result(self, result: RequestResult) -> None:
+        """Add result of a request failed with a transient error and sent again
+
+        :param result: request result
+        :type result: RequestResult
+        """
+        self.add_request_result(result)
+        self.add_retry()
+
+    def add_results(self, results: Dict[str, Any]) -> None:
+        """Add statistics from results of an algorithm run. Latencies are merged
+        from the latency histogram of results.
+
+        :param results: algorithm results
+        :type results: Dict[str, Any]
+        """
+        request_count = results.get(self.REQUEST_COUNT, 0)
+        if not request_count:
+            return
+        latencies = LatencyHistogram.from_list(
+            results.get(self.LATENCY_HISTOGRAM) or []
+        )
+        with self._lock:
+            self._request_count += request_count
+            self._latencies.merge(latencies)
+            self._error_count += results.get(self.ERROR_COUNT, 0)
+            self._retry_count += results.get(self.RETRY_COUNT, 0)
+            self._cache_hit_count += round(
+                results.get(self.CACHE_HIT_RATIO, 0.0) * request_count
+            )
+            self._bytes_received += results.get(self.BYTES_RECEIVED, 0)
+
+    def report(self, feedback: Optional[QgsFeedback], force: bool = False) -> None:
+        """Push statistics summary in feedback if report interval is elapsed
+
+        :param feedback: processing feedback
+        :type feedback: Optional[QgsFeedback]
+        :param force: push summary even if report interval is not elapsed,
+            defaults to False
+        :type force: bool, optional
+        """
+        if not feedback:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_report_time < self.REPORT_INTERVAL_S:
+                return
+            self._last_report_time = now
+
+        summary = self.summary(feedback.progress())
+        if summary:
+            feedback.pushInfo(summary)
+
+    def summary(self, progress: float = 0.0) -> str:
+        """Return a summary string of statistics
+
+        :param progress: current progress (0-100) used for ETA, defaults to 0.0
+        :type progress: float, optional
+        :return: statistics summary, empty string if no request was sent
+        :rtype: str
+        """
+        stats = self.as_dict()
+        if not stats[self.REQUEST_COUNT]:
+            return ""
+
+        summary = self.tr(
+            "{} requêtes ({:.1f} requêtes/s), cache : {:.0%}, relances : {}, "
+            "erreurs : {}, latence p50/p95 : {:.0f}/{:.0f} ms, reçu : {}"
+        ).format(
+            stats[self.REQUEST_COUNT],
+            stats[self.REQUESTS_PER_SECOND],
+            stats[self.CACHE_HIT_RATIO],
+            stats[self.RETRY_COUNT],
+            stats[self.ERROR_COUNT],
+            stats[self.LATENCY_P50],
+            stats[self.LATENCY_P95],
+            convert_octets(stats[self.BYTES_RECEIVED]),
+        )
+
+        if 0 < progress < 100:
+            elapsed = time.monotonic() - self._start_time
+            eta = round(elapsed * (100.0 - progress) / progress)
+            summary += self.tr(", temps restant estimé : {}").format(
+                time.strftime("%H:%M:%S", time.gmtime(eta))
+            )
+        return summary
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return statistics as a dict, using algorithm results keys
+
+        :return: statistics
+        :rtype: Dict[str, Any]
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self._start_time
+            request_count = self._request_count
+            return {
+                self.REQUEST_COUNT: request_count,
+                self.ERROR_COUNT: self._error_count,
+                self.RETRY_COUNT: self._retry_count,
+                self.REQUESTS_PER_SECOND: (
+                    request_count / elapsed if elapsed > 0 else 0.0
+                ),
+                self.CACHE_HIT_RATIO: (
+                    self._cache_hit_count / request_count if request_count else 0.0
+                ),
+                self.LATENCY_P50: self._latencies.percentile(50) * 1000.0,
+                self.LATENCY_P95: self._latencies.percentile(95) * 1000.0,
+                self.BYTES_RECEIVED: self._bytes_received,
+                self.LATENCY_HISTOGRAM: self._latencies.to_list(),
+            }
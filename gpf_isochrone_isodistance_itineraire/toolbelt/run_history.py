@@ -0,0 +1,145 @@
+#! python3  # noqa: E265
+
+"""History of request statistics of previous processing runs."""
+
+# ############################################################################
+# ########## IMPORTS #############
+# ################################
+
+# standard library
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.application_folder import get_app_dir
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_statistics import (
+    RequestStatistics,
+)
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class RunHistory:
+    """Request statistics of previous runs, by algorithm and service url, stored in a
+    json file of the application folder.
+
+    Only the last MAX_RUNS runs are kept for each algorithm and service url. Latency of
+    previous runs is used to estimate duration of a new run.
+    """
+
+    MAX_RUNS = 20
+    FILE_NAME = "run_history.json"
+
+    _lock = threading.Lock()
+
+    def __init__(
+        self, app_prefix: str = ".geoplateforme/isoservices", dir_name: str = "stats"
+    ) -> None:
+        """Run history stored in application folder
+
+        :param app_prefix: application prefix, defaults to ".geoplateforme/isoservices"
+        :type app_prefix: str, optional
+        :param dir_name: directory name, defaults to "stats"
+        :type dir_name: str, optional
+        """
+        self.path: Path = get_app_dir(
+            dir_name=dir_name, app_prefix=app_prefix
+        ).joinpath(self.FILE_NAME)
+
+    @staticmethod
+    def _key(algorithm: str, url_service: str) -> str:
+        """Define history key of an algorithm run
+
+        :param algorithm: algorithm name
+        :type algorithm: str
+        :param url_service: service url
+        :type url_service: str
+        :return: history key
+        :rtype: str
+        """
+        return f"{algorithm} {url_service.rstrip('/')}"
+
+    def _load(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Load history file content
+
+        :return: runs by key, empty if file does not exist or is invalid
+        :rtype: Dict[str, List[Dict[str, Any]]]
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return content if isinstance(content, dict) else {}
+
+    def get_runs(self, algorithm: str, url_service: str) -> List[Dict[str, Any]]:
+        """Return previous runs of an algorithm for a service url
+
+        :param algorithm: algorithm name
+        :type algorithm: str
+        :param url_service: service url
+        :type url_service: str
+        :return: previous runs, oldest first
+        :rtype: List[Dict[str, Any]]
+        """
+        with self._lock:
+            return self._load().get(self._key(algorithm, url_service), [])
+
+    def add_run(
+        self, algorithm: str, url_service: str, statistics: Dict[str, Any]
+    ) -> None:
+        """Add request statistics of a run. Runs without request are not added.
+
+        :param algorithm: algorithm name
+        :type algorithm: str
+        :param url_service: service url
+        :type url_service: str
+        :param statistics: request statistics, from RequestStatistics.as_dict()
+        :type statistics: Dict[str, Any]
+        """
+        request_count = statistics.get(RequestStatistics.REQUEST_COUNT, 0)
+        if not request_count:
+            return
+        run = {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "request_count": request_count,
+            "error_count": statistics.get(RequestStatistics.ERROR_COUNT, 0),
+            "latency_p50": statistics.get(RequestStatistics.LATENCY_P50, 0.0),
+            "requests_per_second": statistics.get(
+                RequestStatistics.REQUESTS_PER_SECOND, 0.0
+            ),
+        }
+        key = self._key(algorithm, url_service)
+        with self._lock:
+            content = self._load()
+            content[key] = (content.get(key, []) + [run])[-self.MAX_RUNS :]
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(content, f, indent=1)
+            tmp_path.replace(self.path)
+
+    def estimate_latency(self, algorithm: str, url_service: str) -> Optional[float]:
+        """Estimate request latency from previous runs: median latencies of runs,
+        weighted by their number of requests.
+
+        :param algorithm: algorithm name
+        :type algorithm: str
+        :param url_service: service url
+        :type url_service: str
+        :return: estimated latency (seconds), None if there is no previous run
+        :rtype: Optional[float]
+        """
+        runs = self.get_runs(algorithm, url_service)
+        request_count = sum(run.get("request_count", 0) for run in runs)
+        if not request_count:
+            return None
+        total = sum(
+            run.get("latency_p50", 0.0) * run.get("request_count", 0) for run in runs
+        )
+        return total / request_count / 1000.0
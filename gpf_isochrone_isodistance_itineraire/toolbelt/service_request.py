@@ -0,0 +1,201 @@
+#! python3  # noqa: E265
+
+"""Requests to an operation of a navigation service, built from parameters."""
+
+# ############################################################################
+# ########## IMPORTS #############
+# ################################
+
+# standard library
+import json
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    canonical_request_url,
+)
+
+# ############################################################################
+# ########## Globals #############
+# ################################
+
+# Characters not encoded in parameter values: separators of coordinates,
+# intermediates and CRS, kept readable in request urls
+SAFE_CHARACTERS = ",|:"
+
+# Separator of list values in request urls
+LIST_SEPARATOR = "|"
+
+# Parameters with list values, sent as JSON arrays in POST requests
+LIST_PARAMS = ("intermediates", "constraints", "waysAttributes")
+
+# Parameters with JSON values (objects, booleans, numbers), sent decoded in POST
+# requests
+JSON_VALUE_PARAMS = ("constraints", "getSteps", "getBbox", "costValue")
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class ServiceRequest:
+    """Request to an operation of a navigation service.
+
+    Parameters are kept as key/value pairs in insertion order and encoded when the
+    url is built. Additional parameters defined by user (`&key=value&...`) are
+    parsed and replace parameters with the same key.
+
+    The same request can be sent as a POST request with a JSON body, for requests
+    too long for an url: see json_body().
+
+    Example:
+
+    .. code-block:: python
+
+        request = ServiceRequest("https://data.geopf.fr/navigation", "isochrone")
+        request.add_param("point", f"{x},{y}")
+        request.add_params_string("&constraints={...}")
+        result = send_request(request.url)
+    """
+
+    def __init__(self, url_service: str, operation: str) -> None:
+        """Service request
+
+        :param url_service: service url
+        :type url_service: str
+        :param operation: operation, for example "isochrone" or "itineraire"
+        :type operation: str
+        """
+        self.url_service = url_service.strip().rstrip("/")
+        self.operation = operation
+        self.params: List[Tuple[str, str]] = []
+
+    @classmethod
+    def from_url(cls, url: str) -> "ServiceRequest":
+        """Create a request from its url
+
+        :param url: request url
+        :type url: str
+        :return: request
+        :rtype: ServiceRequest
+        """
+        parts = urlsplit(url.strip())
+        url_service, _, operation = parts.path.rstrip("/").rpartition("/")
+        request = cls(
+            urlunsplit((parts.scheme, parts.netloc, url_service, "", "")), operation
+        )
+        request.add_params_string(parts.query)
+        return request
+
+    def add_param(self, key: str, value: Any) -> None:
+        """Add a parameter, replacing parameter with the same key
+
+        :param key: parameter key
+        :type key: str
+        :param value: parameter value, converted to string
+        :type value: Any
+        """
+        value = str(value)
+        for i, (param_key, _) in enumerate(self.params):
+            if param_key == key:
+                self.params[i] = (key, value)
+                return
+        self.params.append((key, value))
+
+    def add_params_string(self, params: str) -> None:
+        """Add parameters from a query string (`&key=value&...`), decoded if
+        encoded. Parameters replace parameters with the same key.
+
+        :param params: query string, with or without leading & or ?
+        :type params: str
+        """
+        for key, value in parse_qsl(
+            params.strip().lstrip("?&"), keep_blank_values=True
+        ):
+            self.add_param(key, value)
+
+    def remove_param(self, key: str) -> None:
+        """Remove a parameter, if defined
+
+        :param key: parameter key
+        :type key: str
+        """
+        self.params = [
+            (param_key, value) for param_key, value in self.params if param_key != key
+        ]
+
+    def get_param(self, key: str) -> str:
+        """Return value of a parameter
+
+        :param key: parameter key
+        :type key: str
+        :return: parameter value, empty string if not defined
+        :rtype: str
+        """
+        return dict(self.params).get(key, "")
+
+    @property
+    def url(self) -> str:
+        """Request url, with encoded parameter values
+
+        :return: request url
+        :rtype: str
+        """
+        query = urlencode(self.params, safe=SAFE_CHARACTERS, quote_via=quote)
+        return f"{self.url_service}/{self.operation}?{query}"
+
+    @property
+    def operation_url(self) -> str:
+        """Url of the operation, without parameters: url of POST requests
+
+        :return: operation url
+        :rtype: str
+        """
+        return f"{self.url_service}/{self.operation}"
+
+    def json_body(self) -> bytes:
+        """Return parameters as a JSON body for a POST request. List parameters are
+        sent as arrays and JSON values (constraints, booleans, numbers) are decoded.
+
+        :return: JSON body
+        :rtype: bytes
+        """
+        body: Dict[str, Any] = {}
+        for key, value in self.params:
+            values: List[Any] = (
+                value.split(LIST_SEPARATOR) if key in LIST_PARAMS else [value]
+            )
+            if key in JSON_VALUE_PARAMS:
+                values = [_decode_json_value(item) for item in values]
+            body[key] = values if key in LIST_PARAMS else values[0]
+        return json.dumps(body).encode("utf-8")
+
+    @property
+    def key(self) -> str:
+        """Canonical request url, independent of parameter order and encoding: used
+        to identify identical requests
+
+        :return: request key
+        :rtype: str
+        """
+        return canonical_request_url(self.url)
+
+
+# ############################################################################
+# ########## Functions ###########
+# ################################
+
+
+def _decode_json_value(value: str) -> Any:
+    """Decode a JSON value of a parameter
+
+    :param value: parameter value
+    :type value: str
+    :return: decoded value, value if not valid JSON
+    :rtype: Any
+    """
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
@@ -0,0 +1,286 @@
+#! python3  # noqa: E265
+
+"""Request statistics by service, resource, profile and operation, kept between
+processing runs."""
+
+# ############################################################################
+# ########## IMPORTS #############
+# ################################
+
+# standard library
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.application_folder import get_app_dir
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    RequestResult,
+)
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+@dataclass
+class ServiceStatistics:
+    """Statistics of requests sent for a service, resource, profile and operation"""
+
+    url_service: str
+    id_resource: str
+    profile: str
+    operation: str
+    request_count: int = 0
+    error_count: int = 0
+    # Mean latency of successful requests (seconds)
+    mean_latency: float = 0.0
+    # Latency of recent runs, exponentially weighted (seconds)
+    recent_latency: float = 0.0
+    # Mean size of successful responses (bytes)
+    mean_bytes: float = 0.0
+    # Date of last update, ISO 8601
+    last_update: str = ""
+
+    @property
+    def expected_latency(self) -> Optional[float]:
+        """Expected latency of a new request: latency of recent runs
+
+        :return: expected latency (seconds), None if no request succeeded
+        :rtype: Optional[float]
+        """
+        return self.recent_latency or None
+
+    @property
+    def error_rate(self) -> float:
+        """Part of requests in error (between 0 and 1)
+
+        :return: error rate
+        :rtype: float
+        """
+        return self.error_count / self.request_count if self.request_count else 0.0
+
+
+class ServiceStatisticsStore:
+    """Request latency, response size and error rate by service, resource, profile
+    and operation, stored in a json file of the application folder.
+
+    Results of a run are accumulated in memory with add_result() and merged in the
+    file with save() at the end of the run.
+    """
+
+    FILE_NAME = "service_statistics.json"
+    # Weight of last run in recent latency
+    RECENT_WEIGHT = 0.3
+
+    _lock = threading.Lock()
+
+    def __init__(
+        self, app_prefix: str = ".geoplateforme/isoservices", dir_name: str = "stats"
+    ) -> None:
+        """Statistics store in application folder
+
+        :param app_prefix: application prefix, defaults to ".geoplateforme/isoservices"
+        :type app_prefix: str, optional
+        :param dir_name: directory name, defaults to "stats"
+        :type dir_name: str, optional
+        """
+        self.path: Path = get_app_dir(
+            dir_name=dir_name, app_prefix=app_prefix
+        ).joinpath(self.FILE_NAME)
+        self._content: Optional[Dict[str, Dict[str, Any]]] = None
+        self._pending: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _key(url_service: str, id_resource: str, profile: str, operation: str) -> str:
+        """Define store key
+
+        :param url_service: service url
+        :type url_service: str
+        :param id_resource: id resource
+        :type id_resource: str
+        :param profile: profile
+        :type profile: str
+        :param operation: operation
+        :type operation: str
+        :return: store key
+        :rtype: str
+        """
+        return " ".join([url_service.rstrip("/"), id_resource, profile, operation])
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Load store file content
+
+        :return: statistics by key, empty if file does not exist or is invalid
+        :rtype: Dict[str, Dict[str, Any]]
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return content if isinstance(content, dict) else {}
+
+    def add_result(
+        self,
+        url_service: str,
+        id_resource: str,
+        profile: str,
+        operation: str,
+        result: RequestResult,
+    ) -> None:
+        """Add a request result. Statistics are written in file by save().
+        Responses read from cache are ignored.
+
+        :param url_service: service url
+        :type url_service: str
+        :param id_resource: id resource
+        :type id_resource: str
+        :param profile: profile
+        :type profile: str
+        :param operation: operation
+        :type operation: str
+        :param result: request result
+        :type result: RequestResult
+        """
+        if result.from_cache:
+            return
+        key = self._key(url_service, id_resource, profile, operation)
+        with self._lock:
+            pending = self._pending.setdefault(
+                key,
+                {
+                    "url_service": url_service.rstrip("/"),
+                    "id_resource": id_resource,
+                    "profile": profile,
+                    "operation": operation,
+                    "request_count": 0,
+                    "error_count": 0,
+                    "latency_sum": 0.0,
+                    "bytes_sum": 0,
+                },
+            )
+            pending["request_count"] += 1
+            if result.is_error:
+                pending["error_count"] += 1
+            else:
+                pending["latency_sum"] += result.latency
+                pending["bytes_sum"] += len(result.content)
+
+    def save(self) -> None:
+        """Merge results added since last save in store file"""
+        with self._lock:
+            if not self._pending:
+                return
+            content = self._load()
+            date = time.strftime("%Y-%m-%dT%H:%M:%S")
+            for key, pending in self._pending.items():
+                entry = content.get(key)
+                success_count = pending["request_count"] - pending["error_count"]
+                run_latency = (
+                    pending["latency_sum"] / success_count if success_count else None
+                )
+                if entry is None:
+                    entry = dict(pending, recent_latency=run_latency or 0.0)
+                else:
+                    for name in [
+                        "request_count",
+                        "error_count",
+                        "latency_sum",
+                        "bytes_sum",
+                    ]:
+                        entry[name] = entry.get(name, 0) + pending[name]
+                    if run_latency is not None:
+                        recent = entry.get("recent_latency") or run_latency
+                        entry["recent_latency"] = (
+                            1.0 - self.RECENT_WEIGHT
+                        ) * recent + self.RECENT_WEIGHT * run_latency
+                entry["last_update"] = date
+                content[key] = entry
+            self._pending.clear()
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(content, f, indent=1)
+            tmp_path.replace(self.path)
+            self._content = content
+
+    def clear(self) -> None:
+        """Remove all statistics"""
+        with self._lock:
+            self._pending.clear()
+            self._content = {}
+            self.path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _to_statistics(entry: Dict[str, Any]) -> ServiceStatistics:
+        """Create statistics from a store entry
+
+        :param entry: store entry
+        :type entry: Dict[str, Any]
+        :return: statistics
+        :rtype: ServiceStatistics
+        """
+        request_count = entry.get("request_count", 0)
+        success_count = request_count - entry.get("error_count", 0)
+        return ServiceStatistics(
+            url_service=entry.get("url_service", ""),
+            id_resource=entry.get("id_resource", ""),
+            profile=entry.get("profile", ""),
+            operation=entry.get("operation", ""),
+            request_count=request_count,
+            error_count=entry.get("error_count", 0),
+            mean_latency=(
+                entry.get("latency_sum", 0.0) / success_count if success_count else 0.0
+            ),
+            recent_latency=entry.get("recent_latency", 0.0),
+            mean_bytes=(
+                entry.get("bytes_sum", 0) / success_count if success_count else 0.0
+            ),
+            last_update=entry.get("last_update", ""),
+        )
+
+    def _get_content(self) -> Dict[str, Dict[str, Any]]:
+        """Return store content, loaded once
+
+        :return: statistics by key
+        :rtype: Dict[str, Dict[str, Any]]
+        """
+        with self._lock:
+            if self._content is None:
+                self._content = self._load()
+            return self._content
+
+    def get(
+        self, url_service: str, id_resource: str, profile: str, operation: str
+    ) -> Optional[ServiceStatistics]:
+        """Return statistics for a service, resource, profile and operation
+
+        :param url_service: service url
+        :type url_service: str
+        :param id_resource: id resource
+        :type id_resource: str
+        :param profile: profile
+        :type profile: str
+        :param operation: operation
+        :type operation: str
+        :return: statistics, None if no request was saved
+        :rtype: Optional[ServiceStatistics]
+        """
+        entry = self._get_content().get(
+            self._key(url_service, id_resource, profile, operation)
+        )
+        return self._to_statistics(entry) if entry else None
+
+    def get_all(self) -> List[ServiceStatistics]:
+        """Return all statistics, sorted by key
+
+        :return: all statistics
+        :rtype: List[ServiceStatistics]
+        """
+        content = self._get_content()
+        return [self._to_statistics(content[key]) for key in sorted(content)]
@@ -8,9 +8,9 @@ from qgis.core import (
     QgsProcessingAlgorithm,
     QgsProcessingAlgRunnerTask,
     QgsProcessingContext,
-    QgsProcessingFeedback,
     QgsTask,
 )
+from qgis.PyQt.QtGui import QContextMenuEvent
 from qgis.PyQt.QtWidgets import QMessageBox, QTextEdit, QWidget
 
 # project
@@ -28,11 +28,37 @@ class ProcessingRunTextEdit(QTextEdit):
         """
         super().__init__(parent)
         self.task: Optional[QgsTask] = None
-        self._feedback: Optional[QgsProcessingFeedback] = None
+        self._feedback: Optional[QTextEditProcessingFeedBack] = None
         self.context: Optional[QgsProcessingContext] = None
+        self._errors_only = False
         self.setReadOnly(True)
         self.setUndoRedoEnabled(False)
 
+    def contextMenuEvent(self, event: QContextMenuEvent) -> None:
+        """Display standard context menu with feedback display filter
+
+        :param event: context menu event
+        :type event: QContextMenuEvent
+        """
+        menu = self.createStandardContextMenu()
+        menu.addSeparator()
+        errors_only_action = menu.addAction(self.tr("Erreurs uniquement"))
+        errors_only_action.setCheckable(True)
+        errors_only_action.setChecked(self._errors_only)
+        errors_only_action.toggled.connect(self.set_errors_only)
+        menu.exec(event.globalPos())
+        menu.deleteLater()
+
+    def set_errors_only(self, errors_only: bool) -> None:
+        """Define if all feedback or only errors are displayed
+
+        :param errors_only: display only errors
+        :type errors_only: bool
+        """
+        self._errors_only = errors_only
+        if self._feedback:
+            self._feedback.set_errors_only(errors_only)
+
     def run_alg(
         self,
         alg: QgsProcessingAlgorithm,
@@ -59,10 +85,13 @@ class ProcessingRunTextEdit(QTextEdit):
         res, error = alg.checkParameterValues(params, self.context)
         if res:
             self.clear()
-            self._feedback = QTextEditProcessingFeedBack(self)
+            feedback = QTextEditProcessingFeedBack(self, self._errors_only)
+            self._feedback = feedback
             self._task = QgsProcessingAlgRunnerTask(
                 alg, params, self.context, self._feedback
             )
+            # Display last messages and summary when algorithm is executed
+            self._task.executed.connect(lambda successful, results: feedback.finish())
             if executed_callback:
                 self._task.executed.connect(
                     partial(executed_callback, self.context, *args)
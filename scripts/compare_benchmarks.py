@@ -0,0 +1,171 @@
+#! python3
+
+"""Compare benchmark results with a baseline and report regressions.
+
+Benchmark results are JSON files written by the benchmark suite (see
+tests/benchmarks). A regression is reported when throughput decreases or memory peak
+increases by more than the threshold.
+
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    python scripts/compare_benchmarks.py baseline.json benchmark_results/current.json
+    python scripts/compare_benchmarks.py baseline.json current.json --threshold 0.2
+
+Exit code is 1 if a regression is detected, 0 otherwise.
+"""
+
+# -- Imports
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# -- Variables
+
+# Measures compared: name and True if higher is better
+COMPARED_MEASURES = {
+    "features_per_second": True,
+    "calls_per_second": True,
+    "memory_peak_bytes": False,
+}
+
+
+# -- Functions
+def load_results(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Load benchmark results from a JSON file
+
+    :param path: benchmark results file
+    :type path: Path
+    :return: results by benchmark identifier
+    :rtype: Dict[str, Dict[str, Any]]
+    """
+    with path.open(encoding="UTF-8") as results_file:
+        return json.load(results_file)["results"]
+
+
+def compare_results(
+    baseline: Dict[str, Dict[str, Any]],
+    current: Dict[str, Dict[str, Any]],
+    threshold: float,
+) -> List[Dict[str, Any]]:
+    """Compare benchmark results with a baseline
+
+    :param baseline: baseline results by benchmark identifier
+    :type baseline: Dict[str, Dict[str, Any]]
+    :param current: current results by benchmark identifier
+    :type current: Dict[str, Dict[str, Any]]
+    :param threshold: relative change considered as a regression (0.1 for 10%)
+    :type threshold: float
+    :return: comparison for each benchmark and measure available in both results
+    :rtype: List[Dict[str, Any]]
+    """
+    comparisons = []
+    for benchmark_id in sorted(set(baseline) & set(current)):
+        for measure, higher_is_better in COMPARED_MEASURES.items():
+            baseline_value = baseline[benchmark_id].get(measure)
+            current_value = current[benchmark_id].get(measure)
+            if baseline_value is None or current_value is None:
+                continue
+
+            change = _relative_change(baseline_value, current_value)
+            if change is None:
+                regression = False
+            elif higher_is_better:
+                regression = change < -threshold
+            else:
+                regression = change > threshold
+
+            comparisons.append(
+                {
+                    "benchmark": benchmark_id,
+                    "measure": measure,
+                    "baseline": baseline_value,
+                    "current": current_value,
+                    "change": change,
+                    "regression": regression,
+                }
+            )
+    return comparisons
+
+
+def _relative_change(baseline_value: float, current_value: float) -> Optional[float]:
+    """Relative change between two values
+
+    :param baseline_value: baseline value
+    :type baseline_value: float
+    :param current_value: current value
+    :type current_value: float
+    :return: relative change, None if baseline value is 0
+    :rtype: Optional[float]
+    """
+    if baseline_value == 0:
+        return None
+    return (current_value - baseline_value) / baseline_value
+
+
+def format_report(comparisons: List[Dict[str, Any]]) -> str:
+    """Format comparisons as a text table
+
+    :param comparisons: comparisons from compare_results
+    :type comparisons: List[Dict[str, Any]]
+    :return: report
+    :rtype: str
+    """
+    lines = [
+        f"{'benchmark':<60} {'measure':<20} {'baseline':>14} {'current':>14} "
+        f"{'change':>8}"
+    ]
+    for comparison in comparisons:
+        change = comparison["change"]
+        change_str = "n/a" if change is None else f"{change:+.1%}"
+        flag = "  REGRESSION" if comparison["regression"] else ""
+        lines.append(
+            f"{comparison['benchmark']:<60} {comparison['measure']:<20} "
+            f"{comparison['baseline']:>14.2f} {comparison['current']:>14.2f} "
+            f"{change_str:>8}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    """Compare benchmark results files and print report
+
+    :param args: command line arguments, defaults to None (sys.argv)
+    :type args: Optional[List[str]], optional
+    :return: exit code, 1 if a regression is detected
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline", type=Path, help="baseline results JSON file")
+    parser.add_argument("current", type=Path, help="current results JSON file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative change considered as a regression (default: 0.1 for 10%%)",
+    )
+    options = parser.parse_args(args)
+
+    baseline = load_results(options.baseline)
+    current = load_results(options.current)
+    comparisons = compare_results(baseline, current, options.threshold)
+
+    print(format_report(comparisons))
+
+    missing = sorted(set(baseline) - set(current))
+    if missing:
+        print(f"\nBenchmarks missing from current results: {', '.join(missing)}")
+
+    regressions = [c for c in comparisons if c["regression"]]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {options.threshold:.0%}")
+        return 1
+    return 0
+
+
+# -- Run
+if __name__ == "__main__":
+    sys.exit(main())
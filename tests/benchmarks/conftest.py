@@ -0,0 +1,91 @@
+#! python3  # noqa E265
+
+"""Fixtures for benchmarks."""
+
+# standard library
+import json
+import os
+import platform
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+# 3rd party
+import pytest
+
+# PyQGIS
+from qgis.core import Qgis
+
+# project
+from gpf_isochrone_isodistance_itineraire.__about__ import __version__
+from tests.qgis.conftest import plugin_provider  # noqa: F401
+
+# ############################################################################
+# ########## Globals #############
+# ################################
+
+# Benchmarks are only run if this environment variable is set to 1
+BENCHMARK_ENV_VARIABLE = "GPF_RUN_BENCHMARKS"
+# Output JSON file, defaults to benchmark_results/benchmark_<date>.json
+BENCHMARK_OUTPUT_ENV_VARIABLE = "GPF_BENCHMARK_OUTPUT"
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class BenchmarkRecorder:
+    """Collect benchmark results and write them in a JSON file"""
+
+    def __init__(self) -> None:
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, benchmark_id: str, **measures: Any) -> None:
+        """Record measures for a benchmark
+
+        :param benchmark_id: benchmark identifier, used to compare runs
+        :type benchmark_id: str
+        """
+        self.results[benchmark_id] = measures
+
+    def write(self, output_path: Path) -> None:
+        """Write results with run metadata in a JSON file
+
+        :param output_path: output JSON file path
+        :type output_path: Path
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        content = {
+            "metadata": {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "plugin_version": __version__,
+                "qgis_version": Qgis.QGIS_VERSION,
+                "python_version": platform.python_version(),
+                "platform": platform.platform(),
+            },
+            "results": self.results,
+        }
+        with output_path.open("w", encoding="UTF-8") as output_file:
+            json.dump(content, output_file, indent=2)
+
+
+# ############################################################################
+# ########## Fixtures ############
+# ################################
+
+
+@pytest.fixture(scope="session")
+def benchmark_recorder() -> Iterator[BenchmarkRecorder]:
+    """Benchmark results recorder, results are written at the end of the session"""
+    recorder = BenchmarkRecorder()
+    yield recorder
+
+    if recorder.results:
+        output_path = Path(
+            os.getenv(
+                BENCHMARK_OUTPUT_ENV_VARIABLE,
+                f"benchmark_results/benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json",
+            )
+        )
+        recorder.write(output_path)
@@ -0,0 +1,331 @@
+#! python3  # noqa E265
+
+"""
+Microbenchmarks for the GetCapabilities parser on large synthetic documents.
+
+Each public function of the parser is measured in three modes:
+
+- cold_disk: memory cache is cleared before each call, document is read from disk
+  cache and indexed
+- warm_memory: document is in memory cache, index is cleared before each call
+- indexed: document is in memory cache and already indexed
+
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    GPF_RUN_BENCHMARKS=1 python -m pytest \
+        tests/benchmarks/test_benchmark_get_capabilities_parser.py -o addopts=""
+
+    # restrict number of resources in synthetic documents
+    GPF_RUN_BENCHMARKS=1 GPF_BENCHMARK_CAPABILITIES_SIZES=10,100 python -m pytest \
+        tests/benchmarks/test_benchmark_get_capabilities_parser.py -o addopts=""
+"""
+
+# standard library
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+# 3rd party
+import pytest
+
+# project
+import gpf_isochrone_isodistance_itineraire.processing.get_capabities_parser as getcap
+from gpf_isochrone_isodistance_itineraire.toolbelt.cache_manager import CacheManager
+from tests.benchmarks.conftest import BENCHMARK_ENV_VARIABLE, BenchmarkRecorder
+
+# ############################################################################
+# ########## Globals #############
+# ################################
+
+pytestmark = pytest.mark.skipif(
+    os.getenv(BENCHMARK_ENV_VARIABLE) != "1",
+    reason=f"benchmarks are only run if {BENCHMARK_ENV_VARIABLE}=1",
+)
+
+SIZES = [
+    int(size)
+    for size in os.getenv("GPF_BENCHMARK_CAPABILITIES_SIZES", "10,100,1000,2000").split(
+        ","
+    )
+]
+
+MODES = ["cold_disk", "warm_memory", "indexed"]
+
+# Number of calls measured for each function and mode
+CALL_COUNT = 20
+
+# Number of additional parameters by operation, to get realistic document sizes
+EXTRA_PARAMETER_COUNT = 30
+
+URL_SERVICE_TEMPLATE = "https://benchmark.invalid/capabilities_{size}"
+
+# ############################################################################
+# ########## Functions ###########
+# ################################
+
+
+def _operation_parameters(operation: str, index: int) -> List[Dict[str, Any]]:
+    """Create synthetic parameters for a resource operation
+
+    :param operation: operation id
+    :type operation: str
+    :param index: resource index
+    :type index: int
+    :return: available parameters
+    :rtype: List[Dict[str, Any]]
+    """
+    parameters = [
+        {"id": "profile", "values": ["car", "pedestrian"], "defaultValue": "car"},
+        {
+            "id": "crs",
+            "values": ["EPSG:4326", "EPSG:2154", "EPSG:3857"],
+            "defaultValue": "EPSG:4326",
+        },
+        {
+            "id": "bbox",
+            "values": {
+                "bbox": f"{-5.0 + index * 1e-4},41.0,10.0,{51.0 + index * 1e-4}"
+            },
+        },
+    ]
+    if operation == getcap.ISOCHRONE_OPERATION:
+        parameters += [
+            {"id": "direction", "values": ["departure", "arrival"]},
+            {"id": "costType", "values": ["time", "distance"]},
+        ]
+    else:
+        parameters.append({"id": "optimization", "values": ["fastest", "shortest"]})
+
+    parameters += [
+        {
+            "id": f"parameter_{i}",
+            "description": f"Synthetic parameter {i} for resource {index}",
+            "values": [f"value_{i}_{j}" for j in range(5)],
+            "defaultValue": f"value_{i}_0",
+        }
+        for i in range(EXTRA_PARAMETER_COUNT)
+    ]
+    return parameters
+
+
+def synthetic_capabilities(resource_count: int) -> Dict[str, Any]:
+    """Create a synthetic getcapabilities document.
+
+    Even resources provide route and isochrone operations, odd resources only route.
+
+    :param resource_count: number of resources
+    :type resource_count: int
+    :return: getcapabilities content
+    :rtype: Dict[str, Any]
+    """
+    resources = []
+    for index in range(resource_count):
+        operations = [getcap.ROUTE_OPERATION]
+        if index % 2 == 0:
+            operations.append(getcap.ISOCHRONE_OPERATION)
+        resources.append(
+            {
+                "id": f"resource-{index}",
+                "description": f"Synthetic resource {index}",
+                "availableOperations": [
+                    {
+                        "id": operation,
+                        "availableParameters": _operation_parameters(operation, index),
+                    }
+                    for operation in operations
+                ],
+            }
+        )
+    return {
+        "info": {"name": "Road2 synthetic", "version": "2.0.0"},
+        "api": {"name": "rest", "version": "1.0.0"},
+        "operations": [
+            {"id": getcap.ROUTE_OPERATION},
+            {"id": getcap.ISOCHRONE_OPERATION},
+        ],
+        "resources": resources,
+    }
+
+
+def _parser_calls(
+    resource_count: int, url_service: str
+) -> List[Tuple[str, Callable[[], Any]]]:
+    """Create calls of all public parser functions.
+
+    Last resource is used so lookups go through the whole document.
+
+    :param resource_count: number of resources in document
+    :type resource_count: int
+    :param url_service: service url
+    :type url_service: str
+    :return: function name and call
+    :rtype: List[Tuple[str, Callable[[], Any]]]
+    """
+    iso_resource = f"resource-{(resource_count - 1) // 2 * 2}"
+    route_resource = f"resource-{resource_count - 1}"
+    iso = getcap.ISOCHRONE_OPERATION
+    route = getcap.ROUTE_OPERATION
+    return [
+        ("getcapabilities_json", lambda: getcap.getcapabilities_json(url_service)),
+        (
+            "isochrone_available_for_service",
+            lambda: getcap.isochrone_available_for_service(url_service),
+        ),
+        (
+            "route_available_for_service",
+            lambda: getcap.route_available_for_service(url_service),
+        ),
+        (
+            "get_available_operation",
+            lambda: getcap.get_available_operation(url_service),
+        ),
+        (
+            "isochrone_available_for_resource",
+            lambda: getcap.isochrone_available_for_resource(iso_resource, url_service),
+        ),
+        (
+            "route_available_for_resource",
+            lambda: getcap.route_available_for_resource(route_resource, url_service),
+        ),
+        (
+            "get_available_resources",
+            lambda: getcap.get_available_resources(url_service, iso),
+        ),
+        (
+            "get_available_resources_dict",
+            lambda: getcap.get_available_resources_dict(url_service, route),
+        ),
+        (
+            "get_resource_operation_parameters",
+            lambda: getcap.get_resource_operation_parameters(
+                route_resource, route, url_service
+            ),
+        ),
+        (
+            "get_resource_operation_parameters_values",
+            lambda: getcap.get_resource_operation_parameters_values(
+                f"parameter_{EXTRA_PARAMETER_COUNT - 1}",
+                route_resource,
+                route,
+                url_service,
+            ),
+        ),
+        (
+            "get_resource_operation_parameters_default_value",
+            lambda: getcap.get_resource_operation_parameters_default_value(
+                f"parameter_{EXTRA_PARAMETER_COUNT - 1}",
+                route_resource,
+                route,
+                url_service,
+            ),
+        ),
+        (
+            "get_resource_profiles",
+            lambda: getcap.get_resource_profiles(iso_resource, iso, url_service),
+        ),
+        (
+            "get_resource_crs",
+            lambda: getcap.get_resource_crs(route_resource, route, url_service),
+        ),
+        (
+            "get_resource_default_crs",
+            lambda: getcap.get_resource_default_crs(route_resource, route, url_service),
+        ),
+        (
+            "get_resource_param_bbox",
+            lambda: getcap.get_resource_param_bbox(iso_resource, iso, url_service),
+        ),
+        (
+            "get_resource_direction",
+            lambda: getcap.get_resource_direction(iso_resource, url_service),
+        ),
+        (
+            "get_resource_cost_type",
+            lambda: getcap.get_resource_cost_type(iso_resource, url_service),
+        ),
+        (
+            "get_resource_optimization",
+            lambda: getcap.get_resource_optimization(route_resource, url_service),
+        ),
+    ]
+
+
+def _prepare_mode(mode: str) -> None:
+    """Reset parser caches according to measured mode
+
+    :param mode: benchmark mode
+    :type mode: str
+    """
+    if mode == "cold_disk":
+        getcap.clear_capabilities_memory_cache()
+    elif mode == "warm_memory":
+        getcap._capabilities_indexes.clear()
+
+
+# ############################################################################
+# ########## Fixtures ############
+# ################################
+
+
+@pytest.fixture(params=SIZES, ids=lambda size: f"resources={size}")
+def capabilities_in_disk_cache(request) -> Tuple[int, str]:
+    """Write a synthetic document in plugin disk cache
+
+    :return: number of resources and service url
+    :rtype: Tuple[int, str]
+    """
+    resource_count = request.param
+    url_service = URL_SERVICE_TEMPLATE.format(size=resource_count)
+    cache_file = CacheManager().getcapabilities_cache_path(url_service)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_file, "w", encoding="utf-8") as f:
+        json.dump(synthetic_capabilities(resource_count), f)
+
+    yield resource_count, url_service
+
+    getcap.clear_capabilities_memory_cache()
+    cache_file.unlink(missing_ok=True)
+
+
+# ############################################################################
+# ########## Tests ###############
+# ################################
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_benchmark_get_capabilities_parser(
+    benchmark_recorder: BenchmarkRecorder,
+    capabilities_in_disk_cache: Tuple[int, str],
+    mode: str,
+):
+    """Measure calls/s of each public parser function"""
+    resource_count, url_service = capabilities_in_disk_cache
+    document_bytes = (
+        CacheManager().getcapabilities_cache_path(url_service).stat().st_size
+    )
+
+    for name, call in _parser_calls(resource_count, url_service):
+        # Load document in memory cache and index, and check result is available
+        getcap.clear_capabilities_memory_cache()
+        assert call() not in (None, [], False), name
+
+        duration = 0.0
+        for _ in range(CALL_COUNT):
+            _prepare_mode(mode)
+            start = time.perf_counter()
+            call()
+            duration += time.perf_counter() - start
+
+        benchmark_recorder.record(
+            f"get_capabilities_parser.{name}[resources={resource_count},mode={mode}]",
+            function=name,
+            resource_count=resource_count,
+            document_bytes=document_bytes,
+            mode=mode,
+            call_count=CALL_COUNT,
+            mean_call_s=duration / CALL_COUNT,
+            calls_per_second=CALL_COUNT / duration if duration > 0 else 0.0,
+        )
@@ -0,0 +1,288 @@
+#! python3  # noqa E265
+
+"""
+Throughput benchmarks for the processing algorithms, run against the local Road2
+stand-in.
+
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    GPF_RUN_BENCHMARKS=1 python -m pytest tests/benchmarks -o addopts=""
+
+    # restrict input sizes (number of features) and injected latencies (seconds)
+    GPF_RUN_BENCHMARKS=1 GPF_BENCHMARK_SIZES=100 GPF_BENCHMARK_LATENCIES=0,0.05 \
+        python -m pytest tests/benchmarks -o addopts=""
+"""
+
+# standard library
+import os
+import time
+import tracemalloc
+from typing import Any, Dict, List, Tuple
+
+# 3rd party
+import pytest
+
+# PyQGIS
+from qgis import processing
+from qgis.core import (
+    QgsFeature,
+    QgsGeometry,
+    QgsPointXY,
+    QgsProcessingContext,
+    QgsProcessingFeedback,
+    QgsVectorLayer,
+)
+
+# project
+from tests.benchmarks.conftest import BENCHMARK_ENV_VARIABLE, BenchmarkRecorder
+from tests.road2_stand_in import Road2StandIn, Road2StandInConfig
+
+# ############################################################################
+# ########## Globals #############
+# ################################
+
+pytestmark = pytest.mark.skipif(
+    os.getenv(BENCHMARK_ENV_VARIABLE) != "1",
+    reason=f"benchmarks are only run if {BENCHMARK_ENV_VARIABLE}=1",
+)
+
+SIZES = [
+    int(size) for size in os.getenv("GPF_BENCHMARK_SIZES", "100,1000,10000").split(",")
+]
+LATENCIES = [
+    float(latency)
+    for latency in os.getenv("GPF_BENCHMARK_LATENCIES", "0,0.02").split(",")
+]
+
+PROVIDER_ID = "gpf_isochrone_isodistance_itineraire"
+
+# Points spread over metropolitan France
+X_MIN, Y_MIN, X_MAX, Y_MAX = -1.5, 43.5, 7.0, 50.0
+
+# ############################################################################
+# ########## Functions ###########
+# ################################
+
+
+def _points(size: int) -> List[Tuple[float, float]]:
+    """Create a deterministic grid of points
+
+    :param size: number of points
+    :type size: int
+    :return: point coordinates
+    :rtype: List[Tuple[float, float]]
+    """
+    columns = max(int(size**0.5), 1)
+    rows = size // columns + 1
+    return [
+        (
+            X_MIN + (X_MAX - X_MIN) * (i % columns) / columns,
+            Y_MIN + (Y_MAX - Y_MIN) * (i // columns) / rows,
+        )
+        for i in range(size)
+    ]
+
+
+def _points_layer(size: int, name: str = "points") -> QgsVectorLayer:
+    """Create a memory point layer with an id field
+
+    :param size: number of points
+    :type size: int
+    :param name: layer name, defaults to "points"
+    :type name: str, optional
+    :return: point layer
+    :rtype: QgsVectorLayer
+    """
+    layer = QgsVectorLayer("Point?crs=EPSG:4326&field=id:integer", name, "memory")
+    features = []
+    for i, (x, y) in enumerate(_points(size)):
+        feature = QgsFeature(layer.fields())
+        feature.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(x, y)))
+        feature.setAttribute("id", i)
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    return layer
+
+
+def _itineraries_layer(size: int) -> QgsVectorLayer:
+    """Create a table of itineraries between points with same id
+
+    :param size: number of itineraries
+    :type size: int
+    :return: table layer
+    :rtype: QgsVectorLayer
+    """
+    layer = QgsVectorLayer(
+        "None?field=id_start:integer&field=id_end:integer&field=resource:string"
+        "&field=profile:string&field=optimization:string",
+        "itineraries",
+        "memory",
+    )
+    features = []
+    for i in range(size):
+        feature = QgsFeature(layer.fields())
+        feature.setAttributes([i, (i + 1) % size, "bdtopo-osrm", "car", "fastest"])
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    return layer
+
+
+def _run(algorithm: str, params: Dict[str, Any]) -> int:
+    """Run an algorithm and return number of output features
+
+    :param algorithm: algorithm name in plugin provider
+    :type algorithm: str
+    :param params: algorithm parameters
+    :type params: Dict[str, Any]
+    :return: number of output features
+    :rtype: int
+    """
+    context = QgsProcessingContext()
+    results = processing.run(
+        f"{PROVIDER_ID}:{algorithm}",
+        params,
+        context=context,
+        feedback=QgsProcessingFeedback(),
+    )
+    output = results["OUTPUT"]
+    if isinstance(output, str):
+        output = context.getMapLayer(output)
+    return output.featureCount()
+
+
+def _run_isoservice(algorithm: str, size: int, url_service: str) -> int:
+    """Run isochrone or isodistance processing
+
+    :param algorithm: algorithm name
+    :type algorithm: str
+    :param size: number of input points
+    :type size: int
+    :param url_service: service url
+    :type url_service: str
+    :return: number of output features
+    :rtype: int
+    """
+    return _run(
+        algorithm,
+        {
+            "INPUT": _points_layer(size),
+            "URL_SERVICE": url_service,
+            "ID_RESOURCE": "'bdtopo-valhalla'",
+            "PROFILE": "'car'",
+            "DIRECTION": "'departure'",
+            "MAX_COST": "600",
+            "OUTPUT": "TEMPORARY_OUTPUT",
+        },
+    )
+
+
+def _run_itinerary(size: int, url_service: str) -> int:
+    """Run itinerary processing once per point couple
+
+    :param size: number of itineraries
+    :type size: int
+    :param url_service: service url
+    :type url_service: str
+    :return: number of output features
+    :rtype: int
+    """
+    points = _points(size + 1)
+    feature_count = 0
+    for i in range(size):
+        feature_count += _run(
+            "itinerary",
+            {
+                "URL_SERVICE": url_service,
+                "ID_RESOURCE": "bdtopo-osrm",
+                "START": "{},{} [EPSG:4326]".format(*points[i]),
+                "END": "{},{} [EPSG:4326]".format(*points[i + 1]),
+                "PROFILE": "car",
+                "OPTIMIZATION": "fastest",
+                "OUTPUT": "TEMPORARY_OUTPUT",
+            },
+        )
+    return feature_count
+
+
+def _run_itinerary_batch(size: int, url_service: str) -> int:
+    """Run batch itinerary processing
+
+    :param size: number of itineraries
+    :type size: int
+    :param url_service: service url
+    :type url_service: str
+    :return: number of output features
+    :rtype: int
+    """
+    points_layer = _points_layer(size)
+    return _run(
+        "itinerary_batch",
+        {
+            "INPUT": _itineraries_layer(size),
+            "URL_SERVICE": url_service,
+            "ID_START_FIELD": "id_start",
+            "ID_END_FIELD": "id_end",
+            "RESSOURCE_FIELD": "resource",
+            "PROFIL_FIELD": "profile",
+            "OPTIMIZATION_FIELD": "optimization",
+            "STARTS_LAYER": points_layer,
+            "STARTS_LAYER_ID_FIELD": "id",
+            "ENDS_LAYER": points_layer,
+            "ENDS_LAYER_ID_FIELD": "id",
+            "OUTPUT": "TEMPORARY_OUTPUT",
+        },
+    )
+
+
+# ############################################################################
+# ########## Tests ###############
+# ################################
+
+
+@pytest.mark.parametrize("latency", LATENCIES)
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize(
+    "algorithm",
+    ["isochrone_processing", "isodistance_processing", "itinerary", "itinerary_batch"],
+)
+def test_benchmark_processing(
+    plugin_provider,
+    benchmark_recorder: BenchmarkRecorder,
+    algorithm: str,
+    size: int,
+    latency: float,
+):
+    """Measure features/s, Python memory peak and request count of an algorithm"""
+    with Road2StandIn(Road2StandInConfig(latency=latency)) as road2_stand_in:
+        # Capabilities are downloaded before measures
+        _run_isoservice("isochrone_processing", 1, road2_stand_in.url)
+        request_count_before = len(road2_stand_in.requests)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        if algorithm == "itinerary":
+            feature_count = _run_itinerary(size, road2_stand_in.url)
+        elif algorithm == "itinerary_batch":
+            feature_count = _run_itinerary_batch(size, road2_stand_in.url)
+        else:
+            feature_count = _run_isoservice(algorithm, size, road2_stand_in.url)
+        duration = time.perf_counter() - start
+        _, memory_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        request_count = len(road2_stand_in.requests) - request_count_before
+
+    assert feature_count == size
+
+    benchmark_recorder.record(
+        f"{algorithm}[size={size},latency={latency}]",
+        algorithm=algorithm,
+        size=size,
+        latency=latency,
+        duration_s=duration,
+        features_per_second=feature_count / duration if duration > 0 else 0.0,
+        memory_peak_bytes=memory_peak,
+        request_count=request_count,
+    )
@@ -0,0 +1,34 @@
+#! python3  # noqa E265
+
+"""Shared pytest fixtures."""
+
+# standard library
+from typing import Iterator
+
+# 3rd party
+import pytest
+
+# project
+from tests.road2_stand_in import Road2StandIn, Road2StandInConfig
+
+# ############################################################################
+# ########## Fixtures ############
+# ################################
+
+
+@pytest.fixture
+def road2_stand_in(request: pytest.FixtureRequest) -> Iterator[Road2StandIn]:
+    """Local Road2 stand-in server.
+
+    Default behavior can be changed with indirect parametrization:
+
+    .. code-block:: python
+
+        @pytest.mark.parametrize(
+            "road2_stand_in", [Road2StandInConfig(error_rate=0.5)], indirect=True
+        )
+        def test_errors(road2_stand_in): ...
+    """
+    config = getattr(request, "param", None) or Road2StandInConfig()
+    with Road2StandIn(config) as stand_in:
+        yield stand_in
@@ -0,0 +1,32 @@
+#! python3  # noqa E265
+
+"""Shared pytest fixtures for tests requiring QGIS."""
+
+# standard library
+from typing import Iterator
+
+# 3rd party
+import pytest
+
+# PyQGIS
+from qgis.core import QgsApplication
+
+# project
+from gpf_isochrone_isodistance_itineraire.processing.provider import (
+    PluginGpfIsochroneIsodistanceItineraireProvider,
+)
+
+# ############################################################################
+# ########## Fixtures ############
+# ################################
+
+
+@pytest.fixture(scope="session")
+def plugin_provider(
+    qgis_processing,
+) -> Iterator[PluginGpfIsochroneIsodistanceItineraireProvider]:
+    """Plugin processing provider registered in QGIS processing registry"""
+    provider = PluginGpfIsochroneIsodistanceItineraireProvider()
+    QgsApplication.processingRegistry().addProvider(provider)
+    yield provider
+    QgsApplication.processingRegistry().removeProvider(provider)
@@ -0,0 +1,147 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m unittest tests.qgis.test_circuit_breaker
+"""
+
+# standard library
+import unittest
+
+# PyQGIS
+from qgis.core import QgsBlockingNetworkRequest
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    service_url,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    RequestResult,
+)
+
+# ############################################################################
+# ########## Functions ###########
+# ################################
+
+
+def create_result(
+    status_code: int = 200,
+    error_code: QgsBlockingNetworkRequest.ErrorCode = None,
+) -> RequestResult:
+    """Create a request result
+
+    :param status_code: HTTP status code, defaults to 200
+    :type status_code: int, optional
+    :param error_code: request error code, defaults to None for an error code
+        defined from status code
+    :type error_code: QgsBlockingNetworkRequest.ErrorCode, optional
+    :return: request result
+    :rtype: RequestResult
+    """
+    if error_code is None:
+        error_code = (
+            QgsBlockingNetworkRequest.ErrorCode.NoError
+            if status_code == 200
+            else QgsBlockingNetworkRequest.ErrorCode.ServerExceptionError
+        )
+    return RequestResult(
+        url="",
+        error_code=error_code,
+        error_message="",
+        content=b"",
+        content_type=b"",
+        latency=0.1,
+        status_code=status_code,
+    )
+
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_open_after_consecutive_failures(self):
+        """Test circuit opens after threshold consecutive failures only"""
+        breaker = CircuitBreaker("https://data.geopf.fr/navigation", 3, 10.0)
+        self.assertFalse(breaker.add_result(create_result(503), now=0.0))
+        self.assertFalse(breaker.add_result(create_result(503), now=0.0))
+
+        # Computation error: service is available
+        self.assertFalse(breaker.add_result(create_result(500), now=0.0))
+        self.assertEqual(breaker.failure_count, 0)
+
+        self.assertFalse(breaker.add_result(create_result(429), now=0.0))
+        self.assertFalse(
+            breaker.add_result(
+                create_result(0, QgsBlockingNetworkRequest.ErrorCode.TimeoutError),
+                now=0.0,
+            )
+        )
+        self.assertTrue(
+            breaker.add_result(
+                create_result(0, QgsBlockingNetworkRequest.ErrorCode.NetworkError),
+                now=0.0,
+            )
+        )
+        self.assertEqual(breaker.state, STATE_OPEN)
+        self.assertEqual(breaker.open_count, 1)
+        self.assertFalse(breaker.allow_request(now=5.0))
+        self.assertEqual(breaker.probe_delay(now=5.0), 5.0)
+
+    def test_probe(self):
+        """Test a single probe request is allowed after probe interval"""
+        breaker = CircuitBreaker("https://data.geopf.fr/navigation", 1, 10.0)
+        self.assertTrue(breaker.add_result(create_result(503), now=0.0))
+
+        self.assertTrue(breaker.allow_request(now=10.0))
+        self.assertEqual(breaker.state, STATE_HALF_OPEN)
+        self.assertFalse(breaker.allow_request(now=10.0))
+        self.assertIsNone(breaker.probe_delay(now=10.0))
+
+        # Failed probe: open again until next probe
+        self.assertTrue(breaker.add_result(create_result(502), now=12.0))
+        self.assertEqual(breaker.state, STATE_OPEN)
+        self.assertFalse(breaker.allow_request(now=20.0))
+        self.assertTrue(breaker.allow_request(now=22.0))
+
+        # Successful probe: closed
+        self.assertTrue(breaker.add_result(create_result(200), now=23.0))
+        self.assertEqual(breaker.state, STATE_CLOSED)
+        self.assertTrue(breaker.allow_request(now=23.0))
+        self.assertEqual(breaker.open_count, 1)
+
+    def test_disabled(self):
+        """Test circuit never opens with threshold 0"""
+        breaker = CircuitBreaker("https://data.geopf.fr/navigation", 0)
+        for _ in range(100):
+            self.assertFalse(breaker.add_result(create_result(503)))
+        self.assertTrue(breaker.allow_request())
+
+    def test_service_url(self):
+        """Test requests of a service have the same service url"""
+        self.assertEqual(
+            service_url(
+                "https://Data.Geopf.fr/navigation/isochrone?resource=bdtopo-valhalla"
+            ),
+            "https://data.geopf.fr/navigation",
+        )
+        self.assertEqual(
+            service_url("https://data.geopf.fr/navigation/itineraire/"),
+            "https://data.geopf.fr/navigation",
+        )
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m unittest tests.qgis.test_concurrency_controller
+"""
+
+# standard library
+import unittest
+
+# PyQGIS
+from qgis.core import QgsBlockingNetworkRequest
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.concurrency_controller import (
+    AimdConcurrencyController,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    RequestResult,
+)
+
+# ############################################################################
+# ########## Functions ###########
+# ################################
+
+
+def create_result(status_code: int = 200, latency: float = 0.1) -> RequestResult:
+    """Create a request result
+
+    :param status_code: HTTP status code, defaults to 200
+    :type status_code: int, optional
+    :param latency: latency (seconds), defaults to 0.1
+    :type latency: float, optional
+    :return: request result
+    :rtype: RequestResult
+    """
+    return RequestResult(
+        url="",
+        error_code=(
+            QgsBlockingNetworkRequest.ErrorCode.NoError
+            if status_code == 200
+            else QgsBlockingNetworkRequest.ErrorCode.ServerExceptionError
+        ),
+        error_message="",
+        content=b"",
+        content_type=b"",
+        latency=latency,
+        status_code=status_code,
+    )
+
+
+def add_window(
+    controller: AimdConcurrencyController, status_code: int = 200, latency: float = 0.1
+) -> None:
+    """Add a window of results: one result for each request in flight
+
+    :param controller: controller
+    :type controller: AimdConcurrencyController
+    :param status_code: HTTP status code, defaults to 200
+    :type status_code: int, optional
+    :param latency: latency (seconds), defaults to 0.1
+    :type latency: float, optional
+    """
+    for _ in range(controller.concurrency):
+        controller.add_result(create_result(status_code, latency))
+
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestConcurrencyController(unittest.TestCase):
+    def test_slow_start(self):
+        """Test level is doubled by successful window up to maximum"""
+        controller = AimdConcurrencyController(max_concurrency=12)
+        self.assertEqual(controller.concurrency, 1)
+
+        levels = []
+        for _ in range(5):
+            add_window(controller)
+            levels.append(controller.concurrency)
+        self.assertEqual(levels, [2, 4, 8, 12, 12])
+        self.assertEqual(controller.peak_concurrency, 12)
+        self.assertGreater(controller.throughput, 0)
+
+    def test_decrease_on_throttling(self):
+        """Test level is halved once by window on 429 and 5xx, then increased by 1"""
+        controller = AimdConcurrencyController(
+            max_concurrency=32, min_concurrency=2, initial_concurrency=16
+        )
+        self.assertTrue(controller.add_result(create_result(429)))
+        self.assertEqual(controller.concurrency, 8)
+
+        # Other congestion results of the same window are ignored
+        for _ in range(7):
+            controller.add_result(create_result(503))
+        self.assertEqual(controller.concurrency, 8)
+        self.assertEqual(controller.decrease_count, 1)
+
+        # Additive increase after first congestion
+        add_window(controller)
+        self.assertEqual(controller.concurrency, 9)
+        add_window(controller)
+        self.assertEqual(controller.concurrency, 10)
+
+        for _ in range(5):
+            add_window(controller, status_code=500)
+        self.assertEqual(controller.concurrency, 2)
+        self.assertEqual(controller.decrease_count, 3)
+
+    def test_decrease_on_latency_inflation(self):
+        """Test level is halved when latency is inflated above baseline"""
+        controller = AimdConcurrencyController(
+            max_concurrency=32, initial_concurrency=8
+        )
+        add_window(controller, latency=0.1)
+        self.assertEqual(controller.concurrency, 16)
+
+        add_window(controller, latency=0.2)
+        self.assertEqual(controller.concurrency, 32)
+
+        for _ in range(32):
+            controller.add_result(create_result(latency=1.0))
+        self.assertLess(controller.concurrency, 32)
+        self.assertGreaterEqual(controller.decrease_count, 1)
+        self.assertAlmostEqual(controller.baseline_latency, 0.1)
+
+        # Level is increased again when latency is back to baseline
+        level = controller.concurrency
+        add_window(controller, latency=0.1)
+        add_window(controller, latency=0.1)
+        self.assertGreater(controller.concurrency, level)
+
+    def test_limits(self):
+        """Test level is kept between minimum and maximum"""
+        controller = AimdConcurrencyController(
+            max_concurrency=4, min_concurrency=8, initial_concurrency=16
+        )
+        self.assertEqual(controller.min_concurrency, 4)
+        self.assertEqual(controller.concurrency, 4)
+        add_window(controller, status_code=429)
+        self.assertEqual(controller.concurrency, 4)
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
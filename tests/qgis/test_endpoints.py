@@ -0,0 +1,109 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m unittest tests.qgis.test_endpoints
+"""
+
+# standard library
+import unittest
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.endpoints import (
+    EndpointPool,
+    endpoint_key,
+    primary_endpoint,
+    split_endpoints,
+)
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestEndpoints(unittest.TestCase):
+    def test_split_endpoints(self):
+        """Test endpoints are read from url service"""
+        self.assertEqual(
+            split_endpoints(
+                "https://data.geopf.fr/navigation/ ; https://mirror.invalid/nav;"
+            ),
+            ["https://data.geopf.fr/navigation/", "https://mirror.invalid/nav"],
+        )
+        self.assertEqual(
+            primary_endpoint(
+                "https://data.geopf.fr/navigation/;https://mirror.invalid"
+            ),
+            "https://data.geopf.fr/navigation/",
+        )
+        self.assertEqual(
+            primary_endpoint("https://data.geopf.fr/navigation/"),
+            "https://data.geopf.fr/navigation/",
+        )
+        self.assertEqual(
+            endpoint_key("HTTPS://Data.Geopf.fr//navigation/"),
+            "https://data.geopf.fr/navigation",
+        )
+        self.assertEqual(
+            endpoint_key(
+                "https://data.geopf.fr/navigation//isochrone?point=2,48",
+                operation=True,
+            ),
+            "https://data.geopf.fr/navigation",
+        )
+
+    def test_endpoint_urls(self):
+        """Test requests built with primary endpoint are sent to all endpoints"""
+        pool = EndpointPool(
+            "https://data.geopf.fr/navigation/",
+            [
+                "https://data.geopf.fr/navigation",
+                "http://proxy.invalid:8080/gpf/navigation/",
+            ],
+        )
+        self.assertEqual(
+            pool.endpoint_urls(
+                "https://data.geopf.fr/navigation//isochrone?point=2,48&costValue=600"
+            ),
+            [
+                "https://data.geopf.fr/navigation/isochrone?point=2,48&costValue=600",
+                "http://proxy.invalid:8080/gpf/navigation/isochrone?point=2,48"
+                "&costValue=600",
+            ],
+        )
+        self.assertEqual(
+            pool.endpoint_urls("https://data.geopf.fr/navigation-v2/isochrone"), []
+        )
+        self.assertEqual(pool.endpoint_urls("https://other.invalid/isochrone"), [])
+
+    def test_expected_latency(self):
+        """Test expected latency from smoothed latency and requests in flight"""
+        pool = EndpointPool(
+            "https://main.invalid/navigation",
+            ["https://main.invalid/navigation", "https://mirror.invalid/navigation"],
+        )
+        main, mirror = pool.endpoint_urls("https://main.invalid/navigation/isochrone")
+        self.assertEqual(pool.expected_latency(main), 0.0)
+
+        pool.add_latency(main, 0.1)
+        pool.add_latency(mirror, 0.3)
+        self.assertLess(pool.expected_latency(main), pool.expected_latency(mirror))
+
+        for _ in range(3):
+            pool.add_in_flight(main, 1)
+        self.assertGreater(pool.expected_latency(main), pool.expected_latency(mirror))
+
+        pool.add_in_flight(main, -3)
+        pool.add_latency(main, 1.1)
+        self.assertAlmostEqual(pool.latency["https://main.invalid/navigation"], 0.3)
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,424 @@
+#! python3  # noqa E265
+
+"""
+Golden-output equivalence of processing execution modes.
+
+Each algorithm is run against the local Road2 stand-in in the sequential reference
+mode and in every mode of EXECUTION_MODES. Outputs must have the same fields, the
+same features in the same order (unless the mode is declared unordered), the same
+attributes and equal geometries within GEOMETRY_TOLERANCE.
+
+A new execution mode (concurrency, cache, batch...) must be added to
+EXECUTION_MODES with the algorithm parameters enabling it.
+
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    python -m pytest tests/qgis/test_execution_modes_equivalence.py
+"""
+
+# standard library
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 3rd party
+import pytest
+
+# PyQGIS
+from qgis import processing
+from qgis.core import (
+    QgsFeature,
+    QgsGeometry,
+    QgsPointXY,
+    QgsProcessingContext,
+    QgsProcessingFeedback,
+    QgsVectorLayer,
+)
+
+# project
+from tests.road2_stand_in import Road2StandIn, Road2StandInConfig
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+@dataclass
+class ExecutionMode:
+    """Execution mode of processing algorithms"""
+
+    # Mode name, used in test ids
+    name: str
+    # Parameters added to algorithm parameters to enable the mode
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    # True if output features must be in input order
+    ordered: bool = True
+
+
+# ############################################################################
+# ########## Globals #############
+# ################################
+
+PROVIDER_ID = "gpf_isochrone_isodistance_itineraire"
+
+REFERENCE_MODE = ExecutionMode(name="sequential")
+
+EXECUTION_MODES: List[ExecutionMode] = [
+    REFERENCE_MODE,
+    ExecutionMode(name="concurrent", parameters={"CONCURRENCY": 4}),
+    ExecutionMode(
+        name="concurrent_unordered",
+        parameters={"CONCURRENCY": 4, "OUTPUT_ORDER": 1},
+        ordered=False,
+    ),
+]
+
+# Maximum Hausdorff distance between reference and mode geometries (layer units)
+GEOMETRY_TOLERANCE = 1e-9
+
+# Responses are delayed randomly so concurrent requests complete out of order
+STAND_IN_CONFIG = Road2StandInConfig(latency=0.002, latency_jitter=0.01, seed=7)
+
+POINTS = [
+    (2.35, 48.85),
+    (4.83, 45.76),
+    (5.37, 43.29),
+    (-1.55, 47.21),
+    (1.44, 43.60),
+    (3.06, 50.63),
+    (7.26, 43.70),
+    (-0.57, 44.84),
+    (6.18, 48.69),
+    (0.10, 49.49),
+    (5.72, 45.19),
+    (-4.49, 48.39),
+]
+
+# ############################################################################
+# ########## Functions ###########
+# ################################
+
+
+def create_points_layer(points: List[Tuple[float, float]]) -> QgsVectorLayer:
+    """Create a memory point layer in EPSG:4326 with an id field
+
+    :param points: point coordinates
+    :type points: List[Tuple[float, float]]
+    :return: point layer
+    :rtype: QgsVectorLayer
+    """
+    layer = QgsVectorLayer("Point?crs=EPSG:4326&field=id:integer", "points", "memory")
+    features = []
+    for i, (x, y) in enumerate(points):
+        feature = QgsFeature(layer.fields())
+        feature.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(x, y)))
+        feature.setAttribute("id", i)
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    return layer
+
+
+def create_itineraries_layer(size: int) -> QgsVectorLayer:
+    """Create a table of itineraries between successive points
+
+    :param size: number of itineraries
+    :type size: int
+    :return: table layer
+    :rtype: QgsVectorLayer
+    """
+    layer = QgsVectorLayer(
+        "None?field=id_start:integer&field=id_end:integer&field=resource:string"
+        "&field=profile:string&field=optimization:string",
+        "itineraries",
+        "memory",
+    )
+    features = []
+    for i in range(size):
+        feature = QgsFeature(layer.fields())
+        feature.setAttributes([i, (i + 1) % size, "bdtopo-osrm", "car", "fastest"])
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    return layer
+
+
+def isochrone_parameters(url_service: str) -> Dict[str, Any]:
+    """Parameters for isochrone processing
+
+    :param url_service: service url
+    :type url_service: str
+    :return: algorithm parameters
+    :rtype: Dict[str, Any]
+    """
+    return {
+        "INPUT": create_points_layer(POINTS),
+        "URL_SERVICE": url_service,
+        "ID_RESOURCE": "'bdtopo-valhalla'",
+        "PROFILE": "'car'",
+        "DIRECTION": "'departure'",
+        "MAX_COST": "600",
+    }
+
+
+def isodistance_parameters(url_service: str) -> Dict[str, Any]:
+    """Parameters for isodistance processing
+
+    :param url_service: service url
+    :type url_service: str
+    :return: algorithm parameters
+    :rtype: Dict[str, Any]
+    """
+    return {
+        "INPUT": create_points_layer(POINTS),
+        "URL_SERVICE": url_service,
+        "ID_RESOURCE": "'bdtopo-valhalla'",
+        "PROFILE": "'pedestrian'",
+        "DIRECTION": "'arrival'",
+        "MAX_COST": "1500",
+    }
+
+
+def itinerary_parameters(url_service: str) -> Dict[str, Any]:
+    """Parameters for itinerary processing
+
+    :param url_service: service url
+    :type url_service: str
+    :return: algorithm parameters
+    :rtype: Dict[str, Any]
+    """
+    return {
+        "URL_SERVICE": url_service,
+        "ID_RESOURCE": "bdtopo-osrm",
+        "START": "{},{} [EPSG:4326]".format(*POINTS[0]),
+        "END": "{},{} [EPSG:4326]".format(*POINTS[1]),
+        "INTERMEDIATES": create_points_layer(POINTS[2:4]),
+        "PROFILE": "car",
+        "OPTIMIZATION": "fastest",
+    }
+
+
+def itinerary_batch_parameters(url_service: str) -> Dict[str, Any]:
+    """Parameters for batch itinerary processing
+
+    :param url_service: service url
+    :type url_service: str
+    :return: algorithm parameters
+    :rtype: Dict[str, Any]
+    """
+    points_layer = create_points_layer(POINTS)
+    return {
+        "INPUT": create_itineraries_layer(len(POINTS)),
+        "URL_SERVICE": url_service,
+        "ID_START_FIELD": "id_start",
+        "ID_END_FIELD": "id_end",
+        "RESSOURCE_FIELD": "resource",
+        "PROFIL_FIELD": "profile",
+        "OPTIMIZATION_FIELD": "optimization",
+        "STARTS_LAYER": points_layer,
+        "STARTS_LAYER_ID_FIELD": "id",
+        "ENDS_LAYER": points_layer,
+        "ENDS_LAYER_ID_FIELD": "id",
+    }
+
+
+ALGORITHMS: Dict[str, Callable[[str], Dict[str, Any]]] = {
+    "isochrone_processing": isochrone_parameters,
+    "isodistance_processing": isodistance_parameters,
+    "itinerary": itinerary_parameters,
+    "itinerary_batch": itinerary_batch_parameters,
+}
+
+
+def run_algorithm(
+    algorithm: str, mode: ExecutionMode, url_service: str
+) -> QgsVectorLayer:
+    """Run an algorithm in an execution mode
+
+    :param algorithm: algorithm name in plugin provider
+    :type algorithm: str
+    :param mode: execution mode
+    :type mode: ExecutionMode
+    :param url_service: service url
+    :type url_service: str
+    :return: output layer
+    :rtype: QgsVectorLayer
+    """
+    params = ALGORITHMS[algorithm](url_service)
+    params.update(mode.parameters)
+    params["OUTPUT"] = "TEMPORARY_OUTPUT"
+
+    context = QgsProcessingContext()
+    results = processing.run(
+        f"{PROVIDER_ID}:{algorithm}",
+        params,
+        context=context,
+        feedback=QgsProcessingFeedback(),
+    )
+    output = results["OUTPUT"]
+    if isinstance(output, str):
+        output = context.takeResultLayer(output)
+    return output
+
+
+def _attributes_equal(reference: Any, value: Any) -> bool:
+    """Compare attributes values, with tolerance for floating values
+
+    :param reference: reference value
+    :type reference: Any
+    :param value: compared value
+    :type value: Any
+    :return: True if values are equal
+    :rtype: bool
+    """
+    if isinstance(reference, float) and isinstance(value, float):
+        return math.isclose(reference, value, rel_tol=1e-12, abs_tol=1e-12)
+    return reference == value
+
+
+def _sort_key(feature: QgsFeature) -> str:
+    """Key used to compare features of unordered modes
+
+    :param feature: feature
+    :type feature: QgsFeature
+    :return: key built from attributes
+    :rtype: str
+    """
+    return repr(feature.attributes())
+
+
+def assert_equivalent_outputs(
+    reference: QgsVectorLayer,
+    output: QgsVectorLayer,
+    ordered: bool = True,
+    tolerance: float = GEOMETRY_TOLERANCE,
+) -> None:
+    """Check that an output is equivalent to reference output
+
+    :param reference: reference output layer
+    :type reference: QgsVectorLayer
+    :param output: compared output layer
+    :type output: QgsVectorLayer
+    :param ordered: True if features must be in the same order, defaults to True
+    :type ordered: bool, optional
+    :param tolerance: maximum Hausdorff distance between geometries, defaults to
+        GEOMETRY_TOLERANCE
+    :type tolerance: float, optional
+    """
+    assert output.fields().names() == reference.fields().names()
+    assert output.wkbType() == reference.wkbType()
+    assert output.crs() == reference.crs()
+
+    reference_features = list(reference.getFeatures())
+    output_features = list(output.getFeatures())
+    assert len(output_features) == len(reference_features)
+    if not ordered:
+        reference_features.sort(key=_sort_key)
+        output_features.sort(key=_sort_key)
+
+    for index, (expected, feature) in enumerate(
+        zip(reference_features, output_features)
+    ):
+        for name, expected_value, value in zip(
+            reference.fields().names(), expected.attributes(), feature.attributes()
+        ):
+            assert _attributes_equal(
+                expected_value, value
+            ), f"feature {index}, field {name}: {value!r} != {expected_value!r}"
+
+        expected_geometry = expected.geometry()
+        geometry = feature.geometry()
+        assert geometry.wkbType() == expected_geometry.wkbType(), f"feature {index}"
+        if expected_geometry.isEmpty():
+            assert geometry.isEmpty(), f"feature {index}"
+            continue
+        distance = expected_geometry.hausdorffDistance(geometry)
+        assert (
+            0 <= distance <= tolerance
+        ), f"feature {index}: geometry distance {distance} > {tolerance}"
+
+
+# ############################################################################
+# ########## Fixtures ############
+# ################################
+
+
+@pytest.fixture(scope="module")
+def equivalence_stand_in() -> Road2StandIn:
+    """Road2 stand-in shared by all runs of the module"""
+    with Road2StandIn(STAND_IN_CONFIG) as stand_in:
+        yield stand_in
+
+
+@pytest.fixture(scope="module")
+def reference_outputs() -> Dict[str, QgsVectorLayer]:
+    """Reference outputs by algorithm, computed on first use"""
+    return {}
+
+
+def _reference_output(
+    reference_outputs: Dict[str, QgsVectorLayer],
+    algorithm: str,
+    url_service: str,
+) -> QgsVectorLayer:
+    """Get reference output of an algorithm, run in reference mode if not available
+
+    :param reference_outputs: reference outputs cache
+    :type reference_outputs: Dict[str, QgsVectorLayer]
+    :param algorithm: algorithm name
+    :type algorithm: str
+    :param url_service: service url
+    :type url_service: str
+    :return: reference output
+    :rtype: QgsVectorLayer
+    """
+    reference: Optional[QgsVectorLayer] = reference_outputs.get(algorithm)
+    if reference is None:
+        reference = run_algorithm(algorithm, REFERENCE_MODE, url_service)
+        reference_outputs[algorithm] = reference
+    return reference
+
+
+# ############################################################################
+# ########## Tests ###############
+# ################################
+
+
+@pytest.mark.parametrize("mode", EXECUTION_MODES, ids=lambda mode: mode.name)
+@pytest.mark.parametrize("algorithm", list(ALGORITHMS))
+def test_execution_mode_equivalence(
+    plugin_provider,
+    equivalence_stand_in: Road2StandIn,
+    reference_outputs: Dict[str, QgsVectorLayer],
+    algorithm: str,
+    mode: ExecutionMode,
+):
+    """Check output of an execution mode is equivalent to sequential output"""
+    reference = _reference_output(
+        reference_outputs, algorithm, equivalence_stand_in.url
+    )
+    assert reference.featureCount() > 0
+
+    output = run_algorithm(algorithm, mode, equivalence_stand_in.url)
+
+    assert_equivalent_outputs(reference, output, ordered=mode.ordered)
+
+
+def test_assert_equivalent_outputs_detects_differences():
+    """Check harness reports changed geometry, attribute and order"""
+    reference = create_points_layer(POINTS[:3])
+
+    assert_equivalent_outputs(reference, create_points_layer(POINTS[:3]))
+
+    moved = POINTS[:2] + [(POINTS[2][0] + 1e-6, POINTS[2][1])]
+    with pytest.raises(AssertionError):
+        assert_equivalent_outputs(reference, create_points_layer(moved))
+
+    reordered = create_points_layer([POINTS[1], POINTS[0], POINTS[2]])
+    with pytest.raises(AssertionError):
+        assert_equivalent_outputs(reference, reordered)
+
+    changed = create_points_layer(POINTS[:3])
+    changed.dataProvider().changeAttributeValues({1: {0: 42}})
+    with pytest.raises(AssertionError):
+        assert_equivalent_outputs(reference, changed)
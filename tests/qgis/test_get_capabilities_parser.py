@@ -1,4 +1,5 @@
 # standard
+import copy
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -98,6 +99,26 @@ class TestGetCapabilitiesParser(unittest.TestCase):
         self.assertIn("isochrone", operations)
         self.assertIn("route", operations)
 
+    @patch(
+        "gpf_isochrone_isodistance_itineraire.processing.get_capabities_parser.getcapabilities_json"
+    )
+    def test_get_post_operation_paths(self, mock_download: MagicMock):
+        """Check read of operations accepting POST
+
+        :param mock_download: mock for getcap download
+        :type mock_download: MagicMock
+        """
+        data = copy.deepcopy(self.mock_data)
+        data["operations"] = [
+            {"id": "isochrone", "url": "/isochrone?", "methods": ["GET"]},
+            {"id": "route", "url": "/itineraire?", "methods": ["GET", "POST"]},
+        ]
+        mock_download.return_value = data
+        self.assertEqual(getcap.get_post_operation_paths(), ["/itineraire"])
+
+        mock_download.return_value = self.mock_data
+        self.assertEqual(getcap.get_post_operation_paths(), [])
+
     @patch(
         "gpf_isochrone_isodistance_itineraire.processing.get_capabities_parser.getcapabilities_json"
     )
@@ -406,6 +427,130 @@ class TestGetCapabilitiesParser(unittest.TestCase):
         profiles = getcap.get_resource_profiles("my_resource", "isochrone")
         self.assertEqual(profiles, [])
 
+    @patch.object(getcap, "download_getcapabilities")
+    @patch.object(getcap, "is_file_older_than")
+    def test_getcapabilities_json_memory_cache(
+        self, mock_older: MagicMock, mock_download: MagicMock
+    ):
+        """Check getcapabilities content is kept in memory cache until cleared
+
+        :param mock_older: mock for cache file expiration check
+        :type mock_older: MagicMock
+        :param mock_download: mock for getcap download
+        :type mock_download: MagicMock
+        """
+        mock_older.return_value = True
+        mock_download.return_value = self.mock_data
+        url_service = "https://memory.cache.invalid/"
+        getcap.clear_capabilities_memory_cache()
+
+        self.assertIs(getcap.getcapabilities_json(url_service), self.mock_data)
+        self.assertIs(getcap.getcapabilities_json(url_service), self.mock_data)
+        self.assertEqual(mock_download.call_count, 1)
+
+        getcap.clear_capabilities_memory_cache()
+        getcap.getcapabilities_json(url_service)
+        self.assertEqual(mock_download.call_count, 2)
+        getcap.clear_capabilities_memory_cache()
+
+    @patch(
+        "gpf_isochrone_isodistance_itineraire.processing.get_capabities_parser.getcapabilities_json"
+    )
+    def test_index_not_used_for_other_content(self, mock_download: MagicMock):
+        """Check index is rebuilt if getcapabilities content changes
+
+        :param mock_download: mock for getcap download
+        :type mock_download: MagicMock
+        """
+        mock_download.return_value = self.mock_data
+        self.assertEqual(
+            getcap.get_available_resources(operation="isochrone"),
+            [self.ISOCHRONE_RESOURCE],
+        )
+
+        mock_download.return_value = {
+            "resources": [
+                {"id": "other_resource", "availableOperations": [{"id": "isochrone"}]}
+            ]
+        }
+        self.assertEqual(
+            getcap.get_available_resources(operation="isochrone"), ["other_resource"]
+        )
+        self.assertIsNone(
+            getcap.get_resource_operation_parameters("other_resource", "isochrone")
+        )
+
+    @patch.object(getcap, "download_getcapabilities")
+    @patch.object(getcap, "is_file_older_than")
+    def test_getcapabilities_json_failover(
+        self, mock_older: MagicMock, mock_download: MagicMock
+    ):
+        """Check getcapabilities is downloaded from next endpoint if first one fails
+
+        :param mock_older: mock for cache file expiration check
+        :type mock_older: MagicMock
+        :param mock_download: mock for getcap download
+        :type mock_download: MagicMock
+        """
+        mock_older.return_value = True
+        mock_download.side_effect = lambda url_service, forceRefresh: (
+            self.mock_data if "mirror" in url_service else None
+        )
+        getcap.clear_capabilities_memory_cache()
+
+        self.assertIs(
+            getcap.getcapabilities_json(
+                "https://down.cache.invalid/ ; https://mirror.cache.invalid"
+            ),
+            self.mock_data,
+        )
+        self.assertEqual(mock_download.call_count, 2)
+
+        # Content cached for first endpoint
+        self.assertIs(
+            getcap.getcapabilities_json("https://down.cache.invalid/"), self.mock_data
+        )
+        self.assertEqual(mock_download.call_count, 2)
+        getcap.clear_capabilities_memory_cache()
+
+    @patch(
+        "gpf_isochrone_isodistance_itineraire.processing.get_capabities_parser.getcapabilities_json"
+    )
+    def test_get_compatible_endpoints(self, mock_download: MagicMock):
+        """Check endpoints with different or missing getcapabilities are not used
+
+        :param mock_download: mock for getcap download
+        :type mock_download: MagicMock
+        """
+        other_data = copy.deepcopy(self.mock_data)
+        other_data["resources"][0]["availableOperations"][0]["availableParameters"][0][
+            "values"
+        ] = ["car"]
+        contents = {
+            "https://main.invalid;https://mirror.invalid;https://other.invalid;"
+            "https://down.invalid": self.mock_data,
+            "https://main.invalid": self.mock_data,
+            "https://mirror.invalid": copy.deepcopy(self.mock_data),
+            "https://other.invalid": other_data,
+            "https://down.invalid": None,
+        }
+        mock_download.side_effect = contents.get
+
+        self.assertEqual(
+            getcap.get_compatible_endpoints(
+                "https://main.invalid;https://mirror.invalid;https://other.invalid;"
+                "https://down.invalid"
+            ),
+            (
+                ["https://main.invalid", "https://mirror.invalid"],
+                ["https://other.invalid", "https://down.invalid"],
+            ),
+        )
+        self.assertEqual(
+            getcap.get_compatible_endpoints("https://main.invalid"),
+            (["https://main.invalid"], []),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,84 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m unittest tests.qgis.test_instrumentation
+"""
+
+# standard library
+import unittest
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.instrumentation import (
+    StageHistogram,
+    StageInstrumentation,
+)
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestStageInstrumentation(unittest.TestCase):
+    def test_histogram(self):
+        """Test histogram buckets and percentiles"""
+        histogram = StageHistogram()
+        histogram.add(0.0005)
+        histogram.add(0.003)
+        histogram.add(0.003)
+        histogram.add(100.0)
+
+        self.assertEqual(histogram.count, 4)
+        self.assertEqual(histogram.buckets[0], 1)
+        self.assertEqual(histogram.buckets[2], 2)
+        self.assertEqual(histogram.buckets[-1], 1)
+        self.assertEqual(histogram.percentile(50), 4.0)
+        self.assertEqual(histogram.percentile(100), 100000.0)
+
+    def test_disabled(self):
+        """Test nothing recorded if instrumentation is disabled"""
+        instrumentation = StageInstrumentation(enabled=False)
+        stopwatch = instrumentation.stopwatch()
+        stopwatch.lap(StageInstrumentation.EXPRESSION)
+        with instrumentation.stage(StageInstrumentation.SINK):
+            pass
+        instrumentation.record(StageInstrumentation.REQUEST, 1.0)
+
+        self.assertEqual(instrumentation.histograms(), {})
+        self.assertEqual(instrumentation.report(), "")
+
+    def test_enabled(self):
+        """Test stages recorded and reported"""
+        instrumentation = StageInstrumentation(enabled=True, name="test")
+        stopwatch = instrumentation.stopwatch()
+        stopwatch.lap(StageInstrumentation.EXPRESSION)
+        stopwatch.lap(StageInstrumentation.REQUEST)
+        with instrumentation.stage(StageInstrumentation.SINK):
+            pass
+        instrumentation.record(StageInstrumentation.REQUEST, 0.5)
+
+        histograms = instrumentation.histograms()
+        self.assertEqual(histograms[StageInstrumentation.EXPRESSION].count, 1)
+        self.assertEqual(histograms[StageInstrumentation.REQUEST].count, 2)
+        self.assertEqual(histograms[StageInstrumentation.SINK].count, 1)
+
+        report = instrumentation.report()
+        self.assertIn("test", report)
+        for stage in [
+            StageInstrumentation.EXPRESSION,
+            StageInstrumentation.REQUEST,
+            StageInstrumentation.SINK,
+        ]:
+            self.assertIn(stage, report)
+        self.assertNotIn(StageInstrumentation.DECODE, report)
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m unittest tests.qgis.test_log_handler
+"""
+
+# standard library
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# PyQGIS
+from qgis.core import Qgis
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.log_handler import PlgLogBuffer
+from gpf_isochrone_isodistance_itineraire.toolbelt.preferences import (
+    PREFIX_ENV_VARIABLE,
+)
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestPlgLogBuffer(unittest.TestCase):
+    def _write_messages(self, log_file: Path, env: dict) -> None:
+        """Queue test messages and wait for buffer write
+
+        :param log_file: log file path
+        :type log_file: Path
+        :param env: environment variables used for settings
+        :type env: dict
+        """
+        log_buffer = PlgLogBuffer(log_file=log_file)
+        with patch.dict(os.environ, env, clear=True):
+            log_buffer.put("info message", "test", Qgis.MessageLevel.Info)
+            log_buffer.put("warning message", "test", Qgis.MessageLevel.Warning)
+            log_buffer.put(
+                "notified message", "test", Qgis.MessageLevel.Info, notify_user=True
+            )
+            self.assertTrue(log_buffer.flush())
+        log_buffer.stop()
+
+    def test_log_file(self):
+        """Test messages written in log file, filtered by debug mode"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_file = Path(tmp_dir) / "plugin.log"
+            self._write_messages(
+                log_file,
+                {
+                    f"{PREFIX_ENV_VARIABLE}LOG_TO_FILE": "true",
+                    f"{PREFIX_ENV_VARIABLE}DEBUG_MODE": "false",
+                },
+            )
+
+            content = log_file.read_text(encoding="UTF-8")
+            self.assertNotIn("info message", content)
+            self.assertIn("warning message", content)
+            self.assertIn("notified message", content)
+
+    def test_log_file_debug_mode(self):
+        """Test all messages written in log file in debug mode"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_file = Path(tmp_dir) / "plugin.log"
+            self._write_messages(
+                log_file,
+                {
+                    f"{PREFIX_ENV_VARIABLE}LOG_TO_FILE": "true",
+                    f"{PREFIX_ENV_VARIABLE}DEBUG_MODE": "true",
+                },
+            )
+
+            content = log_file.read_text(encoding="UTF-8")
+            self.assertIn("info message", content)
+            self.assertIn("warning message", content)
+
+    def test_log_file_disabled(self):
+        """Test no log file created if disabled in settings"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_file = Path(tmp_dir) / "plugin.log"
+            self._write_messages(
+                log_file, {f"{PREFIX_ENV_VARIABLE}LOG_TO_FILE": "false"}
+            )
+            self.assertFalse(log_file.exists())
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m unittest tests.qgis.test_network_requests
+"""
+
+# standard library
+import time
+import unittest
+from email.utils import formatdate
+
+# PyQGIS
+from qgis.core import QgsBlockingNetworkRequest
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    RequestResult,
+    RetryPolicy,
+    canonical_request_url,
+    parse_retry_after,
+)
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestNetworkRequests(unittest.TestCase):
+    def test_canonical_request_url(self):
+        """Test equivalent request urls have the same canonical form"""
+        url = (
+            "https://data.geopf.fr/navigation/isochrone?point=2.35,48.85"
+            "&resource=bdtopo-valhalla&profile=car&costValue=600"
+        )
+        equivalent_urls = [
+            url,
+            "HTTPS://Data.Geopf.fr/navigation//isochrone?costValue=600"
+            "&profile=car&resource=bdtopo-valhalla&point=2.35%2C48.85",
+            f"  {url}  ",
+        ]
+        canonical = canonical_request_url(url)
+        for equivalent_url in equivalent_urls:
+            self.assertEqual(canonical_request_url(equivalent_url), canonical)
+
+        self.assertNotEqual(
+            canonical_request_url(url.replace("costValue=600", "costValue=900")),
+            canonical,
+        )
+        self.assertNotEqual(
+            canonical_request_url(url + "&costValue=900"),
+            canonical,
+        )
+
+    def test_parse_retry_after(self):
+        """Test Retry-After header parsing, in seconds or as HTTP date"""
+        self.assertEqual(parse_retry_after("2"), 2.0)
+        self.assertEqual(parse_retry_after(" 0.5 "), 0.5)
+        self.assertEqual(parse_retry_after(""), 0.0)
+        self.assertEqual(parse_retry_after("-1"), 0.0)
+        self.assertEqual(parse_retry_after("soon"), 0.0)
+        self.assertAlmostEqual(
+            parse_retry_after(formatdate(time.time() + 30, usegmt=True)), 30, delta=2
+        )
+
+    def test_retry_policy(self):
+        """Test only transient errors are retried, after Retry-After or backoff delay"""
+
+        def result(status_code: int, retry_after: float = 0.0) -> RequestResult:
+            return RequestResult(
+                url="",
+                error_code=QgsBlockingNetworkRequest.ErrorCode.ServerExceptionError,
+                error_message="error",
+                content=b"",
+                content_type=b"",
+                latency=0.1,
+                status_code=status_code,
+                retry_after=retry_after,
+            )
+
+        policy = RetryPolicy(max_retries=2, backoff_s=1.0, max_delay_s=3.0)
+        for status_code in [429, 502, 503, 504]:
+            self.assertTrue(policy.should_retry(result(status_code), 0))
+        self.assertFalse(policy.should_retry(result(429), 2))
+        self.assertFalse(policy.should_retry(result(500), 0))
+        self.assertFalse(policy.should_retry(result(400), 0))
+
+        self.assertEqual(policy.delay(result(429, retry_after=2), 0), 2)
+        self.assertEqual(policy.delay(result(429, retry_after=60), 0), 3)
+        self.assertTrue(0.5 <= policy.delay(result(503), 0) <= 1.0)
+        self.assertTrue(1.0 <= policy.delay(result(503), 1) <= 2.0)
+        self.assertTrue(1.5 <= policy.delay(result(503), 5) <= 3.0)
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
@@ -44,6 +44,54 @@ class TestPlgPreferences(unittest.TestCase):
         self.assertIsInstance(settings.version, str)
         self.assertEqual(settings.version, __version__)
 
+        # logs
+        self.assertTrue(hasattr(settings, "log_to_file"))
+        self.assertIsInstance(settings.log_to_file, bool)
+        self.assertEqual(settings.log_to_file, False)
+
+        # profiling
+        self.assertTrue(hasattr(settings, "profiling_enabled"))
+        self.assertIsInstance(settings.profiling_enabled, bool)
+        self.assertEqual(settings.profiling_enabled, False)
+        self.assertTrue(hasattr(settings, "profiling_memory"))
+        self.assertIsInstance(settings.profiling_memory, bool)
+        self.assertEqual(settings.profiling_memory, False)
+
+        # concurrent requests
+        self.assertTrue(hasattr(settings, "max_buffered_memory_mb"))
+        self.assertIsInstance(settings.max_buffered_memory_mb, int)
+        self.assertEqual(settings.max_buffered_memory_mb, 256)
+        self.assertTrue(hasattr(settings, "concurrency_auto_tuning"))
+        self.assertIsInstance(settings.concurrency_auto_tuning, bool)
+        self.assertEqual(settings.concurrency_auto_tuning, True)
+        self.assertTrue(hasattr(settings, "min_concurrency"))
+        self.assertIsInstance(settings.min_concurrency, int)
+        self.assertEqual(settings.min_concurrency, 1)
+        self.assertTrue(hasattr(settings, "max_retries"))
+        self.assertIsInstance(settings.max_retries, int)
+        self.assertEqual(settings.max_retries, 3)
+        self.assertTrue(hasattr(settings, "max_connections"))
+        self.assertIsInstance(settings.max_connections, int)
+        self.assertEqual(settings.max_connections, 16)
+        self.assertTrue(hasattr(settings, "rate_limit"))
+        self.assertIsInstance(settings.rate_limit, float)
+        self.assertEqual(settings.rate_limit, 0.0)
+        self.assertTrue(hasattr(settings, "response_cache_mb"))
+        self.assertIsInstance(settings.response_cache_mb, int)
+        self.assertEqual(settings.response_cache_mb, 0)
+        self.assertTrue(hasattr(settings, "circuit_breaker_threshold"))
+        self.assertIsInstance(settings.circuit_breaker_threshold, int)
+        self.assertEqual(settings.circuit_breaker_threshold, 5)
+        self.assertTrue(hasattr(settings, "circuit_breaker_probe_interval"))
+        self.assertIsInstance(settings.circuit_breaker_probe_interval, int)
+        self.assertEqual(settings.circuit_breaker_probe_interval, 10)
+        self.assertTrue(hasattr(settings, "circuit_breaker_fail_fast"))
+        self.assertIsInstance(settings.circuit_breaker_fail_fast, bool)
+        self.assertFalse(settings.circuit_breaker_fail_fast)
+        self.assertTrue(hasattr(settings, "max_host_connections"))
+        self.assertIsInstance(settings.max_host_connections, int)
+        self.assertEqual(settings.max_host_connections, 0)
+
     def test_bool_env_variable(self):
         """Test settings with environment value."""
         manager = PlgOptionsManager()
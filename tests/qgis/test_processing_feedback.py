@@ -0,0 +1,112 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m unittest tests.qgis.test_processing_feedback
+"""
+
+# standard library
+import unittest
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.processing_feedback import (
+    QTextEditProcessingFeedBack,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.txt_processing_run import (
+    ProcessingRunTextEdit,
+)
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestProcessingFeedback(unittest.TestCase):
+    def setUp(self):
+        """Create a run text edit with its feedback"""
+        self.text_edit = ProcessingRunTextEdit()
+        self.feedback = QTextEditProcessingFeedBack(self.text_edit)
+
+    def tearDown(self):
+        """Stop feedback display timer"""
+        self.feedback.finish()
+
+    def test_flush_batch(self):
+        """Test pushed lines are displayed only when flushed, in a single batch"""
+        self.feedback.pushInfo("first")
+        self.feedback.pushWarning("second")
+        self.feedback.reportError("third")
+        self.assertEqual(self.text_edit.toPlainText(), "")
+
+        self.feedback.flush()
+        self.assertEqual(self.text_edit.toPlainText(), "first\nsecond\nthird")
+
+        self.feedback.flush()
+        self.assertEqual(self.text_edit.document().blockCount(), 3)
+
+    def test_max_lines(self):
+        """Test oldest lines are dropped when more than MAX_LINES are displayed"""
+        max_lines = QTextEditProcessingFeedBack.MAX_LINES
+        for i in range(max_lines):
+            self.feedback.pushInfo(f"line {i}")
+        self.feedback.flush()
+        for i in range(max_lines, max_lines + 10):
+            self.feedback.pushInfo(f"line {i}")
+        self.feedback.flush()
+
+        lines = self.text_edit.toPlainText().split("\n")
+        self.assertEqual(self.text_edit.document().blockCount(), max_lines)
+        self.assertEqual(len(lines), max_lines)
+        self.assertEqual(lines[0], "line 10")
+        self.assertEqual(lines[-1], f"line {max_lines + 9}")
+
+    def test_command_summary(self):
+        """Test commands are replaced by a summary line"""
+        for i in range(3):
+            self.feedback.pushCommandInfo(f"request : https://service/{i}")
+        self.feedback.pushInfo("done")
+        self.feedback.finish()
+
+        text = self.text_edit.toPlainText()
+        self.assertNotIn("https://service", text)
+        lines = text.split("\n")
+        self.assertEqual(lines[0], "done")
+        self.assertTrue(lines[1].startswith("Requêtes : 3 ("))
+
+        # No new summary line without new command
+        self.feedback.finish()
+        self.assertEqual(self.text_edit.document().blockCount(), 2)
+
+    def test_errors_only(self):
+        """Test display filter hides lines other than errors and shows them again"""
+        self.text_edit._feedback = self.feedback
+        self.feedback.pushInfo("info")
+        self.feedback.reportError("error")
+        self.feedback.pushWarning("warning")
+        self.feedback.flush()
+
+        self.text_edit.set_errors_only(True)
+        self.assertEqual(self.text_edit.toPlainText(), "error")
+
+        # Lines flushed while filter is active are filtered too
+        self.feedback.pushInfo("other info")
+        self.feedback.reportError("other error")
+        self.feedback.flush()
+        self.assertEqual(self.text_edit.toPlainText(), "error\nother error")
+
+        self.text_edit.set_errors_only(False)
+        self.assertEqual(
+            self.text_edit.toPlainText(),
+            "info\nerror\nwarning\nother info\nother error",
+        )
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
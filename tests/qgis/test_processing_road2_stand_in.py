@@ -0,0 +1,449 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m pytest tests/qgis/test_processing_road2_stand_in.py
+"""
+
+# standard library
+from typing import Any, Dict, List, Optional, Tuple
+
+# 3rd party
+import pytest
+
+# PyQGIS
+from qgis import processing
+from qgis.core import (
+    QgsFeature,
+    QgsGeometry,
+    QgsPointXY,
+    QgsProcessingContext,
+    QgsProcessingFeedback,
+    QgsVectorLayer,
+)
+
+# project
+from gpf_isochrone_isodistance_itineraire.processing.get_capabities_parser import (
+    download_getcapabilities,
+)
+from gpf_isochrone_isodistance_itineraire.processing.gpf_iso_service import (
+    GpfIsoServiceProcessing,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.run_history import RunHistory
+from tests.road2_stand_in import Road2StandIn, Road2StandInConfig
+
+# ############################################################################
+# ########## Functions ###########
+# ################################
+
+
+def create_points_layer(points: List[Tuple[float, float]]) -> QgsVectorLayer:
+    """Create a memory point layer in EPSG:4326
+
+    :param points: point coordinates
+    :type points: List[Tuple[float, float]]
+    :return: point layer
+    :rtype: QgsVectorLayer
+    """
+    layer = QgsVectorLayer("Point?crs=EPSG:4326&field=name:string", "points", "memory")
+    features = []
+    for i, (x, y) in enumerate(points):
+        feature = QgsFeature(layer.fields())
+        feature.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(x, y)))
+        feature.setAttribute("name", f"point_{i}")
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    return layer
+
+
+def run_isochrone(
+    road2_stand_in: Road2StandIn,
+    layer: QgsVectorLayer,
+    parameters: Optional[Dict[str, Any]] = None,
+) -> Tuple[QgsVectorLayer, dict]:
+    """Run isochrone processing on stand-in service
+
+    :param road2_stand_in: Road2 stand-in
+    :type road2_stand_in: Road2StandIn
+    :param layer: input layer
+    :type layer: QgsVectorLayer
+    :param parameters: additional algorithm parameters, defaults to None
+    :type parameters: Optional[Dict[str, Any]], optional
+    :return: output layer and algorithm results, with output layers
+    :rtype: Tuple[QgsVectorLayer, dict]
+    """
+    context = QgsProcessingContext()
+    alg_parameters = {
+        "INPUT": layer,
+        "URL_SERVICE": road2_stand_in.url,
+        "ID_RESOURCE": "'bdtopo-valhalla'",
+        "PROFILE": "'car'",
+        "DIRECTION": "'departure'",
+        "MAX_COST": "600",
+        "OUTPUT": "TEMPORARY_OUTPUT",
+    }
+    alg_parameters.update(parameters or {})
+    results = processing.run(
+        "gpf_isochrone_isodistance_itineraire:isochrone_processing",
+        alg_parameters,
+        context=context,
+        feedback=QgsProcessingFeedback(),
+    )
+    for name, value in results.items():
+        if isinstance(value, str) and context.getMapLayer(value):
+            results[name] = context.getMapLayer(value)
+    return results["OUTPUT"], results
+
+
+# ############################################################################
+# ########## Tests ###############
+# ################################
+
+POINTS = [(2.35, 48.85), (4.83, 45.76), (5.37, 43.29), (-1.55, 47.21)]
+
+
+def test_download_getcapabilities(road2_stand_in: Road2StandIn):
+    """Test getcapabilities downloaded from stand-in"""
+    capabilities = download_getcapabilities(road2_stand_in.url, forceRefresh=True)
+    assert capabilities == road2_stand_in.capabilities
+
+
+def test_isochrone_processing(plugin_provider, road2_stand_in: Road2StandIn):
+    """Test isochrone processing against stand-in"""
+    output, results = run_isochrone(road2_stand_in, create_points_layer(POINTS))
+
+    assert output.featureCount() == len(POINTS)
+    assert road2_stand_in.operation_count("isochrone") == len(POINTS)
+    assert results["REQUEST_COUNT"] == len(POINTS)
+    for feature in output.getFeatures():
+        assert feature.geometry().contains(
+            QgsGeometry.fromPointXY(QgsPointXY(feature["x"], feature["y"]))
+        )
+
+
+def test_isochrone_processing_url_service_expression(
+    plugin_provider, road2_stand_in: Road2StandIn
+):
+    """Test url service evaluated for each feature, with pre-flight validation"""
+    with Road2StandIn(Road2StandInConfig()) as other_service:
+        url_service = (
+            f"if(\"name\" = 'point_0', '{other_service.url}', '{road2_stand_in.url}')"
+        )
+        output, results = run_isochrone(
+            road2_stand_in,
+            create_points_layer(POINTS),
+            {"URL_SERVICE": url_service, "PREFLIGHT": 1},
+        )
+        assert output.featureCount() == len(POINTS)
+        assert results["FAILED_COUNT"] == 0
+        assert other_service.operation_count("isochrone") == 1
+        assert road2_stand_in.operation_count("isochrone") == len(POINTS) - 1
+
+        # Run of several services not recorded in run history, neither for the
+        # expression nor for a service
+        run_history = RunHistory()
+        for key in [url_service, other_service.url, road2_stand_in.url]:
+            assert run_history.get_runs("isochrone_processing", key) == []
+
+        # Run of a single service recorded for its url
+        run_isochrone(
+            road2_stand_in,
+            create_points_layer(POINTS[1:]),
+            {"URL_SERVICE": url_service},
+        )
+        assert run_history.get_runs("isochrone_processing", url_service) == []
+        assert (
+            len(run_history.get_runs("isochrone_processing", road2_stand_in.url)) == 1
+        )
+
+        # Fixed url as string literal
+        sent_count = road2_stand_in.operation_count("isochrone")
+        output, results = run_isochrone(
+            road2_stand_in,
+            create_points_layer(POINTS),
+            {"URL_SERVICE": f"'{other_service.url}'"},
+        )
+        assert output.featureCount() == len(POINTS)
+        assert results["FAILED_COUNT"] == 0
+        assert road2_stand_in.operation_count("isochrone") == sent_count
+        assert len(run_history.get_runs("isochrone_processing", other_service.url)) == 1
+
+
+def test_url_service_uses_feature():
+    """Test url service expressions evaluated for each feature are detected"""
+    for url_service in [
+        "https://data.geopf.fr/navigation",
+        "'https://data.geopf.fr/navigation'",
+        "'https://data.geopf.fr/navigation;https://mirror.example.org/navigation'",
+        "concat('https://', @host, '/navigation')",
+    ]:
+        assert not GpfIsoServiceProcessing._uses_feature(url_service)
+
+    for url_service in [
+        '"url_service"',
+        "if(\"name\" = 'point_0', 'https://a.example.org', 'https://b.example.org')",
+        "attribute(@feature, 'url_service')",
+        "if(x($geometry) > 0, 'https://a.example.org', 'https://b.example.org')",
+    ]:
+        assert GpfIsoServiceProcessing._uses_feature(url_service)
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in", [Road2StandInConfig(error_rate=0.5, seed=1)], indirect=True
+)
+def test_isochrone_processing_errors(plugin_provider, road2_stand_in: Road2StandIn):
+    """Test isochrone processing with service errors: failed points are skipped"""
+    output, results = run_isochrone(road2_stand_in, create_points_layer(POINTS * 5))
+
+    failed = len([req for req in road2_stand_in.requests if req[2] != 200])
+    assert failed > 0
+    assert output.featureCount() == len(POINTS) * 5 - failed
+    assert results["ERROR_COUNT"] == failed
+
+
+def test_itinerary_processing(plugin_provider, road2_stand_in: Road2StandIn):
+    """Test itinerary processing against stand-in"""
+    context = QgsProcessingContext()
+    results = processing.run(
+        "gpf_isochrone_isodistance_itineraire:itinerary",
+        {
+            "URL_SERVICE": road2_stand_in.url,
+            "ID_RESOURCE": "bdtopo-osrm",
+            "START": "2.35,48.85 [EPSG:4326]",
+            "END": "4.83,45.76 [EPSG:4326]",
+            "PROFILE": "car",
+            "OPTIMIZATION": "fastest",
+            "OUTPUT": "TEMPORARY_OUTPUT",
+        },
+        context=context,
+        feedback=QgsProcessingFeedback(),
+    )
+    output = results["OUTPUT"]
+    if isinstance(output, str):
+        output = context.getMapLayer(output)
+
+    assert output.featureCount() == 1
+    feature = next(output.getFeatures())
+    assert feature["distance"] > 0
+    assert feature["duration"] > 0
+    assert road2_stand_in.operation_count("itineraire") == 1
+
+
+def test_itinerary_processing_leg_mode(
+    plugin_provider, road2_stand_in: Road2StandIn, monkeypatch
+):
+    """Test itinerary legs are requested separately and read from cache"""
+    monkeypatch.setenv(
+        "QGIS_GPF_ISOCHRONE_ISODISTANCE_ITINERAIRE_RESPONSE_CACHE_MB", "8"
+    )
+    parameters = {
+        "URL_SERVICE": road2_stand_in.url,
+        "ID_RESOURCE": "bdtopo-osrm",
+        "START": "2.35,48.85 [EPSG:4326]",
+        "END": "4.83,45.76 [EPSG:4326]",
+        "INTERMEDIATES": create_points_layer([(3.05, 47.5), (4.2, 46.6)]),
+        "PROFILE": "car",
+        "OPTIMIZATION": "fastest",
+        "OUTPUT": "TEMPORARY_OUTPUT",
+    }
+
+    def run_itinerary(leg_mode: bool) -> QgsFeature:
+        context = QgsProcessingContext()
+        results = processing.run(
+            "gpf_isochrone_isodistance_itineraire:itinerary",
+            {**parameters, "LEG_MODE": leg_mode},
+            context=context,
+            feedback=QgsProcessingFeedback(),
+        )
+        output = results["OUTPUT"]
+        if isinstance(output, str):
+            output = context.getMapLayer(output)
+        assert output.featureCount() == 1
+        return next(output.getFeatures())
+
+    itinerary = run_itinerary(leg_mode=False)
+    assert road2_stand_in.operation_count("itineraire") == 1
+
+    legs = run_itinerary(leg_mode=True)
+    assert road2_stand_in.operation_count("itineraire") == 4
+    assert legs["distance"] == pytest.approx(itinerary["distance"], abs=1.0)
+    assert legs["duration"] == pytest.approx(itinerary["duration"], abs=1.0)
+    assert legs["intermediates"] == itinerary["intermediates"]
+    assert legs.geometry().constGet().startPoint().x() == pytest.approx(2.35)
+    assert legs.geometry().constGet().endPoint().x() == pytest.approx(4.83)
+
+    # Only legs next to the moved end point are requested again
+    parameters["END"] = "4.85,45.75 [EPSG:4326]"
+    run_itinerary(leg_mode=True)
+    assert road2_stand_in.operation_count("itineraire") == 5
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in", [Road2StandInConfig(error_rate=0.5, seed=1)], indirect=True
+)
+def test_isochrone_processing_failed_output(
+    plugin_provider, road2_stand_in: Road2StandIn
+):
+    """Test failed input features are written with error category and message"""
+    # Last point is outside resource bbox
+    points = POINTS * 5 + [(150.0, -40.0)]
+    output, results = run_isochrone(
+        road2_stand_in,
+        create_points_layer(points),
+        {"FAILED_OUTPUT": "TEMPORARY_OUTPUT"},
+    )
+
+    failed_layer = results["FAILED_OUTPUT"]
+    failed_requests = len([req for req in road2_stand_in.requests if req[2] != 200])
+    assert failed_requests > 0
+    assert results["FAILED_COUNT"] == failed_requests + 1
+    assert failed_layer.featureCount() == failed_requests + 1
+    assert output.featureCount() + failed_layer.featureCount() == len(points)
+
+    categories = [f["error_category"] for f in failed_layer.getFeatures()]
+    assert categories.count("invalid_input") == 1
+    assert categories.count("service_error") == failed_requests
+    for feature in failed_layer.getFeatures():
+        assert feature["error_message"]
+        assert feature["name"].startswith("point_")
+        assert not feature.geometry().isNull()
+
+
+def test_isochrone_processing_without_failed_output(
+    plugin_provider, road2_stand_in: Road2StandIn
+):
+    """Test failed features output is not created by default"""
+    _, results = run_isochrone(
+        road2_stand_in, create_points_layer(POINTS + [(150.0, -40.0)])
+    )
+    assert not results.get("FAILED_OUTPUT")
+    assert results["FAILED_COUNT"] == 1
+
+
+def test_isochrone_processing_previous_output(
+    plugin_provider, road2_stand_in: Road2StandIn
+):
+    """Test features of previous output are reused without request"""
+    previous_output, _ = run_isochrone(road2_stand_in, create_points_layer(POINTS))
+    assert road2_stand_in.operation_count("isochrone") == len(POINTS)
+
+    new_points = [(3.06, 50.63), (7.75, 48.57)]
+    output, results = run_isochrone(
+        road2_stand_in,
+        create_points_layer(POINTS + new_points),
+        {"PREVIOUS_OUTPUT": previous_output},
+    )
+
+    assert road2_stand_in.operation_count("isochrone") == len(POINTS) + len(new_points)
+    assert results["REUSED_COUNT"] == len(POINTS)
+    assert results["REQUEST_COUNT"] == len(new_points)
+    assert output.featureCount() == len(POINTS) + len(new_points)
+
+    previous_geometries = {
+        f["request"]: f.geometry() for f in previous_output.getFeatures()
+    }
+    for feature in output.getFeatures():
+        if feature["request"] in previous_geometries:
+            assert feature.geometry().equals(previous_geometries[feature["request"]])
+        assert feature["name"].startswith("point_")
+
+
+@pytest.mark.parametrize("preflight", [1, 2])
+def test_isochrone_processing_preflight_invalid(
+    plugin_provider, road2_stand_in: Road2StandIn, preflight: int
+):
+    """Test no request is sent if pre-flight validation finds an invalid feature"""
+    output, results = run_isochrone(
+        road2_stand_in,
+        create_points_layer(POINTS + [(150.0, -40.0)]),
+        {"PREFLIGHT": preflight, "FAILED_OUTPUT": "TEMPORARY_OUTPUT"},
+    )
+
+    assert road2_stand_in.operation_count("isochrone") == 0
+    assert output.featureCount() == 0
+    assert results["FAILED_COUNT"] == 1
+    failed = next(results["FAILED_OUTPUT"].getFeatures())
+    assert failed["name"] == f"point_{len(POINTS)}"
+    assert failed["error_category"] == "invalid_input"
+
+
+def test_isochrone_processing_preflight(plugin_provider, road2_stand_in: Road2StandIn):
+    """Test requests are sent after a successful pre-flight validation, except in
+    validation only mode"""
+    _, results = run_isochrone(
+        road2_stand_in, create_points_layer(POINTS), {"PREFLIGHT": 2}
+    )
+    assert road2_stand_in.operation_count("isochrone") == 0
+    assert results["FAILED_COUNT"] == 0
+
+    output, _ = run_isochrone(
+        road2_stand_in, create_points_layer(POINTS), {"PREFLIGHT": 1}
+    )
+    assert road2_stand_in.operation_count("isochrone") == len(POINTS)
+    assert output.featureCount() == len(POINTS)
+
+
+def test_isochrone_processing_preflight_expression(
+    plugin_provider, road2_stand_in: Road2StandIn
+):
+    """Test pre-flight validation evaluates expressions for each feature"""
+    _, results = run_isochrone(
+        road2_stand_in,
+        create_points_layer(POINTS),
+        {
+            "ID_RESOURCE": "if(\"name\" = 'point_1', 'unknown', 'bdtopo-valhalla')",
+            "PREFLIGHT": 2,
+            "FAILED_OUTPUT": "TEMPORARY_OUTPUT",
+        },
+    )
+
+    assert road2_stand_in.operation_count("isochrone") == 0
+    assert results["FAILED_COUNT"] == 1
+    failed = next(results["FAILED_OUTPUT"].getFeatures())
+    assert failed["name"] == "point_1"
+    assert failed["error_category"] == "invalid_input"
+
+
+def test_isochrone_processing_dry_run(plugin_provider, road2_stand_in: Road2StandIn):
+    """Test dry run reports requests without calling the service"""
+    previous_output, _ = run_isochrone(road2_stand_in, create_points_layer(POINTS[:1]))
+
+    points = POINTS + POINTS[1:2] + [(150.0, -40.0)]
+    output, results = run_isochrone(
+        road2_stand_in,
+        create_points_layer(points),
+        {"DRY_RUN": True, "PREVIOUS_OUTPUT": previous_output},
+    )
+
+    assert road2_stand_in.operation_count("isochrone") == 1
+    assert output.featureCount() == 0
+    assert results["UNIQUE_REQUEST_COUNT"] == len(POINTS) - 1
+    assert results["DUPLICATE_REQUEST_COUNT"] == 1
+    assert results["CACHED_REQUEST_COUNT"] == 0
+    assert results["FAILED_COUNT"] == 1
+    assert results["REQUEST_COUNT"] == 0
+    assert results["ESTIMATED_DURATION"] >= 0
+
+
+def test_isochrone_processing_dry_run_cache(
+    plugin_provider, road2_stand_in: Road2StandIn, monkeypatch
+):
+    """Test dry run counts requests available in response cache apart"""
+    monkeypatch.setenv(
+        "QGIS_GPF_ISOCHRONE_ISODISTANCE_ITINERAIRE_RESPONSE_CACHE_MB", "8"
+    )
+    run_isochrone(road2_stand_in, create_points_layer(POINTS[:2]))
+
+    _, results = run_isochrone(
+        road2_stand_in,
+        create_points_layer(POINTS + POINTS[:1]),
+        {"DRY_RUN": True},
+    )
+    assert road2_stand_in.operation_count("isochrone") == 2
+    assert results["CACHED_REQUEST_COUNT"] == 3
+    assert results["UNIQUE_REQUEST_COUNT"] == len(POINTS) - 2
+    assert results["DUPLICATE_REQUEST_COUNT"] == 0
@@ -0,0 +1,69 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m unittest tests.qgis.test_profiling
+"""
+
+# standard library
+import pstats
+import tempfile
+import tracemalloc
+import unittest
+from pathlib import Path
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.profiling import profile_run
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestProfiling(unittest.TestCase):
+    def test_profile_run(self):
+        """Test profile written without memory snapshot"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_dir = Path(tmp_dir)
+            with profile_run("test", output_dir=output_dir):
+                sum(range(1000))
+
+            profiles = list(output_dir.glob("test_*.prof"))
+            self.assertEqual(len(profiles), 1)
+            self.assertIsInstance(pstats.Stats(str(profiles[0])), pstats.Stats)
+            self.assertEqual(list(output_dir.glob("*.tracemalloc")), [])
+
+    def test_profile_run_memory(self):
+        """Test profile and memory snapshot written"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_dir = Path(tmp_dir)
+            with profile_run("test", memory=True, output_dir=output_dir):
+                [str(i) for i in range(1000)]
+
+            self.assertFalse(tracemalloc.is_tracing())
+            snapshots = list(output_dir.glob("test_*.tracemalloc"))
+            self.assertEqual(len(snapshots), 1)
+            snapshot = tracemalloc.Snapshot.load(str(snapshots[0]))
+            self.assertIsInstance(snapshot, tracemalloc.Snapshot)
+
+    def test_nested_profile_run(self):
+        """Test nested run is not profiled separately"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_dir = Path(tmp_dir)
+            with profile_run("outer", output_dir=output_dir):
+                with profile_run("inner", output_dir=output_dir):
+                    sum(range(1000))
+
+            self.assertEqual(len(list(output_dir.glob("outer_*.prof"))), 1)
+            self.assertEqual(list(output_dir.glob("inner_*.prof")), [])
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m unittest tests.qgis.test_reorder_buffer
+"""
+
+# standard library
+import unittest
+from typing import List
+
+# PyQGIS
+from qgis.core import QgsFeature, QgsFeatureSink
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.reorder_buffer import ReorderBuffer
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class RecordingSink:
+    """Sink recording written batches"""
+
+    def __init__(self, success: bool = True) -> None:
+        self.batches: List[List[int]] = []
+        self.flags: List[QgsFeatureSink.Flag] = []
+        self.success = success
+
+    def addFeatures(self, features: List[QgsFeature], flags) -> bool:
+        self.batches.append([f.id() for f in features])
+        self.flags.append(flags)
+        return self.success
+
+    @property
+    def ids(self) -> List[int]:
+        return [fid for batch in self.batches for fid in batch]
+
+
+def _features(index: int, count: int = 1) -> List[QgsFeature]:
+    """Create features with id index * 10 + i
+
+    :param index: input index
+    :type index: int
+    :param count: number of features, defaults to 1
+    :type count: int, optional
+    :return: features
+    :rtype: List[QgsFeature]
+    """
+    features = []
+    for i in range(count):
+        feature = QgsFeature()
+        feature.setId(index * 10 + i)
+        features.append(feature)
+    return features
+
+
+class TestReorderBuffer(unittest.TestCase):
+    def test_ordered(self):
+        """Test features are written in input order, with batches"""
+        sink = RecordingSink()
+        buffer = ReorderBuffer(sink, batch_size=3)
+
+        self.assertTrue(buffer.push(2, _features(2)))
+        self.assertTrue(buffer.push(1, _features(1, 2)))
+        self.assertEqual(sink.ids, [])
+        self.assertEqual(buffer.buffered_features, 3)
+
+        self.assertTrue(buffer.push(0, []))
+        self.assertEqual(sink.batches, [[10, 11, 20]])
+        self.assertEqual(buffer.buffered_features, 0)
+
+        self.assertTrue(buffer.push(3, _features(3)))
+        self.assertEqual(len(sink.batches), 1)
+        self.assertTrue(buffer.flush())
+        self.assertEqual(sink.ids, [10, 11, 20, 30])
+        self.assertEqual(buffer.written_count, 4)
+        self.assertTrue(
+            all(flag == QgsFeatureSink.Flag.FastInsert for flag in sink.flags)
+        )
+
+    def test_unordered(self):
+        """Test features are written in completion order"""
+        sink = RecordingSink()
+        buffer = ReorderBuffer(sink, ordered=False, batch_size=1)
+
+        buffer.push(2, _features(2))
+        buffer.push(0, _features(0))
+        buffer.push(1, _features(1))
+
+        self.assertEqual(sink.ids, [20, 0, 10])
+        self.assertEqual(buffer.peak_buffered_features, 0)
+
+    def test_limits(self):
+        """Test buffer is full when features or bytes limit is reached"""
+        buffer = ReorderBuffer(RecordingSink(), max_features=2, max_bytes=100)
+
+        buffer.push(1, _features(1), size_bytes=10)
+        self.assertFalse(buffer.is_full())
+        buffer.push(2, _features(2), size_bytes=10)
+        self.assertTrue(buffer.is_full())
+        buffer.push(0, _features(0), size_bytes=10)
+        self.assertFalse(buffer.is_full())
+
+        buffer.push(4, [], size_bytes=200)
+        self.assertTrue(buffer.is_full())
+        self.assertEqual(buffer.peak_buffered_bytes, 200)
+
+    def test_flush_skip_missing(self):
+        """Test partial flush writes features after missing indexes in order"""
+        sink = RecordingSink()
+        buffer = ReorderBuffer(sink)
+
+        buffer.push(3, _features(3))
+        buffer.push(1, _features(1))
+        self.assertTrue(buffer.flush())
+        self.assertEqual(sink.ids, [])
+
+        self.assertTrue(buffer.flush(skip_missing=True))
+        self.assertEqual(sink.ids, [10, 30])
+        self.assertFalse(buffer.is_full())
+
+    def test_write_error(self):
+        """Test sink write error is returned"""
+        buffer = ReorderBuffer(RecordingSink(success=False), batch_size=1)
+        self.assertFalse(buffer.push(0, _features(0)))
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
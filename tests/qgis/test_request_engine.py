@@ -0,0 +1,347 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m pytest tests/qgis/test_request_engine.py
+"""
+
+# standard library
+import threading
+import time
+from typing import List
+
+# 3rd party
+import pytest
+
+# PyQGIS
+from qgis.core import QgsFeature, QgsFeedback
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.concurrency_controller import (
+    AimdConcurrencyController,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    RequestResult,
+    RetryPolicy,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.reorder_buffer import ReorderBuffer
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_engine import (
+    ConcurrentRequestEngine,
+    RequestJob,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_statistics import (
+    RequestStatistics,
+)
+from tests.road2_stand_in import Road2StandIn, Road2StandInConfig
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class RecordingSink:
+    """Sink recording written feature ids"""
+
+    def __init__(self) -> None:
+        self.ids: List[int] = []
+
+    def addFeatures(self, features: List[QgsFeature], flags) -> bool:
+        self.ids.extend(f.id() for f in features)
+        return True
+
+
+# ############################################################################
+# ########## Functions ###########
+# ################################
+
+
+def create_jobs(road2_stand_in: Road2StandIn, count: int) -> List[RequestJob]:
+    """Create isochrone request jobs for stand-in
+
+    :param road2_stand_in: Road2 stand-in
+    :type road2_stand_in: Road2StandIn
+    :param count: number of jobs
+    :type count: int
+    :return: jobs
+    :rtype: List[RequestJob]
+    """
+    return [
+        RequestJob(
+            index=i,
+            url=f"{road2_stand_in.url}/isochrone?resource=bdtopo-valhalla"
+            f"&point=2.35,{45 + i * 0.01}&costValue=600&costType=time",
+        )
+        for i in range(count)
+    ]
+
+
+def create_feature(index: int) -> QgsFeature:
+    """Create a feature with index as id
+
+    :param index: job index
+    :type index: int
+    :return: feature
+    :rtype: QgsFeature
+    """
+    feature = QgsFeature()
+    feature.setId(index)
+    return feature
+
+
+def handle_result(job: RequestJob, result: RequestResult) -> List[QgsFeature]:
+    """Create a feature with job index as id
+
+    :param job: job done
+    :type job: RequestJob
+    :param result: request result
+    :type result: RequestResult
+    :return: created features
+    :rtype: List[QgsFeature]
+    """
+    assert not result.is_error
+    return [create_feature(job.index)]
+
+
+# ############################################################################
+# ########## Tests ###############
+# ################################
+
+PADDING_BYTES = 100_000
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in",
+    [Road2StandInConfig(latency=0.02, padding_bytes=PADDING_BYTES)],
+    indirect=True,
+)
+def test_engine_memory_limit(road2_stand_in: Road2StandIn):
+    """Test pending replies and unwritten features are bounded by max bytes"""
+    max_bytes = 3 * PADDING_BYTES + PADDING_BYTES // 2
+    sink = RecordingSink()
+    buffer = ReorderBuffer(sink, batch_size=1, max_bytes=max_bytes)
+    engine = ConcurrentRequestEngine(
+        concurrency=8,
+        buffer=buffer,
+        statistics=RequestStatistics(),
+        feedback=QgsFeedback(),
+        max_bytes=max_bytes,
+    )
+
+    assert engine.run(create_jobs(road2_stand_in, 30), handle_result, total=30)
+
+    assert sink.ids == list(range(30))
+    assert engine.peak_bytes <= max_bytes
+    assert 1 < road2_stand_in.max_concurrent_requests <= 3
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in", [Road2StandInConfig(latency=0.02)], indirect=True
+)
+def test_engine_without_memory_limit(road2_stand_in: Road2StandIn):
+    """Test concurrency is only bounded by number of threads without max bytes"""
+    sink = RecordingSink()
+    engine = ConcurrentRequestEngine(
+        concurrency=4,
+        buffer=ReorderBuffer(sink),
+        statistics=RequestStatistics(),
+        feedback=QgsFeedback(),
+    )
+
+    assert engine.run(create_jobs(road2_stand_in, 20), handle_result, total=20)
+
+    assert sink.ids == list(range(20))
+    assert engine.max_bytes == 0
+    assert 1 < road2_stand_in.max_concurrent_requests <= 4
+
+
+def test_is_memory_full():
+    """Test memory limit check from received response sizes"""
+    engine = ConcurrentRequestEngine(
+        concurrency=8,
+        buffer=ReorderBuffer(RecordingSink()),
+        statistics=RequestStatistics(),
+        feedback=QgsFeedback(),
+        max_bytes=1000,
+    )
+    assert not engine.is_memory_full()
+    assert engine.response_bytes_estimate == 0
+
+    engine._received_count = 2
+    engine._received_bytes = 800
+    assert engine.response_bytes_estimate == 400
+    assert not engine.is_memory_full()
+
+    engine._pending = {object(): RequestJob(index=0)}
+    assert engine.bytes_in_flight == 400
+    assert not engine.is_memory_full()
+
+    engine._pending[object()] = RequestJob(index=1)
+    assert engine.is_memory_full()
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in", [Road2StandInConfig(latency=5.0)], indirect=True
+)
+def test_engine_cancel(road2_stand_in: Road2StandIn):
+    """Test cancellation aborts pending requests and writes partial output"""
+    sink = RecordingSink()
+    feedback = QgsFeedback()
+    engine = ConcurrentRequestEngine(
+        concurrency=8,
+        buffer=ReorderBuffer(sink),
+        statistics=RequestStatistics(),
+        feedback=feedback,
+    )
+
+    # First jobs need no request: their features are written before cancel
+    jobs = [RequestJob(index=i, features=[create_feature(i)]) for i in range(3)]
+    jobs += [
+        RequestJob(index=job.index + 3, url=job.url)
+        for job in create_jobs(road2_stand_in, 50)
+    ]
+
+    timer = threading.Timer(0.3, feedback.cancel)
+    timer.start()
+    start = time.monotonic()
+    try:
+        assert engine.run(jobs, handle_result, total=len(jobs))
+    finally:
+        timer.cancel()
+    duration = time.monotonic() - start
+
+    assert duration < 1.0
+    assert engine.canceled_count == 8
+    assert sink.ids == [0, 1, 2]
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in", [Road2StandInConfig(latency=0.01, retry_after=0)], indirect=True
+)
+def test_engine_retry(road2_stand_in: Road2StandIn):
+    """Test requests throttled or rejected by an unavailable service are sent again"""
+    road2_stand_in.push_statuses(429, 503, 429)
+    sink = RecordingSink()
+    statistics = RequestStatistics()
+    engine = ConcurrentRequestEngine(
+        concurrency=4,
+        buffer=ReorderBuffer(sink),
+        statistics=statistics,
+        feedback=QgsFeedback(),
+        retry_policy=RetryPolicy(max_retries=3, backoff_s=0.05),
+    )
+
+    assert engine.run(create_jobs(road2_stand_in, 10), handle_result, total=10)
+
+    assert sink.ids == list(range(10))
+    assert road2_stand_in.operation_count("isochrone") == 13
+    stats = statistics.as_dict()
+    assert stats[RequestStatistics.REQUEST_COUNT] == 13
+    assert stats[RequestStatistics.ERROR_COUNT] == 3
+    assert stats[RequestStatistics.RETRY_COUNT] == 3
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in", [Road2StandInConfig(retry_after=0)], indirect=True
+)
+def test_engine_retry_buffer_full(road2_stand_in: Road2StandIn):
+    """Test no input job is read while buffer is full and its missing features are
+    waiting for a retry"""
+    road2_stand_in.push_statuses(503)
+    sink = RecordingSink()
+    buffer = ReorderBuffer(sink, batch_size=1, max_features=2)
+    engine = ConcurrentRequestEngine(
+        concurrency=1,
+        buffer=buffer,
+        statistics=RequestStatistics(),
+        feedback=QgsFeedback(),
+        retry_policy=RetryPolicy(max_retries=1, backoff_s=0.2),
+    )
+
+    assert engine.run(create_jobs(road2_stand_in, 10), handle_result, total=10)
+
+    assert sink.ids == list(range(10))
+    assert road2_stand_in.operation_count("isochrone") == 11
+    assert buffer.peak_buffered_features <= 2
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in", [Road2StandInConfig(retry_after=1)], indirect=True
+)
+def test_engine_retry_after(road2_stand_in: Road2StandIn):
+    """Test Retry-After delay is respected and last result is handled when retries
+    are exhausted"""
+    road2_stand_in.push_statuses(429, 429)
+    results: List[RequestResult] = []
+
+    def handle_error(job: RequestJob, result: RequestResult) -> List[QgsFeature]:
+        results.append(result)
+        return []
+
+    engine = ConcurrentRequestEngine(
+        concurrency=2,
+        buffer=ReorderBuffer(RecordingSink()),
+        statistics=RequestStatistics(),
+        feedback=QgsFeedback(),
+        retry_policy=RetryPolicy(max_retries=1),
+    )
+
+    start = time.monotonic()
+    assert engine.run(create_jobs(road2_stand_in, 1), handle_error, total=1)
+    duration = time.monotonic() - start
+
+    assert duration >= 1.0
+    assert road2_stand_in.operation_count("isochrone") == 2
+    assert len(results) == 1
+    assert results[0].status_code == 429
+    assert results[0].retry_after == 1
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in", [Road2StandInConfig(latency=0.02)], indirect=True
+)
+def test_engine_concurrency_controller(road2_stand_in: Road2StandIn):
+    """Test number of requests in flight is increased by controller up to
+    concurrency"""
+    sink = RecordingSink()
+    controller = AimdConcurrencyController(max_concurrency=8)
+    engine = ConcurrentRequestEngine(
+        concurrency=8,
+        buffer=ReorderBuffer(sink),
+        statistics=RequestStatistics(),
+        feedback=QgsFeedback(),
+        controller=controller,
+    )
+
+    assert engine.run(create_jobs(road2_stand_in, 40), handle_result, total=40)
+
+    assert sink.ids == list(range(40))
+    assert controller.peak_concurrency == 8
+    assert 1 < road2_stand_in.max_concurrent_requests <= 8
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in", [Road2StandInConfig(latency=0.02, retry_after=0)], indirect=True
+)
+def test_engine_concurrency_controller_throttled(road2_stand_in: Road2StandIn):
+    """Test number of requests in flight is decreased on throttling"""
+    road2_stand_in.push_statuses(*[200] * 15, 429, 429, 429)
+    sink = RecordingSink()
+    controller = AimdConcurrencyController(max_concurrency=16)
+    engine = ConcurrentRequestEngine(
+        concurrency=16,
+        buffer=ReorderBuffer(sink),
+        statistics=RequestStatistics(),
+        feedback=QgsFeedback(),
+        controller=controller,
+        retry_policy=RetryPolicy(max_retries=3, backoff_s=0.05),
+    )
+
+    assert engine.run(create_jobs(road2_stand_in, 40), handle_result, total=40)
+
+    assert sink.ids == list(range(40))
+    assert controller.decrease_count >= 1
+    assert controller.concurrency < 16
@@ -0,0 +1,481 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m pytest tests/qgis/test_request_scheduler.py
+"""
+
+# standard library
+import json
+import threading
+import time
+from concurrent.futures import Future
+from typing import List
+
+# 3rd party
+import pytest
+
+# PyQGIS
+from qgis.core import (
+    Qgis,
+    QgsBlockingNetworkRequest,
+    QgsFeedback,
+    QgsProcessingFeedback,
+)
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt import request_scheduler
+from gpf_isochrone_isodistance_itineraire.toolbelt.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    RequestResult,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_scheduler import (
+    PRIORITY_INTERACTIVE,
+    RequestScheduler,
+    ResponseCache,
+    _Task,
+)
+from tests.road2_stand_in import Road2StandIn, Road2StandInConfig
+
+# ############################################################################
+# ########## Functions ###########
+# ################################
+
+
+def create_result(url: str, size: int, status_code: int = 200) -> RequestResult:
+    """Create a request result
+
+    :param url: request url
+    :type url: str
+    :param size: response size (bytes)
+    :type size: int
+    :param status_code: HTTP status code, defaults to 200
+    :type status_code: int, optional
+    :return: request result
+    :rtype: RequestResult
+    """
+    return RequestResult(
+        url=url,
+        error_code=(
+            QgsBlockingNetworkRequest.ErrorCode.NoError
+            if status_code == 200
+            else QgsBlockingNetworkRequest.ErrorCode.ServerExceptionError
+        ),
+        error_message="",
+        content=b"x" * size,
+        content_type=b"application/json",
+        latency=0.1,
+        status_code=status_code,
+    )
+
+
+def isochrone_urls(road2_stand_in: Road2StandIn, count: int, y: float) -> List[str]:
+    """Create isochrone request urls for stand-in
+
+    :param road2_stand_in: Road2 stand-in
+    :type road2_stand_in: Road2StandIn
+    :param count: number of urls
+    :type count: int
+    :param y: latitude of first point
+    :type y: float
+    :return: request urls
+    :rtype: List[str]
+    """
+    return [
+        f"{road2_stand_in.url}/isochrone?resource=bdtopo-valhalla"
+        f"&point=2.35,{y + i * 0.01}&costValue=600&costType=time"
+        for i in range(count)
+    ]
+
+
+# ############################################################################
+# ########## Tests ###############
+# ################################
+
+
+def test_response_cache():
+    """Test cached responses are found from canonical url and evicted by size"""
+    cache = ResponseCache(max_bytes=250)
+    url = "https://data.geopf.fr/navigation/isochrone?point=2.35,48.85&costValue=600"
+    cache.put(create_result(url, 100))
+    cache.put(create_result(url + "&profile=car", 100, status_code=500))
+
+    result = cache.get(
+        "https://data.geopf.fr/navigation/isochrone?costValue=600&point=2.35,48.85"
+    )
+    assert result is not None
+    assert result.from_cache
+    assert result.latency == 0
+    assert len(cache) == 1
+
+    # Membership check does not change least recently used response
+    assert url in cache
+    assert url + "&profile=car" not in cache
+    cache.put(create_result(url + "&direction=arrival", 100))
+    assert url in cache
+    cache.put(create_result(url + "&direction=departure", 100))
+    assert cache.used_bytes == 200
+    assert cache.get(url) is None
+    assert url not in cache
+    assert cache.get(url + "&direction=arrival") is not None
+
+    cache.set_max_bytes(0)
+    assert len(cache) == 0
+    assert url + "&direction=arrival" not in cache
+    assert cache.get(url + "&direction=arrival") is None
+
+
+def test_next_task_order():
+    """Test requests of interactive jobs are sent first, then fair share"""
+    scheduler = RequestScheduler(max_connections=1)
+    batch_1 = scheduler.register_job("batch_1")
+    batch_2 = scheduler.register_job("batch_2")
+    interactive = scheduler.register_job("interactive", PRIORITY_INTERACTIVE)
+    assert scheduler.jobs == [batch_1, batch_2, interactive]
+
+    batch_1.in_flight = 2
+    batch_2.in_flight = 1
+    tasks = [
+        _Task(job, f"url_{i}", None, Future(), i)
+        for i, job in enumerate([batch_1, batch_1, batch_2, interactive])
+    ]
+    scheduler._queue = list(tasks)
+
+    order = []
+    while scheduler._queue:
+        task = scheduler._next_task()
+        order.append(task.url)
+        task.job.in_flight += 1
+    assert order == ["url_3", "url_2", "url_0", "url_1"]
+
+    scheduler.unregister_job(batch_1)
+    assert scheduler.jobs == [batch_2, interactive]
+
+
+def test_next_task_host_limit():
+    """Test requests to a busy host are skipped and hosts are shared"""
+    scheduler = RequestScheduler(max_connections=4, max_host_connections=1)
+    job = scheduler.register_job("job")
+    urls = [
+        "https://a.example.org/navigation/isochrone?point=1",
+        "https://a.example.org/navigation/isochrone?point=2",
+        "https://b.example.org/navigation/isochrone?point=1",
+    ]
+    scheduler._queue = [
+        _Task(job, url, None, Future(), i) for i, url in enumerate(urls)
+    ]
+
+    first = scheduler._next_task()
+    scheduler._add_host_in_flight(first.send_url, 1)
+    second = scheduler._next_task()
+    scheduler._add_host_in_flight(second.send_url, 1)
+    assert [first.url, second.url] == [urls[0], urls[2]]
+
+    # Host a.example.org busy: its waiting request is not sent
+    assert scheduler._next_task() is None
+    scheduler._add_host_in_flight(first.send_url, -1)
+    assert scheduler._next_task().url == urls[1]
+
+
+def test_scheduler_post(monkeypatch):
+    """Test long requests are sent with POST to operations accepting it"""
+    sent = []
+
+    def send_request(url, feedback=None, body=None):
+        sent.append((url, body))
+        return create_result(url, 10)
+
+    monkeypatch.setattr(request_scheduler, "send_request", send_request)
+    scheduler = RequestScheduler(max_connections=1, max_get_url_length=200)
+    scheduler.register_post_operations(["https://data.geopf.fr/navigation/itineraire"])
+    job = scheduler.register_job("job")
+    intermediates = "|".join(f"2.{i},48.{i}" for i in range(30))
+    urls = [
+        "https://data.geopf.fr/navigation/itineraire?start=2.35,48.85&end=2.45,48.9",
+        "https://data.geopf.fr/navigation/itineraire?start=2.35,48.85&end=2.45,48.9"
+        f"&intermediates={intermediates}",
+        f"https://data.geopf.fr/navigation/isochrone?point=2.35,48.85&x={'1' * 200}",
+    ]
+    try:
+        results = [job.send(url) for url in urls]
+    finally:
+        scheduler.shutdown()
+
+    assert [result.url for result in results] == urls
+    assert sent[0] == (urls[0], None)
+    assert sent[1][0] == "https://data.geopf.fr/navigation/itineraire"
+    assert len(json.loads(sent[1][1])["intermediates"]) == 30
+    assert sent[2] == (urls[2], None)
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in", [Road2StandInConfig(latency=0.05)], indirect=True
+)
+def test_scheduler_priority(road2_stand_in: Road2StandIn):
+    """Test interactive requests are sent before waiting batch requests"""
+    scheduler = RequestScheduler(max_connections=1)
+    batch = scheduler.register_job("batch")
+    interactive = scheduler.register_job("interactive", PRIORITY_INTERACTIVE)
+    try:
+        batch_futures = [
+            batch.submit(url) for url in isochrone_urls(road2_stand_in, 5, 45)
+        ]
+        interactive_result = interactive.send(isochrone_urls(road2_stand_in, 1, 48)[0])
+        assert not interactive_result.is_error
+
+        # Only batch requests already sent are done before interactive request
+        assert sum(future.done() for future in batch_futures) <= 2
+        assert all(not future.result().is_error for future in batch_futures)
+        assert road2_stand_in.max_concurrent_requests == 1
+        assert batch.sent_count == 5
+        assert interactive.sent_count == 1
+    finally:
+        scheduler.shutdown()
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in", [Road2StandInConfig(latency=0.02)], indirect=True
+)
+def test_scheduler_limits(road2_stand_in: Road2StandIn):
+    """Test connections of all jobs are limited and responses are cached"""
+    scheduler = RequestScheduler(max_connections=3, cache_bytes=1024 * 1024)
+    jobs = [scheduler.register_job(f"job_{i}") for i in range(3)]
+    urls = isochrone_urls(road2_stand_in, 4, 45)
+    try:
+        futures = [job.submit(url) for job in jobs for url in urls]
+        results = [future.result() for future in futures]
+        assert all(not result.is_error for result in results)
+        assert road2_stand_in.max_concurrent_requests <= 3
+
+        # Responses of identical requests are read from cache once available
+        sent = road2_stand_in.operation_count("isochrone")
+        assert sent < len(futures)
+        assert (
+            len([result for result in results if result.from_cache])
+            == len(futures) - sent
+        )
+        assert jobs[0].send(urls[0]).from_cache
+        assert road2_stand_in.operation_count("isochrone") == sent
+    finally:
+        scheduler.shutdown()
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in", [Road2StandInConfig(latency=5.0)], indirect=True
+)
+def test_scheduler_send_cancel(road2_stand_in: Road2StandIn):
+    """Test request sent with processing feedback is aborted when it is canceled"""
+    scheduler = RequestScheduler(max_connections=1)
+    job = scheduler.register_job("job")
+    feedback = QgsProcessingFeedback()
+    results: List[RequestResult] = []
+    try:
+        url = isochrone_urls(road2_stand_in, 1, 45)[0]
+        thread = threading.Thread(
+            target=lambda: results.append(job.send(url, feedback))
+        )
+        start = time.monotonic()
+        thread.start()
+        time.sleep(0.2)
+        feedback.cancel()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert time.monotonic() - start < 2.0
+        assert results[0].is_error
+        scheduler.unregister_job(job)
+    finally:
+        scheduler.shutdown()
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in", [Road2StandInConfig(latency=5.0)], indirect=True
+)
+def test_scheduler_cancel(road2_stand_in: Road2StandIn):
+    """Test waiting requests are canceled without being sent"""
+    scheduler = RequestScheduler(max_connections=1)
+    job = scheduler.register_job("job")
+    feedback = QgsFeedback()
+    try:
+        urls = isochrone_urls(road2_stand_in, 3, 45)
+        futures = [job.submit(url, feedback) for url in urls]
+        feedback.cancel()
+        futures[0].result(timeout=2)
+        scheduler.unregister_job(job)
+        assert all(future.cancelled() for future in futures[1:])
+        assert road2_stand_in.operation_count("isochrone") <= 1
+    finally:
+        scheduler.shutdown()
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in", [Road2StandInConfig(latency=0.01)], indirect=True
+)
+def test_scheduler_circuit_breaker_pause(road2_stand_in: Road2StandIn):
+    """Test requests are paused while service is unavailable, then resumed"""
+    scheduler = RequestScheduler(
+        max_connections=1, failure_threshold=3, probe_interval_s=0.3
+    )
+    job = scheduler.register_job("job")
+    road2_stand_in.push_statuses(503, 503, 503, 503)
+    try:
+        futures = [job.submit(url) for url in isochrone_urls(road2_stand_in, 6, 45)]
+        statuses = [future.result(timeout=10).status_code for future in futures]
+        assert statuses == [503, 503, 503, 503, 200, 200]
+
+        breaker = scheduler.circuit_breaker(road2_stand_in.url + "/isochrone")
+        assert breaker.state == STATE_CLOSED
+        assert breaker.open_count == 1
+
+        # Open, probe failed, open again, probe succeeded, closed
+        levels = [level for level, _ in job.messages]
+        assert levels == [
+            Qgis.MessageLevel.Warning,
+            Qgis.MessageLevel.Info,
+            Qgis.MessageLevel.Warning,
+            Qgis.MessageLevel.Info,
+            Qgis.MessageLevel.Info,
+        ]
+    finally:
+        scheduler.shutdown()
+
+
+def test_scheduler_leftover_open_breaker():
+    """Test open circuit breaker of a service without waiting request does not wake
+    up idle workers"""
+    scheduler = RequestScheduler(max_connections=1)
+    job = scheduler.register_job("job")
+
+    # Service unavailable in a previous run, probe request due
+    leftover = scheduler.circuit_breaker("https://down.example.org/navigation/route")
+    leftover.state = STATE_OPEN
+    assert leftover.probe_delay() == 0
+
+    # Waiting request paused: probe request of its service in flight
+    url = "https://a.example.org/navigation/isochrone?point=1"
+    breaker = scheduler.circuit_breaker(url)
+    breaker.state = STATE_HALF_OPEN
+    with scheduler._condition:
+        assert scheduler._wait_timeout() is None
+        scheduler._queue = [_Task(job, url, None, Future(), 1)]
+        assert scheduler._wait_timeout() is None
+
+        # Probe request of waiting request due: minimum waiting time
+        breaker.state = STATE_OPEN
+        assert scheduler._wait_timeout() == scheduler.POLL_INTERVAL_S
+        breaker.state = STATE_HALF_OPEN
+
+    calls = []
+    next_task = scheduler._next_task
+
+    def counted_next_task():
+        calls.append(time.monotonic())
+        return next_task()
+
+    scheduler._next_task = counted_next_task
+    try:
+        with scheduler._condition:
+            scheduler._start_workers()
+        time.sleep(0.5)
+        # Worker waits for a request done instead of looping
+        assert len(calls) <= 2
+    finally:
+        scheduler.shutdown()
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in", [Road2StandInConfig(latency=0.01)], indirect=True
+)
+def test_scheduler_circuit_breaker_fail_fast(road2_stand_in: Road2StandIn):
+    """Test requests fail without being sent while service is unavailable"""
+    scheduler = RequestScheduler(
+        max_connections=1, failure_threshold=2, probe_interval_s=60, fail_fast=True
+    )
+    job = scheduler.register_job("job")
+    road2_stand_in.push_statuses(503, 503)
+    try:
+        futures = [job.submit(url) for url in isochrone_urls(road2_stand_in, 5, 45)]
+        results = [future.result(timeout=10) for future in futures]
+        assert [result.status_code for result in results] == [503, 503, 0, 0, 0]
+        assert all(result.is_error for result in results)
+        assert not any(result.is_transient_error for result in results)
+        assert road2_stand_in.operation_count("isochrone") == 2
+    finally:
+        scheduler.shutdown()
+
+
+def test_scheduler_endpoint_failover():
+    """Test requests are sent again to another endpoint when one is unavailable"""
+    with Road2StandIn(Road2StandInConfig(latency=0.01)) as main, Road2StandIn(
+        Road2StandInConfig(latency=0.01)
+    ) as mirror:
+        scheduler = RequestScheduler(
+            max_connections=1, failure_threshold=2, probe_interval_s=60
+        )
+        scheduler.register_endpoints(main.url, [main.url, mirror.url])
+        job = scheduler.register_job("job")
+        main.push_statuses(503, 503)
+        try:
+            futures = [job.submit(url) for url in isochrone_urls(main, 6, 45)]
+            results = [future.result(timeout=10) for future in futures]
+            assert all(not result.is_error for result in results)
+
+            # Main endpoint unavailable after 2 failures, requests sent to mirror
+            assert main.operation_count("isochrone") == 2
+            assert mirror.operation_count("isochrone") == 6
+            assert results[-1].url.startswith(mirror.url)
+            assert scheduler.circuit_breaker(main.url + "/isochrone").state == "open"
+        finally:
+            scheduler.shutdown()
+
+
+def test_scheduler_host_limits():
+    """Test connections and rate limit apply to each host"""
+    with Road2StandIn(Road2StandInConfig(latency=0.05)) as service_a, Road2StandIn(
+        Road2StandInConfig(latency=0.05)
+    ) as service_b:
+        scheduler = RequestScheduler(max_connections=4, max_host_connections=2)
+        job = scheduler.register_job("job")
+        try:
+            urls = isochrone_urls(service_a, 6, 45) + isochrone_urls(service_b, 6, 45)
+            results = [future.result(timeout=10) for future in map(job.submit, urls)]
+            assert all(not result.is_error for result in results)
+            assert service_a.max_concurrent_requests <= 2
+            assert service_b.max_concurrent_requests <= 2
+            assert service_a.operation_count("isochrone") == 6
+            assert service_b.operation_count("isochrone") == 6
+        finally:
+            scheduler.shutdown()
+
+
+def test_scheduler_post_stand_in(road2_stand_in: Road2StandIn):
+    """Test a route with many intermediates is computed with a POST request"""
+    scheduler = RequestScheduler(max_connections=1)
+    scheduler.register_post_operations([f"{road2_stand_in.url}/itineraire"])
+    job = scheduler.register_job("job")
+    intermediates = "|".join(
+        f"{2.35 + i * 0.001:.6f},{48.85 + i * 0.001:.6f}" for i in range(150)
+    )
+    url = (
+        f"{road2_stand_in.url}/itineraire?resource=bdtopo-osrm&start=2.35,48.85"
+        f"&end=2.6,49.1&intermediates={intermediates}&geometryFormat=wkt"
+    )
+    try:
+        result = job.send(url)
+    finally:
+        scheduler.shutdown()
+
+    assert len(url) > request_scheduler.MAX_GET_URL_LENGTH
+    assert not result.is_error
+    assert result.url == url
+    operation, params, status = road2_stand_in.requests[-1]
+    assert (operation, status) == ("itineraire", 200)
+    assert len(params["intermediates"].split("|")) == 150
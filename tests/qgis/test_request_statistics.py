@@ -0,0 +1,127 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m unittest tests.qgis.test_request_statistics
+"""
+
+# standard library
+import unittest
+
+# PyQGIS
+from qgis.core import QgsProcessingFeedback
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_statistics import (
+    LatencyHistogram,
+    RequestStatistics,
+)
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestRequestStatistics(unittest.TestCase):
+    def test_empty_statistics(self):
+        """Test statistics without request"""
+        statistics = RequestStatistics()
+        stats = statistics.as_dict()
+        self.assertEqual(stats[RequestStatistics.REQUEST_COUNT], 0)
+        self.assertEqual(stats[RequestStatistics.CACHE_HIT_RATIO], 0.0)
+        self.assertEqual(stats[RequestStatistics.LATENCY_P50], 0.0)
+        self.assertEqual(statistics.summary(), "")
+
+    def test_statistics(self):
+        """Test aggregated statistics"""
+        statistics = RequestStatistics()
+        for i in range(1, 101):
+            statistics.add_request(
+                latency=i / 1000.0,
+                bytes_received=10,
+                cache_hit=i % 4 == 0,
+                error=i == 100,
+            )
+        statistics.add_retry()
+
+        stats = statistics.as_dict()
+        self.assertEqual(stats[RequestStatistics.REQUEST_COUNT], 100)
+        self.assertEqual(stats[RequestStatistics.ERROR_COUNT], 1)
+        self.assertEqual(stats[RequestStatistics.RETRY_COUNT], 1)
+        self.assertEqual(stats[RequestStatistics.BYTES_RECEIVED], 1000)
+        self.assertAlmostEqual(stats[RequestStatistics.CACHE_HIT_RATIO], 0.25)
+        self.assertAlmostEqual(stats[RequestStatistics.LATENCY_P50], 50.0, delta=0.5)
+        self.assertAlmostEqual(stats[RequestStatistics.LATENCY_P95], 95.0, delta=1.0)
+        self.assertGreater(stats[RequestStatistics.REQUESTS_PER_SECOND], 0.0)
+
+    def test_add_results(self):
+        """Test statistics merged from algorithm results"""
+        run_statistics = RequestStatistics()
+        run_statistics.add_request(latency=0.2, bytes_received=100, cache_hit=True)
+
+        statistics = RequestStatistics()
+        statistics.add_results(run_statistics.as_dict())
+        statistics.add_results({})
+
+        stats = statistics.as_dict()
+        self.assertEqual(stats[RequestStatistics.REQUEST_COUNT], 1)
+        self.assertEqual(stats[RequestStatistics.BYTES_RECEIVED], 100)
+        self.assertAlmostEqual(stats[RequestStatistics.CACHE_HIT_RATIO], 1.0)
+        self.assertAlmostEqual(stats[RequestStatistics.LATENCY_P50], 200.0, delta=2.0)
+
+    def test_add_results_latencies(self):
+        """Test latency percentiles of merged results use latencies of each request"""
+        statistics = RequestStatistics()
+        for latencies in [[0.1] * 9, [0.1, 1.0], [2.0] * 9]:
+            run_statistics = RequestStatistics()
+            for latency in latencies:
+                run_statistics.add_request(latency=latency)
+            statistics.add_results(run_statistics.as_dict())
+
+        stats = statistics.as_dict()
+        self.assertEqual(stats[RequestStatistics.REQUEST_COUNT], 20)
+        self.assertAlmostEqual(stats[RequestStatistics.LATENCY_P50], 100.0, delta=1.0)
+        self.assertAlmostEqual(stats[RequestStatistics.LATENCY_P95], 2000.0, delta=20.0)
+
+    def test_latency_histogram(self):
+        """Test latency histogram is bounded and keeps percentiles close to actual
+        latencies"""
+        histogram = LatencyHistogram()
+        for i in range(1, 100001):
+            histogram.add(i / 1000.0)
+        histogram.add(0.0)
+        histogram.add(1e6)
+
+        buckets = histogram.to_list()
+        self.assertLessEqual(len(buckets), LatencyHistogram.BUCKET_COUNT)
+        self.assertEqual(histogram.count, 100002)
+        self.assertAlmostEqual(histogram.percentile(50), 50.0, delta=0.5)
+        self.assertAlmostEqual(histogram.percentile(0), 0.0, delta=0.001)
+
+        merged = LatencyHistogram.from_list(buckets)
+        merged.merge(histogram)
+        self.assertEqual(merged.count, 2 * histogram.count)
+        self.assertEqual(merged.percentile(95), histogram.percentile(95))
+
+    def test_report_interval(self):
+        """Test statistics summary pushed only when interval is elapsed"""
+        statistics = RequestStatistics()
+        statistics.add_request(latency=0.1)
+
+        feedback = QgsProcessingFeedback()
+        statistics.report(feedback)
+        self.assertEqual(feedback.textLog(), "")
+
+        statistics.report(feedback, force=True)
+        self.assertIn("1", feedback.textLog())
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m unittest tests.qgis.test_run_history
+"""
+
+# standard library
+import tempfile
+import unittest
+from pathlib import Path
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.request_statistics import (
+    RequestStatistics,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.run_history import RunHistory
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+def _statistics(request_count: int, latency_p50: float) -> dict:
+    """Create request statistics of a run
+
+    :param request_count: number of requests
+    :type request_count: int
+    :param latency_p50: median latency (ms)
+    :type latency_p50: float
+    :return: request statistics
+    :rtype: dict
+    """
+    return {
+        RequestStatistics.REQUEST_COUNT: request_count,
+        RequestStatistics.ERROR_COUNT: 0,
+        RequestStatistics.LATENCY_P50: latency_p50,
+        RequestStatistics.REQUESTS_PER_SECOND: 1.0,
+    }
+
+
+class TestRunHistory(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.history = RunHistory(app_prefix=self.tmp_dir.name)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_estimate_latency(self):
+        """Test latency is estimated from runs, weighted by number of requests"""
+        url = "https://data.geopf.fr/navigation/"
+        self.assertIsNone(self.history.estimate_latency("isochrone", url))
+
+        self.history.add_run("isochrone", url, _statistics(10, 100.0))
+        self.history.add_run("isochrone", url.rstrip("/"), _statistics(30, 200.0))
+        self.history.add_run("isochrone", url, _statistics(0, 1000.0))
+        self.history.add_run("itinerary", url, _statistics(1, 1000.0))
+
+        self.assertEqual(len(self.history.get_runs("isochrone", url)), 2)
+        self.assertAlmostEqual(self.history.estimate_latency("isochrone", url), 0.175)
+        self.assertIsNone(self.history.estimate_latency("isochrone", "http://other"))
+
+        # History is persisted
+        other = RunHistory(app_prefix=self.tmp_dir.name)
+        self.assertTrue(Path(other.path).exists())
+        self.assertEqual(len(other.get_runs("isochrone", url)), 2)
+
+    def test_max_runs(self):
+        """Test only last runs are kept"""
+        for i in range(RunHistory.MAX_RUNS + 5):
+            self.history.add_run("isochrone", "http://service", _statistics(1, i))
+        runs = self.history.get_runs("isochrone", "http://service")
+        self.assertEqual(len(runs), RunHistory.MAX_RUNS)
+        self.assertEqual(runs[-1]["latency_p50"], RunHistory.MAX_RUNS + 4)
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
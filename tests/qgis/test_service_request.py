@@ -0,0 +1,130 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m unittest tests.qgis.test_service_request
+"""
+
+# standard library
+import json
+import unittest
+from urllib.parse import parse_qsl, urlsplit
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.service_request import (
+    ServiceRequest,
+)
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestServiceRequest(unittest.TestCase):
+    def create_request(self) -> ServiceRequest:
+        """Create an isochrone request
+
+        :return: isochrone request
+        :rtype: ServiceRequest
+        """
+        request = ServiceRequest("https://data.geopf.fr/navigation/", "isochrone")
+        request.add_param("point", "2.35,48.85")
+        request.add_param("resource", "bdtopo-valhalla")
+        request.add_param("costValue", 600)
+        request.add_param("crs", "EPSG:4326")
+        return request
+
+    def test_url(self):
+        """Test url is built with readable separators"""
+        self.assertEqual(
+            self.create_request().url,
+            "https://data.geopf.fr/navigation/isochrone?point=2.35,48.85"
+            "&resource=bdtopo-valhalla&costValue=600&crs=EPSG:4326",
+        )
+
+    def test_encoding(self):
+        """Test values are encoded and decoded back by url parsing"""
+        request = self.create_request()
+        constraints = '{"constraintType":"banned","key":"wayType","value":"tunnel"}'
+        request.add_param("constraints", constraints)
+        request.add_param("name", "a&b=c d+e#f")
+
+        url = request.url
+        self.assertNotIn(" ", url)
+        self.assertNotIn("#", url)
+        params = dict(parse_qsl(urlsplit(url).query))
+        self.assertEqual(params["constraints"], constraints)
+        self.assertEqual(params["name"], "a&b=c d+e#f")
+        self.assertEqual(params["point"], "2.35,48.85")
+
+    def test_additional_params(self):
+        """Test additional parameters are parsed and replace existing parameters"""
+        request = self.create_request()
+        request.add_params_string(
+            "&crs=EPSG:2154&getSteps=false&constraints=%7B%22key%22%3A%22wayType%22%7D"
+        )
+        request.add_params_string("")
+
+        self.assertEqual(request.get_param("crs"), "EPSG:2154")
+        self.assertEqual(request.get_param("getSteps"), "false")
+        self.assertEqual(request.get_param("constraints"), '{"key":"wayType"}')
+        self.assertEqual(request.get_param("unknown"), "")
+        self.assertEqual(
+            [key for key, _ in request.params],
+            ["point", "resource", "costValue", "crs", "getSteps", "constraints"],
+        )
+
+    def test_remove_param(self):
+        """Test parameter is removed and unknown parameter is ignored"""
+        request = self.create_request()
+        request.remove_param("costValue")
+        request.remove_param("unknown")
+        self.assertEqual(
+            [key for key, _ in request.params], ["point", "resource", "crs"]
+        )
+
+    def test_key(self):
+        """Test key is independent of parameter order and encoding"""
+        request = self.create_request()
+        other = ServiceRequest("HTTPS://data.geopf.fr/navigation", "isochrone")
+        other.add_params_string(
+            "crs=EPSG%3A4326&costValue=600&resource=bdtopo-valhalla&point=2.35%2C48.85"
+        )
+        self.assertNotEqual(request.url, other.url)
+        self.assertEqual(request.key, other.key)
+
+        other.add_param("costValue", 900)
+        self.assertNotEqual(request.key, other.key)
+
+    def test_json_body(self):
+        """Test request read from url is converted to a JSON body"""
+        request = ServiceRequest.from_url(
+            "https://data.geopf.fr/navigation//itineraire?start=2.35,48.85"
+            "&end=2.45,48.9&intermediates=2.4,48.87|2.42,48.88&getSteps=false"
+            "&constraints=%7B%22key%22%3A%22wayType%22%7D&crs=EPSG:4326"
+        )
+        self.assertEqual(
+            request.operation_url, "https://data.geopf.fr/navigation/itineraire"
+        )
+        self.assertEqual(
+            json.loads(request.json_body()),
+            {
+                "start": "2.35,48.85",
+                "end": "2.45,48.9",
+                "intermediates": ["2.4,48.87", "2.42,48.88"],
+                "getSteps": False,
+                "constraints": [{"key": "wayType"}],
+                "crs": "EPSG:4326",
+            },
+        )
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m unittest tests.qgis.test_service_statistics
+"""
+
+# standard library
+import tempfile
+import unittest
+
+# PyQGIS
+from qgis.core import QgsBlockingNetworkRequest
+
+# project
+from gpf_isochrone_isodistance_itineraire.toolbelt.network_requests import (
+    RequestResult,
+)
+from gpf_isochrone_isodistance_itineraire.toolbelt.service_statistics import (
+    ServiceStatisticsStore,
+)
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+URL_SERVICE = "https://data.geopf.fr/navigation/"
+
+
+def _result(latency: float, size: int = 100, error: bool = False) -> RequestResult:
+    """Create a request result
+
+    :param latency: latency (seconds)
+    :type latency: float
+    :param size: response size, defaults to 100
+    :type size: int, optional
+    :param error: True for a request error, defaults to False
+    :type error: bool, optional
+    :return: request result
+    :rtype: RequestResult
+    """
+    return RequestResult(
+        url=f"{URL_SERVICE}isochrone",
+        error_code=(
+            QgsBlockingNetworkRequest.ErrorCode.ServerExceptionError
+            if error
+            else QgsBlockingNetworkRequest.ErrorCode.NoError
+        ),
+        error_message="error" if error else "",
+        content=b"x" * size,
+        content_type=b"application/json",
+        latency=latency,
+        status_code=500 if error else 200,
+    )
+
+
+class TestServiceStatisticsStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = ServiceStatisticsStore(app_prefix=self.tmp_dir.name)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_save(self):
+        """Test statistics are aggregated by key and merged in store file"""
+        key = (URL_SERVICE, "bdtopo-valhalla", "car", "isochrone")
+        self.assertIsNone(self.store.get(*key))
+
+        self.store.add_result(*key, _result(0.1, 100))
+        self.store.add_result(*key, _result(0.3, 300))
+        self.store.add_result(*key, _result(2.0, error=True))
+        self.store.add_result(URL_SERVICE, "bdtopo-osrm", "car", "route", _result(1.0))
+        self.assertIsNone(self.store.get(*key))
+        self.store.save()
+
+        statistics = ServiceStatisticsStore(app_prefix=self.tmp_dir.name).get(*key)
+        self.assertEqual(statistics.request_count, 3)
+        self.assertAlmostEqual(statistics.error_rate, 1 / 3)
+        self.assertAlmostEqual(statistics.mean_latency, 0.2)
+        self.assertAlmostEqual(statistics.expected_latency, 0.2)
+        self.assertAlmostEqual(statistics.mean_bytes, 200)
+        self.assertEqual(len(self.store.get_all()), 2)
+
+        # Recent latency is weighted to last runs
+        self.store.add_result(*key, _result(1.1))
+        self.store.save()
+        statistics = self.store.get(*key)
+        self.assertEqual(statistics.request_count, 4)
+        self.assertAlmostEqual(statistics.mean_latency, 0.5)
+        self.assertAlmostEqual(
+            statistics.recent_latency,
+            0.2 * (1 - ServiceStatisticsStore.RECENT_WEIGHT)
+            + 1.1 * ServiceStatisticsStore.RECENT_WEIGHT,
+        )
+
+        self.store.clear()
+        self.assertEqual(self.store.get_all(), [])
+        self.assertFalse(self.store.path.exists())
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
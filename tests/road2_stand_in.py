@@ -0,0 +1,479 @@
+#! python3  # noqa E265
+
+"""
+Local stand-in for the Géoplateforme Road2 navigation service.
+
+Serves getcapabilities from a test fixture and synthesizes isochrone polygons and
+routes, with configurable latency, error rate, throttling (429) and payload size.
+Random behaviors use a seeded generator so runs are reproducible.
+
+Usage:
+
+.. code-block:: python
+
+    with Road2StandIn(Road2StandInConfig(latency=0.05, error_rate=0.1)) as road2:
+        alg_params = {"URL_SERVICE": road2.url, ...}
+"""
+
+# standard library
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# 3rd party
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+# ############################################################################
+# ########## Globals #############
+# ################################
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+GETCAPABILITIES_FIXTURE = FIXTURES_DIR / "road2_getcapabilities.json"
+
+# Mean speed (m/s) used to convert time cost to distance
+MEAN_SPEED = 50 / 3.6
+# Approximate length of a degree of latitude (m)
+METERS_PER_DEGREE = 111_320.0
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+@dataclass
+class Road2StandInConfig:
+    """Behavior of the Road2 stand-in"""
+
+    # Response delay (seconds), a random jitter in [0, latency_jitter] is added
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    # Ratio of computation requests answered with a 500 error
+    error_rate: float = 0.0
+    # Ratio of computation requests answered with a 429 error
+    throttle_rate: float = 0.0
+    # Retry-After header value (seconds) for 429 responses
+    retry_after: int = 1
+    # Number of vertices of synthesized geometries
+    vertex_count: int = 32
+    # Size of an additional padding attribute in responses (bytes)
+    padding_bytes: int = 0
+    # Seed for random behaviors
+    seed: int = 0
+
+
+class Road2StandIn:
+    """Local HTTP stand-in for Road2 getcapabilities, isochrone and itineraire"""
+
+    def __init__(
+        self,
+        config: Optional[Road2StandInConfig] = None,
+        capabilities_path: Path = GETCAPABILITIES_FIXTURE,
+    ) -> None:
+        self.config = config or Road2StandInConfig()
+        with capabilities_path.open(encoding="UTF-8") as capabilities_file:
+            self.capabilities: Dict[str, Any] = json.load(capabilities_file)
+
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._scripted_statuses: Deque[int] = deque()
+        self._active_requests = 0
+
+        # Request log : (operation, query parameters, status)
+        self.requests: List[Tuple[str, Dict[str, str], int]] = []
+        self.max_concurrent_requests = 0
+
+        self.server = HTTPServer(host="localhost", port=0, threaded=True)
+        for operation, handler in [
+            ("getcapabilities", self._handle_getcapabilities),
+            ("isochrone", self._handle_isochrone),
+            ("itineraire", self._handle_route),
+        ]:
+            self.server.expect_request(
+                re.compile(rf"^/*{operation}$")
+            ).respond_with_handler(handler)
+
+    def __enter__(self) -> "Road2StandIn":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Start HTTP server"""
+        self.server.start()
+
+    def stop(self) -> None:
+        """Stop HTTP server"""
+        if self.server.is_running():
+            self.server.stop()
+
+    @property
+    def url(self) -> str:
+        """Service url, to be used as URL_SERVICE parameter
+
+        :return: service url
+        :rtype: str
+        """
+        return self.server.url_for("").rstrip("/")
+
+    def push_statuses(self, *statuses: int) -> None:
+        """Force status of next computation requests, before random behaviors.
+        A 200 status forces a successful response.
+
+        :param statuses: HTTP status codes
+        :type statuses: int
+        """
+        with self._lock:
+            self._scripted_statuses.extend(statuses)
+
+    def operation_count(self, operation: str) -> int:
+        """Return number of requests received for an operation
+
+        :param operation: operation (getcapabilities, isochrone or itineraire)
+        :type operation: str
+        :return: number of requests
+        :rtype: int
+        """
+        with self._lock:
+            return len([req for req in self.requests if req[0] == operation])
+
+    def _handle_getcapabilities(self, request: Request) -> Response:
+        """Return getcapabilities fixture
+
+        :param request: HTTP request
+        :type request: Request
+        :return: HTTP response
+        :rtype: Response
+        """
+        self._log(request, "getcapabilities", 200)
+        return self._json_response(self.capabilities)
+
+    def _handle_isochrone(self, request: Request) -> Response:
+        """Return a synthesized isochrone polygon around requested point
+
+        :param request: HTTP request
+        :type request: Request
+        :return: HTTP response
+        :rtype: Response
+        """
+        return self._handle_computation(request, "isochrone", self._isochrone)
+
+    def _handle_route(self, request: Request) -> Response:
+        """Return a synthesized route through requested points
+
+        :param request: HTTP request
+        :type request: Request
+        :return: HTTP response
+        :rtype: Response
+        """
+        return self._handle_computation(request, "itineraire", self._route)
+
+    def _handle_computation(
+        self, request: Request, operation: str, compute
+    ) -> Response:
+        """Apply configured behaviors and compute response for an operation
+
+        :param request: HTTP request
+        :type request: Request
+        :param operation: operation name
+        :type operation: str
+        :param compute: function returning response content from parameters
+        :type compute: Callable[[Dict[str, str]], Dict[str, Any]]
+        :return: HTTP response
+        :rtype: Response
+        """
+        with self._lock:
+            self._active_requests += 1
+            self.max_concurrent_requests = max(
+                self.max_concurrent_requests, self._active_requests
+            )
+            status, delay = self._draw_behavior()
+
+        try:
+            if delay > 0:
+                time.sleep(delay)
+
+            params = self._request_params(request)
+            if status == 429:
+                response = self._error_response(
+                    429, "TooManyRequests", "Too many requests"
+                )
+                response.headers["Retry-After"] = str(self.config.retry_after)
+            elif status != 200:
+                response = self._error_response(
+                    status, "InternalServerError", "Internal server error"
+                )
+            else:
+                try:
+                    response = self._json_response(compute(params))
+                except (KeyError, ValueError) as exc:
+                    response = self._error_response(
+                        400, "BadRequest", f"Invalid parameter: {exc}"
+                    )
+
+            self._log(request, operation, response.status_code, params)
+            return response
+        finally:
+            with self._lock:
+                self._active_requests -= 1
+
+    def _draw_behavior(self) -> Tuple[int, float]:
+        """Define status and delay for a computation request. Must be called with lock.
+
+        :return: HTTP status and delay (seconds)
+        :rtype: Tuple[int, float]
+        """
+        delay = self.config.latency
+        if self.config.latency_jitter:
+            delay += self._random.uniform(0, self.config.latency_jitter)
+
+        if self._scripted_statuses:
+            return self._scripted_statuses.popleft(), delay
+
+        draw = self._random.random()
+        if draw < self.config.throttle_rate:
+            return 429, delay
+        if draw < self.config.throttle_rate + self.config.error_rate:
+            return 500, delay
+        return 200, delay
+
+    def _request_params(self, request: Request) -> Dict[str, str]:
+        """Return request parameters, from query or JSON body
+
+        :param request: HTTP request
+        :type request: Request
+        :return: request parameters
+        :rtype: Dict[str, str]
+        """
+        params = dict(request.args)
+        if request.method == "POST" and request.data:
+            body = json.loads(request.data)
+            for key, value in body.items():
+                if isinstance(value, list):
+                    value = "|".join(str(item) for item in value)
+                params[key] = str(value)
+        return params
+
+    def _isochrone(self, params: Dict[str, str]) -> Dict[str, Any]:
+        """Synthesize isochrone response: a regular polygon around point
+
+        :param params: request parameters
+        :type params: Dict[str, str]
+        :return: response content
+        :rtype: Dict[str, Any]
+        """
+        x, y = self._check_point(params["point"])
+        resource = self._check_resource(params["resource"], "isochrone")
+        cost_value = float(params["costValue"])
+        cost_type = params.get("costType", "time")
+
+        distance = cost_value * MEAN_SPEED if cost_type == "time" else cost_value
+        radius_y = distance / METERS_PER_DEGREE
+        radius_x = radius_y / max(math.cos(math.radians(y)), 0.01)
+        vertex_count = max(self.config.vertex_count, 3)
+        vertices = [
+            (
+                x + radius_x * math.cos(2 * math.pi * i / vertex_count),
+                y + radius_y * math.sin(2 * math.pi * i / vertex_count),
+            )
+            for i in range(vertex_count)
+        ]
+        vertices.append(vertices[0])
+
+        return self._with_padding(
+            {
+                "point": params["point"],
+                "resource": resource,
+                "costType": cost_type,
+                "costValue": cost_value,
+                "profile": params.get("profile", ""),
+                "direction": params.get("direction", "departure"),
+                "crs": params.get("crs", "EPSG:4326"),
+                "geometry": f"POLYGON(({_wkt_coordinates(vertices)}))",
+            }
+        )
+
+    def _route(self, params: Dict[str, str]) -> Dict[str, Any]:
+        """Synthesize route response: a line through start, intermediates and end
+
+        :param params: request parameters
+        :type params: Dict[str, str]
+        :return: response content
+        :rtype: Dict[str, Any]
+        """
+        points = [self._check_point(params["start"])]
+        if params.get("intermediates"):
+            points += [
+                self._check_point(point)
+                for point in params["intermediates"].split("|")
+                if point
+            ]
+        points.append(self._check_point(params["end"]))
+        resource = self._check_resource(params["resource"], "route")
+
+        # Split vertices between legs
+        vertex_count = max(self.config.vertex_count, len(points))
+        leg_count = len(points) - 1
+        vertices = [points[0]]
+        distance = 0.0
+        for leg in range(leg_count):
+            (x1, y1), (x2, y2) = points[leg], points[leg + 1]
+            steps = max(vertex_count // leg_count, 1)
+            for step in range(1, steps + 1):
+                ratio = step / steps
+                vertices.append((x1 + (x2 - x1) * ratio, y1 + (y2 - y1) * ratio))
+            distance += _distance(points[leg], points[leg + 1])
+
+        return self._with_padding(
+            {
+                "start": params["start"],
+                "end": params["end"],
+                "resource": resource,
+                "profile": params.get("profile", ""),
+                "optimization": params.get("optimization", ""),
+                "crs": params.get("crs", "EPSG:4326"),
+                "distance": round(distance, 1),
+                "duration": round(distance / MEAN_SPEED, 1),
+                "distanceUnit": "meter",
+                "timeUnit": "second",
+                "geometry": f"LINESTRING({_wkt_coordinates(vertices)})",
+            }
+        )
+
+    def _check_point(self, point: str) -> Tuple[float, float]:
+        """Parse a "x,y" point parameter
+
+        :param point: point parameter
+        :type point: str
+        :raises ValueError: invalid point
+        :return: point coordinates
+        :rtype: Tuple[float, float]
+        """
+        values = point.split(",")
+        if len(values) != 2:
+            raise ValueError(point)
+        return float(values[0]), float(values[1])
+
+    def _check_resource(self, resource: str, operation: str) -> str:
+        """Check that resource is available for operation in capabilities
+
+        :param resource: resource id
+        :type resource: str
+        :param operation: operation id
+        :type operation: str
+        :raises ValueError: resource not available
+        :return: resource id
+        :rtype: str
+        """
+        for res in self.capabilities["resources"]:
+            if res["id"] == resource and operation in [
+                op["id"] for op in res["availableOperations"]
+            ]:
+                return resource
+        raise ValueError(resource)
+
+    def _with_padding(self, content: Dict[str, Any]) -> Dict[str, Any]:
+        """Add padding attribute to response content if configured
+
+        :param content: response content
+        :type content: Dict[str, Any]
+        :return: response content
+        :rtype: Dict[str, Any]
+        """
+        if self.config.padding_bytes:
+            content["padding"] = "x" * self.config.padding_bytes
+        return content
+
+    def _log(
+        self,
+        request: Request,
+        operation: str,
+        status: int,
+        params: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Add request to request log
+
+        :param request: HTTP request
+        :type request: Request
+        :param operation: operation name
+        :type operation: str
+        :param status: response status
+        :type status: int
+        :param params: request parameters, defaults to None (query parameters)
+        :type params: Optional[Dict[str, str]], optional
+        """
+        with self._lock:
+            self.requests.append((operation, params or dict(request.args), status))
+
+    @staticmethod
+    def _json_response(content: Dict[str, Any], status: int = 200) -> Response:
+        """Create a JSON response
+
+        :param content: response content
+        :type content: Dict[str, Any]
+        :param status: HTTP status, defaults to 200
+        :type status: int, optional
+        :return: HTTP response
+        :rtype: Response
+        """
+        return Response(
+            json.dumps(content), status=status, content_type="application/json"
+        )
+
+    @staticmethod
+    def _error_response(status: int, error_type: str, message: str) -> Response:
+        """Create a Road2 error response
+
+        :param status: HTTP status
+        :type status: int
+        :param error_type: error type
+        :type error_type: str
+        :param message: error message
+        :type message: str
+        :return: HTTP response
+        :rtype: Response
+        """
+        return Road2StandIn._json_response(
+            {"error": {"errorType": error_type, "message": message}}, status=status
+        )
+
+
+# ############################################################################
+# ########## Functions ###########
+# ################################
+
+
+def _wkt_coordinates(vertices: List[Tuple[float, float]]) -> str:
+    """Format vertices as WKT coordinates
+
+    :param vertices: vertices
+    :type vertices: List[Tuple[float, float]]
+    :return: WKT coordinates
+    :rtype: str
+    """
+    return ",".join(f"{x:.7f} {y:.7f}" for x, y in vertices)
+
+
+def _distance(start: Tuple[float, float], end: Tuple[float, float]) -> float:
+    """Approximate distance in meters between two EPSG:4326 points
+
+    :param start: start point (lon, lat)
+    :type start: Tuple[float, float]
+    :param end: end point (lon, lat)
+    :type end: Tuple[float, float]
+    :return: distance (m)
+    :rtype: float
+    """
+    mean_lat = math.radians((start[1] + end[1]) / 2)
+    dx = (end[0] - start[0]) * math.cos(mean_lat) * METERS_PER_DEGREE
+    dy = (end[1] - start[1]) * METERS_PER_DEGREE
+    return math.hypot(dx, dy)
@@ -0,0 +1,103 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m unittest tests.unit.test_compare_benchmarks
+"""
+
+# standard library
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+# project
+from scripts.compare_benchmarks import compare_results, main
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestCompareBenchmarks(unittest.TestCase):
+    BASELINE = {
+        "isochrone[size=100]": {
+            "features_per_second": 100.0,
+            "memory_peak_bytes": 1000,
+        },
+        "itinerary[size=100]": {"features_per_second": 50.0, "memory_peak_bytes": 1000},
+    }
+
+    def test_no_regression(self):
+        """Test changes below threshold are not regressions"""
+        current = {
+            "isochrone[size=100]": {
+                "features_per_second": 95.0,
+                "memory_peak_bytes": 1050,
+            },
+            "itinerary[size=100]": {
+                "features_per_second": 80.0,
+                "memory_peak_bytes": 500,
+            },
+        }
+        comparisons = compare_results(self.BASELINE, current, threshold=0.1)
+        self.assertEqual(len(comparisons), 4)
+        self.assertFalse(any(c["regression"] for c in comparisons))
+
+    def test_regressions(self):
+        """Test throughput decrease and memory increase above threshold"""
+        current = {
+            "isochrone[size=100]": {
+                "features_per_second": 80.0,
+                "memory_peak_bytes": 1000,
+            },
+            "itinerary[size=100]": {
+                "features_per_second": 50.0,
+                "memory_peak_bytes": 1500,
+            },
+        }
+        comparisons = compare_results(self.BASELINE, current, threshold=0.1)
+        regressions = {
+            (c["benchmark"], c["measure"]) for c in comparisons if c["regression"]
+        }
+        self.assertEqual(
+            regressions,
+            {
+                ("isochrone[size=100]", "features_per_second"),
+                ("itinerary[size=100]", "memory_peak_bytes"),
+            },
+        )
+
+    def test_main_exit_code(self):
+        """Test script exit code with results files"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            baseline_path = Path(tmp_dir) / "baseline.json"
+            current_path = Path(tmp_dir) / "current.json"
+            baseline_path.write_text(json.dumps({"results": self.BASELINE}))
+
+            current_path.write_text(json.dumps({"results": self.BASELINE}))
+            with redirect_stdout(StringIO()):
+                self.assertEqual(main([str(baseline_path), str(current_path)]), 0)
+
+            slower = {
+                key: dict(value, features_per_second=value["features_per_second"] / 2)
+                for key, value in self.BASELINE.items()
+            }
+            current_path.write_text(json.dumps({"results": slower}))
+            output = StringIO()
+            with redirect_stdout(output):
+                self.assertEqual(main([str(baseline_path), str(current_path)]), 1)
+            self.assertIn("REGRESSION", output.getvalue())
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+#! python3  # noqa E265
+
+"""
+Usage from the repo root folder:
+
+.. code-block:: bash
+
+    # for whole tests
+    python -m pytest tests/unit/test_road2_stand_in.py
+"""
+
+# standard library
+import json
+from typing import Any, Dict, Tuple
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+# 3rd party
+import pytest
+
+# project
+from tests.road2_stand_in import Road2StandIn, Road2StandInConfig
+
+# ############################################################################
+# ########## Functions ###########
+# ################################
+
+
+def _get(url: str) -> Tuple[int, Dict[str, Any]]:
+    """Send a GET request and return status and JSON content
+
+    :param url: request url
+    :type url: str
+    :return: status and JSON content
+    :rtype: Tuple[int, Dict[str, Any]]
+    """
+    try:
+        with urlopen(url) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+ISOCHRONE_QUERY = (
+    "/isochrone?point=2.35,48.85&resource=bdtopo-valhalla&profile=car"
+    "&direction=departure&costType=time&costValue=600&geometryFormat=wkt"
+    "&crs=EPSG:4326"
+)
+ROUTE_QUERY = (
+    "/itineraire?start=2.35,48.85&end=2.45,48.90&intermediates=2.40,48.87"
+    "&resource=bdtopo-osrm&profile=car&optimization=fastest&geometryFormat=wkt"
+    "&crs=EPSG:4326"
+)
+
+# ############################################################################
+# ########## Tests ###############
+# ################################
+
+
+def test_getcapabilities(road2_stand_in: Road2StandIn):
+    """Test getcapabilities fixture served"""
+    status, content = _get(f"{road2_stand_in.url}/getcapabilities")
+    assert status == 200
+    assert [op["id"] for op in content["operations"]] == ["route", "isochrone"]
+    assert road2_stand_in.operation_count("getcapabilities") == 1
+
+
+def test_isochrone(road2_stand_in: Road2StandIn):
+    """Test synthesized isochrone polygon"""
+    status, content = _get(f"{road2_stand_in.url}{ISOCHRONE_QUERY}")
+    assert status == 200
+    assert content["geometry"].startswith("POLYGON((")
+    assert content["resource"] == "bdtopo-valhalla"
+    # Default vertex count and closing vertex
+    assert content["geometry"].count(",") == 32
+
+
+def test_route(road2_stand_in: Road2StandIn):
+    """Test synthesized route through intermediates"""
+    status, content = _get(f"{road2_stand_in.url}{ROUTE_QUERY}")
+    assert status == 200
+    assert content["geometry"].startswith("LINESTRING(2.3500000 48.8500000")
+    assert "2.4000000 48.8700000" in content["geometry"]
+    assert content["distance"] > 0
+    assert content["duration"] > 0
+
+
+def test_invalid_resource(road2_stand_in: Road2StandIn):
+    """Test error for resource without isochrone operation"""
+    url = road2_stand_in.url + ISOCHRONE_QUERY.replace("valhalla", "osrm")
+    status, content = _get(url)
+    assert status == 400
+    assert "bdtopo-osrm" in content["error"]["message"]
+
+
+def test_scripted_statuses(road2_stand_in: Road2StandIn):
+    """Test forced statuses for next requests"""
+    road2_stand_in.push_statuses(429, 500)
+    url = f"{road2_stand_in.url}{ISOCHRONE_QUERY}"
+    assert _get(url)[0] == 429
+    assert _get(url)[0] == 500
+    assert _get(url)[0] == 200
+    assert [req[2] for req in road2_stand_in.requests] == [429, 500, 200]
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in",
+    [Road2StandInConfig(error_rate=0.3, throttle_rate=0.2, seed=42)],
+    indirect=True,
+)
+def test_seeded_errors(road2_stand_in: Road2StandIn):
+    """Test error rates are reproducible with seed"""
+    url = f"{road2_stand_in.url}{ISOCHRONE_QUERY}"
+    statuses = [_get(url)[0] for _ in range(50)]
+
+    with Road2StandIn(road2_stand_in.config) as other_stand_in:
+        other_url = f"{other_stand_in.url}{ISOCHRONE_QUERY}"
+        assert [_get(other_url)[0] for _ in range(50)] == statuses
+
+    assert set(statuses) == {200, 429, 500}
+
+
+@pytest.mark.parametrize(
+    "road2_stand_in",
+    [Road2StandInConfig(vertex_count=1000, padding_bytes=10000)],
+    indirect=True,
+)
+def test_payload_size(road2_stand_in: Road2StandIn):
+    """Test configurable payload size"""
+    status, content = _get(f"{road2_stand_in.url}{ISOCHRONE_QUERY}")
+    assert status == 200
+    assert content["geometry"].count(",") == 1000
+    assert len(content["padding"]) == 10000